@@ -1,5 +1,6 @@
 import os
 import sys
+from collections import OrderedDict
 from contextlib import contextmanager
 from functools import wraps
 from os.path import dirname
@@ -71,9 +72,11 @@ def benchmark_clickhouse(fn):
 @contextmanager
 def no_materialized_columns():
     "Allows running a function without any materialized columns being used in query"
-    get_enabled_materialized_columns._cache = {
-        ("events",): (now(), {}),
-        ("person",): (now(), {}),
-    }
+    get_enabled_materialized_columns._cache = OrderedDict(
+        {
+            ("events",): (now(), {}),
+            ("person",): (now(), {}),
+        }
+    )
     yield
-    get_enabled_materialized_columns._cache = {}
+    get_enabled_materialized_columns._cache = OrderedDict()
@@ -0,0 +1,76 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from . import helpers  # noqa: F401
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.database.database import create_hogql_database
+from posthog.hogql.printer import print_ast
+from posthog.hogql.visitor import clone_expr
+from posthog.hogql_queries.query_runner import get_query_runner
+from posthog.models import Organization, Team
+from posthog.schema import (
+    BreakdownFilter,
+    DateRange,
+    EventPropertyFilter,
+    EventsNode,
+    FunnelsQuery,
+    LifecycleQuery,
+    PersonPropertyFilter,
+    PropertyOperator,
+    RetentionQuery,
+    StickinessQuery,
+    TrendsQuery,
+    WebStatsBreakdown,
+    WebStatsTableQuery,
+)
+
+DATE_RANGE = DateRange(date_from="2021-07-01", date_to="2021-10-01")
+
+# Insight queries like the ones in the query runner tests, compiled from HogQL to ClickHouse SQL
+QUERIES = {
+    "trends_breakdown": TrendsQuery(
+        series=[
+            EventsNode(event="$pageview"),
+            EventsNode(
+                event="$pageview",
+                properties=[
+                    EventPropertyFilter(key="$browser", operator=PropertyOperator.EXACT, value="Chrome"),
+                    PersonPropertyFilter(key="email", operator=PropertyOperator.ICONTAINS, value=".com"),
+                ],
+            ),
+        ],
+        breakdownFilter=BreakdownFilter(breakdown="$browser"),
+        dateRange=DATE_RANGE,
+    ),
+    "funnel": FunnelsQuery(
+        series=[EventsNode(event="$pageview"), EventsNode(event="$autocapture"), EventsNode(event="$pageleave")],
+        dateRange=DATE_RANGE,
+    ),
+    "retention": RetentionQuery(retentionFilter={}, dateRange=DATE_RANGE),
+    "lifecycle": LifecycleQuery(series=[EventsNode(event="$pageview")], dateRange=DATE_RANGE),
+    "stickiness": StickinessQuery(series=[EventsNode(event="$pageview")], dateRange=DATE_RANGE),
+    "web_stats_table": WebStatsTableQuery(breakdownBy=WebStatsBreakdown.PAGE, properties=[], dateRange=DATE_RANGE),
+}
+
+
+class HogQLCompileSuite:
+    """Time spent compiling insight queries from HogQL to ClickHouse SQL, without running them"""
+
+    version = "v001"
+    params = list(QUERIES.keys())
+    param_names = ["query"]
+
+    team: Team
+
+    def setup(self, query_name):
+        # :TRICKY: Data in benchmark servers has ID=2
+        team = Team.objects.filter(id=2).first()
+        if team is None:
+            organization = Organization.objects.create()
+            team = Team.objects.create(id=2, organization=organization, name="The Bakery")
+        self.team = team
+        self.database = create_hogql_database(team.pk)
+        self.query = get_query_runner(QUERIES[query_name], team).to_query()
+
+    def time_compile(self, query_name):
+        context = HogQLContext(team_id=self.team.pk, team=self.team, enable_select_queries=True, database=self.database)
+        print_ast(clone_expr(self.query), context=context, dialect="clickhouse")
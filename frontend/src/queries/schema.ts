@@ -551,6 +551,8 @@ export interface EventsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit?: integer
     offset?: integer
+    /** Pass as `cursor` to fetch the next page, when the query was paginated with a cursor */
+    nextCursor?: string
 }
 
 export type CachedEventsQueryResponse = CachedQueryResponse<EventsQueryResponse>
@@ -586,6 +588,10 @@ export interface EventsQuery extends DataNode<EventsQueryResponse> {
      * Number of rows to skip before returning rows
      */
     offset?: integer
+    /**
+     * Continue after the last row of a previous page, from its `nextCursor`, or pass an empty string to start paginating with cursors. Takes precedence over `offset`
+     */
+    cursor?: string
     /**
      * Show events matching a given action
      */
@@ -1752,6 +1758,8 @@ export interface ActorsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit: integer
     offset: integer
+    /** Pass as `cursor` to fetch the next page, when the query was paginated with a cursor */
+    nextCursor?: string
     missing_actors_count?: integer
 }
 
@@ -1769,6 +1777,8 @@ export interface ActorsQuery extends DataNode<ActorsQueryResponse> {
     orderBy?: string[]
     limit?: integer
     offset?: integer
+    /** Continue after the last row of a previous page, from its `nextCursor`, or pass an empty string to start paginating with cursors. Takes precedence over `offset` */
+    cursor?: string
 }
 
 export interface TimelineEntry {
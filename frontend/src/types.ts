@@ -4109,6 +4109,12 @@ export interface DataWarehouseSavedQuery {
     columns: DatabaseSchemaField[]
     last_run_at?: string
     status?: string
+    materialization_type?: 'full_refresh' | 'incremental'
+    materialization_config?: {
+        watermark_column?: string | null
+        watermark_lookback?: number
+        watermark_last_value?: string | number | null
+    }
 }
 
 export interface DataWarehouseViewLink {
@@ -0,0 +1,44 @@
+"""
+Benchmarks the Python HogVM on the compiled programs in `hogvm/__tests__/__snapshots__`.
+
+    pip install pyperf
+    python -m hogvm.python.benchmark -o before.json
+    python -m hogvm.python.benchmark -o after.json
+    python -m pyperf compare_to before.json after.json
+
+Pass `--program <name>` (repeatable) to run only some of the programs, e.g. `--program mandelbrot`.
+"""
+
+import glob
+import json
+import os
+from datetime import timedelta
+
+import pyperf
+
+from hogvm.python.execute import execute_bytecode
+
+SNAPSHOTS_DIR = os.path.join(os.path.dirname(__file__), "..", "__tests__", "__snapshots__")
+
+
+def add_cmdline_args(cmd: list[str], args) -> None:
+    for program in args.program:
+        cmd.extend(("--program", program))
+
+
+def main():
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.argparser.add_argument("--program", action="append", default=[], help="Only run the given program(s)")
+    args = runner.parse_args()
+
+    for filename in sorted(glob.glob(os.path.join(SNAPSHOTS_DIR, "*.hoge"))):
+        name = os.path.basename(filename).removesuffix(".hoge")
+        if args.program and name not in args.program:
+            continue
+        with open(filename) as file:
+            bytecode = json.load(file)
+        runner.bench_func(f"hogvm_{name}", execute_bytecode, bytecode, None, None, timedelta(seconds=60))
+
+
+if __name__ == "__main__":
+    main()
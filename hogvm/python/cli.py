@@ -2,6 +2,7 @@ from datetime import timedelta
 import sys
 import json
 from .execute import execute_bytecode
+from .regex_cache import regex_cache
 
 modifiers = [arg for arg in sys.argv if arg.startswith("-")]
 args = [arg for arg in sys.argv if arg != "" and not arg.startswith("-")]
@@ -22,3 +23,5 @@ with open(filename) as file:
 response = execute_bytecode(code, globals=None, timeout=timedelta(seconds=5), team=None, debug=debug)
 for line in response.stdout:
     print(line)  # noqa: T201
+if debug:
+    print(f"Regex cache: {regex_cache.stats()}", file=sys.stderr)  # noqa: T201
@@ -3,16 +3,18 @@ import re
 import time
 from copy import deepcopy
 from typing import Any, Optional, TYPE_CHECKING
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 from hogvm.python.debugger import debugger, color_bytecode
 from hogvm.python.objects import is_hog_error, new_hog_closure, CallFrame, ThrowFrame, new_hog_callable, is_hog_upvalue
 from hogvm.python.operation import Operation, HOGQL_BYTECODE_IDENTIFIER, HOGQL_BYTECODE_IDENTIFIER_V0
+from hogvm.python.regex_cache import regex_cache
 from hogvm.python.stl import STL
 from hogvm.python.stl.bytecode import BYTECODE_STL
 from dataclasses import dataclass
 
 from hogvm.python.utils import (
+    COST_PER_UNIT,
     UncaughtHogVMException,
     HogVMException,
     get_nested_value,
@@ -29,6 +31,13 @@ MAX_MEMORY = 64 * 1024 * 1024  # 64 MB
 MAX_FUNCTION_ARGS_LENGTH = 300
 CALLSTACK_LENGTH = 1000
 
+# Containers cheaper than this are measured again on every push, as that's faster than caching them
+COST_CACHE_MIN_COST = 256
+COST_CACHE_MAX_SIZE = 1024
+
+# Returned by operations that moved the instruction pointer themselves
+_JUMPED = object()
+
 
 @dataclass
 class BytecodeResult:
@@ -45,6 +54,77 @@ def execute_bytecode(
     team: Optional["Team"] = None,
     debug=False,
 ) -> BytecodeResult:
+    return _create_vm(input, functions, timeout, team, debug).run(globals)
+
+
+@dataclass
+class BatchItemError:
+    """Stands in for the result of an item that raised, when running a batch with `capture_errors`."""
+
+    error: Exception
+
+
+def execute_bytecode_batch(
+    input: list[Any] | dict,
+    globals_list: Iterable[Optional[dict[str, Any]]],
+    functions: Optional[dict[str, Callable[..., Any]]] = None,
+    timeout=timedelta(seconds=5),
+    team: Optional["Team"] = None,
+    capture_errors=False,
+) -> list[Any]:
+    """
+    Runs the same bytecode once for every item of `globals_list`, and returns the results in order.
+
+    The bytecode is validated and set up only once for the whole batch, while `timeout` applies to every item on its
+    own. With `capture_errors`, an item that raises gets a `BatchItemError` instead of failing the whole batch.
+    """
+    vm = _create_vm(input, functions, timeout, team)
+    results: list[Any] = []
+    for globals in globals_list:
+        try:
+            results.append(vm.run(globals).result)
+        except Exception as e:
+            if not capture_errors:
+                raise
+            results.append(BatchItemError(error=e))
+    return results
+
+
+def filter_bytecode_batch(
+    input: list[Any] | dict,
+    globals_list: Iterable[Optional[dict[str, Any]]],
+    functions: Optional[dict[str, Callable[..., Any]]] = None,
+    timeout=timedelta(seconds=5),
+    team: Optional["Team"] = None,
+    capture_errors=False,
+) -> bytearray:
+    """
+    Like `execute_bytecode_batch`, but for filters. Returns a bitmap in which bit `i % 8` of byte `i // 8` is set if
+    item `i` returned `true`. With `capture_errors`, items that raise are left unset.
+    """
+    vm = _create_vm(input, functions, timeout, team)
+    bitmap = bytearray()
+    for index, globals in enumerate(globals_list):
+        if index % 8 == 0:
+            bitmap.append(0)
+        try:
+            matches = vm.run(globals).result is True
+        except Exception:
+            if not capture_errors:
+                raise
+            matches = False
+        if matches:
+            bitmap[index // 8] |= 1 << (index % 8)
+    return bitmap
+
+
+def _create_vm(
+    input: list[Any] | dict,
+    functions: Optional[dict[str, Callable[..., Any]]],
+    timeout: timedelta | int,
+    team: Optional["Team"],
+    debug=False,
+) -> "HogVM":
     bytecodes = input if isinstance(input, dict) else {"root": {"bytecode": input}}
     root_bytecode = bytecodes.get("root", {}).get("bytecode", []) or []
 
@@ -54,74 +134,185 @@ def execute_bytecode(
         or (root_bytecode[0] != HOGQL_BYTECODE_IDENTIFIER and root_bytecode[0] != HOGQL_BYTECODE_IDENTIFIER_V0)
     ):
         raise HogVMException(f"Invalid bytecode. Must start with '{HOGQL_BYTECODE_IDENTIFIER}'")
-    version = root_bytecode[1] if len(root_bytecode) >= 2 and root_bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 0
-    start_time = time.time()
-    last_op = len(root_bytecode) - 1
-    stack: list = []
-    upvalues: list[dict] = []
-    upvalues_by_id: dict[int, dict] = {}
-    mem_stack: list = []
-    call_stack: list[CallFrame] = []
-    throw_stack: list[ThrowFrame] = []
-    declared_functions: dict[str, tuple[int, int]] = {}
-    mem_used = 0
-    max_mem_used = 0
-    ops = 0
-    stdout: list[str] = []
-    debug_bytecode = []
     if isinstance(timeout, int):
         timeout = timedelta(seconds=timeout)
 
-    if len(call_stack) == 0:
-        call_stack.append(
-            CallFrame(
+    return HogVM(bytecodes, root_bytecode, functions, timeout, team, debug)
+
+
+class HogVM:
+    """
+    A program and the state of its execution. `run` can be called again with other globals, reusing everything that
+    doesn't depend on them.
+
+    The value stack is a flat list shared by all call frames, with a parallel `mem_stack` that holds the cost of
+    every value at the time it was pushed. Frames are truncated in place when they return. Operations are dispatched
+    through the `OPERATIONS` table, built once per process, instead of being matched one by one.
+    """
+
+    __slots__ = (
+        "bytecodes",
+        "root_bytecode",
+        "globals",
+        "functions",
+        "timeout",
+        "team",
+        "debug",
+        "version",
+        "start_time",
+        "stack",
+        "mem_stack",
+        "mem_used",
+        "max_mem_used",
+        "cost_cache",
+        "upvalues",
+        "upvalues_by_id",
+        "call_stack",
+        "throw_stack",
+        "declared_functions",
+        "ops",
+        "stdout",
+        "debug_bytecode",
+        "frame",
+        "chunk_bytecode",
+        "chunk_globals",
+        "last_op",
+        "root_closure",
+    )
+
+    def __init__(
+        self,
+        bytecodes: dict,
+        root_bytecode: list[Any],
+        functions: Optional[dict[str, Callable[..., Any]]],
+        timeout: timedelta,
+        team: Optional["Team"],
+        debug: bool,
+    ):
+        self.bytecodes = bytecodes
+        self.root_bytecode = root_bytecode
+        self.functions = functions
+        self.timeout = timeout
+        self.team = team
+        self.debug = debug
+        self.version = (
+            root_bytecode[1] if len(root_bytecode) >= 2 and root_bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 0
+        )
+        self.root_closure = new_hog_closure(
+            new_hog_callable(
+                type="local",
+                arg_count=0,
+                upvalue_count=0,
                 ip=0,
                 chunk="root",
-                stack_start=0,
-                arg_len=0,
-                closure=new_hog_closure(
-                    new_hog_callable(
-                        type="local",
-                        arg_count=0,
-                        upvalue_count=0,
-                        ip=0,
-                        chunk="root",
-                        name="",
-                    )
-                ),
+                name="",
             )
         )
-    frame = call_stack[-1]
-    chunk_bytecode: list[Any] = root_bytecode
-    chunk_globals = globals
+        # id(container) -> (container, cost), so that pushing the same large container again doesn't measure it again
+        self.cost_cache: dict[int, tuple[Any, int]] = {}
+
+    def reset(self, globals: Optional[dict[str, Any]]) -> None:
+        self.globals = globals
+        self.start_time = time.time()
+        self.stack: list = []
+        self.mem_stack: list[int] = []
+        self.mem_used = 0
+        self.max_mem_used = 0
+        self.cost_cache.clear()
+        self.upvalues: list[dict] = []
+        self.upvalues_by_id: dict[int, dict] = {}
+        self.throw_stack: list[ThrowFrame] = []
+        self.declared_functions: dict[str, tuple[int, int]] = {}
+        self.ops = 0
+        self.stdout: list[str] = []
+        self.debug_bytecode: list = []
+
+        self.frame = CallFrame(ip=0, chunk="root", stack_start=0, arg_len=0, closure=self.root_closure)
+        self.call_stack: list[CallFrame] = [self.frame]
+        self.set_chunk_bytecode()
+
+    def run(self, globals: Optional[dict[str, Any]] = None) -> BytecodeResult:
+        self.reset(globals)
+        operations = OPERATIONS
+        debug = self.debug
+        while True:
+            # Return or jump back to the previous call frame if ran out of bytecode to execute in this one, and return null
+            if self.frame.ip > self.last_op:
+                last_call_frame = self.call_stack.pop()
+                if len(self.call_stack) == 0 or last_call_frame is None:
+                    if len(self.stack) > 1:
+                        raise HogVMException("Invalid bytecode. More than one value left on stack")
+                    return self.result(self.pop_stack() if len(self.stack) > 0 else None)
+                self.stack_keep_first_elements(last_call_frame.stack_start)
+                self.push_stack(None)
+                self.frame = self.call_stack[-1]
+                self.set_chunk_bytecode()
 
-    def set_chunk_bytecode():
-        nonlocal chunk_bytecode, chunk_globals, last_op, debug_bytecode
+            frame = self.frame
+            self.ops += 1
+            symbol = self.chunk_bytecode[frame.ip]
+            if (self.ops & 127) == 0:  # every 128th operation
+                self.check_timeout()
+            elif debug:
+                debugger(
+                    symbol,
+                    self.chunk_bytecode,
+                    self.debug_bytecode,
+                    frame.ip,
+                    self.stack,
+                    self.call_stack,
+                    self.throw_stack,
+                )
+            if symbol is None:
+                break
+            try:
+                operation = operations[symbol]
+            except (KeyError, TypeError):
+                raise HogVMException(
+                    f'Unexpected node while running bytecode in chunk "{frame.chunk}": {self.chunk_bytecode[frame.ip]}'
+                ) from None
+            response = operation(self)
+            if response is None:
+                self.frame.ip += 1
+            elif response is not _JUMPED:
+                return response
+
+        return self.result(self.pop_stack() if len(self.stack) > 0 else None)
+
+    def result(self, value: Any) -> BytecodeResult:
+        return BytecodeResult(result=value, stdout=self.stdout, bytecodes=self.bytecodes)
+
+    def set_chunk_bytecode(self) -> None:
+        frame = self.frame
         if not frame.chunk or frame.chunk == "root":
-            chunk_bytecode = root_bytecode
-            chunk_globals = globals
+            self.chunk_bytecode = self.root_bytecode
+            self.chunk_globals = self.globals
         elif frame.chunk.startswith("stl/") and frame.chunk[4:] in BYTECODE_STL:
-            chunk_bytecode = BYTECODE_STL[frame.chunk[4:]][1]
-            chunk_globals = {}
-        elif bytecodes.get(frame.chunk):
-            chunk_bytecode = bytecodes[frame.chunk].get("bytecode", [])
-            chunk_globals = bytecodes[frame.chunk].get("globals", {})
+            self.chunk_bytecode = BYTECODE_STL[frame.chunk[4:]][1]
+            self.chunk_globals = {}
+        elif self.bytecodes.get(frame.chunk):
+            self.chunk_bytecode = self.bytecodes[frame.chunk].get("bytecode", [])
+            self.chunk_globals = self.bytecodes[frame.chunk].get("globals", {})
         else:
             raise HogVMException(f"Unknown chunk: {frame.chunk}")
-        last_op = len(chunk_bytecode) - 1
-        if debug:
-            debug_bytecode = color_bytecode(chunk_bytecode)
-        if frame.ip == 0 and (chunk_bytecode[0] == "_H" or chunk_bytecode[0] == "_h"):
+        self.last_op = len(self.chunk_bytecode) - 1
+        if self.debug:
+            self.debug_bytecode = color_bytecode(self.chunk_bytecode)
+        if frame.ip == 0 and (self.chunk_bytecode[0] == "_H" or self.chunk_bytecode[0] == "_h"):
             # TODO: store chunk version
-            frame.ip += 2 if chunk_bytecode[0] == "_H" else 1
+            frame.ip += 2 if self.chunk_bytecode[0] == "_H" else 1
 
-    set_chunk_bytecode()
+    def enter_frame(self, frame: CallFrame) -> object:
+        self.frame = frame
+        self.set_chunk_bytecode()
+        self.call_stack.append(frame)
+        return _JUMPED
 
-    def stack_keep_first_elements(count: int) -> list[Any]:
-        nonlocal stack, mem_stack, mem_used
+    def stack_keep_first_elements(self, count: int) -> list[Any]:
+        stack = self.stack
         if count < 0 or len(stack) < count:
             raise HogVMException("Stack underflow")
-        for upvalue in reversed(upvalues):
+        for upvalue in reversed(self.upvalues):
             if upvalue["location"] >= count:
                 if not upvalue["closed"]:
                     upvalue["closed"] = True
@@ -129,42 +320,84 @@ def execute_bytecode(
             else:
                 break
         removed = stack[count:]
-        stack = stack[0:count]
-        mem_used -= sum(mem_stack[count:])
-        mem_stack = mem_stack[0:count]
+        del stack[count:]
+        self.mem_used -= sum(self.mem_stack[count:])
+        del self.mem_stack[count:]
         return removed
 
-    def next_token():
-        nonlocal frame, chunk_bytecode
-        if frame.ip >= last_op:
+    def next_token(self) -> Any:
+        frame = self.frame
+        if frame.ip >= self.last_op:
             raise HogVMException("Unexpected end of bytecode")
         frame.ip += 1
-        return chunk_bytecode[frame.ip]
+        return self.chunk_bytecode[frame.ip]
 
-    def pop_stack():
-        if not stack:
+    def pop_stack(self) -> Any:
+        if not self.stack:
             raise HogVMException("Stack underflow")
-        nonlocal mem_used
-        mem_used -= mem_stack.pop()
-        return stack.pop()
-
-    def push_stack(value):
-        stack.append(value)
-        mem_stack.append(calculate_cost(value))
-        nonlocal mem_used
-        mem_used += mem_stack[-1]
-        nonlocal max_mem_used
-        max_mem_used = max(mem_used, max_mem_used)
+        self.mem_used -= self.mem_stack.pop()
+        return self.stack.pop()
+
+    def push_stack(self, value: Any) -> None:
+        self.stack.append(value)
+        cost = self.calculate_cost(value)
+        self.mem_stack.append(cost)
+        mem_used = self.mem_used = self.mem_used + cost
+        if mem_used > self.max_mem_used:
+            self.max_mem_used = mem_used
         if mem_used > MAX_MEMORY:
             raise HogVMException(f"Memory limit of {MAX_MEMORY} bytes exceeded. Tried to allocate {mem_used} bytes.")
 
-    def check_timeout():
-        if time.time() - start_time > timeout.total_seconds() and not debug:
-            raise HogVMException(f"Execution timed out after {timeout.total_seconds()} seconds. Performed {ops} ops.")
+    def calculate_cost(self, value: Any) -> int:
+        """Same as `calculate_cost` in utils, but measures every large container only once."""
+        if isinstance(value, dict | list | tuple):
+            entry = self.cost_cache.get(id(value))
+            if entry is not None and entry[0] is value:
+                return entry[1]
+            cost = calculate_cost(value)
+            if cost >= COST_CACHE_MIN_COST:
+                if len(self.cost_cache) >= COST_CACHE_MAX_SIZE:
+                    self.cost_cache.clear()
+                self.cost_cache[id(value)] = (value, cost)
+            return cost
+        if isinstance(value, str):
+            return COST_PER_UNIT + len(value)
+        return COST_PER_UNIT
 
-    def capture_upvalue(index) -> dict:
-        nonlocal upvalues
-        for upvalue in reversed(upvalues):
+    def set_property(self, obj: Any, field: Any, value: Any) -> None:
+        """Sets `obj[field]`, and updates the cached cost of `obj` by the difference instead of measuring it again."""
+        entry = self.cost_cache.get(id(obj))
+        # Any other cached container could hold `obj`
+        self.cost_cache.clear()
+        if entry is None or entry[0] is not obj:
+            set_nested_value(obj, [field], value)
+            return
+        try:
+            old_cost = _property_cost(obj, field)
+        except Exception:
+            old_cost = None
+        set_nested_value(obj, [field], value)
+        if old_cost is not None:
+            new_cost = _property_cost(obj, field)
+            if new_cost is not None:
+                self.cost_cache[id(obj)] = (obj, entry[1] - old_cost + new_cost)
+
+    def call_host_function(self, name: str, args: list[Any]) -> Any:
+        assert self.functions is not None
+        try:
+            return self.functions[name](*args)
+        finally:
+            # Host functions may mutate the values passed to them
+            self.cost_cache.clear()
+
+    def check_timeout(self) -> None:
+        if time.time() - self.start_time > self.timeout.total_seconds() and not self.debug:
+            raise HogVMException(
+                f"Execution timed out after {self.timeout.total_seconds()} seconds. Performed {self.ops} ops."
+            )
+
+    def capture_upvalue(self, index) -> dict:
+        for upvalue in reversed(self.upvalues):
             if upvalue["location"] < index:
                 break
             if upvalue["location"] == index:
@@ -174,496 +407,606 @@ def execute_bytecode(
             "location": index,
             "closed": False,
             "value": None,
-            "id": len(upvalues) + 1,
+            "id": len(self.upvalues) + 1,
         }
-        upvalues.append(created_upvalue)
-        upvalues_by_id[created_upvalue["id"]] = created_upvalue
-        upvalues.sort(key=lambda x: x["location"])
+        self.upvalues.append(created_upvalue)
+        self.upvalues_by_id[created_upvalue["id"]] = created_upvalue
+        self.upvalues.sort(key=lambda x: x["location"])
         return created_upvalue
 
-    symbol: Any = None
-    while True:
-        # Return or jump back to the previous call frame if ran out of bytecode to execute in this one, and return null
-        if frame.ip > last_op:
-            last_call_frame = call_stack.pop()
-            if len(call_stack) == 0 or last_call_frame is None:
-                if len(stack) > 1:
-                    raise HogVMException("Invalid bytecode. More than one value left on stack")
-                return BytecodeResult(
-                    result=pop_stack() if len(stack) > 0 else None, stdout=stdout, bytecodes=bytecodes
+    def pop_elements(self, count: int) -> list[Any]:
+        """Pops the top `count` elements, in the order they were pushed, without closing their upvalues."""
+        elems = self.stack[-count:]
+        del self.stack[-count:]
+        self.mem_used -= sum(self.mem_stack[-count:])
+        del self.mem_stack[-count:]
+        return elems
+
+    def get_upvalue(self, index: int) -> dict:
+        closure = self.frame.closure
+        if index >= len(closure["upvalues"]):
+            raise HogVMException(f"Invalid upvalue index: {index}")
+        upvalue = self.upvalues_by_id[closure["upvalues"][index]]
+        if not is_hog_upvalue(upvalue):
+            raise HogVMException(f"Invalid upvalue: {upvalue}")
+        return upvalue
+
+
+def _property_cost(obj: Any, field: Any) -> Optional[int]:
+    """The part of `calculate_cost(obj)` that comes from `obj[field]`, or None if it can't be set."""
+    marked = {id(obj)}
+    if isinstance(obj, dict):
+        if field not in obj:
+            return 0
+        return calculate_cost(field, marked) + calculate_cost(obj[field], marked)
+    if isinstance(obj, list) and isinstance(field, int) and 0 < field <= len(obj):
+        return calculate_cost(obj[field - 1], marked)
+    return None
+
+
+def _string(vm: HogVM):
+    vm.push_stack(vm.next_token())
+
+
+def _true(vm: HogVM):
+    vm.push_stack(True)
+
+
+def _false(vm: HogVM):
+    vm.push_stack(False)
+
+
+def _null(vm: HogVM):
+    vm.push_stack(None)
+
+
+def _not(vm: HogVM):
+    vm.push_stack(not vm.pop_stack())
+
+
+def _and(vm: HogVM):
+    vm.push_stack(all([vm.pop_stack() for _ in range(vm.next_token())]))  # noqa: C419
+
+
+def _or(vm: HogVM):
+    vm.push_stack(any([vm.pop_stack() for _ in range(vm.next_token())]))  # noqa: C419
+
+
+def _plus(vm: HogVM):
+    vm.push_stack(vm.pop_stack() + vm.pop_stack())
+
+
+def _minus(vm: HogVM):
+    vm.push_stack(vm.pop_stack() - vm.pop_stack())
+
+
+def _divide(vm: HogVM):
+    vm.push_stack(vm.pop_stack() / vm.pop_stack())
+
+
+def _multiply(vm: HogVM):
+    vm.push_stack(vm.pop_stack() * vm.pop_stack())
+
+
+def _mod(vm: HogVM):
+    vm.push_stack(vm.pop_stack() % vm.pop_stack())
+
+
+def _eq(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 == var2)
+
+
+def _not_eq(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 != var2)
+
+
+def _gt(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 > var2)
+
+
+def _gt_eq(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 >= var2)
+
+
+def _lt(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 < var2)
+
+
+def _lt_eq(vm: HogVM):
+    var1, var2 = unify_comparison_types(vm.pop_stack(), vm.pop_stack())
+    vm.push_stack(var1 <= var2)
+
+
+def _like(vm: HogVM):
+    vm.push_stack(like(vm.pop_stack(), vm.pop_stack()))
+
+
+def _ilike(vm: HogVM):
+    vm.push_stack(like(vm.pop_stack(), vm.pop_stack(), re.IGNORECASE))
+
+
+def _not_like(vm: HogVM):
+    vm.push_stack(not like(vm.pop_stack(), vm.pop_stack()))
+
+
+def _not_ilike(vm: HogVM):
+    vm.push_stack(not like(vm.pop_stack(), vm.pop_stack(), re.IGNORECASE))
+
+
+def _in(vm: HogVM):
+    vm.push_stack(vm.pop_stack() in vm.pop_stack())
+
+
+def _not_in(vm: HogVM):
+    vm.push_stack(vm.pop_stack() not in vm.pop_stack())
+
+
+def _regex(vm: HogVM):
+    args = [vm.pop_stack(), vm.pop_stack()]
+    vm.push_stack(bool(regex_cache.compile(args[1]).search(args[0])) if args[0] and args[1] else False)
+
+
+def _not_regex(vm: HogVM):
+    args = [vm.pop_stack(), vm.pop_stack()]
+    vm.push_stack(not bool(regex_cache.compile(args[1]).search(args[0])) if args[0] and args[1] else False)
+
+
+def _iregex(vm: HogVM):
+    args = [vm.pop_stack(), vm.pop_stack()]
+    vm.push_stack(bool(regex_cache.compile(args[1], re.IGNORECASE).search(args[0])) if args[0] and args[1] else False)
+
+
+def _not_iregex(vm: HogVM):
+    args = [vm.pop_stack(), vm.pop_stack()]
+    vm.push_stack(
+        not bool(regex_cache.compile(args[1], re.IGNORECASE).search(args[0])) if args[0] and args[1] else False
+    )
+
+
+def _get_global(vm: HogVM):
+    chain = [vm.pop_stack() for _ in range(vm.next_token())]
+    if vm.chunk_globals and chain[0] in vm.chunk_globals:
+        vm.push_stack(deepcopy(get_nested_value(vm.chunk_globals, chain, True)))
+    elif vm.functions and chain[0] in vm.functions:
+        vm.push_stack(
+            new_hog_closure(
+                new_hog_callable(
+                    type="stl",
+                    name=chain[0],
+                    arg_count=0,
+                    upvalue_count=0,
+                    ip=-1,
+                    chunk="stl",
                 )
-            stack_start = last_call_frame.stack_start
-            stack_keep_first_elements(stack_start)
-            push_stack(None)
-            frame = call_stack[-1]
-            set_chunk_bytecode()
-
-        ops += 1
-        symbol = chunk_bytecode[frame.ip]
-        if (ops & 127) == 0:  # every 128th operation
-            check_timeout()
-        elif debug:
-            debugger(symbol, chunk_bytecode, debug_bytecode, frame.ip, stack, call_stack, throw_stack)
-        match symbol:
-            case None:
-                break
-            case Operation.STRING:
-                push_stack(next_token())
-            case Operation.INTEGER:
-                push_stack(next_token())
-            case Operation.FLOAT:
-                push_stack(next_token())
-            case Operation.TRUE:
-                push_stack(True)
-            case Operation.FALSE:
-                push_stack(False)
-            case Operation.NULL:
-                push_stack(None)
-            case Operation.NOT:
-                push_stack(not pop_stack())
-            case Operation.AND:
-                push_stack(all([pop_stack() for _ in range(next_token())]))  # noqa: C419
-            case Operation.OR:
-                push_stack(any([pop_stack() for _ in range(next_token())]))  # noqa: C419
-            case Operation.PLUS:
-                push_stack(pop_stack() + pop_stack())
-            case Operation.MINUS:
-                push_stack(pop_stack() - pop_stack())
-            case Operation.DIVIDE:
-                push_stack(pop_stack() / pop_stack())
-            case Operation.MULTIPLY:
-                push_stack(pop_stack() * pop_stack())
-            case Operation.MOD:
-                push_stack(pop_stack() % pop_stack())
-            case Operation.EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 == var2)
-            case Operation.NOT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 != var2)
-            case Operation.GT:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 > var2)
-            case Operation.GT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 >= var2)
-            case Operation.LT:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 < var2)
-            case Operation.LT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 <= var2)
-            case Operation.LIKE:
-                push_stack(like(pop_stack(), pop_stack()))
-            case Operation.ILIKE:
-                push_stack(like(pop_stack(), pop_stack(), re.IGNORECASE))
-            case Operation.NOT_LIKE:
-                push_stack(not like(pop_stack(), pop_stack()))
-            case Operation.NOT_ILIKE:
-                push_stack(not like(pop_stack(), pop_stack(), re.IGNORECASE))
-            case Operation.IN:
-                push_stack(pop_stack() in pop_stack())
-            case Operation.NOT_IN:
-                push_stack(pop_stack() not in pop_stack())
-            case Operation.REGEX:
-                args = [pop_stack(), pop_stack()]
-                # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
-                push_stack(bool(re.search(re.compile(args[1]), args[0])) if args[0] and args[1] else False)
-            case Operation.NOT_REGEX:
-                args = [pop_stack(), pop_stack()]
-                # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
-                push_stack(not bool(re.search(re.compile(args[1]), args[0])) if args[0] and args[1] else False)
-            case Operation.IREGEX:
-                args = [pop_stack(), pop_stack()]
-                push_stack(
-                    bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0]))
-                    if args[0] and args[1]
-                    else False
+            )
+        )
+    elif chain[0] in STL and len(chain) == 1:
+        vm.push_stack(
+            new_hog_closure(
+                new_hog_callable(
+                    type="stl",
+                    name=chain[0],
+                    arg_count=STL[chain[0]].maxArgs or 0,
+                    upvalue_count=0,
+                    ip=-1,
+                    chunk="stl",
                 )
-            case Operation.NOT_IREGEX:
-                args = [pop_stack(), pop_stack()]
-                push_stack(
-                    not bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0]))
-                    if args[0] and args[1]
-                    else False
+            )
+        )
+    elif chain[0] in BYTECODE_STL and len(chain) == 1:
+        vm.push_stack(
+            new_hog_closure(
+                new_hog_callable(
+                    type="stl",
+                    name=chain[0],
+                    arg_count=len(BYTECODE_STL[chain[0]][0]),
+                    upvalue_count=0,
+                    ip=0,
+                    chunk=f"stl/{chain[0]}",
                 )
-            case Operation.GET_GLOBAL:
-                chain = [pop_stack() for _ in range(next_token())]
-                if chunk_globals and chain[0] in chunk_globals:
-                    push_stack(deepcopy(get_nested_value(chunk_globals, chain, True)))
-                elif functions and chain[0] in functions:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=0,
-                                upvalue_count=0,
-                                ip=-1,
-                                chunk="stl",
-                            )
-                        )
-                    )
-                elif chain[0] in STL and len(chain) == 1:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=STL[chain[0]].maxArgs or 0,
-                                upvalue_count=0,
-                                ip=-1,
-                                chunk="stl",
-                            )
-                        )
-                    )
-                elif chain[0] in BYTECODE_STL and len(chain) == 1:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=len(BYTECODE_STL[chain[0]][0]),
-                                upvalue_count=0,
-                                ip=0,
-                                chunk=f"stl/{chain[0]}",
-                            )
-                        )
-                    )
-                else:
-                    raise HogVMException(f"Global variable not found: {chain[0]}")
-            case Operation.POP:
-                pop_stack()
-            case Operation.CLOSE_UPVALUE:
-                stack_keep_first_elements(len(stack) - 1)
-            case Operation.RETURN:
-                response = pop_stack()
-                last_call_frame = call_stack.pop()
-                if len(call_stack) == 0 or last_call_frame is None:
-                    return BytecodeResult(result=response, stdout=stdout, bytecodes=bytecodes)
-                stack_start = last_call_frame.stack_start
-                stack_keep_first_elements(stack_start)
-                push_stack(response)
-                frame = call_stack[-1]
-                set_chunk_bytecode()
-                continue  # resume the loop without incrementing frame.ip
-
-            case Operation.GET_LOCAL:
-                stack_start = 0 if not call_stack else call_stack[-1].stack_start
-                push_stack(stack[next_token() + stack_start])
-            case Operation.SET_LOCAL:
-                stack_start = 0 if not call_stack else call_stack[-1].stack_start
-                value = pop_stack()
-                index = next_token() + stack_start
-                stack[index] = value
-                last_cost = mem_stack[index]
-                mem_stack[index] = calculate_cost(value)
-                mem_used += mem_stack[index] - last_cost
-                max_mem_used = max(mem_used, max_mem_used)
-            case Operation.GET_PROPERTY:
-                property = pop_stack()
-                push_stack(get_nested_value(pop_stack(), [property]))
-            case Operation.GET_PROPERTY_NULLISH:
-                property = pop_stack()
-                push_stack(get_nested_value(pop_stack(), [property], nullish=True))
-            case Operation.SET_PROPERTY:
-                value = pop_stack()
-                field = pop_stack()
-                set_nested_value(pop_stack(), [field], value)
-            case Operation.DICT:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-(count * 2) :]
-                    stack = stack[: -(count * 2)]
-                    mem_used -= sum(mem_stack[-(count * 2) :])
-                    mem_stack = mem_stack[: -(count * 2)]
-                    push_stack({elems[i]: elems[i + 1] for i in range(0, len(elems), 2)})
-                else:
-                    push_stack({})
-            case Operation.ARRAY:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-count:]
-                    stack = stack[:-count]
-                    mem_used -= sum(mem_stack[-count:])
-                    mem_stack = mem_stack[:-count]
-                    push_stack(elems)
-                else:
-                    push_stack([])
-            case Operation.TUPLE:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-count:]
-                    stack = stack[:-count]
-                    mem_used -= sum(mem_stack[-count:])
-                    mem_stack = mem_stack[:-count]
-                    push_stack(tuple(elems))
-                else:
-                    push_stack(())
-            case Operation.JUMP:
-                count = next_token()
-                frame.ip += count
-            case Operation.JUMP_IF_FALSE:
-                count = next_token()
-                if not pop_stack():
-                    frame.ip += count
-            case Operation.JUMP_IF_STACK_NOT_NULL:
-                count = next_token()
-                if len(stack) > 0 and stack[-1] is not None:
-                    frame.ip += count
-            case Operation.DECLARE_FN:
-                # DEPRECATED
-                name = next_token()
-                arg_len = next_token()
-                body_len = next_token()
-                declared_functions[name] = (frame.ip + 1, arg_len)
-                frame.ip += body_len
-            case Operation.CALLABLE:
-                name = next_token()  # TODO: do we need it? it could change as the variable is reassigned
-                arg_count = next_token()
-                upvalue_count = next_token()
-                body_length = next_token()
-                push_stack(
+            )
+        )
+    else:
+        raise HogVMException(f"Global variable not found: {chain[0]}")
+
+
+def _pop(vm: HogVM):
+    vm.pop_stack()
+
+
+def _close_upvalue(vm: HogVM):
+    vm.stack_keep_first_elements(len(vm.stack) - 1)
+
+
+def _return(vm: HogVM):
+    response = vm.pop_stack()
+    last_call_frame = vm.call_stack.pop()
+    if len(vm.call_stack) == 0 or last_call_frame is None:
+        return vm.result(response)
+    vm.stack_keep_first_elements(last_call_frame.stack_start)
+    vm.push_stack(response)
+    vm.frame = vm.call_stack[-1]
+    vm.set_chunk_bytecode()
+    return _JUMPED  # resume the loop without incrementing frame.ip
+
+
+def _get_local(vm: HogVM):
+    stack_start = 0 if not vm.call_stack else vm.call_stack[-1].stack_start
+    vm.push_stack(vm.stack[vm.next_token() + stack_start])
+
+
+def _set_local(vm: HogVM):
+    stack_start = 0 if not vm.call_stack else vm.call_stack[-1].stack_start
+    value = vm.pop_stack()
+    index = vm.next_token() + stack_start
+    vm.stack[index] = value
+    last_cost = vm.mem_stack[index]
+    vm.mem_stack[index] = vm.calculate_cost(value)
+    vm.mem_used += vm.mem_stack[index] - last_cost
+    vm.max_mem_used = max(vm.mem_used, vm.max_mem_used)
+
+
+def _get_property(vm: HogVM):
+    property = vm.pop_stack()
+    vm.push_stack(get_nested_value(vm.pop_stack(), [property]))
+
+
+def _get_property_nullish(vm: HogVM):
+    property = vm.pop_stack()
+    vm.push_stack(get_nested_value(vm.pop_stack(), [property], nullish=True))
+
+
+def _set_property(vm: HogVM):
+    value = vm.pop_stack()
+    field = vm.pop_stack()
+    vm.set_property(vm.pop_stack(), field, value)
+
+
+def _dict(vm: HogVM):
+    count = vm.next_token()
+    if count > 0:
+        elems = vm.pop_elements(count * 2)
+        vm.push_stack({elems[i]: elems[i + 1] for i in range(0, len(elems), 2)})
+    else:
+        vm.push_stack({})
+
+
+def _array(vm: HogVM):
+    count = vm.next_token()
+    if count > 0:
+        vm.push_stack(vm.pop_elements(count))
+    else:
+        vm.push_stack([])
+
+
+def _tuple(vm: HogVM):
+    count = vm.next_token()
+    if count > 0:
+        vm.push_stack(tuple(vm.pop_elements(count)))
+    else:
+        vm.push_stack(())
+
+
+def _jump(vm: HogVM):
+    count = vm.next_token()
+    vm.frame.ip += count
+
+
+def _jump_if_false(vm: HogVM):
+    count = vm.next_token()
+    if not vm.pop_stack():
+        vm.frame.ip += count
+
+
+def _jump_if_stack_not_null(vm: HogVM):
+    count = vm.next_token()
+    if len(vm.stack) > 0 and vm.stack[-1] is not None:
+        vm.frame.ip += count
+
+
+def _declare_fn(vm: HogVM):
+    # DEPRECATED
+    name = vm.next_token()
+    arg_len = vm.next_token()
+    body_len = vm.next_token()
+    vm.declared_functions[name] = (vm.frame.ip + 1, arg_len)
+    vm.frame.ip += body_len
+
+
+def _callable(vm: HogVM):
+    name = vm.next_token()  # TODO: do we need it? it could change as the variable is reassigned
+    arg_count = vm.next_token()
+    upvalue_count = vm.next_token()
+    body_length = vm.next_token()
+    vm.push_stack(
+        new_hog_callable(
+            type="local",
+            name=name,
+            chunk=vm.frame.chunk,
+            arg_count=arg_count,
+            upvalue_count=upvalue_count,
+            ip=vm.frame.ip + 1,
+        )
+    )
+    vm.frame.ip += body_length
+
+
+def _closure(vm: HogVM):
+    frame = vm.frame
+    closure_callable = vm.pop_stack()
+    closure = new_hog_closure(closure_callable)
+    stack_start = frame.stack_start
+    upvalue_count = vm.next_token()
+    if upvalue_count != closure_callable["upvalueCount"]:
+        raise HogVMException(f"Invalid upvalue count. Expected {closure_callable['upvalueCount']}, got {upvalue_count}")
+    for _ in range(closure_callable["upvalueCount"]):
+        is_local, index = vm.next_token(), vm.next_token()
+        if is_local:
+            closure["upvalues"].append(vm.capture_upvalue(stack_start + index)["id"])
+        else:
+            closure["upvalues"].append(frame.closure["upvalues"][index])
+    vm.push_stack(closure)
+
+
+def _get_upvalue(vm: HogVM):
+    upvalue = vm.get_upvalue(vm.next_token())
+    if upvalue["closed"]:
+        vm.push_stack(upvalue["value"])
+    else:
+        vm.push_stack(vm.stack[upvalue["location"]])
+
+
+def _set_upvalue(vm: HogVM):
+    upvalue = vm.get_upvalue(vm.next_token())
+    if upvalue["closed"]:
+        upvalue["value"] = vm.pop_stack()
+    else:
+        vm.stack[upvalue["location"]] = vm.pop_stack()
+
+
+def _call_global(vm: HogVM):
+    vm.check_timeout()
+    frame = vm.frame
+    name = vm.next_token()
+    arg_count = vm.next_token()
+    # This is for backwards compatibility. We use a closure on the stack with local functions now.
+    if name in vm.declared_functions:
+        func_ip, arg_len = vm.declared_functions[name]
+        frame.ip += 1  # advance for when we return
+        if arg_len > arg_count:
+            for _ in range(arg_len - arg_count):
+                vm.push_stack(None)
+        return vm.enter_frame(
+            CallFrame(
+                ip=func_ip,
+                chunk=frame.chunk,
+                stack_start=len(vm.stack) - arg_len,
+                arg_len=arg_len,
+                closure=new_hog_closure(
                     new_hog_callable(
                         type="local",
                         name=name,
-                        chunk=frame.chunk,
-                        arg_count=arg_count,
-                        upvalue_count=upvalue_count,
-                        ip=frame.ip + 1,
-                    )
-                )
-                frame.ip += body_length
-            case Operation.CLOSURE:
-                closure_callable = pop_stack()
-                closure = new_hog_closure(closure_callable)
-                stack_start = frame.stack_start
-                upvalue_count = next_token()
-                if upvalue_count != closure_callable["upvalueCount"]:
-                    raise HogVMException(
-                        f"Invalid upvalue count. Expected {closure_callable['upvalueCount']}, got {upvalue_count}"
-                    )
-                for _ in range(closure_callable["upvalueCount"]):
-                    is_local, index = next_token(), next_token()
-                    if is_local:
-                        closure["upvalues"].append(capture_upvalue(stack_start + index)["id"])
-                    else:
-                        closure["upvalues"].append(frame.closure["upvalues"][index])
-                push_stack(closure)
-            case Operation.GET_UPVALUE:
-                index = next_token()
-                closure = frame.closure
-                if index >= len(closure["upvalues"]):
-                    raise HogVMException(f"Invalid upvalue index: {index}")
-                upvalue = upvalues_by_id[closure["upvalues"][index]]
-                if not is_hog_upvalue(upvalue):
-                    raise HogVMException(f"Invalid upvalue: {upvalue}")
-                if upvalue["closed"]:
-                    push_stack(upvalue["value"])
-                else:
-                    push_stack(stack[upvalue["location"]])
-            case Operation.SET_UPVALUE:
-                index = next_token()
-                closure = frame.closure
-                if index >= len(closure["upvalues"]):
-                    raise HogVMException(f"Invalid upvalue index: {index}")
-                upvalue = upvalues_by_id[closure["upvalues"][index]]
-                if not is_hog_upvalue(upvalue):
-                    raise HogVMException(f"Invalid upvalue: {upvalue}")
-                if upvalue["closed"]:
-                    upvalue["value"] = pop_stack()
-                else:
-                    stack[upvalue["location"]] = pop_stack()
-            case Operation.CALL_GLOBAL:
-                check_timeout()
-                name = next_token()
-                arg_count = next_token()
-                # This is for backwards compatibility. We use a closure on the stack with local functions now.
-                if name in declared_functions:
-                    func_ip, arg_len = declared_functions[name]
-                    frame.ip += 1  # advance for when we return
-                    if arg_len > arg_count:
-                        for _ in range(arg_len - arg_count):
-                            push_stack(None)
-                    frame = CallFrame(
+                        arg_count=arg_len,
+                        upvalue_count=0,
                         ip=func_ip,
                         chunk=frame.chunk,
-                        stack_start=len(stack) - arg_len,
-                        arg_len=arg_len,
-                        closure=new_hog_closure(
-                            new_hog_callable(
-                                type="local",
-                                name=name,
-                                arg_count=arg_len,
-                                upvalue_count=0,
-                                ip=func_ip,
-                                chunk=frame.chunk,
-                            )
-                        ),
                     )
-                    set_chunk_bytecode()
-                    call_stack.append(frame)
-                    continue  # resume the loop without incrementing frame.ip
-                else:
-                    if name == "import":
-                        if arg_count != 1:
-                            raise HogVMException("Function import requires exactly 1 argument")
-                        module_name = pop_stack()
-                        frame.ip += 1  # advance for when we return
-                        frame = CallFrame(
-                            ip=0,
-                            chunk=module_name,
-                            stack_start=len(stack),
-                            arg_len=0,
-                            closure=new_hog_closure(
-                                new_hog_callable(
-                                    type="local",
-                                    name=module_name,
-                                    arg_count=0,
-                                    upvalue_count=0,
-                                    ip=0,
-                                    chunk=module_name,
-                                )
-                            ),
-                        )
-                        set_chunk_bytecode()
-                        call_stack.append(frame)
-                        continue
-                    elif functions is not None and name in functions:
-                        if version == 0:
-                            args = [pop_stack() for _ in range(arg_count)]
-                        else:
-                            args = stack_keep_first_elements(len(stack) - arg_count)
-                        push_stack(functions[name](*args))
-                    elif name in STL:
-                        if version == 0:
-                            args = [pop_stack() for _ in range(arg_count)]
-                        else:
-                            args = stack_keep_first_elements(len(stack) - arg_count)
-                        push_stack(STL[name].fn(args, team, stdout, timeout.total_seconds()))
-                    elif name in BYTECODE_STL:
-                        arg_names = BYTECODE_STL[name][0]
-                        if len(arg_names) != arg_count:
-                            raise HogVMException(f"Function {name} requires exactly {len(arg_names)} arguments")
-                        frame.ip += 1  # advance for when we return
-                        frame = CallFrame(
-                            ip=0,
-                            chunk=f"stl/{name}",
-                            stack_start=len(stack) - arg_count,
-                            arg_len=arg_count,
-                            closure=new_hog_closure(
-                                new_hog_callable(
-                                    type="stl",
-                                    name=name,
-                                    arg_count=arg_count,
-                                    upvalue_count=0,
-                                    ip=0,
-                                    chunk=f"stl/{name}",
-                                )
-                            ),
-                        )
-                        set_chunk_bytecode()
-                        call_stack.append(frame)
-                        continue  # resume the loop without incrementing frame.ip
-                    else:
-                        raise HogVMException(f"Unsupported function call: {name}")
-            case Operation.CALL_LOCAL:
-                check_timeout()
-                closure = pop_stack()
-                if not isinstance(closure, dict) or closure.get("__hogClosure__") is None:
-                    raise HogVMException(f"Invalid closure: {closure}")
-                callable = closure.get("callable")
-                if not isinstance(callable, dict) or callable.get("__hogCallable__") is None:
-                    raise HogVMException(f"Invalid callable: {callable}")
-                args_length = next_token()
-                if args_length > MAX_FUNCTION_ARGS_LENGTH:
-                    raise HogVMException("Too many arguments")
-
-                if callable.get("__hogCallable__") == "local":
-                    if callable["argCount"] > args_length:
-                        # TODO: specify minimum required arguments somehow
-                        for _ in range(callable["argCount"] - args_length):
-                            push_stack(None)
-                    elif callable["argCount"] < args_length:
-                        raise HogVMException(
-                            f"Too many arguments. Passed {args_length}, expected {callable['argCount']}"
-                        )
-                    frame.ip += 1  # advance for when we return
-                    frame = CallFrame(
-                        ip=callable["ip"],
-                        chunk=callable["chunk"],
-                        stack_start=len(stack) - callable["argCount"],
-                        arg_len=callable["argCount"],
-                        closure=closure,
-                    )
-                    set_chunk_bytecode()
-                    call_stack.append(frame)
-                    continue  # resume the loop without incrementing frame.ip
-
-                elif callable.get("__hogCallable__") == "stl":
-                    if callable["name"] not in STL:
-                        raise HogVMException(f"Unsupported function call: {callable['name']}")
-                    stl_fn = STL[callable["name"]]
-                    if stl_fn.minArgs is not None and args_length < stl_fn.minArgs:
-                        raise HogVMException(
-                            f"Function {callable['name']} requires at least {stl_fn.minArgs} arguments"
-                        )
-                    if stl_fn.maxArgs is not None and args_length > stl_fn.maxArgs:
-                        raise HogVMException(f"Function {callable['name']} requires at most {stl_fn.maxArgs} arguments")
-                    if version == 0:
-                        args = [pop_stack() for _ in range(args_length)]
-                    else:
-                        args = list(reversed([pop_stack() for _ in range(args_length)]))
-                        if stl_fn.maxArgs is not None and len(args) < stl_fn.maxArgs:
-                            args = [*args, *([None] * (stl_fn.maxArgs - len(args)))]
-                    push_stack(stl_fn.fn(args, team, stdout, timeout.total_seconds()))
-
-                elif callable.get("__hogCallable__") == "async":
-                    raise HogVMException("Async functions are not supported")
-
-                else:
-                    raise HogVMException("Invalid callable")
-
-            case Operation.TRY:
-                throw_stack.append(
-                    ThrowFrame(
-                        call_stack_len=len(call_stack), stack_len=len(stack), catch_ip=frame.ip + 1 + next_token()
-                    )
-                )
-            case Operation.POP_TRY:
-                if throw_stack:
-                    throw_stack.pop()
-                else:
-                    raise HogVMException("Invalid operation POP_TRY: no try block to pop")
-            case Operation.THROW:
-                exception = pop_stack()
-                if not is_hog_error(exception):
-                    raise HogVMException("Can not throw: value is not of type Error")
-                if throw_stack:
-                    last_throw = throw_stack.pop()
-                    call_stack_len, stack_len, catch_ip = (
-                        last_throw.call_stack_len,
-                        last_throw.stack_len,
-                        last_throw.catch_ip,
+                ),
+            )
+        )
+    elif name == "import":
+        if arg_count != 1:
+            raise HogVMException("Function import requires exactly 1 argument")
+        module_name = vm.pop_stack()
+        frame.ip += 1  # advance for when we return
+        return vm.enter_frame(
+            CallFrame(
+                ip=0,
+                chunk=module_name,
+                stack_start=len(vm.stack),
+                arg_len=0,
+                closure=new_hog_closure(
+                    new_hog_callable(
+                        type="local",
+                        name=module_name,
+                        arg_count=0,
+                        upvalue_count=0,
+                        ip=0,
+                        chunk=module_name,
                     )
-                    stack_keep_first_elements(stack_len)
-                    call_stack = call_stack[0:call_stack_len]
-                    push_stack(exception)
-                    frame = call_stack[-1]
-                    set_chunk_bytecode()
-                    frame.ip = catch_ip
-                    continue
-                else:
-                    raise UncaughtHogVMException(
-                        type=exception.get("type"),
-                        message=exception.get("message"),
-                        payload=exception.get("payload"),
+                ),
+            )
+        )
+    elif vm.functions is not None and name in vm.functions:
+        if vm.version == 0:
+            args = [vm.pop_stack() for _ in range(arg_count)]
+        else:
+            args = vm.stack_keep_first_elements(len(vm.stack) - arg_count)
+        vm.push_stack(vm.call_host_function(name, args))
+    elif name in STL:
+        if vm.version == 0:
+            args = [vm.pop_stack() for _ in range(arg_count)]
+        else:
+            args = vm.stack_keep_first_elements(len(vm.stack) - arg_count)
+        vm.push_stack(STL[name].fn(args, vm.team, vm.stdout, vm.timeout.total_seconds()))
+    elif name in BYTECODE_STL:
+        arg_names = BYTECODE_STL[name][0]
+        if len(arg_names) != arg_count:
+            raise HogVMException(f"Function {name} requires exactly {len(arg_names)} arguments")
+        frame.ip += 1  # advance for when we return
+        return vm.enter_frame(
+            CallFrame(
+                ip=0,
+                chunk=f"stl/{name}",
+                stack_start=len(vm.stack) - arg_count,
+                arg_len=arg_count,
+                closure=new_hog_closure(
+                    new_hog_callable(
+                        type="stl",
+                        name=name,
+                        arg_count=arg_count,
+                        upvalue_count=0,
+                        ip=0,
+                        chunk=f"stl/{name}",
                     )
-            case _:
-                raise HogVMException(
-                    f'Unexpected node while running bytecode in chunk "{frame.chunk}": {chunk_bytecode[frame.ip]}'
-                )
+                ),
+            )
+        )
+    else:
+        raise HogVMException(f"Unsupported function call: {name}")
+
+
+def _call_local(vm: HogVM):
+    vm.check_timeout()
+    closure = vm.pop_stack()
+    if not isinstance(closure, dict) or closure.get("__hogClosure__") is None:
+        raise HogVMException(f"Invalid closure: {closure}")
+    callable = closure.get("callable")
+    if not isinstance(callable, dict) or callable.get("__hogCallable__") is None:
+        raise HogVMException(f"Invalid callable: {callable}")
+    args_length = vm.next_token()
+    if args_length > MAX_FUNCTION_ARGS_LENGTH:
+        raise HogVMException("Too many arguments")
+
+    if callable.get("__hogCallable__") == "local":
+        if callable["argCount"] > args_length:
+            # TODO: specify minimum required arguments somehow
+            for _ in range(callable["argCount"] - args_length):
+                vm.push_stack(None)
+        elif callable["argCount"] < args_length:
+            raise HogVMException(f"Too many arguments. Passed {args_length}, expected {callable['argCount']}")
+        vm.frame.ip += 1  # advance for when we return
+        return vm.enter_frame(
+            CallFrame(
+                ip=callable["ip"],
+                chunk=callable["chunk"],
+                stack_start=len(vm.stack) - callable["argCount"],
+                arg_len=callable["argCount"],
+                closure=closure,
+            )
+        )
+
+    elif callable.get("__hogCallable__") == "stl":
+        if callable["name"] not in STL:
+            raise HogVMException(f"Unsupported function call: {callable['name']}")
+        stl_fn = STL[callable["name"]]
+        if stl_fn.minArgs is not None and args_length < stl_fn.minArgs:
+            raise HogVMException(f"Function {callable['name']} requires at least {stl_fn.minArgs} arguments")
+        if stl_fn.maxArgs is not None and args_length > stl_fn.maxArgs:
+            raise HogVMException(f"Function {callable['name']} requires at most {stl_fn.maxArgs} arguments")
+        if vm.version == 0:
+            args = [vm.pop_stack() for _ in range(args_length)]
+        else:
+            args = list(reversed([vm.pop_stack() for _ in range(args_length)]))
+            if stl_fn.maxArgs is not None and len(args) < stl_fn.maxArgs:
+                args = [*args, *([None] * (stl_fn.maxArgs - len(args)))]
+        vm.push_stack(stl_fn.fn(args, vm.team, vm.stdout, vm.timeout.total_seconds()))
+
+    elif callable.get("__hogCallable__") == "async":
+        raise HogVMException("Async functions are not supported")
+
+    else:
+        raise HogVMException("Invalid callable")
+
+
+def _try(vm: HogVM):
+    vm.throw_stack.append(
+        ThrowFrame(
+            call_stack_len=len(vm.call_stack), stack_len=len(vm.stack), catch_ip=vm.frame.ip + 1 + vm.next_token()
+        )
+    )
+
+
+def _pop_try(vm: HogVM):
+    if vm.throw_stack:
+        vm.throw_stack.pop()
+    else:
+        raise HogVMException("Invalid operation POP_TRY: no try block to pop")
+
+
+def _throw(vm: HogVM):
+    exception = vm.pop_stack()
+    if not is_hog_error(exception):
+        raise HogVMException("Can not throw: value is not of type Error")
+    if vm.throw_stack:
+        last_throw = vm.throw_stack.pop()
+        vm.stack_keep_first_elements(last_throw.stack_len)
+        del vm.call_stack[last_throw.call_stack_len :]
+        vm.push_stack(exception)
+        vm.frame = vm.call_stack[-1]
+        vm.set_chunk_bytecode()
+        vm.frame.ip = last_throw.catch_ip
+        return _JUMPED
+    else:
+        raise UncaughtHogVMException(
+            type=exception.get("type"),
+            message=exception.get("message"),
+            payload=exception.get("payload"),
+        )
 
-        frame.ip += 1
 
-    return BytecodeResult(result=pop_stack() if len(stack) > 0 else None, stdout=stdout, bytecodes=bytecodes)
+OPERATIONS: dict[int, Callable[[HogVM], Any]] = {
+    int(operation): handler
+    for operation, handler in {
+        Operation.STRING: _string,
+        Operation.INTEGER: _string,
+        Operation.FLOAT: _string,
+        Operation.TRUE: _true,
+        Operation.FALSE: _false,
+        Operation.NULL: _null,
+        Operation.NOT: _not,
+        Operation.AND: _and,
+        Operation.OR: _or,
+        Operation.PLUS: _plus,
+        Operation.MINUS: _minus,
+        Operation.DIVIDE: _divide,
+        Operation.MULTIPLY: _multiply,
+        Operation.MOD: _mod,
+        Operation.EQ: _eq,
+        Operation.NOT_EQ: _not_eq,
+        Operation.GT: _gt,
+        Operation.GT_EQ: _gt_eq,
+        Operation.LT: _lt,
+        Operation.LT_EQ: _lt_eq,
+        Operation.LIKE: _like,
+        Operation.ILIKE: _ilike,
+        Operation.NOT_LIKE: _not_like,
+        Operation.NOT_ILIKE: _not_ilike,
+        Operation.IN: _in,
+        Operation.NOT_IN: _not_in,
+        Operation.REGEX: _regex,
+        Operation.NOT_REGEX: _not_regex,
+        Operation.IREGEX: _iregex,
+        Operation.NOT_IREGEX: _not_iregex,
+        Operation.GET_GLOBAL: _get_global,
+        Operation.POP: _pop,
+        Operation.CLOSE_UPVALUE: _close_upvalue,
+        Operation.RETURN: _return,
+        Operation.GET_LOCAL: _get_local,
+        Operation.SET_LOCAL: _set_local,
+        Operation.GET_PROPERTY: _get_property,
+        Operation.GET_PROPERTY_NULLISH: _get_property_nullish,
+        Operation.SET_PROPERTY: _set_property,
+        Operation.DICT: _dict,
+        Operation.ARRAY: _array,
+        Operation.TUPLE: _tuple,
+        Operation.JUMP: _jump,
+        Operation.JUMP_IF_FALSE: _jump_if_false,
+        Operation.JUMP_IF_STACK_NOT_NULL: _jump_if_stack_not_null,
+        Operation.DECLARE_FN: _declare_fn,
+        Operation.CALLABLE: _callable,
+        Operation.CLOSURE: _closure,
+        Operation.GET_UPVALUE: _get_upvalue,
+        Operation.SET_UPVALUE: _set_upvalue,
+        Operation.CALL_GLOBAL: _call_global,
+        Operation.CALL_LOCAL: _call_local,
+        Operation.TRY: _try,
+        Operation.POP_TRY: _pop_try,
+        Operation.THROW: _throw,
+    }.items()
+}
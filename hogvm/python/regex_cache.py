@@ -0,0 +1,122 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+
+REGEX_CACHE_MAX_SIZE = 1024
+
+# POSIX bracket expressions supported by re2, which Python's `re` would read as a set of literal characters
+_POSIX_CLASSES = {
+    "alnum": "0-9A-Za-z",
+    "alpha": "A-Za-z",
+    "ascii": "\\x00-\\x7F",
+    "blank": "\\t ",
+    "cntrl": "\\x00-\\x1F\\x7F",
+    "digit": "0-9",
+    "graph": "!-~",
+    "lower": "a-z",
+    "print": " -~",
+    "punct": "!-/:-@[-`{-~",
+    "space": "\\t\\n\\v\\f\\r ",
+    "upper": "A-Z",
+    "word": "0-9A-Za-z_",
+    "xdigit": "0-9A-Fa-f",
+}
+
+
+def translate_re2(pattern: str) -> str:
+    """Rewrites the parts of re2 syntax (used by ClickHouse and the NodeJS VM) that Python's `re` reads differently."""
+    result: list[str] = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            # `\z` is the end of the text in re2, and an invalid escape in Python
+            result.append("\\Z" if pattern[i + 1] == "z" and not in_class else pattern[i : i + 2])
+            i += 2
+        elif in_class:
+            if pattern.startswith("[:", i):
+                end = pattern.find(":]", i + 2)
+                if end != -1 and pattern[i + 2 : end] in _POSIX_CLASSES:
+                    result.append(_POSIX_CLASSES[pattern[i + 2 : end]])
+                    i = end + 2
+                    continue
+            elif char == "]":
+                in_class = False
+            result.append(char)
+            i += 1
+        elif char == "[":
+            in_class = True
+            start = i
+            i += 1
+            # A `]` right after the opening bracket (or after `^`) is a literal
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+            result.append(pattern[start:i])
+        elif pattern.startswith("(?<", i) and not pattern.startswith(("(?<=", "(?<!"), i):
+            # Named groups without the `P`
+            result.append("(?P<")
+            i += 3
+        else:
+            result.append(char)
+            i += 1
+    return "".join(result)
+
+
+def like_to_regex(pattern: str) -> str:
+    return re.escape(pattern).replace("%", ".*").replace("_", ".")
+
+
+class RegexCache:
+    """A bounded, thread-safe LRU of compiled patterns, shared by the VM and the STL."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str, int], re.Pattern] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, pattern: Any, flags: int = 0) -> re.Pattern:
+        """Compiles a re2 pattern, as used by `=~`, `~*` and `match()`."""
+        if not isinstance(pattern, str):
+            return re.compile(pattern, flags)
+        return self._get_or_compile("regex", pattern, flags)
+
+    def compile_like(self, pattern: Any, flags: int = 0) -> re.Pattern:
+        """Compiles a LIKE pattern, in which `%` and `_` are the only special characters."""
+        if not isinstance(pattern, str):
+            return re.compile(like_to_regex(pattern), flags)
+        return self._get_or_compile("like", pattern, flags)
+
+    def _get_or_compile(self, kind: str, pattern: str, flags: int) -> re.Pattern:
+        key = (kind, pattern, flags)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = re.compile(translate_re2(pattern) if kind == "regex" else like_to_regex(pattern), flags)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+regex_cache = RegexCache(max_size=REGEX_CACHE_MAX_SIZE)
@@ -25,6 +25,7 @@ from .date import (
 )
 from .crypto import sha256Hex, md5Hex, sha256HmacChainHex
 from ..objects import is_hog_error, new_hog_error, is_hog_callable, is_hog_closure, to_hog_interval
+from ..regex_cache import regex_cache
 from ..utils import like, get_nested_value
 
 if TYPE_CHECKING:
@@ -892,7 +893,7 @@ STL: dict[str, STLFunction] = {
     "match": STLFunction(
         fn=lambda args, team, stdout, timeout: False
         if args[1] is None or args[0] is None
-        else bool(re.search(re.compile(args[1]), args[0])),
+        else bool(regex_cache.compile(args[1]).search(args[0])),
         minArgs=2,
         maxArgs=2,
     ),
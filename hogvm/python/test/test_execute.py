@@ -1,15 +1,23 @@
 import json
+from datetime import timedelta
 from typing import Any, Optional
 from collections.abc import Callable
 
 
-from hogvm.python.execute import execute_bytecode, get_nested_value
+from hogvm.python.execute import (
+    BatchItemError,
+    HogVM,
+    execute_bytecode,
+    execute_bytecode_batch,
+    filter_bytecode_batch,
+    get_nested_value,
+)
 from hogvm.python.operation import (
     Operation as op,
     HOGQL_BYTECODE_IDENTIFIER as _H,
     HOGQL_BYTECODE_VERSION as VERSION,
 )
-from hogvm.python.utils import UncaughtHogVMException
+from hogvm.python.utils import HogVMException, UncaughtHogVMException, calculate_cost
 from posthog.hogql.compiler.bytecode import create_bytecode
 from posthog.hogql.parser import parse_expr, parse_program
 
@@ -1033,3 +1041,73 @@ class TestBytecodeExecute:
             }
         )
         assert res.result == "tomato"
+
+    def test_cost_cache_follows_mutations(self):
+        vm = HogVM({}, [_H, VERSION], None, timedelta(seconds=5), None, False)
+        obj: dict[str, Any] = {"key": "x" * 300, "list": [1, 2, 3]}
+        parent = {"child": obj, "padding": "y" * 300}
+        assert vm.calculate_cost(obj) == calculate_cost(obj)
+        assert vm.calculate_cost(parent) == calculate_cost(parent)
+
+        vm.set_property(obj, "key", "short")
+        vm.set_property(obj, "new", ["z" * 500])
+        vm.set_property(obj, "self", obj)
+        vm.set_property(obj["list"], 2, "w" * 400)
+        assert vm.calculate_cost(obj) == calculate_cost(obj)
+        assert vm.calculate_cost(parent) == calculate_cost(parent)
+
+    def test_cost_cache_with_mutating_functions(self):
+        def append(arr, value):
+            arr.append(value)
+
+        code = """
+            let arr := [];
+            for (let i := 0; i < 100; i := i + 1) {
+                arr := arrayPushBack(arr, 'abcdefghij');
+            }
+            append(arr, arr);
+            return arr;
+        """
+        program = parse_program(code)
+        bytecode = create_bytecode(program, supported_functions={"append"}).bytecode
+        vm = HogVM({"root": {"bytecode": bytecode}}, bytecode, {"append": append}, timedelta(seconds=5), None, False)
+        result = vm.run().result
+        assert len(result) == 101
+        assert vm.calculate_cost(result) == calculate_cost(result)
+
+    def test_execute_bytecode_batch(self):
+        bytecode = create_bytecode(parse_expr("properties.count * 2")).bytecode
+        globals_list: list[dict[str, Any]] = [{"properties": {"count": count}} for count in range(3)]
+        assert execute_bytecode_batch(bytecode, globals_list) == [0, 2, 4]
+
+        globals_list.insert(1, {"properties": {"count": None}})
+        try:
+            execute_bytecode_batch(bytecode, globals_list)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("Expected TypeError")
+
+        results = execute_bytecode_batch(bytecode, globals_list, capture_errors=True)
+        assert results[0] == 0
+        assert isinstance(results[1], BatchItemError) and isinstance(results[1].error, TypeError)
+        assert results[2:] == [2, 4]
+
+    def test_execute_bytecode_batch_timeout_per_item(self):
+        bytecode = create_bytecode(parse_program("while (globals.loop) { } return 1")).bytecode
+        globals_list = [{"globals": {"loop": loop}} for loop in [False, True, False]]
+        results = execute_bytecode_batch(bytecode, globals_list, timeout=1, capture_errors=True)
+        assert results[0] == 1
+        assert isinstance(results[1], BatchItemError) and isinstance(results[1].error, HogVMException)
+        assert "Execution timed out" in str(results[1].error)
+        assert results[2] == 1
+
+    def test_filter_bytecode_batch(self):
+        bytecode = create_bytecode(parse_expr("event.event = '$pageview' and event.properties.count > 1")).bytecode
+        globals_list = [
+            {"event": {"event": event, "properties": {"count": count}}}
+            for event in ["$pageview", "$autocapture"]
+            for count in range(5)
+        ]
+        bitmap = filter_bytecode_batch(bytecode, globals_list)
+        assert bitmap == bytearray([0b00011100, 0b00])
@@ -0,0 +1,49 @@
+import re
+
+from hogvm.python.regex_cache import RegexCache, translate_re2
+
+
+class TestRegexCache:
+    def test_translate_re2(self):
+        assert translate_re2("^a.*b$") == "^a.*b$"
+        assert translate_re2("abc\\z") == "abc\\Z"
+        assert translate_re2("[\\z]") == "[\\z]"
+        assert translate_re2("(?<name>\\d+)") == "(?P<name>\\d+)"
+        assert translate_re2("(?<=a)b(?<!c)") == "(?<=a)b(?<!c)"
+        assert translate_re2("[[:digit:]]+[^[:alpha:]_]") == "[0-9]+[^A-Za-z_]"
+        assert translate_re2("[]:alpha:]") == "[]:alpha:]"
+
+    def test_translated_patterns_match(self):
+        cache = RegexCache(max_size=10)
+        assert cache.compile("^[[:upper:]][[:lower:]]+\\z").search("Hello")
+        assert not cache.compile("^[[:upper:]][[:lower:]]+\\z").search("Hello!")
+        assert cache.compile("(?<year>\\d{4})").search("in 2024").group("year") == "2024"
+
+    def test_caches_by_pattern_and_flags(self):
+        cache = RegexCache(max_size=10)
+        assert cache.compile("a.c") is cache.compile("a.c")
+        assert cache.compile("a.c") is not cache.compile("a.c", re.IGNORECASE)
+        assert cache.compile("a_c") is not cache.compile_like("a_c")
+        assert cache.compile_like("a_c").search("abc")
+        assert not cache.compile_like("a.c").search("abc")
+        assert cache.stats() == {"size": 5, "hits": 3, "misses": 5}
+
+    def test_evicts_least_recently_used(self):
+        cache = RegexCache(max_size=2)
+        first = cache.compile("a")
+        cache.compile("b")
+        cache.compile("a")
+        cache.compile("c")
+        assert cache.compile("a") is first
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["misses"] == 3
+
+    def test_non_string_patterns_are_not_cached(self):
+        cache = RegexCache(max_size=10)
+        try:
+            cache.compile(None)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("Expected TypeError")
+        assert cache.stats()["size"] == 0
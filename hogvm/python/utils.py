@@ -1,6 +1,7 @@
-import re
 from typing import Any
 
+from hogvm.python.regex_cache import regex_cache
+
 
 COST_PER_UNIT = 8
 
@@ -26,9 +27,7 @@ class UncaughtHogVMException(HogVMException):
 
 
 def like(string, pattern, flags=0):
-    pattern = re.escape(pattern).replace("%", ".*").replace("_", ".")
-    re_pattern = re.compile(pattern, flags)
-    return re_pattern.search(string) is not None
+    return regex_cache.compile_like(pattern, flags).search(string) is not None
 
 
 def get_nested_value(obj, chain, nullish=False) -> Any:
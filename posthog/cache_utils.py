@@ -1,10 +1,13 @@
 from dataclasses import dataclass, field
 import threading
+from collections import OrderedDict
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Generic, ParamSpec, TypeVar
+from typing import Any, Generic, Optional, ParamSpec, TypeVar
 
 import orjson
+from prometheus_client import Counter, Gauge
 from rest_framework.utils.encoders import JSONEncoder
 from django.utils.timezone import now
 from django_redis.serializers.base import BaseSerializer
@@ -16,15 +19,72 @@ R = TypeVar("R")
 
 CacheKey = tuple[tuple[Any, ...], frozenset[tuple[Any, Any]]]
 
+DEFAULT_CACHE_MAXSIZE = 1024
+BACKGROUND_REFRESH_MAX_WORKERS = 4
+
+CACHE_FOR_HITS_COUNTER = Counter(
+    "posthog_cache_for_hits_total",
+    "Calls of functions decorated with cache_for answered from the cache, including stale values being refreshed.",
+    labelnames=["function"],
+)
+CACHE_FOR_MISSES_COUNTER = Counter(
+    "posthog_cache_for_misses_total",
+    "Calls of functions decorated with cache_for that waited for the function to be called.",
+    labelnames=["function"],
+)
+CACHE_FOR_EVICTIONS_COUNTER = Counter(
+    "posthog_cache_for_evictions_total",
+    "Entries evicted from the cache of functions decorated with cache_for, because it was full or they expired.",
+    labelnames=["function", "reason"],
+)
+CACHE_FOR_SIZE_GAUGE = Gauge(
+    "posthog_cache_for_size",
+    "Number of entries in the cache of functions decorated with cache_for.",
+    labelnames=["function"],
+)
+
+_background_refresh_executor: Optional[ThreadPoolExecutor] = None
+_background_refresh_executor_lock = threading.Lock()
+
+
+def _get_background_refresh_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by all cached functions to refresh stale values in the background."""
+    global _background_refresh_executor
+
+    with _background_refresh_executor_lock:
+        if _background_refresh_executor is None:
+            _background_refresh_executor = ThreadPoolExecutor(
+                max_workers=BACKGROUND_REFRESH_MAX_WORKERS, thread_name_prefix="cache_for_refresh"
+            )
+        return _background_refresh_executor
+
+
+@dataclass(slots=True)
+class _InflightCall:
+    """A call of a cached function, shared by all callers waiting for a value for the same arguments."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Any = None
+    error: Optional[BaseException] = None
+
 
 @dataclass(slots=True)
 class CachedFunction(Generic[P, R]):
     _fn: Callable[P, R]
     _cache_time: timedelta
     _background_refresh: bool = False
+    _maxsize: Optional[int] = DEFAULT_CACHE_MAXSIZE
+    _evict_expired: bool = False
+
+    _cache: OrderedDict[CacheKey, tuple[datetime, R]] = field(default_factory=OrderedDict, init=False, repr=False)
+    _refreshing: dict[CacheKey, datetime] = field(default_factory=dict, init=False, repr=False)
+    _inflight: dict[CacheKey, _InflightCall] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _last_expired_eviction: Optional[datetime] = field(default=None, init=False, repr=False)
+    _name: str = field(default="", init=False, repr=False)
 
-    _cache: dict[CacheKey, tuple[datetime, R]] = field(default_factory=dict, init=False, repr=False)
-    _refreshing: dict[CacheKey, datetime | None] = field(default_factory=dict, init=False, repr=False)
+    def __post_init__(self) -> None:
+        self._name = f"{self._fn.__module__}.{self._fn.__qualname__}"
 
     def __call__(self, *args: P.args, use_cache: bool = not TEST, **kwargs: P.kwargs) -> R:
         if not use_cache:
@@ -33,32 +93,102 @@ class CachedFunction(Generic[P, R]):
         current_time = now()
         key: CacheKey = (args, frozenset(sorted(kwargs.items())))
 
-        def refresh():
-            try:
-                value = self._fn(*args, **kwargs)
-                self._cache[key] = (now(), value)
-                self._refreshing[key] = None
-            except Exception:
-                self._refreshing[key] = None
-                raise
-
-        if key not in self._cache:
-            refresh()
-        elif current_time - self._cache[key][0] > self._cache_time:
-            if self._background_refresh:
-                if not self._refreshing.get(key):
-                    self._refreshing[key] = current_time
-                    t = threading.Thread(target=refresh)
-                    t.start()
-            else:
-                refresh()
-
-        return self._cache[key][1]
-
-
-def cache_for(cache_time: timedelta, background_refresh=False) -> Callable[[Callable[P, R]], CachedFunction[P, R]]:
+        with self._lock:
+            entry = self._cache.get(key)
+
+            if entry is not None:
+                self._cache.move_to_end(key)
+
+                if current_time - entry[0] <= self._cache_time:
+                    CACHE_FOR_HITS_COUNTER.labels(function=self._name).inc()
+                    return entry[1]
+
+                if self._background_refresh:
+                    # Serve the stale value, while a single refresh per key runs in the shared thread pool
+                    if key not in self._refreshing:
+                        self._refreshing[key] = current_time
+                        _get_background_refresh_executor().submit(self._refresh_in_background, key, args, kwargs)
+                    CACHE_FOR_HITS_COUNTER.labels(function=self._name).inc()
+                    return entry[1]
+
+            # Concurrent callers with the same arguments wait for a single call of the function
+            inflight = self._inflight.get(key)
+            is_caller = inflight is None
+            if inflight is None:
+                inflight = self._inflight[key] = _InflightCall()
+
+        CACHE_FOR_MISSES_COUNTER.labels(function=self._name).inc()
+
+        if not is_caller:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.value
+
+        try:
+            value = self._fn(*args, **kwargs)
+            inflight.value = value
+            self._store(key, value)
+            return value
+        except BaseException as err:
+            inflight.error = err
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.done.set()
+
+    def _refresh_in_background(self, key: CacheKey, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        try:
+            self._store(key, self._fn(*args, **kwargs))
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _store(self, key: CacheKey, value: R) -> None:
+        with self._lock:
+            current_time = now()
+            self._cache[key] = (current_time, value)
+            self._cache.move_to_end(key)
+
+            if self._evict_expired:
+                self._evict_expired_entries(current_time)
+
+            while self._maxsize is not None and len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+                CACHE_FOR_EVICTIONS_COUNTER.labels(function=self._name, reason="size").inc()
+
+            CACHE_FOR_SIZE_GAUGE.labels(function=self._name).set(len(self._cache))
+
+    def _evict_expired_entries(self, current_time: datetime) -> None:
+        # Entries are ordered by use rather than by age, so all of them are checked, at most once per cache time
+        if self._last_expired_eviction is not None and current_time - self._last_expired_eviction < self._cache_time:
+            return
+        self._last_expired_eviction = current_time
+
+        expired = [key for key, (cached_at, _) in self._cache.items() if current_time - cached_at > self._cache_time]
+        for key in expired:
+            del self._cache[key]
+        if expired:
+            CACHE_FOR_EVICTIONS_COUNTER.labels(function=self._name, reason="expired").inc(len(expired))
+
+
+def cache_for(
+    cache_time: timedelta,
+    background_refresh=False,
+    maxsize: Optional[int] = DEFAULT_CACHE_MAXSIZE,
+    evict_expired: bool = False,
+) -> Callable[[Callable[P, R]], CachedFunction[P, R]]:
+    """
+    Cache the results of a function in memory for `cache_time`, per arguments.
+
+    The least recently used results are evicted once more than `maxsize` are cached, unless `maxsize` is `None`.
+    With `evict_expired`, results older than `cache_time` are also evicted, rather than kept until they are used again.
+    With `background_refresh`, stale results keep being returned while they are refreshed in a shared thread pool.
+    """
+
     def wrapper(fn: Callable[P, R]) -> CachedFunction[P, R]:
-        return CachedFunction(fn, cache_time, background_refresh)
+        return CachedFunction(fn, cache_time, background_refresh, maxsize, evict_expired)
 
     return wrapper
 
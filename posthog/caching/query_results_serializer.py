@@ -0,0 +1,24 @@
+from typing import Any
+
+from django_redis.serializers.pickle import PickleSerializer
+
+from posthog.caching.zstd_dictionaries import has_dictionary_header
+
+
+class QueryResultsSerializer(PickleSerializer):
+    """
+    Pickles values like the default django_redis serializer, except for query results compressed with a zstd
+    dictionary, which are stored as the bytes they are. The compressor then sees their header and leaves them alone,
+    where it would otherwise compress them again after pickling.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, bytes) and has_dictionary_header(value):
+            return value
+        return super().dumps(value)
+
+    def loads(self, value: bytes) -> Any:
+        # pickles can't start with the header, so values pickled before this serializer was used are still read
+        if has_dictionary_header(value):
+            return value
+        return super().loads(value)
@@ -0,0 +1,193 @@
+import pickle
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django_redis import get_redis_connection
+from fakeredis import FakeConnection
+from redis.exceptions import ConnectionError
+
+from posthog import redis
+from posthog.caching.tolerant_zlib_compressor import TolerantZlibCompressor
+from posthog.caching.zstd_dictionaries import (
+    DICTIONARY_KEY,
+    MissingDictionaryError,
+    compress_query_result,
+    decompress_query_result,
+    get_current_dictionary_id,
+    get_sample_keys,
+    has_dictionary_header,
+    store_dictionary,
+    train_dictionary,
+)
+from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.hogql_queries.query_cache import QueryCacheManager
+from posthog.test.base import BaseTest
+
+
+def make_result(i: int) -> dict:
+    return {
+        "results": [
+            {
+                "label": f"$pageview - {i}",
+                "days": [f"2024-12-{day:02d}" for day in range(1, 31)],
+                "data": [i * day % 97 for day in range(1, 31)],
+                "filter": {"display": "ActionsLineGraph", "interval": "day", "date_from": "-30d"},
+            }
+        ],
+        "is_cached": False,
+        "cache_key": f"cache_{i}",
+        "timezone": "UTC",
+    }
+
+
+SAMPLES = [OrjsonJsonSerializer({}).dumps(make_result(i)) for i in range(200)]
+
+# The cache used outside of tests, backed by a fake Redis server like the rest of the tests
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": settings.REDIS_URL,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "COMPRESSOR": "posthog.caching.tolerant_zlib_compressor.TolerantZlibCompressor",
+            "SERIALIZER": "posthog.caching.query_results_serializer.QueryResultsSerializer",
+            "CONNECTION_POOL_KWARGS": {"connection_class": FakeConnection},
+        },
+        "KEY_PREFIX": "posthog",
+    }
+}
+
+
+@override_settings(USE_QUERY_CACHE_ZSTD_DICTIONARIES=True)
+class TestZstdDictionaries(BaseTest):
+    def test_compresses_with_the_current_dictionary_of_the_query_kind(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        value = OrjsonJsonSerializer({}).dumps(make_result(1000))
+
+        compressed = compress_query_result(value, "TrendsQuery")
+
+        assert has_dictionary_header(compressed)
+        assert len(compressed) < len(value)
+        assert decompress_query_result(compressed) == value
+        # other kinds don't have a dictionary and are left to the cache compressor
+        assert compress_query_result(value, "FunnelsQuery") == value
+
+    @override_settings(USE_QUERY_CACHE_ZSTD_DICTIONARIES=False)
+    def test_does_not_compress_when_turned_off_but_can_still_read(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        value = OrjsonJsonSerializer({}).dumps(make_result(1000))
+
+        assert compress_query_result(value, "TrendsQuery") == value
+        with override_settings(USE_QUERY_CACHE_ZSTD_DICTIONARIES=True):
+            compressed = compress_query_result(value, "TrendsQuery")
+        assert decompress_query_result(compressed) == value
+
+    def test_previous_dictionary_expires_when_replaced(self) -> None:
+        first = train_dictionary(SAMPLES, 4096)
+        store_dictionary("TrendsQuery", first)
+        second = train_dictionary(SAMPLES, 4096)
+        store_dictionary("TrendsQuery", second)
+
+        assert first.dict_id() != second.dict_id()
+        assert get_current_dictionary_id("TrendsQuery") == second.dict_id()
+        assert redis.get_client().ttl(DICTIONARY_KEY.format(dictionary_id=first.dict_id())) > 0
+        assert redis.get_client().ttl(DICTIONARY_KEY.format(dictionary_id=second.dict_id())) == -1
+
+    def test_reading_a_value_of_a_missing_dictionary_raises(self) -> None:
+        dictionary = train_dictionary(SAMPLES, 4096)
+        store_dictionary("TrendsQuery", dictionary)
+        compressed = compress_query_result(SAMPLES[0], "TrendsQuery")
+        redis.get_client().delete(DICTIONARY_KEY.format(dictionary_id=dictionary.dict_id()))
+
+        with self.assertRaises(MissingDictionaryError):
+            decompress_query_result(compressed)
+
+    def test_compressor_passes_dictionary_compressed_values_through(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        compressed = compress_query_result(SAMPLES[0] * 10, "TrendsQuery")
+
+        compressor = TolerantZlibCompressor({})
+        assert compressor.compress(compressed) == compressed
+        assert compressor.decompress(compressed) == compressed
+
+    def test_query_cache_round_trip(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+
+        manager.set_cache_data(response=make_result(1000), target_age=None)
+
+        assert has_dictionary_header(cache.get("cache_trends"))
+        assert manager.get_cache_data() == make_result(1000)
+        assert get_sample_keys("TrendsQuery") == ["cache_trends"]
+
+    @override_settings(CACHES=REDIS_CACHES, USE_REDIS_COMPRESSION=True)
+    def test_query_cache_round_trip_through_redis(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+
+        manager.set_cache_data(response=make_result(1000), target_age=None)
+
+        # stored as is, rather than pickled and compressed again
+        stored = get_redis_connection("default").get(cache.make_key("cache_trends"))
+        assert has_dictionary_header(stored)
+        assert stored == compress_query_result(OrjsonJsonSerializer({}).dumps(make_result(1000)), "TrendsQuery")
+        assert manager.get_cache_data() == make_result(1000)
+
+        # other values are still pickled and compressed
+        cache.set("other", {"value": "x" * 1000})
+        assert not has_dictionary_header(get_redis_connection("default").get(cache.make_key("other")))
+        assert cache.get("other") == {"value": "x" * 1000}
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_query_cache_reads_dictionary_compressed_values_pickled_before(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        compressed = compress_query_result(OrjsonJsonSerializer({}).dumps(make_result(1000)), "TrendsQuery")
+        # the way the default serializer stored these values
+        get_redis_connection("default").set(
+            cache.make_key("cache_trends"), TolerantZlibCompressor({}).compress(pickle.dumps(compressed))
+        )
+
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+        assert manager.get_cache_data() == make_result(1000)
+
+    def test_query_cache_treats_values_it_cannot_load_the_dictionary_of_as_misses(self) -> None:
+        store_dictionary("TrendsQuery", train_dictionary(SAMPLES, 4096))
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+        manager.set_cache_data(response=make_result(1000), target_age=None)
+
+        with patch("posthog.caching.zstd_dictionaries.redis.get_client", side_effect=ConnectionError):
+            assert manager.get_cache_data() is None
+
+    @override_settings(USE_QUERY_CACHE_ZSTD_DICTIONARIES=False)
+    def test_does_not_sample_keys_when_turned_off(self) -> None:
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+        manager.set_cache_data(response=make_result(1000), target_age=None)
+
+        assert get_sample_keys("TrendsQuery") == []
+
+    def test_query_cache_treats_values_of_missing_dictionaries_as_misses(self) -> None:
+        dictionary = train_dictionary(SAMPLES, 4096)
+        store_dictionary("TrendsQuery", dictionary)
+        manager = QueryCacheManager(team_id=self.team.pk, cache_key="cache_trends", query_kind="TrendsQuery")
+        manager.set_cache_data(response=make_result(1000), target_age=None)
+        redis.get_client().delete(DICTIONARY_KEY.format(dictionary_id=dictionary.dict_id()))
+
+        assert manager.get_cache_data() is None
+
+    def test_train_command(self) -> None:
+        for i in range(100):
+            manager = QueryCacheManager(team_id=self.team.pk, cache_key=f"cache_{i}", query_kind="TrendsQuery")
+            manager.set_cache_data(response=make_result(i), target_age=None)
+
+        out = StringIO()
+        call_command("train_query_cache_dictionaries", "--dictionary-size=4096", stdout=out)
+
+        assert "TrendsQuery: 20 held out results" in out.getvalue()
+        dictionary_id = get_current_dictionary_id("TrendsQuery")
+        assert f"TrendsQuery: stored dictionary {dictionary_id}" in out.getvalue()
+        # results cached before the dictionary was trained can still be read
+        assert QueryCacheManager(team_id=self.team.pk, cache_key="cache_0").get_cache_data() == make_result(0)
@@ -8,6 +8,8 @@ from django.conf import settings
 import structlog
 from prometheus_client import Counter
 
+from posthog.caching.zstd_dictionaries import has_dictionary_header
+
 logger = structlog.get_logger(__name__)
 
 COULD_NOT_DECOMPRESS_VALUE_COUNTER = Counter(
@@ -35,6 +37,7 @@ class TolerantZlibCompressor(BaseCompressor):
     Even while we no longer write compressed values to the cache.
 
     This compressor is a tolerant reader and will return the original value if it can't be decompressed.
+    Query results compressed with a zstd dictionary are passed through as is in both directions.
     """
 
     # we don't want to compress all values, e.g. feature flag cache in decide is already small
@@ -44,11 +47,17 @@ class TolerantZlibCompressor(BaseCompressor):
     zlib_preset = 6
 
     def compress(self, value: bytes) -> bytes:
+        # query results compressed with a zstd dictionary are already as small as they get
+        if has_dictionary_header(value):
+            return value
         if settings.USE_REDIS_COMPRESSION and len(value) > self.min_length:
             return zstd.compress(value, self.zstd_preset, self.zstd_threads)
         return value
 
     def decompress(self, value: bytes) -> bytes:
+        if has_dictionary_header(value):
+            # these are decompressed by the query cache, which knows where to find the dictionary
+            return value
         try:
             try:
                 return zstd.decompress(value)
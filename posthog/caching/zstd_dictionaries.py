@@ -0,0 +1,168 @@
+import struct
+from datetime import timedelta
+from typing import Optional
+
+import structlog
+import zstandard
+from django.conf import settings
+from prometheus_client import Counter
+
+from posthog import redis
+from posthog.cache_utils import cache_for
+
+logger = structlog.get_logger(__name__)
+
+# Values compressed with a dictionary start with this magic and the ID of the dictionary. The first byte can't start
+# JSON, pickled values, or zstd and zlib frames, so these values can be told apart from everything else in the cache.
+DICTIONARY_HEADER_MAGIC = b"\xffzd"
+DICTIONARY_HEADER = struct.Struct(f">{len(DICTIONARY_HEADER_MAGIC)}sI")
+
+ZSTD_LEVEL = 3
+# IDs below 32768 are reserved by zstd for dictionaries that are shared publicly
+DICTIONARY_ID_OFFSET = 32768
+DICTIONARY_SIZE = 112640
+MAX_SAMPLE_KEYS = 2000
+
+DICTIONARY_KEY = "query_cache_dictionary:{dictionary_id}"
+CURRENT_DICTIONARY_KEY = "query_cache_dictionary:current:{query_kind}"
+LAST_DICTIONARY_ID_KEY = "query_cache_dictionary:last_id"
+SAMPLE_KEYS_KEY = "query_cache_dictionary:samples:{query_kind}"
+
+DICTIONARY_COMPRESSION_BYTES_COUNTER = Counter(
+    "posthog_query_cache_dictionary_compression_bytes",
+    "Bytes of query results written to the cache compressed with a zstd dictionary, before and after compression.",
+    labelnames=["query_kind", "stage"],
+)
+
+
+class MissingDictionaryError(Exception):
+    """The dictionary a cached value was compressed with no longer exists or can't be loaded, so the value can't be read."""
+
+
+def has_dictionary_header(value: bytes) -> bool:
+    return value[: len(DICTIONARY_HEADER_MAGIC)] == DICTIONARY_HEADER_MAGIC
+
+
+@cache_for(timedelta(hours=1), maxsize=64)
+def _load_dictionary(dictionary_id: int) -> zstandard.ZstdCompressionDict:
+    # Dictionaries never change once stored, so they can be kept in memory for as long as they are used
+    data = redis.get_client().get(DICTIONARY_KEY.format(dictionary_id=dictionary_id))
+    if data is None:
+        # Raised rather than returned, so that the miss isn't cached while the dictionary may be stored any moment
+        raise MissingDictionaryError(f"zstd dictionary {dictionary_id} does not exist")
+    dictionary = zstandard.ZstdCompressionDict(data)
+    dictionary.precompute_compress(level=ZSTD_LEVEL)
+    return dictionary
+
+
+def get_dictionary(dictionary_id: int) -> Optional[zstandard.ZstdCompressionDict]:
+    try:
+        return _load_dictionary(dictionary_id)
+    except MissingDictionaryError:
+        return None
+
+
+@cache_for(timedelta(minutes=5), maxsize=256)
+def get_current_dictionary_id(query_kind: str) -> Optional[int]:
+    dictionary_id = redis.get_client().get(CURRENT_DICTIONARY_KEY.format(query_kind=query_kind))
+    return int(dictionary_id) if dictionary_id is not None else None
+
+
+def compress_with_dictionary(value: bytes, dictionary: zstandard.ZstdCompressionDict) -> bytes:
+    # The dictionary ID is in our header already, so there's no need to repeat it in the zstd frame
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary, write_dict_id=False)
+    return DICTIONARY_HEADER.pack(DICTIONARY_HEADER_MAGIC, dictionary.dict_id()) + compressor.compress(value)
+
+
+def decompress_with_dictionary(value: bytes, dictionary: zstandard.ZstdCompressionDict) -> bytes:
+    decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    return decompressor.decompress(value[DICTIONARY_HEADER.size :])
+
+
+def compress_query_result(value: bytes, query_kind: Optional[str]) -> bytes:
+    """
+    Compresses a serialized query result with the current dictionary for its query kind. Returns the value as is when
+    dictionaries are turned off or none has been trained for the query kind, for the cache compressor to deal with.
+    """
+    if not settings.USE_QUERY_CACHE_ZSTD_DICTIONARIES or not query_kind:
+        return value
+
+    try:
+        dictionary_id = get_current_dictionary_id(query_kind)
+        dictionary = get_dictionary(dictionary_id) if dictionary_id is not None else None
+    except Exception as e:
+        logger.warning("query_cache_dictionary_unavailable", query_kind=query_kind, error=str(e))
+        return value
+    if dictionary is None:
+        return value
+
+    compressed = compress_with_dictionary(value, dictionary)
+    DICTIONARY_COMPRESSION_BYTES_COUNTER.labels(query_kind=query_kind, stage="uncompressed").inc(len(value))
+    DICTIONARY_COMPRESSION_BYTES_COUNTER.labels(query_kind=query_kind, stage="compressed").inc(len(compressed))
+    return compressed
+
+
+def decompress_query_result(value: bytes) -> bytes:
+    """
+    Decompresses a value written by `compress_query_result`, and returns any other value as is, so that results
+    cached before dictionaries were turned on can still be read.
+    """
+    if not has_dictionary_header(value):
+        return value
+
+    _, dictionary_id = DICTIONARY_HEADER.unpack_from(value)
+    try:
+        dictionary = _load_dictionary(dictionary_id)
+    except MissingDictionaryError:
+        raise
+    except Exception as e:
+        logger.warning("query_cache_dictionary_unavailable", dictionary_id=dictionary_id, error=str(e))
+        raise MissingDictionaryError(f"zstd dictionary {dictionary_id} could not be loaded") from e
+    return decompress_with_dictionary(value, dictionary)
+
+
+def record_sample_key(query_kind: str, cache_key: str) -> None:
+    """Remembers recently written cache keys per query kind, to sample values from when training dictionaries."""
+    if not settings.USE_QUERY_CACHE_ZSTD_DICTIONARIES:
+        return
+    sample_keys_key = SAMPLE_KEYS_KEY.format(query_kind=query_kind)
+    pipeline = redis.get_client().pipeline(transaction=False)
+    pipeline.lpush(sample_keys_key, cache_key)
+    pipeline.ltrim(sample_keys_key, 0, MAX_SAMPLE_KEYS - 1)
+    pipeline.execute()
+
+
+def get_sample_keys(query_kind: str, limit: int = MAX_SAMPLE_KEYS) -> list[str]:
+    sample_keys = redis.get_client().lrange(SAMPLE_KEYS_KEY.format(query_kind=query_kind), 0, limit - 1)
+    # The same query is often cached repeatedly, and duplicate samples would skew the dictionary towards it
+    return list(dict.fromkeys(key.decode("utf-8") for key in sample_keys))
+
+
+def get_sampled_query_kinds() -> list[str]:
+    prefix = SAMPLE_KEYS_KEY.format(query_kind="")
+    return sorted(key.decode("utf-8").removeprefix(prefix) for key in redis.get_client().scan_iter(match=f"{prefix}*"))
+
+
+def train_dictionary(samples: list[bytes], dictionary_size: int = DICTIONARY_SIZE) -> zstandard.ZstdCompressionDict:
+    dictionary_id = DICTIONARY_ID_OFFSET + redis.get_client().incr(LAST_DICTIONARY_ID_KEY)
+    return zstandard.train_dictionary(dictionary_size, samples, dict_id=dictionary_id, level=ZSTD_LEVEL)
+
+
+def store_dictionary(query_kind: str, dictionary: zstandard.ZstdCompressionDict) -> None:
+    """
+    Makes the dictionary the one new results of the query kind are compressed with. The previous dictionary is kept
+    until every result compressed with it has expired from the cache.
+    """
+    client = redis.get_client()
+    current_dictionary_key = CURRENT_DICTIONARY_KEY.format(query_kind=query_kind)
+    previous_dictionary_id = client.get(current_dictionary_key)
+
+    client.set(DICTIONARY_KEY.format(dictionary_id=dictionary.dict_id()), dictionary.as_bytes())
+    client.set(current_dictionary_key, dictionary.dict_id())
+
+    if previous_dictionary_id is not None:
+        # Processes keep compressing with the previous dictionary until they notice the new one
+        client.expire(
+            DICTIONARY_KEY.format(dictionary_id=int(previous_dictionary_id)),
+            settings.CACHED_RESULTS_TTL + int(timedelta(hours=1).total_seconds()),
+        )
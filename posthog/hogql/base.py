@@ -1,7 +1,8 @@
 import re
 from dataclasses import dataclass, field
 
-from typing import TYPE_CHECKING, Literal, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, Optional, TypeVar
+from collections.abc import Callable
 
 from posthog.hogql.constants import ConstantDataType
 from posthog.hogql.errors import NotImplementedError
@@ -13,26 +14,51 @@ if TYPE_CHECKING:
 camel_case_pattern = re.compile(r"(?<!^)(?<![A-Z])(?=[A-Z])")
 
 
-@dataclass(kw_only=True)
+def get_visit_method_name(node_class: type["AST"]) -> str:
+    name = camel_case_pattern.sub("_", node_class.__name__).lower()
+
+    # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
+    replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
+    for old, new in replacements.items():
+        name = name.replace(old, new)
+    return f"visit_{name}"
+
+
+def find_visit_method(visitor_class: type, node_class: type["AST"]) -> Callable[[Any, Any], Any]:
+    """Find the unbound method of the visitor class that visits nodes of the given class."""
+    method_name = node_class.visit_method_name
+    visit = getattr(visitor_class, method_name, None) or getattr(visitor_class, "visit_unknown", None)
+    if visit is not None:
+        return visit
+
+    def not_implemented(visitor, node):
+        raise NotImplementedError(f"{visitor_class.__name__} has no method {method_name}")
+
+    return not_implemented
+
+
+@dataclass(kw_only=True, slots=True)
 class AST:
     start: Optional[int] = field(default=None)
     end: Optional[int] = field(default=None)
 
+    # Name of the method that visits nodes of this class, e.g. "visit_select_query", found once per class
+    visit_method_name: ClassVar[str] = "visit_ast"
+
+    def __init_subclass__(cls, **kwargs):
+        # Zero-argument super() doesn't work in slotted dataclasses, as the decorator replaces the class
+        super(AST, cls).__init_subclass__(**kwargs)
+        cls.visit_method_name = get_visit_method_name(cls)
+
     # This is part of the visitor pattern from visitor.py.
     def accept(self, visitor):
-        name = camel_case_pattern.sub("_", self.__class__.__name__).lower()
-
-        # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
-        replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
-        for old, new in replacements.items():
-            name = name.replace(old, new)
-        method_name = f"visit_{name}"
-        if hasattr(visitor, method_name):
-            visit = getattr(visitor, method_name)
-            return visit(self)
-        if hasattr(visitor, "visit_unknown"):
-            return visitor.visit_unknown(self)
-        raise NotImplementedError(f"{visitor.__class__.__name__} has no method {method_name}")
+        # Visitors cache their visit method per node class, see Visitor.__init_subclass__
+        dispatch_table = visitor.dispatch_table
+        try:
+            visit = dispatch_table[self.__class__]
+        except KeyError:
+            visit = dispatch_table[self.__class__] = find_visit_method(visitor.__class__, self.__class__)
+        return visit(visitor, self)
 
     def to_hogql(self):
         from posthog.hogql.printer import print_prepared_ast
@@ -46,14 +72,14 @@ class AST:
 
     def __str__(self):
         if isinstance(self, Type):
-            return super().__str__()
+            return repr(self)
         return f"sql({self.to_hogql()})"
 
 
 _T_AST = TypeVar("_T_AST", bound=AST)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Type(AST):
     def get_child(self, name: str, context: "HogQLContext") -> "Type":
         raise NotImplementedError("Type.get_child not overridden")
@@ -68,12 +94,12 @@ class Type(AST):
         raise NotImplementedError(f"{self.__class__.__name__}.resolve_column_constant_type not overridden")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Expr(AST):
     type: Optional[Type] = field(default=None)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CTE(Expr):
     """A common table expression."""
 
@@ -83,7 +109,7 @@ class CTE(Expr):
     cte_type: Literal["column", "subquery"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ConstantType(Type):
     data_type: ConstantDataType
     nullable: bool = field(default=True)
@@ -95,7 +121,7 @@ class ConstantType(Type):
         raise NotImplementedError("ConstantType.print_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UnknownType(ConstantType):
     data_type: ConstantDataType = field(default="unknown", init=False)
 
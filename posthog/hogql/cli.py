@@ -2,6 +2,7 @@ import sys
 import json
 
 from hogvm.python.execute import execute_bytecode
+from hogvm.python.regex_cache import regex_cache
 from posthog.hogql.compiler.bytecode import create_bytecode, parse_program
 from posthog.hogql.compiler.javascript import to_js_program
 
@@ -34,6 +35,8 @@ else:
         response = execute_bytecode(bytecode, globals=None, timeout=5, team=None, debug="--debug" in modifiers)
         for line in response.stdout:
             print(line)  # noqa: T201
+        if "--debug" in modifiers:
+            print(f"Regex cache: {regex_cache.stats()}", file=sys.stderr)  # noqa: T201
 
     elif "--out" in modifiers:
         if len(args) != 2:
@@ -0,0 +1,187 @@
+"""
+Process-local cache of compiled HogQL queries.
+
+`execute_hogql_query` resolves and prints every query twice, once for the `hogql` dialect and once for `clickhouse`.
+Dashboards and cache warming run the same insight queries over and over, so the printed output is cached, keyed by a
+structural fingerprint of the query AST, the modifiers and settings it's printed with, and the team's schema version.
+
+Printing also depends on state that doesn't bump the schema version, like property definitions and materialized
+columns. Entries therefore expire after `HOGQL_COMPILED_QUERY_CACHE_TTL` seconds, and queries that depend on cohorts
+or actions, which are looked up in Postgres while printing, are never cached.
+"""
+
+import dataclasses
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+
+from django.conf import settings
+from prometheus_client import Counter
+from pydantic import BaseModel
+
+from posthog.hogql import ast
+from posthog.hogql.constants import HogQLGlobalSettings
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.database.cache import get_team_schema_version
+from posthog.schema import HogQLQueryModifiers
+
+HOGQL_COMPILED_QUERY_CACHE_COUNTER = Counter(
+    "hogql_compiled_query_cache",
+    "Lookups in the process-local cache of compiled HogQL queries",
+    labelnames=["result"],
+)
+
+# Fields that don't change what a node prints to
+_IGNORED_NODE_FIELDS = frozenset({"start", "end", "type"})
+# Functions printed from the current steps of an action, or the current ID and version of a cohort
+_UNCACHEABLE_FUNCTIONS = frozenset({"matchesAction", "cohort"})
+
+
+class UncacheableQuery(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledQuery:
+    hogql: str
+    clickhouse: str
+    values: dict[str, Any]
+    columns: list[str]
+
+
+class CompiledQueryCache:
+    """A bounded, thread-safe LRU of compiled queries, whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, CompiledQuery]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CompiledQuery]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                HOGQL_COMPILED_QUERY_CACHE_COUNTER.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            HOGQL_COMPILED_QUERY_CACHE_COUNTER.labels(result="hit").inc()
+            return entry[1]
+
+    def set(self, key: str, compiled_query: CompiledQuery) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), compiled_query)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+compiled_query_cache = CompiledQueryCache(
+    max_size=settings.HOGQL_COMPILED_QUERY_CACHE_MAX_SIZE, ttl=settings.HOGQL_COMPILED_QUERY_CACHE_TTL
+)
+
+
+def get_compiled_query_cache_key(
+    node: ast.SelectQuery | ast.SelectSetQuery,
+    context: HogQLContext,
+    team_id: int,
+    timezone: Optional[str],
+    modifiers: HogQLQueryModifiers,
+    query_settings: HogQLGlobalSettings,
+    pretty: bool,
+) -> Optional[str]:
+    """
+    Returns the key a query is cached under, or None if the query or context can't be cached.
+
+    Contexts with a custom database, globals or pre-existing values print differently from a fresh context, so they
+    are never cached.
+    """
+    if context.database is not None or context.globals or context.values or context.debug:
+        return None
+
+    digest = hashlib.sha256()
+    try:
+        _fingerprint(node, digest)
+    except UncacheableQuery:
+        return None
+
+    digest.update(
+        repr(
+            (
+                team_id,
+                get_team_schema_version(team_id),
+                timezone,
+                modifiers.model_dump_json(exclude_none=True),
+                query_settings.model_dump_json(exclude_none=True),
+                pretty,
+                context.within_non_hogql_query,
+                context.limit_top_select,
+            )
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+def _fingerprint(value: Any, digest: "hashlib._Hash") -> None:
+    if isinstance(value, ast.AST):
+        if isinstance(value, ast.Expr) and value.type is not None:
+            # Already resolved nodes reference database tables, which aren't part of the fingerprint
+            raise UncacheableQuery()
+        if isinstance(value, ast.CompareOperation) and value.op in (
+            ast.CompareOperationOp.InCohort,
+            ast.CompareOperationOp.NotInCohort,
+        ):
+            # Printed with the cohort's current version
+            raise UncacheableQuery()
+        if isinstance(value, ast.Field) and "cohort_people" in value.chain:
+            raise UncacheableQuery()
+        if isinstance(value, ast.Call) and value.name in _UNCACHEABLE_FUNCTIONS:
+            raise UncacheableQuery()
+        if isinstance(value, ast.Placeholder):
+            raise UncacheableQuery()
+
+        digest.update(f"<{value.__class__.__name__}".encode())
+        for field in dataclasses.fields(value):
+            if field.name in _IGNORED_NODE_FIELDS:
+                continue
+            digest.update(f" {field.name}=".encode())
+            _fingerprint(getattr(value, field.name), digest)
+        digest.update(b">")
+    elif isinstance(value, list | tuple):
+        digest.update(f"[{len(value)}".encode())
+        for item in value:
+            _fingerprint(item, digest)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        digest.update(f"{{{len(value)}".encode())
+        for key, item in value.items():
+            _fingerprint(key, digest)
+            _fingerprint(item, digest)
+        digest.update(b"}")
+    elif value is None or isinstance(value, bool | int | float | str | Enum | datetime | date | UUID):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, BaseModel):
+        digest.update(f"{type(value).__name__}:{value.model_dump_json()};".encode())
+    else:
+        raise UncacheableQuery()
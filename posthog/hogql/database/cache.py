@@ -0,0 +1,170 @@
+"""
+Process-local cache of built HogQL `Database` objects.
+
+Building a `Database` loads the team's group type mappings, saved queries, warehouse tables and joins from Postgres,
+which is expensive for teams with large warehouses. Built databases are cached per team and per set of modifiers, and
+invalidated through a per-team schema version that is bumped whenever one of the underlying models changes.
+
+Cached databases are never handed out directly. Callers get a fork in which every table, virtual table and lazy join
+is a fresh copy, so assigning to `database.events.fields[...]` can't leak into other queries. Leaf fields are shared,
+as nothing mutates them after the database has been built.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from prometheus_client import Counter
+
+from posthog.hogql.database.models import DatabaseField, FieldOrTable, FieldTraverser, LazyJoin, Table
+from posthog.models.signals import mutable_receiver
+
+if TYPE_CHECKING:
+    from posthog.hogql.database.database import Database
+    from posthog.schema import HogQLQueryModifiers
+
+
+HOGQL_DATABASE_CACHE_COUNTER = Counter(
+    "hogql_database_cache",
+    "Lookups in the process-local cache of built HogQL databases",
+    labelnames=["result"],
+)
+
+SCHEMA_VERSION_CACHE_KEY_PREFIX = "hogql_database_schema_version"
+
+DatabaseCacheKey = tuple[int, str, Optional[str], Optional[str], str]
+
+
+def _schema_version_cache_key(team_id: int) -> str:
+    return f"{SCHEMA_VERSION_CACHE_KEY_PREFIX}:{team_id}"
+
+
+def get_team_schema_version(team_id: int) -> str:
+    """
+    Returns an opaque token that changes every time the team's HogQL schema changes.
+
+    Tokens are random rather than incrementing, so a version evicted from Redis can never come back as a value some
+    process has already cached a database under.
+    """
+    key = _schema_version_cache_key(team_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return str(version)
+
+
+def bump_team_schema_version(team_id: int) -> None:
+    cache.set(_schema_version_cache_key(team_id), uuid.uuid4().hex, timeout=None)
+
+
+class DatabaseCache:
+    """A bounded, thread-safe LRU of built databases."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[DatabaseCacheKey, Database] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: DatabaseCacheKey) -> Optional["Database"]:
+        with self._lock:
+            database = self._entries.get(key)
+            if database is not None:
+                self._entries.move_to_end(key)
+        return database
+
+    def set(self, key: DatabaseCacheKey, database: "Database") -> None:
+        team_id, version = key[0], key[1]
+        with self._lock:
+            # Entries built from an older schema version of the same team can never be hit again
+            for stale_key in [k for k in self._entries if k[0] == team_id and k[1] != version]:
+                del self._entries[stale_key]
+            self._entries[key] = database
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+database_cache = DatabaseCache(max_size=settings.HOGQL_DATABASE_CACHE_MAX_SIZE)
+
+
+def get_database_cache_key(
+    team_id: int,
+    timezone: Optional[str],
+    week_start_day: Optional[Any],
+    modifiers: "HogQLQueryModifiers",
+) -> DatabaseCacheKey:
+    return (
+        team_id,
+        get_team_schema_version(team_id),
+        timezone,
+        str(week_start_day) if week_start_day is not None else None,
+        modifiers.model_dump_json(exclude_none=True),
+    )
+
+
+def fork_database(database: "Database") -> "Database":
+    """Returns a copy of `database` that can be mutated without affecting the original."""
+    memo: dict[int, Any] = {}
+    forked = database.model_copy()
+    for name, value in database:
+        if isinstance(value, FieldOrTable):
+            setattr(forked, name, _fork_field_or_table(value, memo))
+    # Private attributes are copied shallowly by `model_copy`
+    forked._warehouse_table_names = list(database._warehouse_table_names)
+    forked._view_table_names = list(database._view_table_names)
+    return forked
+
+
+def _fork_field_or_table(value: Any, memo: dict[int, Any]) -> Any:
+    if not isinstance(value, FieldOrTable) or isinstance(value, DatabaseField | FieldTraverser):
+        return value
+    if id(value) in memo:
+        return memo[id(value)]
+
+    forked = value.model_copy()
+    memo[id(value)] = forked
+    # `model_copy` is shallow, so the fields of the copy are still the original ones
+    if isinstance(forked, LazyJoin):
+        forked.join_table = _fork_field_or_table(forked.join_table, memo)
+    elif isinstance(forked, Table):
+        for name in type(forked).model_fields:
+            attr = getattr(forked, name)
+            if isinstance(attr, dict):
+                setattr(forked, name, {key: _fork_field_or_table(field, memo) for key, field in attr.items()})
+            elif isinstance(attr, FieldOrTable):
+                setattr(forked, name, _fork_field_or_table(attr, memo))
+    return forked
+
+
+@mutable_receiver([post_save, post_delete], sender="posthog.Team")
+def bump_schema_version_on_team_change(sender, instance, **kwargs):
+    bump_team_schema_version(instance.pk)
+
+
+@mutable_receiver([post_save, post_delete], sender="posthog.GroupTypeMapping")
+def bump_schema_version_on_group_type_mapping_change(sender, instance, **kwargs):
+    from posthog.models.team import Team
+
+    for team_id in Team.objects.filter(project_id=instance.project_id).values_list("id", flat=True):
+        bump_team_schema_version(team_id)
+
+
+@mutable_receiver([post_save, post_delete], sender="posthog.DataWarehouseTable")
+@mutable_receiver([post_save, post_delete], sender="posthog.DataWarehouseSavedQuery")
+@mutable_receiver([post_save, post_delete], sender="posthog.DataWarehouseJoin")
+@mutable_receiver([post_save, post_delete], sender="posthog.DataWarehouseCredential")
+@mutable_receiver([post_save, post_delete], sender="posthog.ExternalDataSource")
+def bump_schema_version_on_warehouse_change(sender, instance, **kwargs):
+    bump_team_schema_version(instance.team_id)
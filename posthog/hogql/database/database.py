@@ -3,12 +3,19 @@ from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, ClassVar, Literal, Optional, TypeAlias, Union, cast
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from django.conf import settings
 from django.db.models import Q
 from pydantic import BaseModel, ConfigDict
 from sentry_sdk import capture_exception
 
 from posthog.hogql import ast
 from posthog.hogql.context import HogQLContext
+from posthog.hogql.database.cache import (
+    HOGQL_DATABASE_CACHE_COUNTER,
+    database_cache,
+    fork_database,
+    get_database_cache_key,
+)
 from posthog.hogql.database.models import (
     BooleanDatabaseField,
     DatabaseField,
@@ -252,18 +259,39 @@ def _use_error_tracking_issue_id_from_error_tracking_issue_overrides(database: D
 def create_hogql_database(
     team_id: int, modifiers: Optional[HogQLQueryModifiers] = None, team_arg: Optional["Team"] = None
 ) -> Database:
-    from posthog.hogql.database.s3_table import S3Table
     from posthog.hogql.query import create_default_modifiers_for_team
     from posthog.models import Team
+
+    team = team_arg or Team.objects.get(pk=team_id)
+    modifiers = create_default_modifiers_for_team(team, modifiers)
+
+    if not settings.HOGQL_DATABASE_CACHE_ENABLED:
+        return _build_hogql_database(team_id, modifiers, team)
+
+    cache_key = get_database_cache_key(team.pk, team.timezone, team.week_start_day, modifiers)
+    database = database_cache.get(cache_key)
+    if database is None:
+        HOGQL_DATABASE_CACHE_COUNTER.labels(result="miss").inc()
+        database = _build_hogql_database(team_id, modifiers, team)
+        database_cache.set(cache_key, database)
+    else:
+        HOGQL_DATABASE_CACHE_COUNTER.labels(result="hit").inc()
+
+    return fork_database(database)
+
+
+def _build_hogql_database(team_id: int, modifiers: HogQLQueryModifiers, team: "Team") -> Database:
+    from posthog.hogql.database.s3_table import S3Table
     from posthog.warehouse.models import (
         DataWarehouseJoin,
         DataWarehouseSavedQuery,
         DataWarehouseTable,
     )
 
-    team = team_arg or Team.objects.get(pk=team_id)
-    modifiers = create_default_modifiers_for_team(team, modifiers)
-    database = Database(timezone=team.timezone, week_start_day=team.week_start_day)
+    database = Database(
+        timezone=team.timezone,
+        week_start_day=WeekStartDay(team.week_start_day) if team.week_start_day is not None else None,
+    )
 
     if modifiers.personsOnEventsMode == PersonsOnEventsMode.DISABLED:
         # no change
@@ -7,6 +7,7 @@ from django.test import override_settings
 from parameterized import parameterized
 
 from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS
+from posthog.hogql.database.cache import database_cache
 from posthog.hogql.database.database import create_hogql_database, serialize_database
 from posthog.hogql.database.models import FieldTraverser, LazyJoin, StringDatabaseField, ExpressionField, Table
 from posthog.hogql.errors import ExposedHogQLError
@@ -589,3 +590,59 @@ class TestDatabase(BaseTest, QueryMatchingTest):
         assert "some_field" in person_on_event_table.join_table.fields.keys()  # type: ignore
 
         print_ast(parse_select("select person.some_field.key from events"), context, dialect="clickhouse")
+
+    @override_settings(HOGQL_DATABASE_CACHE_ENABLED=True)
+    def test_database_cache_reuses_built_database(self):
+        database_cache.clear()
+        create_hogql_database(team_id=self.team.pk, team_arg=self.team)
+
+        # No group type mapping or warehouse lookups
+        with self.assertNumQueries(FuzzyInt(0, 1)):
+            create_hogql_database(team_id=self.team.pk, team_arg=self.team)
+
+    @override_settings(HOGQL_DATABASE_CACHE_ENABLED=True)
+    def test_database_cache_hands_out_copies(self):
+        database_cache.clear()
+        db = create_hogql_database(team_id=self.team.pk)
+        db.events.fields["mutated"] = StringDatabaseField(name="mutated")
+        cast(Table, db.events.fields["poe"]).fields["mutated"] = StringDatabaseField(name="mutated")
+        db.add_views(my_view=db.numbers)
+
+        other_db = create_hogql_database(team_id=self.team.pk)
+        assert "mutated" not in other_db.events.fields
+        assert "mutated" not in cast(Table, other_db.events.fields["poe"]).fields
+        assert "my_view" not in other_db.get_views()
+
+    @override_settings(HOGQL_DATABASE_CACHE_ENABLED=True)
+    def test_database_cache_invalidated_on_schema_change(self):
+        database_cache.clear()
+        db = create_hogql_database(team_id=self.team.pk)
+        assert not db.has_table("my_saved_query")
+
+        DataWarehouseSavedQuery.objects.create(
+            team=self.team, name="my_saved_query", query={"query": "select 1 as a", "kind": "HogQLQuery"}
+        )
+        db = create_hogql_database(team_id=self.team.pk)
+        assert db.has_table("my_saved_query")
+
+        GroupTypeMapping.objects.create(
+            team=self.team, project_id=self.team.project_id, group_type="company", group_type_index=0
+        )
+        db = create_hogql_database(team_id=self.team.pk)
+        assert "company" in db.events.fields
+
+    @override_settings(HOGQL_DATABASE_CACHE_ENABLED=True)
+    def test_database_cache_keyed_by_modifiers(self):
+        database_cache.clear()
+        db = create_hogql_database(
+            team_id=self.team.pk,
+            modifiers=HogQLQueryModifiers(
+                personsOnEventsMode=PersonsOnEventsMode.PERSON_ID_NO_OVERRIDE_PROPERTIES_ON_EVENTS
+            ),
+        )
+        assert isinstance(db.events.fields["person_id"], StringDatabaseField)
+
+        db = create_hogql_database(
+            team_id=self.team.pk, modifiers=HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.DISABLED)
+        )
+        assert isinstance(db.events.fields["person_id"], FieldTraverser)
@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import OrderedDict
 from typing import Literal, Optional, cast
 from collections.abc import Callable
 
@@ -15,6 +18,7 @@ from posthog.hogql.grammar.HogQLParser import HogQLParser
 from posthog.hogql.parse_string import parse_string_literal_text, parse_string_literal_ctx, parse_string_text_ctx
 from posthog.hogql.placeholders import replace_placeholders
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql.visitor import clone_expr
 from hogql_parser import (
     parse_expr as _parse_expr_cpp,
     parse_order_expr as _parse_order_expr_cpp,
@@ -63,11 +67,82 @@ RULE_TO_HISTOGRAM: dict[Literal["expr", "order_expr", "select", "full_template_s
     cast(Literal["expr", "order_expr", "select", "full_template_string"], rule): Histogram(
         f"parse_{rule}_seconds",
         f"Time to parse {rule} expression",
-        labelnames=["backend"],
+        labelnames=["backend", "cached"],
     )
     for rule in ("expr", "order_expr", "select", "full_template_string")
 }
 
+# Most parsed strings are constant templates in our code, e.g. "event = {event}", parsed over and over again
+PARSE_CACHE_MAXSIZE = 1024
+# Longer strings are mostly queries written by users, which are rarely parsed twice
+PARSE_CACHE_MAX_STRING_LENGTH = 2048
+
+# (rule, string, backend, rule arguments like the start position of expressions)
+ParseCacheKey = tuple[str, str, str, tuple]
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of parsed ASTs, before placeholders are replaced. The cached ASTs are never handed out, only
+    clones of them, as callers are free to modify what they get back.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._nodes: OrderedDict[ParseCacheKey, ast.Expr] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ParseCacheKey) -> Optional[ast.Expr]:
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None:
+                self._nodes.move_to_end(key)
+            return node
+
+    def set(self, key: ParseCacheKey, node: ast.Expr) -> None:
+        with self._lock:
+            self._nodes[key] = node
+            self._nodes.move_to_end(key)
+            while len(self._nodes) > self.maxsize:
+                self._nodes.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+
+parse_cache = ParseCache(PARSE_CACHE_MAXSIZE)
+
+
+def _parse_with_cache(
+    rule: Literal["expr", "order_expr", "select"],
+    string: str,
+    placeholders: Optional[dict[str, ast.Expr]],
+    timings: HogQLTimings,
+    backend: Literal["python", "cpp"],
+    *args,
+):
+    start_time = time.perf_counter()
+    cacheable = len(string) <= PARSE_CACHE_MAX_STRING_LENGTH
+    key: ParseCacheKey = (rule, string, backend, args)
+    node = parse_cache.get(key) if cacheable else None
+    cache_hit = node is not None
+    if node is None:
+        node = RULE_TO_PARSE_FUNCTION[backend][rule](string, *args)
+        if cacheable:
+            parse_cache.set(key, node)
+    if cacheable and not placeholders:
+        # Replacing placeholders returns a clone of the cached node already
+        node = clone_expr(node)
+    RULE_TO_HISTOGRAM[rule].labels(backend=backend, cached="true" if cache_hit else "false").observe(
+        time.perf_counter() - start_time
+    )
+
+    if placeholders:
+        with timings.measure("replace_placeholders"):
+            node = replace_placeholders(node, placeholders)
+    return node
+
 
 def parse_string_template(
     string: str,
@@ -80,7 +155,7 @@ def parse_string_template(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_full_template_string_{backend}"):
-        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend).time():
+        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend, cached="false").time():
             node = RULE_TO_PARSE_FUNCTION[backend]["full_template_string"]("F'" + string)
         if placeholders:
             with timings.measure("replace_placeholders"):
@@ -101,12 +176,7 @@ def parse_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_with_cache("expr", expr, placeholders, timings, backend, start)
 
 
 def parse_order_expr(
@@ -119,12 +189,7 @@ def parse_order_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_order_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["order_expr"](order_expr)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_with_cache("order_expr", order_expr, placeholders, timings, backend)
 
 
 def parse_select(
@@ -137,12 +202,7 @@ def parse_select(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_select_{backend}"):
-        with RULE_TO_HISTOGRAM["select"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["select"](statement)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_with_cache("select", statement, placeholders, timings, backend)
 
 
 def parse_program(
@@ -154,7 +214,7 @@ def parse_program(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
+        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend, cached="false").time():
             node = RULE_TO_PARSE_FUNCTION[backend]["program"](source)
     return node
 
@@ -1,9 +1,12 @@
 import dataclasses
 from typing import Optional, Union, cast
 
+from django.conf import settings as app_settings
+
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
+from posthog.hogql.compiled_query_cache import CompiledQuery, compiled_query_cache, get_compiled_query_cache_key
 from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.hogql import HogQLContext
@@ -110,81 +113,115 @@ def execute_hogql_query(
             if one_query.limit is None:
                 one_query.limit = ast.Constant(value=get_default_limit_for_context(limit_context))
 
-    # Get printed HogQL query, and returned columns. Using a cloned query.
-    with timings.measure("hogql"):
-        with timings.measure("prepare_ast"):
-            hogql_query_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
-                team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
-                modifiers=query_modifiers,
-            )
-
-            with timings.measure("clone"):
-                cloned_query = clone_expr(select_query, True)
-            select_query_hogql = cast(
-                ast.SelectQuery,
-                prepare_ast_for_printing(node=cloned_query, context=hogql_query_context, dialect="hogql"),
-            )
-
-        with timings.measure("print_ast"):
-            hogql = print_prepared_ast(
-                select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
-            )
-            print_columns = []
-            columns_query = (
-                next(extract_select_queries(select_query_hogql))
-                if isinstance(select_query_hogql, ast.SelectSetQuery)
-                else select_query_hogql
-            )
-            for node in columns_query.select:
-                if isinstance(node, ast.Alias):
-                    print_columns.append(node.alias)
-                else:
-                    print_columns.append(
-                        print_prepared_ast(
-                            node=node,
-                            context=hogql_query_context,
-                            dialect="hogql",
-                            stack=[select_query_hogql],
-                        )
-                    )
-
     settings = settings or HogQLGlobalSettings()
     if limit_context in (LimitContext.EXPORT, LimitContext.COHORT_CALCULATION, LimitContext.QUERY_ASYNC):
         settings.max_execution_time = HOGQL_INCREASED_MAX_EXECUTION_TIME
 
-    # Print the ClickHouse SQL query
-    with timings.measure("print_ast"):
-        try:
-            clickhouse_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+    clickhouse_context = dataclasses.replace(
+        context,
+        # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+        team_id=team.pk,
+        team=team,
+        enable_select_queries=True,
+        timings=timings,
+        modifiers=query_modifiers,
+    )
+
+    compiled_query_cache_key: Optional[str] = None
+    compiled_query: Optional[CompiledQuery] = None
+    if app_settings.HOGQL_COMPILED_QUERY_CACHE_ENABLED and not debug:
+        with timings.measure("compiled_query_cache"):
+            compiled_query_cache_key = get_compiled_query_cache_key(
+                select_query,
+                context=context,
                 team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
+                timezone=team.timezone,
                 modifiers=query_modifiers,
-            )
-            clickhouse_sql = print_ast(
-                select_query,
-                context=clickhouse_context,
-                dialect="clickhouse",
-                settings=settings,
+                query_settings=settings,
                 pretty=pretty if pretty is not None else True,
             )
-        except Exception as e:
-            if debug:
-                clickhouse_sql = None
-                if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
-                    error = str(e)
+            if compiled_query_cache_key is not None:
+                compiled_query = compiled_query_cache.get(compiled_query_cache_key)
+
+    if compiled_query is not None:
+        hogql = compiled_query.hogql
+        print_columns = list(compiled_query.columns)
+        clickhouse_sql = compiled_query.clickhouse
+        clickhouse_context.values.update(compiled_query.values)
+    else:
+        # Get printed HogQL query, and returned columns. Using a cloned query.
+        with timings.measure("hogql"):
+            with timings.measure("prepare_ast"):
+                hogql_query_context = dataclasses.replace(
+                    context,
+                    # set the team.pk here so someone can't pass a context for a different team 🤷‍️
+                    team_id=team.pk,
+                    team=team,
+                    enable_select_queries=True,
+                    timings=timings,
+                    modifiers=query_modifiers,
+                )
+
+                with timings.measure("clone"):
+                    cloned_query = clone_expr(select_query, True)
+                select_query_hogql = cast(
+                    ast.SelectQuery,
+                    prepare_ast_for_printing(node=cloned_query, context=hogql_query_context, dialect="hogql"),
+                )
+
+            with timings.measure("print_ast"):
+                hogql = print_prepared_ast(
+                    select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
+                )
+                print_columns = []
+                columns_query = (
+                    next(extract_select_queries(select_query_hogql))
+                    if isinstance(select_query_hogql, ast.SelectSetQuery)
+                    else select_query_hogql
+                )
+                for node in columns_query.select:
+                    if isinstance(node, ast.Alias):
+                        print_columns.append(node.alias)
+                    else:
+                        print_columns.append(
+                            print_prepared_ast(
+                                node=node,
+                                context=hogql_query_context,
+                                dialect="hogql",
+                                stack=[select_query_hogql],
+                            )
+                        )
+
+        # Print the ClickHouse SQL query
+        with timings.measure("print_ast"):
+            try:
+                clickhouse_sql = print_ast(
+                    select_query,
+                    context=clickhouse_context,
+                    dialect="clickhouse",
+                    settings=settings,
+                    pretty=pretty if pretty is not None else True,
+                )
+            except Exception as e:
+                if debug:
+                    clickhouse_sql = None
+                    if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
+                        error = str(e)
+                    else:
+                        error = "Unknown error"
                 else:
-                    error = "Unknown error"
-            else:
-                raise
+                    raise
+
+        if compiled_query_cache_key is not None and clickhouse_sql is not None:
+            compiled_query_cache.set(
+                compiled_query_cache_key,
+                CompiledQuery(
+                    hogql=hogql,
+                    clickhouse=clickhouse_sql,
+                    values=dict(clickhouse_context.values),
+                    columns=list(print_columns),
+                ),
+            )
 
     if clickhouse_sql is not None:
         timings_dict = timings.to_dict()
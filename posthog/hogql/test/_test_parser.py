@@ -1,6 +1,8 @@
 from typing import Literal, cast, Optional
 
 import math
+from prometheus_client import REGISTRY
+
 from posthog.hogql.ast import (
     VariableAssignment,
     Constant,
@@ -28,7 +30,14 @@ from posthog.hogql.ast import (
 from posthog.hogql.parser import parse_program
 from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError, SyntaxError
-from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select, parse_string_template
+from posthog.hogql.parser import (
+    RULE_TO_PARSE_FUNCTION,
+    parse_cache,
+    parse_expr,
+    parse_order_expr,
+    parse_select,
+    parse_string_template,
+)
 from posthog.hogql.visitor import clear_locations
 from posthog.test.base import BaseTest, MemoryLeakTestMixin
 
@@ -1643,6 +1652,7 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
                         expr=ast.WindowFunction(
                             name="min",
                             exprs=[ast.Field(chain=["timestamp"])],
+                            args=[],
                             over_expr=ast.WindowExpr(
                                 partition_by=[ast.Field(chain=["person", "id"])],
                                 order_by=[
@@ -1699,6 +1709,7 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
                         expr=ast.WindowFunction(
                             name="min",
                             exprs=[ast.Field(chain=["timestamp"])],
+                            args=[],
                             over_identifier="win1",
                         ),
                     ),
@@ -2562,4 +2573,66 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
             )
             self.assertEqual(program, expected)
 
+        def test_parse_cache_hands_out_clones(self):
+            parse_cache.clear()
+            first = cast(ast.CompareOperation, parse_expr("event = {event}", backend=backend))
+            first.left = Constant(value=1)
+
+            second = parse_expr("event = {event}", backend=backend)
+            assert second is not first
+            self.assertEqual(
+                clear_locations(second),
+                CompareOperation(
+                    op=CompareOperationOp.Eq,
+                    left=Field(chain=["event"]),
+                    right=ast.Placeholder(expr=Field(chain=["event"])),
+                ),
+            )
+
+        def test_parse_cache_replaces_placeholders_of_each_call(self):
+            parse_cache.clear()
+            for event in ("$pageview", "$pageleave"):
+                self.assertEqual(
+                    clear_locations(parse_expr("event = {event}", {"event": Constant(value=event)}, backend=backend)),
+                    CompareOperation(
+                        op=CompareOperationOp.Eq, left=Field(chain=["event"]), right=Constant(value=event)
+                    ),
+                )
+            self.assertEqual(
+                clear_locations(
+                    parse_select("select 1 from {table}", {"table": Field(chain=["events"])}, backend=backend)
+                ),
+                SelectQuery(select=[Constant(value=1)], select_from=JoinExpr(table=Field(chain=["events"]))),
+            )
+
+        def test_parse_cache_hits_match_fresh_parses(self):
+            for query in (
+                "select e.event from events e join persons p on e.person_id = p.id where e.event = 'a'",
+                "select * from events e left join (select 1 as id) s using id",
+                "select row_number() over (), lag(event) over w from events window w as (order by timestamp)",
+                "select sum(1) over (partition by event order by timestamp rows between 1 preceding and current row)",
+                "select event, count() from events group by event having count() > 1 order by 2 desc limit 5 by event",
+                "select 1 union all select 2",
+            ):
+                with self.subTest(query=query):
+                    parse_cache.clear()
+                    parse_select(query, backend=backend)
+                    fresh = RULE_TO_PARSE_FUNCTION[backend]["select"](query)
+                    self.assertEqual(parse_select(query, backend=backend), fresh)
+
+        def test_parse_cache_hits_are_counted_per_rule(self):
+            parse_cache.clear()
+
+            def hits(rule: str) -> float:
+                labels = {"backend": backend, "cached": "true"}
+                return REGISTRY.get_sample_value(f"parse_{rule}_seconds_count", labels) or 0
+
+            expr_hits, order_expr_hits = hits("expr"), hits("order_expr")
+            parse_expr("1 = 2", backend=backend)
+            parse_expr("1 = 2", backend=backend)
+            parse_order_expr("timestamp DESC", backend=backend)
+
+            assert hits("expr") == expr_hits + 1
+            assert hits("order_expr") == order_expr_hits
+
     return TestParser
@@ -0,0 +1,81 @@
+from typing import cast
+from unittest.mock import patch
+
+from posthog.hogql import ast
+from posthog.hogql.compiled_query_cache import CompiledQuery, CompiledQueryCache, get_compiled_query_cache_key
+from posthog.hogql.constants import HogQLGlobalSettings
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.parser import parse_select
+from posthog.schema import HogQLQueryModifiers
+from posthog.test.base import BaseTest
+
+
+class TestCompiledQueryCache(BaseTest):
+    def _key(self, query: str, context: HogQLContext | None = None, **kwargs) -> str | None:
+        return get_compiled_query_cache_key(
+            parse_select(query),
+            context=context or HogQLContext(team_id=self.team.pk),
+            team_id=self.team.pk,
+            timezone=kwargs.get("timezone", "UTC"),
+            modifiers=kwargs.get("modifiers", HogQLQueryModifiers()),
+            query_settings=kwargs.get("query_settings", HogQLGlobalSettings()),
+            pretty=True,
+        )
+
+    def test_key_is_structural(self):
+        key = self._key("select event from events where event = 'a'")
+        assert key is not None
+        assert key == self._key("select   event\nfrom events   where event = 'a'")
+        assert key != self._key("select event from events where event = 'b'")
+        assert key != self._key("select event from events where event = 1")
+
+    def test_key_includes_printing_options(self):
+        key = self._key("select 1")
+        assert key != self._key("select 1", timezone="Europe/Berlin")
+        assert key != self._key("select 1", modifiers=HogQLQueryModifiers(debug=True))
+        assert key != self._key("select 1", query_settings=HogQLGlobalSettings(max_execution_time=600))
+
+    def test_key_changes_with_schema_version(self):
+        key = self._key("select 1")
+        self.team.save()  # bumps the schema version
+        assert key != self._key("select 1")
+
+    def test_uncacheable_queries(self):
+        assert self._key("select 1 from events where person_id in cohort 5") is None
+        assert self._key("select person_id from cohort_people") is None
+        assert self._key("select 1 from events where person_id in cohort('my cohort')") is None
+        assert self._key("select 1 from events where matchesAction('my action')") is None
+        assert self._key("select {placeholder}") is None
+        assert self._key("select 1", context=HogQLContext(team_id=self.team.pk, values={"a": 1})) is None
+
+        node = cast(ast.SelectQuery, parse_select("select 1"))
+        node.select[0].type = ast.IntegerType()
+        assert (
+            get_compiled_query_cache_key(
+                node,
+                context=HogQLContext(team_id=self.team.pk),
+                team_id=self.team.pk,
+                timezone="UTC",
+                modifiers=HogQLQueryModifiers(),
+                query_settings=HogQLGlobalSettings(),
+                pretty=True,
+            )
+            is None
+        )
+
+    def test_cache_evicts_and_expires(self):
+        cache = CompiledQueryCache(max_size=2, ttl=10)
+        compiled = CompiledQuery(hogql="SELECT 1", clickhouse="SELECT 1", values={}, columns=["1"])
+
+        with patch("posthog.hogql.compiled_query_cache.time.monotonic", return_value=100):
+            cache.set("a", compiled)
+            cache.set("b", compiled)
+            assert cache.get("a") == compiled
+            cache.set("c", compiled)  # evicts "b", the least recently used
+            assert cache.get("b") is None
+            assert cache.get("c") == compiled
+
+        with patch("posthog.hogql.compiled_query_cache.time.monotonic", return_value=111):
+            assert cache.get("a") is None
+
+        assert (cache.hits, cache.misses) == (2, 2)
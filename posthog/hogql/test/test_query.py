@@ -1535,3 +1535,25 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             (session_id, 600),
             (session_id, 600),
         ]
+
+    @override_settings(HOGQL_COMPILED_QUERY_CACHE_ENABLED=True)
+    def test_compiled_query_cache(self):
+        from posthog.hogql.compiled_query_cache import compiled_query_cache
+
+        compiled_query_cache.clear()
+        random_uuid = self._create_random_events()
+        query = "select count(), event from events where properties.random_uuid = {random_uuid} group by event"
+
+        first = execute_hogql_query(
+            query, placeholders={"random_uuid": ast.Constant(value=random_uuid)}, team=self.team
+        )
+        second = execute_hogql_query(
+            query, placeholders={"random_uuid": ast.Constant(value=random_uuid)}, team=self.team
+        )
+
+        assert (compiled_query_cache.hits, compiled_query_cache.misses) == (1, 1)
+        assert second.clickhouse == first.clickhouse
+        assert second.hogql == first.hogql
+        assert second.columns == first.columns
+        assert second.results == first.results == [(2, "random event")]
+        assert not any(timing.k.endswith("/print_ast") for timing in second.timings or [])
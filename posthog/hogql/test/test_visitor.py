@@ -155,6 +155,30 @@ class TestVisitor(BaseTest):
         assert NamingCheck().visit(HogQLXAttribute(name="a", value="a")) == "visit_hogqlx_attribute"
         assert NamingCheck().visit(HogQLXTag(kind="", attributes=[])) == "visit_hogqlx_tag"
 
+    def test_visit_methods_are_dispatched_per_visitor_class(self):
+        class ParentVisitor(Visitor):
+            def visit_constant(self, node: ast.Constant):
+                return "parent"
+
+        class ChildVisitor(ParentVisitor):
+            def visit_constant(self, node: ast.Constant):
+                return "child"
+
+        class UnknownVisitor(ParentVisitor):
+            def visit_unknown(self, node: ast.AST):
+                return "unknown"
+
+        assert ParentVisitor().visit(ast.Constant(value=1)) == "parent"
+        assert ChildVisitor().visit(ast.Constant(value=1)) == "child"
+        assert ParentVisitor().visit(ast.Constant(value=2)) == "parent"
+        assert UnknownVisitor().visit(ast.Field(chain=["a"])) == "unknown"
+        assert UnknownVisitor().visit(ast.Constant(value=1)) == "parent"
+
+    def test_ast_nodes_are_slotted(self):
+        node = ast.Constant(value=1)
+        with self.assertRaises(AttributeError):
+            node.not_a_field = 1  # type: ignore
+
     def test_visit_interval_type(self):
         # Just ensure ``IntervalType`` can be visited without throwing ``NotImplementedError``
         TraversingVisitor().visit(ast.IntervalType())
@@ -1,5 +1,6 @@
 from copy import deepcopy
-from typing import Optional, TypeVar, Generic, Any
+from collections.abc import Callable
+from typing import ClassVar, Optional, TypeVar, Generic, Any
 
 from posthog.hogql import ast
 from posthog.hogql.ast import SelectSetNode
@@ -24,6 +25,13 @@ T = TypeVar("T")
 
 
 class Visitor(Generic[T]):
+    # The method of this visitor class that visits each class of AST node, filled in by AST.accept on first visit
+    dispatch_table: ClassVar[dict[type[AST], Callable[[Any, Any], Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch_table = {}
+
     def visit(self, node: AST | None) -> T:
         if node is None:
             return node  # type: ignore
@@ -589,7 +597,7 @@ class CloningVisitor(Visitor[Any]):
             prewhere=self.visit(node.prewhere),
             having=self.visit(node.having),
             group_by=[self.visit(expr) for expr in node.group_by] if node.group_by else None,
-            order_by=[self.visit(expr) for expr in node.order_by] if node.order_by else None,
+            order_by=[self.visit(expr) for expr in node.order_by] if node.order_by is not None else None,
             limit_by=[self.visit(expr) for expr in node.limit_by] if node.limit_by else None,
             limit=self.visit(node.limit),
             limit_with_ties=node.limit_with_ties,
@@ -619,8 +627,8 @@ class CloningVisitor(Visitor[Any]):
             start=None if self.clear_locations else node.start,
             end=None if self.clear_locations else node.end,
             type=None if self.clear_types else node.type,
-            partition_by=[self.visit(expr) for expr in node.partition_by] if node.partition_by else None,
-            order_by=[self.visit(expr) for expr in node.order_by] if node.order_by else None,
+            partition_by=[self.visit(expr) for expr in node.partition_by] if node.partition_by is not None else None,
+            order_by=[self.visit(expr) for expr in node.order_by] if node.order_by is not None else None,
             frame_method=node.frame_method,
             frame_start=self.visit(node.frame_start),
             frame_end=self.visit(node.frame_end),
@@ -632,8 +640,8 @@ class CloningVisitor(Visitor[Any]):
             end=None if self.clear_locations else node.end,
             type=None if self.clear_types else node.type,
             name=node.name,
-            exprs=[self.visit(expr) for expr in node.exprs] if node.exprs else None,
-            args=[self.visit(arg) for arg in node.args] if node.args else None,
+            exprs=[self.visit(expr) for expr in node.exprs] if node.exprs is not None else None,
+            args=[self.visit(arg) for arg in node.args] if node.args is not None else None,
             over_expr=self.visit(node.over_expr) if node.over_expr else None,
             over_identifier=node.over_identifier,
         )
@@ -648,13 +656,29 @@ class CloningVisitor(Visitor[Any]):
         )
 
     def visit_join_constraint(self, node: ast.JoinConstraint) -> ast.JoinConstraint:
-        return ast.JoinConstraint(expr=self.visit(node.expr), constraint_type=node.constraint_type)
+        return ast.JoinConstraint(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            type=None if self.clear_types else node.type,
+            expr=self.visit(node.expr),
+            constraint_type=node.constraint_type,
+        )
 
     def visit_hogqlx_tag(self, node: ast.HogQLXTag):
-        return ast.HogQLXTag(kind=node.kind, attributes=[self.visit(a) for a in node.attributes])
+        return ast.HogQLXTag(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            kind=node.kind,
+            attributes=[self.visit(a) for a in node.attributes],
+        )
 
     def visit_hogqlx_attribute(self, node: ast.HogQLXAttribute):
-        return ast.HogQLXAttribute(name=node.name, value=self.visit(node.value))
+        return ast.HogQLXAttribute(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            name=node.name,
+            value=self.visit(node.value),
+        )
 
     def visit_program(self, node: ast.Program):
         return ast.Program(
@@ -1,6 +1,5 @@
 import json
 from zoneinfo import ZoneInfo
-from django.conf import settings
 from posthog.constants import ExperimentNoResultsErrorKeys
 from posthog.hogql import ast
 from posthog.hogql_queries.experiments import CONTROL_VARIANT_KEY
@@ -20,6 +19,7 @@ from posthog.hogql_queries.experiments.trends_statistics_v2_continuous import (
     calculate_probabilities_v2_continuous,
 )
 from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.hogql_queries.query_executor import get_query_priority, sub_query_executor
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.models.experiment import Experiment
 from posthog.queries.trends.util import ALL_SUPPORTED_MATH_FUNCTIONS
@@ -43,8 +43,7 @@ from posthog.schema import (
     TrendsQuery,
     TrendsQueryResponse,
 )
-from typing import Any, Optional
-import threading
+from typing import Optional
 from datetime import datetime, timedelta, UTC
 
 
@@ -270,40 +269,11 @@ class ExperimentTrendsQueryRunner(QueryRunner):
         return prepared_exposure_query
 
     def calculate(self) -> ExperimentTrendsQueryResponse:
-        shared_results: dict[str, Optional[Any]] = {"count_result": None, "exposure_result": None}
-        errors = []
-
-        def run(query_runner: TrendsQueryRunner, result_key: str, is_parallel: bool):
-            try:
-                result = query_runner.calculate()
-                shared_results[result_key] = result
-            except Exception as e:
-                errors.append(e)
-            finally:
-                if is_parallel:
-                    from django.db import connection
-
-                    # This will only close the DB connection for the newly spawned thread and not the whole app
-                    connection.close()
-
-        # This exists so that we're not spawning threads during unit tests
-        if settings.IN_UNIT_TESTING:
-            run(self.count_query_runner, "count_result", False)
-            run(self.exposure_query_runner, "exposure_result", False)
-        else:
-            jobs = [
-                threading.Thread(target=run, args=(self.count_query_runner, "count_result", True)),
-                threading.Thread(target=run, args=(self.exposure_query_runner, "exposure_result", True)),
-            ]
-            [j.start() for j in jobs]  # type: ignore
-            [j.join() for j in jobs]  # type: ignore
-
-        # Raise any errors raised in a separate thread
-        if errors:
-            raise errors[0]
-
-        count_result = shared_results["count_result"]
-        exposure_result = shared_results["exposure_result"]
+        count_result, exposure_result = sub_query_executor.run_all(
+            team_id=self.team.pk,
+            tasks=[self.count_query_runner.calculate, self.exposure_query_runner.calculate],
+            priority=get_query_priority(self.limit_context),
+        )
         if count_result is None or exposure_result is None:
             raise ValueError("One or both query runners failed to produce a response")
 
@@ -1,4 +1,11 @@
-from typing import Any, Optional, cast
+import base64
+import binascii
+from datetime import date, datetime
+from typing import Any, Literal, Optional, Self, cast
+from uuid import UUID
+
+import orjson
+from rest_framework.exceptions import ValidationError
 
 from posthog.hogql import ast
 from posthog.hogql.constants import (
@@ -28,12 +35,12 @@ class HogQLHasMorePaginator:
 
     @classmethod
     def from_limit_context(
-        cls, *, limit_context: LimitContext, limit: Optional[int] = None, offset: Optional[int] = None
-    ) -> "HogQLHasMorePaginator":
+        cls, *, limit_context: LimitContext, limit: Optional[int] = None, offset: Optional[int] = None, **kwargs
+    ) -> Self:
         max_rows = get_max_limit_for_context(limit_context)
         default_rows = get_default_limit_for_context(limit_context)
         limit = min(max_rows, default_rows if (limit is None or limit <= 0) else limit)
-        return cls(limit=limit, offset=offset, limit_context=limit_context)
+        return cls(limit=limit, offset=offset, limit_context=limit_context, **kwargs)
 
     def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
         query.limit = ast.Constant(value=self.limit + 1)
@@ -79,3 +86,182 @@ class HogQLHasMorePaginator:
             "limit": self.limit,
             "offset": self.offset,
         }
+
+
+class HogQLCursorPaginator(HogQLHasMorePaginator):
+    """
+    Paginator that continues after the sort key of the last row of the previous page, so ClickHouse doesn't have to
+    read and skip every earlier row like it does for an offset. The key is handed out as an opaque `nextCursor`, and
+    turned into a `WHERE (timestamp, uuid) < cursor` predicate for the next page.
+
+    Only queries ordered by plain columns in a single direction can be paginated this way, with `unique_key` added to
+    the ordering to break ties. Queries are only paginated with cursors when a cursor is passed, which is an empty
+    string for the first page. Otherwise they are paginated with an offset, exactly like HogQLHasMorePaginator does.
+    """
+
+    def __init__(self, *, unique_key: str, cursor: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.unique_key = unique_key
+        self.cursor = cursor
+        if cursor is not None:
+            self.offset = 0
+        self.next_cursor: Optional[str] = None
+        self.cursor_columns: Optional[list[str]] = None
+        self.cursor_order: Literal["ASC", "DESC"] = "ASC"
+        self.cursor_indices: list[int] = []
+        self.hidden_columns = 0
+
+    def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
+        if self.cursor is None:
+            self.cursor_columns = None
+            return super().paginate(query)
+
+        self.cursor_columns = self._cursor_columns(query)
+        if self.cursor_columns is None:
+            raise ValidationError("A cursor can't be used with the ordering of this query, use an offset instead")
+
+        assert query.order_by is not None  # For type checking
+        self.cursor_order = query.order_by[0].order
+        if self.unique_key not in self.cursor_columns:
+            self.cursor_columns.append(self.unique_key)
+            query.order_by = [
+                *query.order_by,
+                ast.OrderExpr(expr=ast.Field(chain=[self.unique_key]), order=self.cursor_order),
+            ]
+
+        # Read the key from the last row, selecting the columns that aren't selected already
+        self.cursor_indices = []
+        self.hidden_columns = 0
+        for column in self.cursor_columns:
+            index = next(
+                (i for i, expr in enumerate(query.select) if isinstance(expr, ast.Field) and expr.chain == [column]),
+                None,
+            )
+            if index is None:
+                index = len(query.select)
+                query.select = [*query.select, ast.Field(chain=[column])]
+                self.hidden_columns += 1
+            self.cursor_indices.append(index)
+
+        if self.cursor:
+            query.where = self._cursor_predicate(query.where, self._decode_cursor(self.cursor))
+
+        query.limit = ast.Constant(value=self.limit + 1)
+        query.offset = None
+        return query
+
+    def execute_hogql_query(
+        self,
+        query: ast.SelectQuery,
+        *,
+        query_type: str,
+        **kwargs,
+    ) -> HogQLQueryResponse:
+        self.response = cast(
+            HogQLQueryResponse,
+            execute_hogql_query(
+                query=self.paginate(query),
+                query_type=query_type,
+                **kwargs if self.limit_context is None else {"limit_context": self.limit_context, **kwargs},
+            ),
+        )
+        self.next_cursor = None
+        if self.cursor_columns is not None and self.has_more():
+            last_row = self.response.results[self.limit - 1]
+            self.next_cursor = self._encode_cursor([last_row[index] for index in self.cursor_indices])
+        if self.hidden_columns > 0:
+            self.response.results = [row[: -self.hidden_columns] for row in self.response.results]
+            if self.response.columns:
+                self.response.columns = self.response.columns[: -self.hidden_columns]
+            if self.response.types:
+                self.response.types = self.response.types[: -self.hidden_columns]
+        self.results = self.trim_results()
+        return self.response
+
+    def response_params(self):
+        return {
+            **super().response_params(),
+            "nextCursor": self.next_cursor,
+        }
+
+    def _cursor_columns(self, query: ast.SelectQuery) -> Optional[list[str]]:
+        if query.group_by or query.having or query.distinct or query.limit_by or not query.order_by:
+            return None
+        if len({order_expr.order for order_expr in query.order_by}) != 1:
+            return None
+
+        # Aliases can stand for any expression, including ones that are nullable or not comparable
+        aliases = {expr.alias for expr in query.select if isinstance(expr, ast.Alias)}
+        columns: list[str] = []
+        for order_expr in query.order_by:
+            if not isinstance(order_expr.expr, ast.Field) or len(order_expr.expr.chain) != 1:
+                return None
+            column = order_expr.expr.chain[0]
+            if not isinstance(column, str) or column in aliases:
+                return None
+            columns.append(column)
+        return columns
+
+    def _cursor_predicate(self, where: Optional[ast.Expr], values: list[Any]) -> ast.Expr:
+        assert self.cursor_columns is not None  # For type checking
+        fields: list[ast.Expr] = [ast.Field(chain=[column]) for column in self.cursor_columns]
+        constants: list[ast.Expr] = [ast.Constant(value=value) for value in values]
+        exprs = [] if where is None else [where]
+        # Bound the first column on its own too, for ClickHouse to be able to skip partitions and granules with it
+        exprs.append(
+            ast.CompareOperation(
+                op=ast.CompareOperationOp.LtEq if self.cursor_order == "DESC" else ast.CompareOperationOp.GtEq,
+                left=fields[0],
+                right=constants[0],
+            )
+        )
+        exprs.append(
+            ast.CompareOperation(
+                op=ast.CompareOperationOp.Lt if self.cursor_order == "DESC" else ast.CompareOperationOp.Gt,
+                left=ast.Tuple(exprs=fields),
+                right=ast.Tuple(exprs=constants),
+            )
+        )
+        return ast.And(exprs=exprs)
+
+    def _encode_cursor(self, values: list[Any]) -> str:
+        payload = {
+            "columns": self.cursor_columns,
+            "order": self.cursor_order,
+            "values": [_encode_cursor_value(value) for value in values],
+        }
+        return base64.urlsafe_b64encode(orjson.dumps(payload)).decode("ascii")
+
+    def _decode_cursor(self, cursor: str) -> list[Any]:
+        try:
+            payload = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if payload["columns"] != self.cursor_columns or payload["order"] != self.cursor_order:
+                raise ValidationError("The cursor was made for a query with a different ordering")
+            values = [_decode_cursor_value(value) for value in payload["values"]]
+        except (binascii.Error, orjson.JSONDecodeError, UnicodeError, KeyError, TypeError, ValueError):
+            raise ValidationError("Invalid cursor")
+        if len(values) != len(self.cursor_columns or []):
+            raise ValidationError("Invalid cursor")
+        return values
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError("Unknown cursor value")
+    return value
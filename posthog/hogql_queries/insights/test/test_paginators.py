@@ -1,6 +1,11 @@
-from typing import cast
+from datetime import UTC, datetime
+from typing import Optional, cast
+from uuid import UUID
 from unittest.mock import MagicMock, patch
 
+from rest_framework.exceptions import ValidationError
+
+from posthog.hogql import ast
 from posthog.hogql.ast import SelectQuery
 from posthog.hogql.constants import (
     LimitContext,
@@ -9,7 +14,8 @@ from posthog.hogql.constants import (
     MAX_SELECT_RETURNED_ROWS,
 )
 from posthog.hogql.parser import parse_select
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql.visitor import clear_locations
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator, HogQLHasMorePaginator
 from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
 from posthog.models.utils import UUIDT
 from posthog.schema import (
@@ -221,3 +227,100 @@ class TestHogQLHasMorePaginator(ClickhouseTestMixin, APIBaseTest):
         )
         mock_execute_hogql_query.assert_called_once()
         self.assertEqual(mock_execute_hogql_query.call_args.kwargs["limit_context"], limit_context)
+
+
+class TestHogQLCursorPaginator(ClickhouseTestMixin, APIBaseTest):
+    def test_cursor_pages_match_offset_pages(self):
+        for index in range(7):
+            _create_person(
+                properties={"email": f"jacob{index}@posthog.com"},
+                team=self.team,
+                distinct_ids=[f"id-{index}"],
+            )
+        flush_persons_and_events()
+
+        expected = ActorsQueryRunner(team=self.team, query=ActorsQuery(select=["properties.email"])).calculate()
+        assert expected.nextCursor is None
+
+        emails: list[str] = []
+        # an empty cursor starts paginating with cursors
+        cursor: Optional[str] = ""
+        for _ in range(4):
+            runner = ActorsQueryRunner(
+                team=self.team, query=ActorsQuery(select=["properties.email"], limit=2, cursor=cursor)
+            )
+            response = runner.calculate()
+            emails.extend(row[0] for row in response.results)
+            assert response.columns == ["properties.email"]
+            assert response.hasMore == (response.nextCursor is not None)
+            cursor = response.nextCursor
+            if cursor is None:
+                break
+
+        assert emails == [row[0] for row in expected.results]
+
+    def test_adds_cursor_predicate_and_tiebreaker(self):
+        paginator = HogQLCursorPaginator(limit=10, unique_key="uuid")
+        paginator.cursor_columns = ["timestamp", "uuid"]
+        paginator.cursor_order = "DESC"
+        cursor = paginator._encode_cursor([datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC), UUID(int=5)])
+
+        paginator = HogQLCursorPaginator(limit=10, offset=20, cursor=cursor, unique_key="uuid")
+        query = paginator.paginate(
+            cast(SelectQuery, parse_select("SELECT event, timestamp FROM events ORDER BY timestamp DESC"))
+        )
+
+        assert paginator.offset == 0
+        assert paginator.cursor_indices == [1, 2]
+        assert paginator.hidden_columns == 1
+        assert clear_locations(query) == clear_locations(
+            parse_select(
+                """
+            SELECT event, timestamp, uuid FROM events
+            WHERE timestamp <= {timestamp} AND (timestamp, uuid) < ({timestamp}, {uuid})
+            ORDER BY timestamp DESC, uuid DESC
+            LIMIT 11
+            """,
+                {
+                    "timestamp": ast.Constant(value=datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)),
+                    "uuid": ast.Constant(value=UUID(int=5)),
+                },
+            )
+        )
+
+    def test_paginates_by_offset_without_a_cursor(self):
+        for select in (
+            "SELECT event, timestamp FROM events ORDER BY timestamp DESC",
+            "SELECT event, count() FROM events GROUP BY event ORDER BY count() DESC",
+        ):
+            with self.subTest(select=select):
+                paginator = HogQLCursorPaginator(limit=10, offset=20, unique_key="uuid")
+                query = paginator.paginate(cast(SelectQuery, parse_select(select)))
+                expected = HogQLHasMorePaginator(limit=10, offset=20).paginate(cast(SelectQuery, parse_select(select)))
+                assert paginator.cursor_columns is None
+                assert clear_locations(query) == clear_locations(expected)
+
+    def test_rejects_cursors_for_orderings_without_a_cursor(self):
+        for select in (
+            "SELECT event, count() FROM events GROUP BY event ORDER BY count() DESC",
+            "SELECT event, timestamp FROM events ORDER BY timestamp DESC, event ASC",
+            "SELECT properties.$browser FROM events ORDER BY properties.$browser",
+            "SELECT toDate(timestamp) AS timestamp FROM events ORDER BY timestamp",
+        ):
+            with self.subTest(select=select):
+                with self.assertRaises(ValidationError):
+                    HogQLCursorPaginator(limit=10, cursor="", unique_key="uuid").paginate(
+                        cast(SelectQuery, parse_select(select))
+                    )
+
+    def test_rejects_invalid_cursors(self):
+        paginator = HogQLCursorPaginator(limit=10, unique_key="uuid")
+        paginator.cursor_columns = ["timestamp", "uuid"]
+        paginator.cursor_order = "ASC"
+        ascending_cursor = paginator._encode_cursor([datetime(2024, 1, 2, tzinfo=UTC), UUID(int=5)])
+
+        for cursor in ("not a cursor", ascending_cursor[:-4], ascending_cursor):
+            with self.subTest(cursor=cursor), self.assertRaises(ValidationError):
+                HogQLCursorPaginator(limit=10, cursor=cursor, unique_key="uuid").paginate(
+                    cast(SelectQuery, parse_select("SELECT event FROM events ORDER BY timestamp DESC"))
+                )
@@ -25,6 +25,7 @@ from posthog.hogql_queries.insights.trends.trends_query_runner import (
     BREAKDOWN_OTHER_DISPLAY,
     TrendsQueryRunner,
 )
+from posthog.hogql_queries.query_runner import ExecutionMode
 from posthog.models import GroupTypeMapping
 from posthog.models.action.action import Action
 from posthog.models.cohort.cohort import Cohort
@@ -37,6 +38,7 @@ from posthog.schema import (
     Breakdown,
     BreakdownFilter,
     BreakdownItem,
+    CachedTrendsQueryResponse,
     BreakdownType,
     ChartDisplayType,
     CompareFilter,
@@ -5067,3 +5069,159 @@ class TestTrendsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         assert len(response.results) == 1
         assert response.results[0]["count"] == 1
         assert response.results[0]["data"] == [0, 0, 1, 0]
+
+    @override_settings(TRENDS_INCREMENTAL_CALCULATION_ENABLED=True)
+    def test_incremental_calculation_only_queries_intervals_after_the_cached_result(self):
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={})
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-13T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-19T10:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-19T12:00:00Z"):
+            response = self._create_query_runner("-7d", None, IntervalType.DAY, None).run(
+                execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+            )
+        assert isinstance(response, CachedTrendsQueryResponse)
+        self.assertEqual(response.results[0]["data"], [0, 1, 0, 0, 0, 0, 0, 1])
+
+        # Late event in an interval that was already complete when the result was cached
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-14T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-19T15:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-20T01:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-20T03:00:00Z"):
+            response = self._create_query_runner("-7d", None, IntervalType.DAY, None).run(
+                execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+            )
+            assert isinstance(response, CachedTrendsQueryResponse)
+            self.assertEqual(response.is_cached, False)
+            self.assertEqual(response.results[0]["days"][0], "2020-01-13")
+            self.assertEqual(response.results[0]["days"][-1], "2020-01-20")
+            self.assertEqual(response.results[0]["data"], [1, 0, 0, 0, 0, 0, 2, 1])
+            self.assertEqual(response.results[0]["count"], 4)
+
+            # A forced refresh recalculates the whole date range
+            response = self._create_query_runner("-7d", None, IntervalType.DAY, None).run(
+                execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+            )
+            assert isinstance(response, CachedTrendsQueryResponse)
+            self.assertEqual(response.results[0]["data"], [1, 1, 0, 0, 0, 0, 2, 1])
+
+    @override_settings(TRENDS_INCREMENTAL_CALCULATION_ENABLED=True)
+    def test_incremental_calculation_with_compare(self):
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={})
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-08T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-13T12:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-19T12:00:00Z"):
+            self._create_query_runner(
+                "-7d", None, IntervalType.DAY, None, compare_filters=CompareFilter(compare=True)
+            ).run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-20T01:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-20T03:00:00Z"):
+            response = self._create_query_runner(
+                "-7d", None, IntervalType.DAY, None, compare_filters=CompareFilter(compare=True)
+            ).run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        current, previous = response.results
+        self.assertEqual(current["compare_label"], "current")
+        self.assertEqual(current["days"], [f"2020-01-{day}" for day in range(13, 21)])
+        self.assertEqual(current["data"], [1, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(previous["compare_label"], "previous")
+        self.assertEqual(previous["days"], [f"2020-01-{day:02d}" for day in range(6, 14)])
+        self.assertEqual(previous["data"], [0, 0, 1, 0, 0, 0, 0, 1])
+
+    @override_settings(TRENDS_INCREMENTAL_CALCULATION_ENABLED=True)
+    def test_incremental_calculation_falls_back_on_new_breakdown_value(self):
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={})
+        _create_event(
+            team=self.team,
+            event="$pageview",
+            distinct_id="p1",
+            timestamp="2020-01-13T12:00:00Z",
+            properties={"$browser": "Chrome"},
+        )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-19T12:00:00Z"):
+            self._create_query_runner(
+                "-7d", None, IntervalType.DAY, None, breakdown=BreakdownFilter(breakdown="$browser")
+            ).run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        _create_event(
+            team=self.team,
+            event="$pageview",
+            distinct_id="p1",
+            timestamp="2020-01-14T12:00:00Z",
+            properties={"$browser": "Safari"},
+        )
+        _create_event(
+            team=self.team,
+            event="$pageview",
+            distinct_id="p1",
+            timestamp="2020-01-20T01:00:00Z",
+            properties={"$browser": "Safari"},
+        )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-20T03:00:00Z"):
+            response = self._create_query_runner(
+                "-7d", None, IntervalType.DAY, None, breakdown=BreakdownFilter(breakdown="$browser")
+            ).run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        # Safari has no cached history to extend, so the whole date range was recalculated
+        results = {result["breakdown_value"]: result["data"] for result in response.results}
+        self.assertEqual(results, {"Chrome": [1, 0, 0, 0, 0, 0, 0, 0], "Safari": [0, 1, 0, 0, 0, 0, 0, 1]})
+
+    @override_settings(TRENDS_INCREMENTAL_CALCULATION_ENABLED=True)
+    def test_incremental_calculation_falls_back_when_breakdown_values_are_grouped_into_other(self):
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={})
+        for timestamp, browser in (
+            ("2020-01-13T12:00:00Z", "Chrome"),
+            ("2020-01-13T13:00:00Z", "Chrome"),
+            ("2020-01-14T12:00:00Z", "Safari"),
+        ):
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id="p1",
+                timestamp=timestamp,
+                properties={"$browser": browser},
+            )
+        flush_persons_and_events()
+
+        breakdown = BreakdownFilter(breakdown="$browser", breakdown_limit=1)
+        with freeze_time("2020-01-19T12:00:00Z"):
+            self._create_query_runner("-7d", None, IntervalType.DAY, None, breakdown=breakdown).run(
+                execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+            )
+
+        for hour in range(3):
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id="p1",
+                timestamp=f"2020-01-20T0{hour}:00:00Z",
+                properties={"$browser": "Safari"},
+            )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-20T03:00:00Z"):
+            response = self._create_query_runner("-7d", None, IntervalType.DAY, None, breakdown=breakdown).run(
+                execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+            )
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        # Safari became the top value, which only recalculating the whole date range finds out
+        results = {result["breakdown_value"]: result["data"] for result in response.results}
+        self.assertEqual(
+            results,
+            {"Safari": [0, 1, 0, 0, 0, 0, 0, 3], BREAKDOWN_OTHER_STRING_LABEL: [2, 0, 0, 0, 0, 0, 0, 0]},
+        )
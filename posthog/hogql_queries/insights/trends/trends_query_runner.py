@@ -1,6 +1,10 @@
-import threading
+import json
+from collections import defaultdict
+from collections.abc import Callable
 from copy import deepcopy
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import UTC, timedelta
+from functools import partial
 from math import ceil
 from operator import itemgetter
 from typing import Any, Optional, Union
@@ -14,9 +18,10 @@ from posthog.caching.insights_api import (
     REAL_TIME_INSIGHT_REFRESH_INTERVAL,
     REDUCED_MINIMUM_INSIGHT_REFRESH_INTERVAL,
 )
+from posthog.caching.utils import last_refresh_from_cached_result
 from posthog.clickhouse import query_tagging
 from posthog.hogql import ast
-from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext
+from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext, get_breakdown_limit_for_context
 from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
@@ -31,6 +36,8 @@ from posthog.hogql_queries.insights.trends.display import TrendsDisplay
 from posthog.hogql_queries.insights.trends.series_with_extras import SeriesWithExtras
 from posthog.hogql_queries.insights.trends.trends_actors_query_builder import TrendsActorsQueryBuilder
 from posthog.hogql_queries.insights.trends.trends_query_builder import TrendsQueryBuilder
+from posthog.hogql_queries.query_cache import QueryCacheManager
+from posthog.hogql_queries.query_executor import get_query_priority, sub_query_executor
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.formula_ast import FormulaAST
 from posthog.hogql_queries.utils.query_compare_to_date_range import QueryCompareToDateRange
@@ -55,6 +62,7 @@ from posthog.schema import (
     DashboardFilter,
     DataWarehouseEventsModifier,
     DataWarehouseNode,
+    DateRange,
     DayItem,
     EventsNode,
     HogQLQueryModifiers,
@@ -73,6 +81,16 @@ from posthog.utils import format_label_date, multisort
 from posthog.warehouse.models.util import get_view_or_table_by_name
 
 
+@dataclass
+class _IncrementalPlan:
+    """How a single period (current or previous) of a cached trends result is extended."""
+
+    values: list[datetime]
+    cached_offset: int
+    reused_intervals: int
+    tail_date_range: QueryDateRange
+
+
 class TrendsQueryRunner(QueryRunner):
     query: TrendsQuery
     response: TrendsQueryResponse
@@ -113,19 +131,23 @@ class TrendsQueryRunner(QueryRunner):
     def to_query(self) -> ast.SelectSetQuery:
         return ast.SelectSetQuery.create_from_queries(self.to_queries(), "UNION ALL")
 
-    def to_queries(self) -> list[ast.SelectQuery | ast.SelectSetQuery]:
+    def to_queries(
+        self,
+        query_date_range: Optional[QueryDateRange] = None,
+        query_previous_date_range: Optional[QueryDateRange] = None,
+    ) -> list[ast.SelectQuery | ast.SelectSetQuery]:
         queries = []
         with self.timings.measure("trends_to_query"):
             for series in self.series:
                 if not series.is_previous_period_series:
-                    query_date_range = self.query_date_range
+                    series_date_range = query_date_range or self.query_date_range
                 else:
-                    query_date_range = self.query_previous_date_range
+                    series_date_range = query_previous_date_range or self.query_previous_date_range
 
                 query_builder = TrendsQueryBuilder(
                     trends_query=series.overriden_query or self.query,
                     team=self.team,
-                    query_date_range=query_date_range,
+                    query_date_range=series_date_range,
                     series=series.series,
                     timings=self.timings,
                     modifiers=self.modifiers,
@@ -295,8 +317,9 @@ class TrendsQueryRunner(QueryRunner):
         )
 
     def calculate(self):
-        queries = self.to_queries()
+        return self._calculate_queries(self.to_queries())
 
+    def _calculate_queries(self, queries: list[ast.SelectQuery | ast.SelectSetQuery]) -> TrendsQueryResponse:
         if len(queries) == 0:
             response_hogql = ""
         else:
@@ -310,73 +333,38 @@ class TrendsQueryRunner(QueryRunner):
 
         res_matrix: list[list[Any] | Any | None] = [None] * len(queries)
         timings_matrix: list[list[QueryTiming] | None] = [None] * (2 + len(queries))
-        errors: list[Exception] = []
         debug_errors: list[str] = []
 
-        def run(
-            index: int,
-            query: ast.SelectQuery | ast.SelectSetQuery,
-            timings: HogQLTimings,
-            is_parallel: bool,
-            query_tags: Optional[dict] = None,
-        ):
-            try:
-                if query_tags:
-                    query_tagging.tag_queries(**query_tags)
-
-                series_with_extra = self.series[index]
+        def run(index: int, query: ast.SelectQuery | ast.SelectSetQuery, timings: HogQLTimings):
+            series_with_extra = self.series[index]
 
-                response = execute_hogql_query(
-                    query_type="TrendsQuery",
-                    query=query,
-                    team=self.team,
-                    timings=timings,
-                    modifiers=self.modifiers,
-                    limit_context=self.limit_context,
-                )
-
-                timings_matrix[index + 1] = response.timings
-                res_matrix[index] = self.build_series_response(response, series_with_extra, len(queries))
-                if response.error:
-                    debug_errors.append(response.error)
-            except Exception as e:
-                errors.append(e)
-            finally:
-                if is_parallel:
-                    from django.db import connection
+            response = execute_hogql_query(
+                query_type="TrendsQuery",
+                query=query,
+                team=self.team,
+                timings=timings,
+                modifiers=self.modifiers,
+                limit_context=self.limit_context,
+            )
 
-                    # This will only close the DB connection for the newly spawned thread and not the whole app
-                    connection.close()
+            timings_matrix[index + 1] = response.timings
+            res_matrix[index] = self.build_series_response(response, series_with_extra, len(queries))
+            if response.error:
+                debug_errors.append(response.error)
 
         with self.timings.measure("execute_queries"):
             timings_matrix[0] = self.timings.to_list(back_out_stack=False)
             self.timings.clear_timings()
 
-            # This exists so that we're not spawning threads during unit tests. We can't do
-            # this right now due to the lack of multithreaded support of Django
-            if len(queries) == 1 or settings.IN_UNIT_TESTING:
-                for index, query in enumerate(queries):
-                    run(index, query, self.timings.clone_for_subquery(index), False)
-            else:
-                jobs = [
-                    threading.Thread(
-                        target=run,
-                        args=(
-                            index,
-                            query,
-                            self.timings.clone_for_subquery(index),
-                            True,
-                            query_tagging.get_query_tags(),
-                        ),
-                    )
+            sub_query_executor.run_all(
+                team_id=self.team.pk,
+                tasks=[
+                    partial(run, index, query, self.timings.clone_for_subquery(index))
                     for index, query in enumerate(queries)
-                ]
-                [j.start() for j in jobs]  # type:ignore
-                [j.join() for j in jobs]  # type:ignore
-
-        # Raise any errors raised in a seperate thread
-        if len(errors) > 0:
-            raise errors[0]
+                ],
+                priority=get_query_priority(self.limit_context),
+                on_failure=self._cancel_sub_queries_callback(),
+            )
 
         # Flatten res and timings
         returned_results: list[list[dict[str, Any]]] = []
@@ -432,6 +420,212 @@ class TrendsQueryRunner(QueryRunner):
             error=". ".join(debug_errors),
         )
 
+    def _cancel_sub_queries_callback(self) -> Optional[Callable[[], None]]:
+        # All sub-queries of a calculation share the client query ID, so one failing can cancel the others
+        client_query_id = query_tagging.get_query_tag_value("client_query_id")
+        if not client_query_id:
+            return None
+
+        def cancel() -> None:
+            from posthog.clickhouse.cancel import cancel_query_on_cluster
+
+            cancel_query_on_cluster(team_id=self.team.pk, client_query_id=client_query_id)
+
+        return cancel
+
+    def calculate_incrementally(self, cache_manager: QueryCacheManager) -> Optional[TrendsQueryResponse]:
+        """
+        Reuses the intervals of the cached result that ended well before it was cached, and only queries the
+        intervals after them. Returns None whenever the cached result can't be extended that way.
+        """
+        if not settings.TRENDS_INCREMENTAL_CALCULATION_ENABLED or not self._can_calculate_incrementally():
+            return None
+
+        cached_response_candidate = cache_manager.get_cache_data()
+        if not self.is_cached_response(cached_response_candidate):
+            return None
+        cached_response = CachedTrendsQueryResponse(**{**cached_response_candidate, "is_cached": True})
+
+        last_refresh = last_refresh_from_cached_result(cached_response)
+        if (
+            last_refresh is None
+            or cached_response.timezone != self.team.timezone
+            or datetime.now(UTC) - last_refresh > timedelta(seconds=settings.TRENDS_INCREMENTAL_CALCULATION_MAX_AGE)
+            or cached_response.hasMore
+            or not cached_response.results
+            or self._breakdown_limit_applies(cached_response.results)
+        ):
+            return None
+        frozen_before = last_refresh - timedelta(seconds=settings.TRENDS_INCREMENTAL_CALCULATION_FROZEN_LAG)
+
+        has_compare = bool(self.query.compareFilter and self.query.compareFilter.compare)
+        date_ranges: dict[Optional[str], QueryDateRange] = (
+            {"current": self.query_date_range, "previous": self.query_previous_date_range}
+            if has_compare
+            else {None: self.query_date_range}
+        )
+        plans: dict[Optional[str], _IncrementalPlan] = {}
+        for compare_label, date_range in date_ranges.items():
+            period_results = [
+                result for result in cached_response.results if result.get("compare_label") == compare_label
+            ]
+            plan = self._plan_incremental_calculation(date_range, period_results, frozen_before)
+            if plan is None:
+                return None
+            plans[compare_label] = plan
+
+        tail_response = self._calculate_queries(
+            self.to_queries(
+                plans["current" if has_compare else None].tail_date_range,
+                plans["previous"].tail_date_range if has_compare else None,
+            )
+        )
+        if tail_response.error or tail_response.hasMore:
+            return None
+
+        tail_results = {self._incremental_series_key(result): result for result in tail_response.results}
+        cached_keys = {self._incremental_series_key(result) for result in cached_response.results}
+        if (
+            len(tail_results) != len(tail_response.results)
+            or tail_results.keys() != cached_keys
+            or self._breakdown_limit_applies(tail_response.results)
+        ):
+            # A series that's only in the tail, e.g. a new breakdown value, also has data in older intervals, and a
+            # series that's only cached may be missing from the tail for having been beyond the breakdown limit there
+            return None
+
+        merged_results: list[dict[str, Any]] = []
+        for cached_result in cached_response.results:
+            plan = plans[cached_result.get("compare_label")]
+            tail_result = tail_results[self._incremental_series_key(cached_result)]
+            tail_values = plan.values[plan.reused_intervals :]
+            if tail_result.get("days") != [self._format_day(value) for value in tail_values]:
+                return None
+
+            reused = slice(plan.cached_offset, plan.cached_offset + plan.reused_intervals)
+            merged_result = {**cached_result, **tail_result}
+            for key in ("data", "labels", "days"):
+                if key not in cached_result or key not in tail_result:
+                    return None
+                merged_result[key] = cached_result[key][reused] + tail_result[key]
+            merged_result["count"] = float(sum(merged_result["data"]))
+            if merged_result.get("action"):
+                merged_result["action"] = {**merged_result["action"], "days": self.query_date_range.all_values()}
+            if "filter" in merged_result:
+                merged_result["filter"] = self._query_to_filter()
+            merged_results.append(merged_result)
+
+        with self.timings.measure("printing_hogql_for_response"):
+            response_hogql = to_printed_hogql(self.to_query(), self.team, self.modifiers)
+
+        return TrendsQueryResponse(
+            results=merged_results,
+            hasMore=False,
+            timings=[*(tail_response.timings or []), *self.timings.to_list()],
+            hogql=response_hogql,
+            modifiers=self.modifiers,
+            error="",
+        )
+
+    def _can_calculate_incrementally(self) -> bool:
+        # These are calculated over the whole date range rather than interval by interval
+        if self._trends_display.is_total_value():
+            return False
+        if self._trends_display.display_type == ChartDisplayType.ACTIONS_LINE_GRAPH_CUMULATIVE:
+            return False
+        if self.query.trendsFilter and (self.query.trendsFilter.smoothingIntervals or 1) > 1:
+            return False
+        breakdown_filter = self.query.breakdownFilter
+        if breakdown_filter and (
+            breakdown_filter.breakdown_histogram_bin_count is not None
+            or any(breakdown.histogram_bin_count is not None for breakdown in breakdown_filter.breakdowns or [])
+        ):
+            return False
+        return True
+
+    def _breakdown_limit_applies(self, results: list[dict[str, Any]]) -> bool:
+        """
+        Whether breakdown values were grouped into "Other" or left out for being beyond the breakdown limit. The top
+        values of the intervals after the cached result can then differ from the top values of the whole date range.
+        """
+        breakdown_filter = self.query.breakdownFilter
+        if not breakdown_filter:
+            return False
+        breakdown_limit = breakdown_filter.breakdown_limit or get_breakdown_limit_for_context(self.limit_context)
+        breakdown_values: dict[tuple[Optional[str], Optional[int]], set[str]] = defaultdict(set)
+        for result in results:
+            breakdown_value = result.get("breakdown_value")
+            if breakdown_value == BREAKDOWN_OTHER_STRING_LABEL or (
+                isinstance(breakdown_value, list) and BREAKDOWN_OTHER_STRING_LABEL in breakdown_value
+            ):
+                return True
+            series = (result.get("compare_label"), (result.get("action") or {}).get("order"))
+            breakdown_values[series].add(json.dumps(breakdown_value, default=str))
+        return any(len(values) >= breakdown_limit for values in breakdown_values.values())
+
+    def _plan_incremental_calculation(
+        self, date_range: QueryDateRange, cached_results: list[dict[str, Any]], frozen_before: datetime
+    ) -> Optional[_IncrementalPlan]:
+        if not cached_results:
+            return None
+        cached_days = cached_results[0].get("days") or []
+        if any(result.get("days") != cached_days for result in cached_results):
+            return None
+
+        values = date_range.all_values()
+        days = [self._format_day(value) for value in values]
+        if not days or days[0] not in cached_days:
+            return None
+        if not date_range.use_start_of_interval() and date_range.date_from() != values[0]:
+            # The first interval only covers part of its period, and which part changes as the date range moves
+            return None
+
+        cached_offset = cached_days.index(days[0])
+        frozen_until = date_range.align_with_interval(frozen_before.astimezone(self.team.timezone_info))
+        reused_intervals = 0
+        # Always query at least the last interval, so that the tail date range is never empty
+        while (
+            reused_intervals < len(values) - 1
+            and values[reused_intervals] < frozen_until
+            and cached_offset + reused_intervals < len(cached_days)
+            and cached_days[cached_offset + reused_intervals] == days[reused_intervals]
+        ):
+            reused_intervals += 1
+        if reused_intervals == 0:
+            return None
+
+        tail_date_range = QueryDateRange(
+            date_range=DateRange(
+                date_from=values[reused_intervals].isoformat(),
+                date_to=date_range.date_to().isoformat(),
+                explicitDate=True,
+            ),
+            team=self.team,
+            interval=date_range.interval_type,
+            now=datetime.now(),
+        )
+        if tail_date_range.all_values() != values[reused_intervals:]:
+            return None
+        return _IncrementalPlan(
+            values=values,
+            cached_offset=cached_offset,
+            reused_intervals=reused_intervals,
+            tail_date_range=tail_date_range,
+        )
+
+    @staticmethod
+    def _incremental_series_key(result: dict[str, Any]) -> tuple[Optional[str], str, Optional[int]]:
+        return (
+            result.get("compare_label"),
+            json.dumps(result.get("breakdown_value"), default=str),
+            (result.get("action") or {}).get("order"),
+        )
+
+    def _format_day(self, value: datetime) -> str:
+        return value.strftime(
+            "%Y-%m-%d{}".format(" %H:%M:%S" if self.query_date_range.interval_name in ("hour", "minute") else "")
+        )
+
     def build_series_response(self, response: HogQLQueryResponse, series: SeriesWithExtras, series_count: int):
         def get_value(name: str, val: Any):
             if name not in ["date", "total", "breakdown_value"]:
@@ -1,11 +1,20 @@
+import time
 from datetime import datetime, UTC
 from typing import Optional
 
 from django.conf import settings
 from django.core.cache import cache
+from redis.lock import Lock
 
 from posthog import redis
 from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching.utils import last_refresh_from_cached_result
+from posthog.caching.zstd_dictionaries import (
+    MissingDictionaryError,
+    compress_query_result,
+    decompress_query_result,
+    record_sample_key,
+)
 from posthog.utils import get_safe_cache
 
 
@@ -17,12 +26,14 @@ class QueryCacheManager:
         cache_key: str,
         insight_id: Optional[int] = None,
         dashboard_id: Optional[int] = None,
+        query_kind: Optional[str] = None,
     ):
         self.redis_client = redis.get_client()
         self.team_id = team_id
         self.cache_key = cache_key
         self.insight_id = insight_id
         self.dashboard_id = dashboard_id
+        self.query_kind = query_kind
 
     @property
     def identifier(self):
@@ -82,8 +93,10 @@ class QueryCacheManager:
         self.redis_client.zrem(f"cache_timestamps:{self.team_id}", self.identifier)
 
     def set_cache_data(self, *, response: dict, target_age: Optional[datetime]) -> None:
-        fresh_response_serialized = OrjsonJsonSerializer({}).dumps(response)
+        fresh_response_serialized = compress_query_result(OrjsonJsonSerializer({}).dumps(response), self.query_kind)
         cache.set(self.cache_key, fresh_response_serialized, settings.CACHED_RESULTS_TTL)
+        if self.query_kind:
+            record_sample_key(self.query_kind, self.cache_key)
 
         if target_age:
             self.update_target_age(target_age)
@@ -95,4 +108,49 @@ class QueryCacheManager:
         if not cached_response_bytes:
             return None
 
+        try:
+            cached_response_bytes = decompress_query_result(cached_response_bytes)
+        except MissingDictionaryError:
+            return None
         return OrjsonJsonSerializer({}).loads(cached_response_bytes)
+
+    @property
+    def calculation_lock_key(self) -> str:
+        return f"query_calculation_lock:{self.team_id}:{self.cache_key}"
+
+    def calculation_lock(self) -> Lock:
+        """
+        Lock held while the result for this cache key is being calculated, so that concurrent cache misses for the
+        same query can wait for that result instead of all querying ClickHouse.
+        """
+        return self.redis_client.lock(
+            self.calculation_lock_key, timeout=settings.QUERY_CALCULATION_LOCK_TTL, blocking=False
+        )
+
+    def is_being_calculated(self) -> bool:
+        return self.redis_client.exists(self.calculation_lock_key) == 1
+
+    def wait_for_cache_data(
+        self, *, newer_than: Optional[datetime], timeout: float, poll_interval: float = 0.1
+    ) -> Optional[dict]:
+        """
+        Waits until a result newer than `newer_than` is written to the cache, and returns it.
+
+        Returns None if nothing newer shows up within `timeout` seconds, or if the calculation stops without writing a
+        result, e.g. because it failed.
+        """
+        # Track the time slept rather than reading the clock, which may be frozen in tests
+        waited = 0.0
+        while True:
+            being_calculated = self.is_being_calculated()
+            data = self.get_cache_data()
+            if data is not None:
+                last_refresh = last_refresh_from_cached_result(data)
+                if newer_than is None or (last_refresh is not None and last_refresh > newer_than):
+                    return data
+            if not being_calculated or waited >= timeout:
+                return None
+            sleep_for = min(poll_interval, timeout - waited)
+            time.sleep(sleep_for)
+            waited += sleep_for
+            poll_interval = min(poll_interval * 2, 1.0)
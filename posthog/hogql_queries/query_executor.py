@@ -0,0 +1,200 @@
+"""
+Process-wide pool for the sub-queries of query runners, e.g. one ClickHouse query per trends series.
+
+Spawning a thread per sub-query lets a single insight with many series (times compare, times cohort breakdowns) send
+dozens of queries to ClickHouse at once, which trips the per-team limit on simultaneous queries for everyone in the
+team. Sub-queries submitted here instead share a fixed number of worker threads (`QUERY_EXECUTOR_MAX_WORKERS`), and
+at most `QUERY_EXECUTOR_MAX_CONCURRENT_PER_TEAM` of them run for any one team at a time. Interactive queries are
+picked up before background ones (async calculation, cache warming, exports), and once one sub-query of a batch
+fails, the rest of the batch is dropped.
+"""
+
+import itertools
+import threading
+from bisect import insort
+from collections import Counter as CounterDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Generic, Optional, TypeVar
+
+import structlog
+from django.conf import settings
+from prometheus_client import Counter
+
+from posthog.clickhouse.query_tagging import get_query_tag_value, get_query_tags, reset_query_tags, tag_queries
+from posthog.hogql.constants import LimitContext
+
+logger = structlog.get_logger(__name__)
+
+QUERY_EXECUTOR_TASKS_COUNTER = Counter(
+    "posthog_query_executor_tasks_total",
+    "Sub-queries run by the shared query executor, by priority and outcome.",
+    labelnames=["priority", "outcome"],
+)
+
+T = TypeVar("T")
+
+
+class QueryPriority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def get_query_priority(limit_context: Optional[LimitContext]) -> QueryPriority:
+    """Queries that nobody is actively waiting on yield to the ones that someone is."""
+    if limit_context in (LimitContext.QUERY_ASYNC, LimitContext.EXPORT):
+        return QueryPriority.BACKGROUND
+    if (get_query_tag_value("trigger") or "").startswith("warming"):
+        return QueryPriority.BACKGROUND
+    return QueryPriority.INTERACTIVE
+
+
+@dataclass
+class _Batch(Generic[T]):
+    team_id: int
+    priority: QueryPriority
+    results: list[Optional[T]]
+    remaining: int
+    on_failure: Optional[Callable[[], None]]
+    error: Optional[Exception] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass(order=True)
+class _WorkItem:
+    sort_key: tuple[int, int]
+    batch: _Batch = field(compare=False)
+    index: int = field(compare=False)
+    task: Callable[[], Any] = field(compare=False)
+    query_tags: dict[str, Any] = field(compare=False)
+
+
+class SubQueryExecutor:
+    """A bounded pool of worker threads with per-team concurrency limits and priorities."""
+
+    def __init__(self, max_workers: int, max_concurrent_per_team: int):
+        self.max_workers = max_workers
+        self.max_concurrent_per_team = max_concurrent_per_team
+        self._pending: list[_WorkItem] = []
+        self._running_per_team: CounterDict[int] = CounterDict()
+        self._condition = threading.Condition()
+        self._workers: list[threading.Thread] = []
+        self._sequence = itertools.count()
+        self._local = threading.local()
+
+    def run_all(
+        self,
+        team_id: int,
+        tasks: Sequence[Callable[[], T]],
+        priority: QueryPriority = QueryPriority.INTERACTIVE,
+        on_failure: Optional[Callable[[], None]] = None,
+    ) -> list[T]:
+        """
+        Runs all tasks and returns their results in order. If any task raises, tasks that haven't started yet are
+        dropped, `on_failure` is called to cancel the ones that are still running, and the first error is raised.
+        """
+        if len(tasks) <= 1 or settings.IN_UNIT_TESTING or getattr(self._local, "is_worker", False):
+            # Nested batches run inline, as waiting on the pool from one of its own workers could deadlock it.
+            # Unit tests don't spawn threads, since Django's test database isn't shared across threads.
+            return [task() for task in tasks]
+
+        batch: _Batch[T] = _Batch(
+            team_id=team_id, priority=priority, results=[None] * len(tasks), remaining=len(tasks), on_failure=on_failure
+        )
+        query_tags = dict(get_query_tags())
+        with self._condition:
+            for index, task in enumerate(tasks):
+                insort(
+                    self._pending,
+                    _WorkItem(
+                        sort_key=(priority, next(self._sequence)),
+                        batch=batch,
+                        index=index,
+                        task=task,
+                        query_tags=query_tags,
+                    ),
+                )
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name="query-executor", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify_all()
+
+        batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.results  # type: ignore
+
+    def _work(self) -> None:
+        self._local.is_worker = True
+        while True:
+            with self._condition:
+                item = self._take_next_item()
+                while item is None:
+                    self._condition.wait()
+                    item = self._take_next_item()
+                self._running_per_team[item.batch.team_id] += 1
+            try:
+                self._run_item(item)
+            finally:
+                with self._condition:
+                    self._running_per_team[item.batch.team_id] -= 1
+                    self._condition.notify_all()
+
+    def _take_next_item(self) -> Optional[_WorkItem]:
+        # `_pending` is sorted by priority, then submission order
+        for position, item in enumerate(self._pending):
+            if self._running_per_team[item.batch.team_id] < self.max_concurrent_per_team:
+                del self._pending[position]
+                return item
+        return None
+
+    def _run_item(self, item: _WorkItem) -> None:
+        batch = item.batch
+        reset_query_tags()
+        tag_queries(**item.query_tags)
+        try:
+            batch.results[item.index] = item.task()
+        except Exception as e:
+            QUERY_EXECUTOR_TASKS_COUNTER.labels(priority=batch.priority.name.lower(), outcome="error").inc()
+            self._fail_batch(batch, e)
+        else:
+            QUERY_EXECUTOR_TASKS_COUNTER.labels(priority=batch.priority.name.lower(), outcome="success").inc()
+        finally:
+            reset_query_tags()
+            from django.db import connection
+
+            # This only closes the DB connection of this worker thread
+            connection.close()
+            self._complete_items(batch, 1)
+
+    def _fail_batch(self, batch: _Batch, error: Exception) -> None:
+        with self._condition:
+            if batch.error is not None:
+                return
+            batch.error = error
+            dropped = [item for item in self._pending if item.batch is batch]
+            self._pending = [item for item in self._pending if item.batch is not batch]
+        if dropped:
+            QUERY_EXECUTOR_TASKS_COUNTER.labels(priority=batch.priority.name.lower(), outcome="cancelled").inc(
+                len(dropped)
+            )
+            self._complete_items(batch, len(dropped))
+        if batch.on_failure is not None:
+            try:
+                batch.on_failure()
+            except Exception:
+                logger.exception("Failed to cancel the sub-queries of a failed batch", team_id=batch.team_id)
+
+    def _complete_items(self, batch: _Batch, count: int) -> None:
+        with self._condition:
+            batch.remaining -= count
+            if batch.remaining == 0:
+                batch.done.set()
+
+
+sub_query_executor = SubQueryExecutor(
+    max_workers=settings.QUERY_EXECUTOR_MAX_WORKERS,
+    max_concurrent_per_team=settings.QUERY_EXECUTOR_MAX_CONCURRENT_PER_TEAM,
+)
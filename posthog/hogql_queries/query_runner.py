@@ -4,12 +4,20 @@ from enum import StrEnum
 from typing import Any, Generic, Optional, TypeGuard, TypeVar, Union, cast
 
 import structlog
+from django.conf import settings
 from prometheus_client import Counter
 from pydantic import BaseModel, ConfigDict
+from redis.exceptions import LockError
+from redis.lock import Lock
 from sentry_sdk import capture_exception, get_traceparent, push_scope, set_tag
 
 from posthog.caching.utils import ThresholdMode, cache_target_age, is_stale, last_refresh_from_cached_result
-from posthog.clickhouse.client.execute_async import QueryNotFoundError, enqueue_process_query_task, get_query_status
+from posthog.clickhouse.client.execute_async import (
+    QueryNotFoundError,
+    QueryStatusManager,
+    enqueue_process_query_task,
+    get_query_status,
+)
 from posthog.clickhouse.query_tagging import get_query_tag_value, tag_queries
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
@@ -76,6 +84,14 @@ QUERY_CACHE_HIT_COUNTER = Counter(
     labelnames=[LABEL_TEAM_ID, "cache_hit", "trigger"],
 )
 
+QUERY_CALCULATION_COALESCING_COUNTER = Counter(
+    "posthog_query_calculation_coalescing_total",
+    "Cache misses that calculated a query, or were served by a concurrent calculation of it (waited/stale).",
+    labelnames=[LABEL_TEAM_ID, "outcome"],
+)
+
+COALESCED_QUERY_STATUS_LABEL = "coalesced"
+
 EXTENDED_CACHE_AGE = timedelta(days=1)
 
 
@@ -510,6 +526,13 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     def calculate(self) -> R:
         raise NotImplementedError()
 
+    def calculate_incrementally(self, cache_manager: QueryCacheManager) -> Optional[R]:
+        """
+        Recalculates only the parts of the cached result that may have changed since it was cached.
+        Returns None if that's not possible, in which case the query is calculated from scratch.
+        """
+        return None
+
     def enqueue_async_calculation(
         self,
         *,
@@ -643,6 +666,7 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             cache_key=cache_key,
             insight_id=insight_id,
             dashboard_id=dashboard_id,
+            query_kind=getattr(self.query, "kind", None),
         )
 
         if execution_mode == ExecutionMode.CALCULATE_ASYNC_ALWAYS:
@@ -660,42 +684,143 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             if results is not None:
                 return results
 
-        last_refresh = datetime.now(UTC)
-        target_age = self.cache_target_age(last_refresh=last_refresh)
-
-        # Avoid affecting cache key
-        # Add user based modifiers here, primarily for user specific feature flagging
-        if user:
-            self.modifiers = create_default_modifiers_for_user(user, self.team, self.modifiers)
-            self.modifiers.useMaterializedViews = True
-
-        fresh_response_dict = {
-            **self.calculate().model_dump(),
-            "is_cached": False,
-            "last_refresh": last_refresh,
-            "next_allowed_client_refresh": last_refresh + self._refresh_frequency(),
-            "cache_key": cache_key,
-            "timezone": self.team.timezone,
-            "cache_target_age": target_age,
-        }
-        if get_query_tag_value("trigger"):
-            fresh_response_dict["calculation_trigger"] = get_query_tag_value("trigger")
-        fresh_response = CachedResponse(**fresh_response_dict)
-
-        # Don't cache debug queries with errors and export queries
-        has_error: Optional[list] = fresh_response_dict.get("error", None)
-        if (has_error is None or len(has_error) == 0) and self.limit_context != LimitContext.EXPORT:
-            cache_manager.set_cache_data(
-                response=fresh_response_dict,
-                # This would be a possible place to decide to not ever keep this cache warm
-                # Example: Not for super quickly calculated insights
-                # Set target_age to None in that case
-                target_age=target_age,
-            )
-            QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
+        calculation_lock: Optional[Lock] = None
+        calculated_response: Optional[CR] = None
+        try:
+            if execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS and self.limit_context != LimitContext.EXPORT:
+                # Only one of several concurrent cache misses for the same query calculates it
+                lock = cache_manager.calculation_lock()
+                if lock.acquire():
+                    calculation_lock = lock
+                    QUERY_CALCULATION_COALESCING_COUNTER.labels(team_id=self.team.pk, outcome="calculated").inc()
+                else:
+                    coalesced_response = self.wait_for_concurrent_calculation(cache_manager)
+                    if coalesced_response is not None:
+                        return coalesced_response
+
+            last_refresh = datetime.now(UTC)
+            target_age = self.cache_target_age(last_refresh=last_refresh)
+
+            # Avoid affecting cache key
+            # Add user based modifiers here, primarily for user specific feature flagging
+            if user:
+                self.modifiers = create_default_modifiers_for_user(user, self.team, self.modifiers)
+                self.modifiers.useMaterializedViews = True
+
+            response: Optional[R] = None
+            # A forced refresh or an export is calculated from scratch, without reusing any of the cached result
+            if execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS and self.limit_context != LimitContext.EXPORT:
+                response = self.calculate_incrementally(cache_manager)
+            if response is None:
+                response = self.calculate()
+            fresh_response_dict = {
+                **response.model_dump(),
+                "is_cached": False,
+                "last_refresh": last_refresh,
+                "next_allowed_client_refresh": last_refresh + self._refresh_frequency(),
+                "cache_key": cache_key,
+                "timezone": self.team.timezone,
+                "cache_target_age": target_age,
+            }
+            if get_query_tag_value("trigger"):
+                fresh_response_dict["calculation_trigger"] = get_query_tag_value("trigger")
+            fresh_response = CachedResponse(**fresh_response_dict)
+
+            # Don't cache debug queries with errors and export queries
+            has_error: Optional[list] = fresh_response_dict.get("error", None)
+            if (has_error is None or len(has_error) == 0) and self.limit_context != LimitContext.EXPORT:
+                cache_manager.set_cache_data(
+                    response=fresh_response_dict,
+                    # This would be a possible place to decide to not ever keep this cache warm
+                    # Example: Not for super quickly calculated insights
+                    # Set target_age to None in that case
+                    target_age=target_age,
+                )
+                QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
+            calculated_response = fresh_response
+        finally:
+            if calculation_lock is not None:
+                self.complete_coalesced_query_status(cache_key=cache_key, response=calculated_response)
+                try:
+                    calculation_lock.release()
+                except LockError:
+                    # The lock expired while calculating, and may already be held by someone else
+                    pass
 
         return fresh_response
 
+    def wait_for_concurrent_calculation(self, cache_manager: QueryCacheManager) -> Optional[CR]:
+        """
+        Called when another request is already calculating this query. Waits a bounded time for its result. If it
+        doesn't arrive in time, returns the stale cached result with a query status to poll, if there is one.
+        Returns None if the caller should calculate the query itself.
+        """
+        CachedResponse: type[CR] = self.cached_response_type
+        stale_candidate = cache_manager.get_cache_data()
+        stale_response = (
+            CachedResponse(**{**stale_candidate, "is_cached": True})
+            if self.is_cached_response(stale_candidate)
+            else None
+        )
+
+        fresh_candidate = cache_manager.wait_for_cache_data(
+            newer_than=last_refresh_from_cached_result(stale_response) if stale_response else None,
+            timeout=settings.QUERY_CALCULATION_WAIT_TIMEOUT,
+        )
+        if self.is_cached_response(fresh_candidate):
+            QUERY_CALCULATION_COALESCING_COUNTER.labels(team_id=self.team.pk, outcome="waited").inc()
+            return CachedResponse(**{**fresh_candidate, "is_cached": True})
+
+        if stale_response is not None and cache_manager.is_being_calculated():
+            stale_response.query_status = self.get_coalesced_query_status(cache_manager)
+            # The calculation might have finished before the status was stored, in which case nobody completes it
+            fresh_candidate = cache_manager.wait_for_cache_data(
+                newer_than=last_refresh_from_cached_result(stale_response), timeout=0
+            )
+            if self.is_cached_response(fresh_candidate):
+                QUERY_CALCULATION_COALESCING_COUNTER.labels(team_id=self.team.pk, outcome="waited").inc()
+                return CachedResponse(**{**fresh_candidate, "is_cached": True})
+            QUERY_CALCULATION_COALESCING_COUNTER.labels(team_id=self.team.pk, outcome="stale").inc()
+            return stale_response
+
+        QUERY_CALCULATION_COALESCING_COUNTER.labels(team_id=self.team.pk, outcome="gave_up").inc()
+        return None
+
+    def get_coalesced_query_status(self, cache_manager: QueryCacheManager) -> QueryStatus:
+        """
+        Returns a pollable status for a calculation that's running in another request. It's stored under the cache
+        key, like async queries, and completed by whoever holds the calculation lock.
+        """
+        manager = QueryStatusManager(cache_manager.cache_key, self.team.pk)
+        try:
+            return manager.get_query_status()
+        except QueryNotFoundError:
+            query_status = QueryStatus(
+                id=cache_manager.cache_key,
+                team_id=self.team.pk,
+                insight_id=cache_manager.insight_id,
+                dashboard_id=cache_manager.dashboard_id,
+                start_time=datetime.now(UTC),
+                labels=[COALESCED_QUERY_STATUS_LABEL],
+            )
+            manager.store_query_status(query_status)
+            return query_status
+
+    def complete_coalesced_query_status(self, *, cache_key: str, response: Optional[CR]) -> None:
+        manager = QueryStatusManager(cache_key, self.team.pk)
+        try:
+            query_status = manager.get_query_status()
+        except QueryNotFoundError:
+            return  # Nobody is polling for this calculation
+        if query_status.complete or COALESCED_QUERY_STATUS_LABEL not in (query_status.labels or []):
+            return
+
+        query_status.complete = True
+        query_status.error = response is None
+        query_status.results = response.model_dump(by_alias=True) if response is not None else None
+        query_status.end_time = datetime.now(UTC)
+        manager.store_query_status(query_status)
+
     @abstractmethod
     def to_query(self) -> ast.SelectQuery | ast.SelectSetQuery:
         raise NotImplementedError()
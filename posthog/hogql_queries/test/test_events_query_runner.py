@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Optional, cast
 
 from freezegun import freeze_time
 from datetime import datetime
@@ -300,3 +300,43 @@ class TestEventsQueryRunner(ClickhouseTestMixin, APIBaseTest):
             datetime(2020, 1, 12, 12, 0, 0, tzinfo=self.team.timezone_info),
             datetime(2020, 1, 12, 23, 0, 0, tzinfo=self.team.timezone_info),
         ]
+
+    def test_cursor_pagination(self):
+        self._create_events(
+            data=[
+                ("p1", "2020-01-12T01:00:00Z", {"index": 0}),
+                ("p1", "2020-01-12T02:00:00Z", {"index": 1}),
+                # events with the same timestamp are told apart by their uuid, even across pages
+                ("p2", "2020-01-12T03:00:00Z", {"index": 2}),
+                ("p2", "2020-01-12T03:00:00Z", {"index": 3}),
+                ("p3", "2020-01-12T03:00:00Z", {"index": 4}),
+            ]
+        )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-12T12:00:00Z"):
+            expected = EventsQueryRunner(
+                query=EventsQuery(kind="EventsQuery", select=["properties.index", "timestamp"]), team=self.team
+            ).calculate()
+
+            results: list = []
+            # an empty cursor starts paginating with cursors
+            cursor: Optional[str] = ""
+            while True:
+                response = EventsQueryRunner(
+                    query=EventsQuery(
+                        kind="EventsQuery", select=["properties.index", "timestamp"], limit=2, cursor=cursor
+                    ),
+                    team=self.team,
+                ).calculate()
+                assert response.columns == ["properties.index", "timestamp"]
+                assert all(len(row) == 2 for row in response.results)
+                results.extend(response.results)
+                cursor = response.nextCursor
+                if cursor is None:
+                    break
+
+        assert len(results) == 5
+        # the offset query doesn't break ties, so only the order of timestamps is the same
+        assert sorted(results) == sorted(expected.results)
+        assert [row[1] for row in results] == [row[1] for row in expected.results]
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from posthog.clickhouse.query_tagging import get_query_tag_value, reset_query_tags, tag_queries
+from posthog.hogql.constants import LimitContext
+from posthog.hogql_queries.query_executor import QueryPriority, SubQueryExecutor, get_query_priority
+
+
+@override_settings(IN_UNIT_TESTING=False)
+class TestSubQueryExecutor(SimpleTestCase):
+    def tearDown(self):
+        reset_query_tags()
+
+    def test_returns_results_in_order(self):
+        executor = SubQueryExecutor(max_workers=4, max_concurrent_per_team=4)
+
+        def task(index: int) -> int:
+            time.sleep(0.01 * (5 - index))
+            return index
+
+        tasks: list[Callable[[], int]] = [partial(task, i) for i in range(5)]
+        results = executor.run_all(team_id=1, tasks=tasks)
+
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+
+    def test_limits_concurrency_per_team(self):
+        executor = SubQueryExecutor(max_workers=8, max_concurrent_per_team=2)
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def task():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        executor.run_all(team_id=1, tasks=[task] * 8)
+
+        self.assertEqual(max_running, 2)
+
+    def test_propagates_query_tags(self):
+        executor = SubQueryExecutor(max_workers=2, max_concurrent_per_team=2)
+        tag_queries(client_query_id="abc")
+
+        results = executor.run_all(team_id=1, tasks=[lambda: get_query_tag_value("client_query_id")] * 2)
+
+        self.assertEqual(results, ["abc", "abc"])
+
+    def test_failure_drops_pending_siblings_and_cancels_running_ones(self):
+        executor = SubQueryExecutor(max_workers=1, max_concurrent_per_team=1)
+        on_failure = MagicMock()
+        sibling = MagicMock()
+
+        def failing_task() -> None:
+            raise ValueError("Series failed")
+
+        tasks: list[Callable[[], None]] = [failing_task, sibling, sibling]
+        with self.assertRaises(ValueError):
+            executor.run_all(team_id=1, tasks=tasks, on_failure=on_failure)
+
+        sibling.assert_not_called()
+        on_failure.assert_called_once()
+
+    def test_interactive_queries_go_first(self):
+        executor = SubQueryExecutor(max_workers=1, max_concurrent_per_team=1)
+        order: list[str] = []
+        blocker = threading.Event()
+
+        background = threading.Thread(
+            target=executor.run_all,
+            kwargs={
+                "team_id": 1,
+                "tasks": [blocker.wait, lambda: order.append("background")],
+                "priority": QueryPriority.BACKGROUND,
+            },
+        )
+        background.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(
+            target=executor.run_all,
+            kwargs={"team_id": 1, "tasks": [lambda: order.append("interactive")] * 2},
+        )
+        interactive.start()
+        time.sleep(0.05)
+        blocker.set()
+        background.join()
+        interactive.join()
+
+        self.assertEqual(order, ["interactive", "interactive", "background"])
+
+    def test_query_priority(self):
+        self.assertEqual(get_query_priority(LimitContext.QUERY), QueryPriority.INTERACTIVE)
+        self.assertEqual(get_query_priority(LimitContext.QUERY_ASYNC), QueryPriority.BACKGROUND)
+        tag_queries(trigger="warming")
+        self.assertEqual(get_query_priority(LimitContext.QUERY), QueryPriority.BACKGROUND)
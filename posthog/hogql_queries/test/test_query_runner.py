@@ -4,9 +4,12 @@ from unittest import mock
 from zoneinfo import ZoneInfo
 
 from django.core.cache import cache
+from django.test import override_settings
 from freezegun import freeze_time
 from pydantic import BaseModel
 
+from posthog.clickhouse.client.execute_async import get_query_status
+from posthog.hogql_queries.query_cache import QueryCacheManager
 from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
 from posthog.models.team.team import Team
 from posthog.schema import (
@@ -276,3 +279,104 @@ class TestQueryRunner(BaseTest):
         response = runner.calculate()
         assert response.clickhouse is not None
         assert "events.`mat_$browser" not in response.clickhouse
+
+    def test_concurrent_cache_miss_waits_for_calculation(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        cache_manager = QueryCacheManager(team_id=self.team.pk, cache_key=runner.get_cache_key())
+
+        other_request_lock = cache_manager.calculation_lock()
+        assert other_request_lock.acquire()
+
+        def other_request_finishes(_seconds):
+            now = datetime.now(tz=ZoneInfo("UTC"))
+            cache_manager.set_cache_data(
+                response={
+                    "results": [],
+                    "is_cached": False,
+                    "last_refresh": now,
+                    "next_allowed_client_refresh": now,
+                    "cache_key": cache_manager.cache_key,
+                    "timezone": "UTC",
+                },
+                target_age=None,
+            )
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37, 42)):
+            with (
+                mock.patch.object(TestQueryRunner, "calculate") as calculate,
+                mock.patch("posthog.hogql_queries.query_cache.time.sleep", side_effect=other_request_finishes),
+            ):
+                response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+            calculate.assert_not_called()
+            self.assertIsInstance(response, TestCachedBasicQueryResponse)
+            self.assertEqual(response.is_cached, True)
+
+        other_request_lock.release()
+
+    @override_settings(QUERY_CALCULATION_WAIT_TIMEOUT=0)
+    def test_concurrent_cache_miss_returns_stale_result_with_status(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        cache_manager = QueryCacheManager(team_id=self.team.pk, cache_key=runner.get_cache_key())
+
+        stale_response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        other_request_lock = cache_manager.calculation_lock()
+        assert other_request_lock.acquire()
+
+        with (
+            mock.patch.object(TestQueryRunner, "calculate") as calculate,
+            mock.patch.object(TestQueryRunner, "_is_stale", return_value=True),
+        ):
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        calculate.assert_not_called()
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, True)
+        self.assertEqual(response.last_refresh, stale_response.last_refresh)
+        assert response.query_status is not None
+        self.assertEqual(response.query_status.id, cache_manager.cache_key)
+        self.assertEqual(response.query_status.complete, False)
+
+        other_request_lock.release()
+
+        # Whoever calculates the query next completes the status the stale response pointed to
+        with mock.patch.object(TestQueryRunner, "_is_stale", return_value=True):
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        self.assertEqual(response.is_cached, False)
+
+        query_status = get_query_status(team_id=self.team.pk, query_id=cache_manager.cache_key)
+        self.assertEqual(query_status.complete, True)
+        self.assertEqual(query_status.error, False)
+        assert query_status.results is not None
+        self.assertEqual(query_status.results["is_cached"], False)
+
+    @override_settings(QUERY_CALCULATION_WAIT_TIMEOUT=0)
+    def test_concurrent_cache_miss_calculates_when_nothing_to_wait_for(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        cache_manager = QueryCacheManager(team_id=self.team.pk, cache_key=runner.get_cache_key())
+
+        other_request_lock = cache_manager.calculation_lock()
+        assert other_request_lock.acquire()
+
+        response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, False)
+
+        other_request_lock.release()
+
+    def test_calculation_lock_is_released_when_preparing_the_calculation_fails(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        cache_manager = QueryCacheManager(team_id=self.team.pk, cache_key=runner.get_cache_key())
+
+        with (
+            mock.patch.object(TestQueryRunner, "cache_target_age", side_effect=ValueError("Bad target age")),
+            self.assertRaises(ValueError),
+        ):
+            runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        next_request_lock = cache_manager.calculation_lock()
+        self.assertTrue(next_request_lock.acquire())
+        next_request_lock.release()
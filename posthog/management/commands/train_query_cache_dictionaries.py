@@ -0,0 +1,101 @@
+import time
+
+import zstd
+from django.core.management.base import BaseCommand, CommandError
+
+from posthog.caching.zstd_dictionaries import (
+    DICTIONARY_SIZE,
+    MAX_SAMPLE_KEYS,
+    MissingDictionaryError,
+    compress_with_dictionary,
+    decompress_query_result,
+    decompress_with_dictionary,
+    get_sample_keys,
+    get_sampled_query_kinds,
+    store_dictionary,
+    train_dictionary,
+)
+from posthog.utils import get_safe_cache
+
+# Every Nth sample is left out of training, to measure the dictionary on values it hasn't seen
+HOLDOUT_EVERY = 5
+MIN_TRAINING_SAMPLES = 20
+
+
+class Command(BaseCommand):
+    help = "Train zstd dictionaries from query results in the cache, per query kind, and report what they save"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            default=[],
+            dest="kinds",
+            action="append",
+            help="Query kind to train a dictionary for, all sampled kinds by default",
+        )
+        parser.add_argument("--samples", type=int, default=MAX_SAMPLE_KEYS, help="Maximum cached results to sample")
+        parser.add_argument("--dictionary-size", type=int, default=DICTIONARY_SIZE, help="Dictionary size in bytes")
+        parser.add_argument("--dry-run", action="store_true", help="Only report, without storing the dictionaries")
+
+    def handle(self, *args, **options):
+        kinds = options["kinds"] or get_sampled_query_kinds()
+        if not kinds:
+            raise CommandError("No cached query results have been sampled yet")
+
+        for kind in kinds:
+            samples = self.get_samples(kind, options["samples"])
+            training_samples = [sample for i, sample in enumerate(samples) if i % HOLDOUT_EVERY != 0]
+            holdout_samples = [sample for i, sample in enumerate(samples) if i % HOLDOUT_EVERY == 0]
+            if len(training_samples) < MIN_TRAINING_SAMPLES:
+                self.stdout.write(f"{kind}: skipped, only {len(samples)} cached results found")
+                continue
+
+            dictionary = train_dictionary(training_samples, options["dictionary_size"])
+            self.report(kind, dictionary, holdout_samples)
+
+            if not options["dry_run"]:
+                store_dictionary(kind, dictionary)
+                self.stdout.write(f"{kind}: stored dictionary {dictionary.dict_id()}")
+
+    def get_samples(self, kind, limit):
+        samples = []
+        for key in get_sample_keys(kind, limit):
+            value = get_safe_cache(key)
+            if not isinstance(value, bytes):
+                continue
+            try:
+                samples.append(decompress_query_result(value))
+            except MissingDictionaryError:
+                continue
+        return samples
+
+    def report(self, kind, dictionary, samples):
+        uncompressed_bytes = sum(len(sample) for sample in samples)
+        plain_bytes, plain_set_seconds, plain_get_seconds = 0, 0.0, 0.0
+        dictionary_bytes, dictionary_set_seconds, dictionary_get_seconds = 0, 0.0, 0.0
+
+        for sample in samples:
+            start = time.perf_counter()
+            compressed = zstd.compress(sample, 0, 1)
+            plain_set_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            zstd.decompress(compressed)
+            plain_get_seconds += time.perf_counter() - start
+            plain_bytes += len(compressed)
+
+            start = time.perf_counter()
+            compressed = compress_with_dictionary(sample, dictionary)
+            dictionary_set_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            decompress_with_dictionary(compressed, dictionary)
+            dictionary_get_seconds += time.perf_counter() - start
+            dictionary_bytes += len(compressed)
+
+        count = len(samples)
+        self.stdout.write(
+            f"{kind}: {count} held out results, {uncompressed_bytes} bytes uncompressed\n"
+            f"  zstd:            {plain_bytes} bytes, "
+            f"{plain_set_seconds / count * 1e6:.0f}us per set, {plain_get_seconds / count * 1e6:.0f}us per get\n"
+            f"  zstd dictionary: {dictionary_bytes} bytes ({1 - dictionary_bytes / plain_bytes:.1%} smaller), "
+            f"{dictionary_set_seconds / count * 1e6:.0f}us per set, {dictionary_get_seconds / count * 1e6:.0f}us per get"
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.15 on 2026-10-17 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0537_data_color_themes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="externaldataschema",
+            name="delta_file_count",
+            field=models.IntegerField(
+                blank=True, help_text="The number of files of the synced delta table after the last sync.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="externaldataschema",
+            name="delta_size_in_bytes",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="The total size of the files of the synced delta table after the last sync.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.15 on 2024-12-30 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0538_externaldataschema_delta_file_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datawarehousesavedquery",
+            name="bytes_materialized",
+            field=models.BigIntegerField(
+                blank=True, help_text="The size in bytes of this SavedQuery's last materialization.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="datawarehousesavedquery",
+            name="rows_materialized",
+            field=models.BigIntegerField(
+                blank=True, help_text="The number of rows written by this SavedQuery's last materialization.", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2024-12-30 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0539_datawarehousesavedquery_materialized_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datawarehousesavedquery",
+            name="materialization_config",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="datawarehousesavedquery",
+            name="materialization_type",
+            field=models.CharField(
+                choices=[("full_refresh", "full_refresh"), ("incremental", "incremental")],
+                default="full_refresh",
+                help_text="Whether materializing this SavedQuery recomputes all rows or only rows past its watermark.",
+                max_length=128,
+            ),
+        ),
+    ]
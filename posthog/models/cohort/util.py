@@ -501,6 +501,18 @@ def get_all_cohort_ids_by_person_uuid(uuid: str, team_id: int) -> list[int]:
     return [*cohort_ids, *static_cohort_ids]
 
 
+def get_cohort_dependency_ids(cohort: Cohort) -> list[int]:
+    """IDs of the cohorts that the cohort's filters directly refer to."""
+    dependency_ids = []
+    for prop in cohort.properties.flat:
+        if prop.type == "cohort" and not isinstance(prop.value, list):
+            try:
+                dependency_ids.append(int(prop.value))
+            except (ValueError, TypeError):
+                continue
+    return dependency_ids
+
+
 def get_dependent_cohorts(
     cohort: Cohort,
     using_database: str = "default",
@@ -513,13 +525,7 @@ def get_dependent_cohorts(
     seen_cohort_ids = set()
     seen_cohort_ids.add(cohort.id)
 
-    queue = []
-    for prop in cohort.properties.flat:
-        if prop.type == "cohort" and not isinstance(prop.value, list):
-            try:
-                queue.append(int(prop.value))
-            except (ValueError, TypeError):
-                continue
+    queue = get_cohort_dependency_ids(cohort)
 
     while queue:
         cohort_id = queue.pop()
@@ -537,12 +543,7 @@ def get_dependent_cohorts(
                 cohorts.append(current_cohort)
                 seen_cohort_ids.add(current_cohort.id)
 
-                for prop in current_cohort.properties.flat:
-                    if prop.type == "cohort" and not isinstance(prop.value, list):
-                        try:
-                            queue.append(int(prop.value))
-                        except (ValueError, TypeError):
-                            continue
+                queue.extend(get_cohort_dependency_ids(current_cohort))
 
         except Cohort.DoesNotExist:
             seen_cohorts_cache[cohort_id] = ""
@@ -0,0 +1,329 @@
+"""
+Evaluates the `Q` objects built by `properties_to_Q` against an already fetched person or group,
+instead of sending them to Postgres as annotated columns.
+
+Results follow the SQL semantics exactly, including three-valued logic (a condition on a missing key is
+NULL, not False). Any lookup whose Postgres behaviour we can't reproduce with certainty raises
+`UnsupportedConditionError`, and the caller falls back to evaluating that condition in SQL.
+"""
+
+import json
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional
+
+from django.db.models import Exists, Q, Value
+from django.db.models.fields.json import JSONField, KeyTransform
+from django.db.models.lookups import Exact
+
+from posthog.models.cohort import CohortPeople
+from posthog.queries.base import sanitize_property_key
+
+
+# Number of compiled regexes kept around, as flags are evaluated over and over again with the same patterns
+REGEX_CACHE_SIZE = 1024
+
+# Key names that Django would read as a lookup on the column rather than a key transform
+_RESERVED_KEYS = frozenset(JSONField.get_lookups()) | frozenset(KeyTransform.get_lookups())
+
+_KEY_LOOKUPS = frozenset(("exact", "in", "isnull", "icontains", "regex", "gt", "gte", "lt", "lte"))
+
+# jsonb ordering between scalar types: Boolean > Number > String > Null
+_NULL, _STRING, _NUMBER, _BOOLEAN = range(4)
+
+
+class UnsupportedConditionError(Exception):
+    pass
+
+
+def parse_properties_json(text: str) -> Any:
+    """Parses a jsonb column cast to text, keeping numbers exact like Postgres does."""
+    return json.loads(text, parse_float=Decimal)
+
+
+def evaluate_condition(
+    expr: Q, column: str, properties: Any, static_cohort_ids: Optional[set[int]] = None
+) -> Optional[bool]:
+    """
+    Returns what `ExpressionWrapper(expr, output_field=BooleanField())` selects for the entity, i.e. True, False or None.
+
+    `static_cohort_ids` are the static cohorts the person belongs to, and must be given for person conditions on
+    static cohorts.
+    """
+    if not isinstance(properties, dict):
+        # Key lookups on NULL or on JSON arrays behave differently
+        raise UnsupportedConditionError("Properties aren't a JSON object")
+    evaluator = _ConditionEvaluator(column, properties, static_cohort_ids)
+    evaluator.collect_keys(expr)
+    return evaluator.evaluate(expr)
+
+
+class _ConditionEvaluator:
+    def __init__(self, column: str, properties: dict, static_cohort_ids: Optional[set[int]]):
+        self.column = column
+        self.prefix = f"{column}__"
+        self.properties = properties
+        self.static_cohort_ids = static_cohort_ids
+        self.type_annotations: dict[str, str] = {}
+
+    def collect_keys(self, node: Q) -> None:
+        # :TRICKY: Type annotations (see `_get_property_type_annotations`) only carry a sanitized key,
+        # so map them back through the keys referenced elsewhere in the expression.
+        for child in node.children:
+            if isinstance(child, Q):
+                self.collect_keys(child)
+            elif isinstance(child, tuple) and child[0].startswith(self.prefix):
+                key = child[1] if child[0] == f"{self.prefix}has_key" else child[0][len(self.prefix) :].split("__")[0]
+                self.type_annotations[f"{self.column}_{sanitize_property_key(key)}_type"] = key
+
+    def evaluate(self, node: Q) -> Optional[bool]:
+        if not node.children:
+            raise UnsupportedConditionError("Empty Q object")
+
+        results = []
+        for child in node.children:
+            if isinstance(child, Q):
+                result = self.evaluate(child)
+            elif isinstance(child, Exists):
+                result = self.evaluate_static_cohort(child)
+            elif isinstance(child, tuple):
+                result = self.evaluate_lookup(*child)
+            else:
+                raise UnsupportedConditionError(f"Unsupported expression: {child!r}")
+            results.append(result)
+
+        if node.connector == Q.AND:
+            result = False if False in results else (None if None in results else True)
+        else:
+            result = True if True in results else (None if None in results else False)
+
+        if node.negated:
+            return None if result is None else not result
+        return result
+
+    def evaluate_static_cohort(self, exists: Exists) -> Optional[bool]:
+        query = exists.query
+        if query.model is not CohortPeople or self.static_cohort_ids is None:
+            raise UnsupportedConditionError("Only person queries on static cohorts are supported")
+
+        cohort_ids = set()
+        for lookup in query.where.children:
+            if not isinstance(lookup, Exact) or getattr(lookup.lhs, "target", None) is None:
+                raise UnsupportedConditionError(f"Unsupported cohort lookup: {lookup!r}")
+            if lookup.lhs.target.name == "cohort" and isinstance(lookup.rhs, int):
+                cohort_ids.add(lookup.rhs)
+            elif lookup.lhs.target.name != "person":
+                raise UnsupportedConditionError(f"Unsupported cohort lookup: {lookup!r}")
+        if len(cohort_ids) != 1:
+            raise UnsupportedConditionError("Expected exactly one cohort")
+
+        return cohort_ids.pop() in self.static_cohort_ids
+
+    def evaluate_lookup(self, lookup: str, value: Any) -> Optional[bool]:
+        if lookup == "pk__isnull":
+            # Explicit match-all or match-none, see `property_to_Q`
+            return not value
+        if lookup == "pk" and value == -1:
+            # Explicit match-none for invalid regexes
+            return False
+        if lookup in self.type_annotations:
+            if not isinstance(value, Value):
+                raise UnsupportedConditionError(f"Unsupported type annotation comparison: {value!r}")
+            key = self.type_annotations[lookup]
+            if key not in self.properties:
+                return None
+            return _jsonb_typeof(self.properties[key]) == value.value
+        if not lookup.startswith(self.prefix):
+            raise UnsupportedConditionError(f"Unsupported lookup: {lookup}")
+
+        path = lookup[len(self.prefix) :]
+        if path == "has_key":
+            return value in self.properties
+
+        key, _, operator = path.partition("__")
+        operator = operator or "exact"
+        if not key or "__" in operator or operator not in _KEY_LOOKUPS or not _is_plain_key(key):
+            raise UnsupportedConditionError(f"Unsupported lookup: {lookup}")
+
+        # `col -> 'key'` is NULL when the key is missing, while a JSON null is a value of its own
+        if operator == "isnull":
+            return (key not in self.properties) == bool(value)
+        if key not in self.properties:
+            return None
+        property_value = self.properties[key]
+
+        if operator == "exact":
+            return _jsonb_equal(property_value, _to_jsonb(value))
+        if operator == "in":
+            if not isinstance(value, list | tuple) or not value or None in value:
+                raise UnsupportedConditionError("Unsupported IN lookup")
+            return any(_jsonb_equal(property_value, _to_jsonb(item)) for item in value)
+        if operator in ("gt", "gte", "lt", "lte"):
+            comparison = _jsonb_compare(property_value, _to_jsonb(value))
+            return {
+                "gt": comparison > 0,
+                "gte": comparison >= 0,
+                "lt": comparison < 0,
+                "lte": comparison <= 0,
+            }[operator]
+
+        # The text lookups work on `col ->> 'key'`, which is NULL for a JSON null
+        text = _jsonb_text(property_value)
+        if text is None:
+            return None
+        if value is None:
+            raise UnsupportedConditionError(f"Unsupported {operator} lookup on None")
+        if operator == "icontains":
+            needle = str(value)
+            if not needle.isascii() or not text.isascii():
+                # UPPER() of non-ASCII text depends on the database locale
+                raise UnsupportedConditionError("Unsupported non-ASCII icontains")
+            return needle.upper() in text.upper()
+        if not text.isascii():
+            raise UnsupportedConditionError("Unsupported non-ASCII regex subject")
+        return _compile_regex(str(value)).search(text) is not None
+
+
+def _is_plain_key(key: str) -> bool:
+    # Integer-like keys become array index lookups (`col -> 0`)
+    return key not in _RESERVED_KEYS and not key.lstrip("-").isdigit()
+
+
+def _reject_constant(constant: str) -> Any:
+    # NaN and Infinity aren't valid jsonb, so the query would error out
+    raise UnsupportedConditionError(f"Unsupported JSON constant: {constant}")
+
+
+def _to_jsonb(value: Any) -> Any:
+    """Round-trips a lookup value through JSON, as the `Jsonb` query parameter does."""
+    try:
+        serialized = json.dumps(value)
+    except (TypeError, ValueError):
+        raise UnsupportedConditionError(f"Unsupported lookup value: {value!r}")
+    if "\\u0000" in serialized:
+        raise UnsupportedConditionError("jsonb doesn't support null characters")
+    return json.loads(serialized, parse_float=Decimal, parse_constant=_reject_constant)
+
+
+def _jsonb_typeof(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int | Decimal):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _jsonb_equal(left: Any, right: Any) -> bool:
+    left_type = _jsonb_typeof(left)
+    if left_type != _jsonb_typeof(right):
+        return False
+    if left_type == "array":
+        return len(left) == len(right) and all(_jsonb_equal(a, b) for a, b in zip(left, right))
+    if left_type == "object":
+        return left.keys() == right.keys() and all(_jsonb_equal(left[key], right[key]) for key in left)
+    # Numbers compare by value, so `1.0` equals `1`
+    return left == right
+
+
+def _jsonb_compare(left: Any, right: Any) -> int:
+    scalar_types = {"null": _NULL, "string": _STRING, "number": _NUMBER, "boolean": _BOOLEAN}
+    left_type, right_type = _jsonb_typeof(left), _jsonb_typeof(right)
+    if left_type not in scalar_types or right_type not in scalar_types:
+        raise UnsupportedConditionError("Unsupported comparison of JSON containers")
+    if left_type != right_type:
+        return 1 if scalar_types[left_type] > scalar_types[right_type] else -1
+    if left_type == "string":
+        # Strings are ordered by the database collation
+        raise UnsupportedConditionError("Unsupported string comparison")
+    return (left > right) - (left < right)
+
+
+def _jsonb_text(value: Any) -> Optional[str]:
+    """Mirrors `col ->> 'key'` for scalars."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, Decimal):
+        # Postgres never prints numeric values with an exponent
+        return format(value, "f")
+    if isinstance(value, int | str):
+        return str(value)
+    raise UnsupportedConditionError("Unsupported text lookup on a JSON container")
+
+
+_REGEX_QUANTIFIERS = "*+?{"
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _compile_regex(pattern: str) -> re.Pattern:
+    """
+    Compiles the subset of Postgres regular expressions that Python's `re` matches the same way.
+
+    Besides the syntax, this rejects quantified groups that contain a quantifier or an alternation,
+    as Python's backtracking can take exponential time on them where Postgres doesn't.
+    """
+    if not pattern.isascii():
+        raise UnsupportedConditionError("Unsupported non-ASCII regex")
+
+    translated: list[str] = []
+    # Whether each open group contains a quantifier or alternation
+    groups: list[bool] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # Postgres escapes like `\y` or `\m` mean something else in Python, so only allow escaped punctuation
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                raise UnsupportedConditionError(f"Unsupported regex escape in {pattern}")
+            translated.append(pattern[i : i + 2])
+            i += 2
+            continue
+        if char == "[":
+            end = pattern.find(
+                "]", i + (3 if pattern.startswith("[^]", i) else 2 if pattern.startswith("[]", i) else 1)
+            )
+            if end == -1 or "\\" in pattern[i:end] or "[" in pattern[i + 1 : end]:
+                raise UnsupportedConditionError(f"Unsupported bracket expression in {pattern}")
+            translated.append(pattern[i : end + 1])
+            i = end + 1
+            continue
+        if char == "(":
+            if pattern.startswith("(?", i):
+                raise UnsupportedConditionError(f"Unsupported group in {pattern}")
+            groups.append(False)
+        elif char == ")":
+            if not groups:
+                raise UnsupportedConditionError(f"Unbalanced parenthesis in {pattern}")
+            nested = groups.pop()
+            if nested and pattern[i + 1 : i + 2] in tuple(_REGEX_QUANTIFIERS):
+                raise UnsupportedConditionError(f"Unsupported nested quantifier in {pattern}")
+            if groups:
+                groups[-1] = groups[-1] or nested
+        elif char in _REGEX_QUANTIFIERS or char == "|":
+            if char == "{":
+                bound = re.match(r"\{(\d+)(,(\d*))?\}", pattern[i:])
+                if not bound or any(int(count) > 255 for count in bound.groups()[::2] if count):
+                    raise UnsupportedConditionError(f"Unsupported bound in {pattern}")
+            if groups:
+                groups[-1] = True
+        elif char == "$":
+            # Without newline-sensitive matching, `$` only matches at the very end in Postgres
+            translated.append("\\Z")
+            i += 1
+            continue
+        translated.append(char)
+        i += 1
+
+    try:
+        # ... and `.` matches newlines too
+        return re.compile("".join(translated), re.DOTALL)
+    except re.error:
+        raise UnsupportedConditionError(f"Invalid regex {pattern}")
@@ -0,0 +1,96 @@
+"""
+Process-local cache of the deserialized feature flags of a team, in front of the JSON we keep in Redis.
+
+`/decide` used to load, parse and turn every flag of the team into a `FeatureFlag` instance on every request.
+Instead, we keep the instances around per process, tagged with a per-team version that is bumped whenever the
+Redis JSON is rewritten. A lookup then only costs one small Redis `GET` of the version.
+
+Every lookup hands out its own copies of the cached instances, so a request changing the attributes of its flags
+doesn't change them for the requests after it. The copies are shallow: their filters are shared and read-only.
+"""
+
+import copy
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter
+
+if TYPE_CHECKING:
+    from posthog.models.feature_flag.feature_flag import FeatureFlag
+
+
+FLAG_DEFINITIONS_CACHE_COUNTER = Counter(
+    "flag_definitions_cache",
+    "Lookups in the process-local cache of deserialized feature flags",
+    labelnames=["result"],
+)
+
+FLAGS_VERSION_CACHE_KEY_PREFIX = "team_feature_flags_version"
+
+
+def _flags_version_cache_key(team_id: int) -> str:
+    return f"{FLAGS_VERSION_CACHE_KEY_PREFIX}_{team_id}"
+
+
+def get_team_flags_version(team_id: int) -> Optional[str]:
+    version = cache.get(_flags_version_cache_key(team_id))
+    return str(version) if version is not None else None
+
+
+def bump_team_flags_version(team_id: int, timeout: int) -> None:
+    """
+    Must be called after the flags JSON is written, so a process reading the new version can't cache older flags under it.
+    Tokens are random, so a version evicted from Redis never comes back as one a process has cached flags under.
+    """
+    cache.set(_flags_version_cache_key(team_id), uuid.uuid4().hex, timeout)
+
+
+@dataclass(frozen=True, slots=True)
+class TeamFlagDefinitions:
+    version: str
+    feature_flags: tuple["FeatureFlag", ...]
+
+
+class FlagDefinitionsCache:
+    """A bounded, thread-safe LRU of each team's latest flag definitions."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[int, TeamFlagDefinitions] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, team_id: int, version: str) -> Optional[list["FeatureFlag"]]:
+        with self._lock:
+            definitions = self._entries.get(team_id)
+            if definitions is not None and definitions.version == version:
+                self._entries.move_to_end(team_id)
+                FLAG_DEFINITIONS_CACHE_COUNTER.labels(result="hit").inc()
+                return [copy.copy(flag) for flag in definitions.feature_flags]
+        FLAG_DEFINITIONS_CACHE_COUNTER.labels(result="miss").inc()
+        return None
+
+    def set(self, team_id: int, version: str, feature_flags: list["FeatureFlag"]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[team_id] = TeamFlagDefinitions(
+                version=version, feature_flags=tuple(copy.copy(flag) for flag in feature_flags)
+            )
+            self._entries.move_to_end(team_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+flag_definitions_cache = FlagDefinitionsCache(max_size=settings.DECIDE_FLAG_DEFINITIONS_CACHE_MAX_SIZE)
@@ -15,6 +15,11 @@ from posthog.constants import (
 )
 from posthog.models.cohort import Cohort, CohortOrEmpty
 from posthog.models.experiment import Experiment
+from posthog.models.feature_flag.definitions_cache import (
+    bump_team_flags_version,
+    flag_definitions_cache,
+    get_team_flags_version,
+)
 from posthog.models.property import GroupTypeIndex
 from posthog.models.property.property import Property, PropertyGroup
 from posthog.models.signals import mutable_receiver
@@ -417,6 +422,7 @@ def set_feature_flags_for_team_in_cache(
 
     try:
         cache.set(f"team_feature_flags_{team_id}", json.dumps(serialized_flags), FIVE_DAYS)
+        bump_team_flags_version(team_id, FIVE_DAYS)
     except Exception:
         # redis is unavailable
         logger.exception("Redis is unavailable")
@@ -426,6 +432,18 @@ def set_feature_flags_for_team_in_cache(
 
 
 def get_feature_flags_for_team_in_cache(team_id: int) -> Optional[list[FeatureFlag]]:
+    try:
+        version = get_team_flags_version(team_id)
+    except Exception:
+        # redis is unavailable
+        logger.exception("Redis is unavailable")
+        return None
+
+    if version is not None:
+        feature_flags = flag_definitions_cache.get(team_id, version)
+        if feature_flags is not None:
+            return feature_flags
+
     try:
         flag_data = cache.get(f"team_feature_flags_{team_id}")
     except Exception:
@@ -436,12 +454,16 @@ def get_feature_flags_for_team_in_cache(team_id: int) -> Optional[list[FeatureFl
     if flag_data is not None:
         try:
             parsed_data = json.loads(flag_data)
-            return [FeatureFlag(**flag) for flag in parsed_data]
+            feature_flags = [FeatureFlag(**flag) for flag in parsed_data]
         except Exception as e:
             logger.exception("Error parsing flags from cache")
             capture_exception(e)
             return None
 
+        if version is not None:
+            flag_definitions_cache.set(team_id, version, feature_flags)
+        return feature_flags
+
     return None
 
 
@@ -1,16 +1,21 @@
 import hashlib
+import json
 from dataclasses import dataclass
 from enum import StrEnum
 import time
 import structlog
-from typing import Literal, Optional, Union, cast
+from collections.abc import Collection
+from functools import lru_cache
+from typing import Any, Literal, Optional, Union, cast
 
 from prometheus_client import Counter
 from django.conf import settings
 from django.db import DatabaseError, IntegrityError, DataError
 from django.db.models.expressions import ExpressionWrapper, RawSQL
 from django.db.models.fields import BooleanField
-from django.db.models import Q, Func, F, CharField
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Q, Func, F, CharField, OuterRef, TextField
+from django.db.models.functions import Cast
 from django.db.models.query import QuerySet
 from sentry_sdk.api import capture_exception, start_span
 from posthog.metrics import LABEL_TEAM_ID
@@ -22,7 +27,7 @@ from posthog.models.group_type_mapping import GroupTypeMapping
 from posthog.models.person import Person, PersonDistinctId
 from posthog.models.property import GroupTypeIndex, GroupTypeName
 from posthog.models.property.property import Property
-from posthog.models.cohort import Cohort, CohortOrEmpty
+from posthog.models.cohort import Cohort, CohortOrEmpty, CohortPeople
 from posthog.models.utils import execute_with_timeout
 from posthog.queries.base import match_property, properties_to_Q, sanitize_property_key
 from posthog.database_healthcheck import (
@@ -31,6 +36,7 @@ from posthog.database_healthcheck import (
 )
 from posthog.utils import label_for_team_id_to_track
 
+from .condition_evaluation import UnsupportedConditionError, evaluate_condition, parse_properties_json
 from .feature_flag import (
     FeatureFlag,
     FeatureFlagHashKeyOverride,
@@ -63,8 +69,17 @@ FLAG_CACHE_HIT_COUNTER = Counter(
     labelnames=[LABEL_TEAM_ID, "cache_hit"],
 )
 
+FLAG_CONDITION_EVALUATION_COUNTER = Counter(
+    "flag_condition_evaluation_total",
+    "Flag conditions evaluated in process, or in SQL when that isn't possible.",
+    labelnames=["mode"],
+)
+
+# Number of distinct release conditions whose parsed properties we keep around
+FLAG_CONDITION_PROPERTIES_CACHE_SIZE = 10_000
+
 ENTITY_EXISTS_PREFIX = "flag_entity_exists_"
-PERSON_KEY = "person"
+PERSON_KEY: Literal["person"] = "person"
 
 
 class FeatureFlagMatchReason(StrEnum):
@@ -107,6 +122,14 @@ class FeatureFlagMatch:
     payload: Optional[object] = None
 
 
+@dataclass(frozen=True)
+class FlagCondition:
+    key: str
+    expr: Optional[Q]
+    properties_with_math_operators: list[tuple[str, str]]
+    group_type_index: Optional[GroupTypeIndex]
+
+
 class FlagsMatcherCache:
     def __init__(self, team_id: int):
         self.team_id = team_id
@@ -466,196 +489,317 @@ class FeatureFlagMatcher:
             # Some extra wiggle room here for timeouts because this depends on the number of flags as well,
             # and not just the database query.
             with execute_with_timeout(FLAG_MATCHING_QUERY_TIMEOUT_MS * 2, DATABASE_FOR_FLAG_MATCHING):
-                all_conditions: dict = {}
-                team_id = self.feature_flags[0].team_id
-                person_query: QuerySet = Person.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
-                    team_id=team_id,
-                    persondistinctid__distinct_id=self.distinct_id,
-                    persondistinctid__team_id=team_id,
+                if settings.DECIDE_EVALUATE_FLAGS_IN_PROCESS:
+                    return self._query_conditions_in_process()
+                return self._query_conditions_with_sql()
+        except DatabaseError:
+            self.failed_to_fetch_conditions = True
+            raise
+        except Exception:
+            # Usually when a user somehow manages to create an invalid filter, usually via API.
+            # In this case, don't put db down, just skip the flag.
+            # Covers all cases like invalid JSON, invalid operator, invalid property name, invalid group input format, etc.
+            raise
+
+    def _query_conditions_with_sql(self) -> dict[str, bool]:
+        all_conditions: dict = {}
+        person_query = self._person_query()
+        group_queries = self._group_queries()
+
+        for existence_condition_key in self.has_pure_is_not_conditions:
+            if existence_condition_key == PERSON_KEY:
+                person_exists = person_query.exists()
+                all_conditions[f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
+            else:
+                if existence_condition_key not in group_queries:
+                    continue
+
+                group_exists = group_queries[cast(GroupTypeIndex, existence_condition_key)].exists()
+                all_conditions[f"{ENTITY_EXISTS_PREFIX}{existence_condition_key}"] = group_exists
+
+        flag_conditions = self._get_flag_conditions(all_conditions, group_queries.keys())
+        all_conditions.update(self._fetch_conditions_with_sql(person_query, group_queries, flag_conditions))
+        return all_conditions
+
+    def _query_conditions_in_process(self) -> dict[str, bool]:
+        """
+        Fetches the person and groups once, and evaluates the conditions against their properties here,
+        instead of asking Postgres for one column per condition.
+        Conditions we can't evaluate in process exactly like Postgres would are still queried for.
+        """
+        all_conditions: dict = {}
+        person_query = self._person_query()
+        group_queries = self._group_queries()
+        flag_conditions = self._get_flag_conditions(all_conditions, group_queries.keys())
+
+        entity_keys: set[Literal["person"] | GroupTypeIndex] = {
+            PERSON_KEY if flag_condition.group_type_index is None else flag_condition.group_type_index
+            for flag_condition in flag_conditions
+        }
+        entity_keys.update(key for key in self.has_pure_is_not_conditions if key == PERSON_KEY or key in group_queries)
+        entities = self._fetch_entities(entity_keys)
+
+        for entity_key in self.has_pure_is_not_conditions:
+            if entity_key in entity_keys:
+                all_conditions[f"{ENTITY_EXISTS_PREFIX}{entity_key}"] = entity_key in entities
+
+        sql_conditions: list[FlagCondition] = []
+        for flag_condition in flag_conditions:
+            entity_key = PERSON_KEY if flag_condition.group_type_index is None else flag_condition.group_type_index
+            if entity_key not in entities:
+                # Same as the SQL query not returning a row
+                continue
+            if flag_condition.expr is None:
+                all_conditions[flag_condition.key] = True
+                continue
+
+            column, properties, static_cohort_ids = entities[entity_key]
+            try:
+                all_conditions[flag_condition.key] = evaluate_condition(
+                    flag_condition.expr, column, properties, static_cohort_ids
                 )
-                basic_group_query: QuerySet = Group.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
-                    team_id=team_id
+                FLAG_CONDITION_EVALUATION_COUNTER.labels(mode="in_process").inc()
+            except UnsupportedConditionError:
+                sql_conditions.append(flag_condition)
+                FLAG_CONDITION_EVALUATION_COUNTER.labels(mode="sql_fallback").inc()
+
+        if sql_conditions:
+            all_conditions.update(self._fetch_conditions_with_sql(person_query, group_queries, sql_conditions))
+        return all_conditions
+
+    def _person_query(self) -> QuerySet:
+        team_id = self.feature_flags[0].team_id
+        return Person.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
+            team_id=team_id,
+            persondistinctid__distinct_id=self.distinct_id,
+            persondistinctid__team_id=team_id,
+        )
+
+    def _group_queries(self) -> dict[GroupTypeIndex, QuerySet]:
+        basic_group_query: QuerySet = Group.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
+            team_id=self.feature_flags[0].team_id
+        )
+        group_queries: dict[GroupTypeIndex, QuerySet] = {}
+        # :TRICKY: Create a queryset for each group type that uniquely identifies a group, based on the groups passed in.
+        # If no groups for a group type are passed in, we can skip querying for that group type,
+        # since the result will always be `false`.
+        for group_type, group_key in self.groups.items():
+            group_type_index = self.cache.group_types_to_indexes.get(group_type)
+            if group_type_index is not None:
+                group_queries[group_type_index] = basic_group_query.filter(
+                    group_type_index=group_type_index, group_key=group_key
                 )
-                group_query_per_group_type_mapping: dict[GroupTypeIndex, tuple[QuerySet, list[str]]] = {}
-                # :TRICKY: Create a queryset for each group type that uniquely identifies a group, based on the groups passed in.
-                # If no groups for a group type are passed in, we can skip querying for that group type,
-                # since the result will always be `false`.
-                for group_type, group_key in self.groups.items():
-                    group_type_index = self.cache.group_types_to_indexes.get(group_type)
-                    if group_type_index is not None:
-                        # a tuple of querySet and field names
-                        group_query_per_group_type_mapping[group_type_index] = (
-                            basic_group_query.filter(group_type_index=group_type_index, group_key=group_key),
-                            [],
-                        )
+        return group_queries
 
-                person_fields: list[str] = []
+    def _get_flag_conditions(
+        self, all_conditions: dict, group_type_indexes: Collection[GroupTypeIndex]
+    ) -> list["FlagCondition"]:
+        """
+        Builds the Q expression of every release condition that can't be decided from the overrides alone.
+        Conditions that can be decided are written straight to `all_conditions`.
+        """
+        team_id = self.feature_flags[0].team_id
+        flag_conditions: list[FlagCondition] = []
 
-                for existence_condition_key in self.has_pure_is_not_conditions:
-                    if existence_condition_key == PERSON_KEY:
-                        person_exists = person_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
-                    else:
-                        if existence_condition_key not in group_query_per_group_type_mapping:
-                            continue
+        def condition_eval(key, condition, feature_flag: FeatureFlag):
+            expr = None
 
-                        group_query, _ = group_query_per_group_type_mapping[
-                            cast(GroupTypeIndex, existence_condition_key)
-                        ]
-                        group_exists = group_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{existence_condition_key}"] = group_exists
-
-                def condition_eval(key, condition):
-                    team_id = self.feature_flags[0].team_id
-                    expr = None
-                    annotate_query = True
-                    nonlocal person_query
-
-                    property_list = Filter(data=condition).property_groups.flat
-                    properties_with_math_operators = get_all_properties_with_math_operators(
-                        property_list, self.cohorts_cache, team_id
-                    )
+            property_list = get_condition_properties(condition)
+            properties_with_math_operators = get_all_properties_with_math_operators(
+                property_list, self.cohorts_cache, team_id
+            )
 
-                    if len(condition.get("properties", {})) > 0:
-                        # Feature Flags don't support OR filtering yet
-                        target_properties = self.property_value_overrides
-                        if feature_flag.aggregation_group_type_index is not None:
-                            if feature_flag.aggregation_group_type_index not in self.cache.group_type_index_to_name:
-                                target_properties = {}
-                            else:
-                                target_properties = self.group_property_value_overrides.get(
-                                    self.cache.group_type_index_to_name[feature_flag.aggregation_group_type_index],
-                                    {},
-                                )
-
-                        expr = properties_to_Q(
-                            team_id,
-                            property_list,
-                            override_property_values=target_properties,
-                            cohorts_cache=self.cohorts_cache,
-                            using_database=DATABASE_FOR_FLAG_MATCHING,
+            if len(condition.get("properties", {})) > 0:
+                # Feature Flags don't support OR filtering yet
+                target_properties = self.property_value_overrides
+                if feature_flag.aggregation_group_type_index is not None:
+                    if feature_flag.aggregation_group_type_index not in self.cache.group_type_index_to_name:
+                        target_properties = {}
+                    else:
+                        target_properties = self.group_property_value_overrides.get(
+                            self.cache.group_type_index_to_name[feature_flag.aggregation_group_type_index],
+                            {},
                         )
 
-                        # TRICKY: Due to property overrides for cohorts, we sometimes shortcircuit the condition check.
-                        # In that case, the expression is either an explicit True or explicit False, or multiple conditions.
-                        # We can skip going to the database in explicit True|False conditions. This is important
-                        # as it allows resolving flags correctly for non-ingested persons.
-                        # However, this doesn't work for the multiple condition case (when expr has multiple Q objects),
-                        # but it's better than nothing.
-                        # TODO: A proper fix would be to handle cohorts with property overrides before we get to this point.
-                        # Unskip test test_complex_cohort_filter_with_override_properties when we fix this.
-                        if expr == Q(pk__isnull=False):
-                            all_conditions[key] = True
-                            annotate_query = False
-                        elif expr == Q(pk__isnull=True):
-                            all_conditions[key] = False
-                            annotate_query = False
-
-                    if annotate_query:
-                        if feature_flag.aggregation_group_type_index is None:
-                            # :TRICKY: Flag matching depends on type of property when doing >, <, >=, <= comparisons.
-                            # This requires a generated field to query in Q objects, which sadly don't allow inlining fields,
-                            # hence we need to annotate the query here, even though these annotations are used much deeper,
-                            # in properties_to_q, in empty_or_null_with_value_q
-                            # These need to come in before the expr so they're available to use inside the expr.
-                            # Same holds for the group queries below.
-                            type_property_annotations = _get_property_type_annotations(properties_with_math_operators)
-                            person_query = person_query.annotate(
-                                **type_property_annotations,
-                                **{
-                                    key: ExpressionWrapper(
-                                        expr if expr else RawSQL("true", []),
-                                        output_field=BooleanField(),
-                                    ),
-                                },
-                            )
-                            person_fields.append(key)
-                        else:
-                            if feature_flag.aggregation_group_type_index not in group_query_per_group_type_mapping:
-                                # ignore flags that didn't have the right groups passed in
-                                return
-                            (
-                                group_query,
-                                group_fields,
-                            ) = group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index]
-                            type_property_annotations = _get_property_type_annotations(properties_with_math_operators)
-                            group_query = group_query.annotate(
-                                **type_property_annotations,
-                                **{
-                                    key: ExpressionWrapper(
-                                        expr if expr else RawSQL("true", []),
-                                        output_field=BooleanField(),
-                                    )
-                                },
-                            )
-                            group_fields.append(key)
-                            group_query_per_group_type_mapping[feature_flag.aggregation_group_type_index] = (
-                                group_query,
-                                group_fields,
-                            )
-
-                # only fetch all cohorts if not passed in any cached cohorts
-                if not self.cohorts_cache and any(feature_flag.uses_cohorts for feature_flag in self.feature_flags):
-                    all_cohorts = {
-                        cohort.pk: cohort
-                        for cohort in Cohort.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
-                            team_id=team_id, deleted=False
-                        )
-                    }
-                    self.cohorts_cache.update(all_cohorts)
-                # release conditions
-                for feature_flag in self.feature_flags:
-                    # super release conditions
-                    if feature_flag.super_conditions and len(feature_flag.super_conditions) > 0:
-                        condition = feature_flag.super_conditions[0]
-                        prop_key = (condition.get("properties") or [{}])[0].get("key")
-                        if prop_key:
-                            key = f"flag_{feature_flag.pk}_super_condition"
-                            condition_eval(key, condition)
-
-                            is_set_key = f"flag_{feature_flag.pk}_super_condition_is_set"
-                            is_set_condition = {
-                                "properties": [
-                                    {
-                                        "key": prop_key,
-                                        "operator": "is_set",
-                                    }
-                                ]
+                expr = properties_to_Q(
+                    team_id,
+                    property_list,
+                    override_property_values=target_properties,
+                    cohorts_cache=self.cohorts_cache,
+                    using_database=DATABASE_FOR_FLAG_MATCHING,
+                )
+
+                # TRICKY: Due to property overrides for cohorts, we sometimes shortcircuit the condition check.
+                # In that case, the expression is either an explicit True or explicit False, or multiple conditions.
+                # We can skip going to the database in explicit True|False conditions. This is important
+                # as it allows resolving flags correctly for non-ingested persons.
+                # However, this doesn't work for the multiple condition case (when expr has multiple Q objects),
+                # but it's better than nothing.
+                # TODO: A proper fix would be to handle cohorts with property overrides before we get to this point.
+                # Unskip test test_complex_cohort_filter_with_override_properties when we fix this.
+                if expr == Q(pk__isnull=False):
+                    all_conditions[key] = True
+                    return
+                elif expr == Q(pk__isnull=True):
+                    all_conditions[key] = False
+                    return
+
+            if (
+                feature_flag.aggregation_group_type_index is not None
+                and feature_flag.aggregation_group_type_index not in group_type_indexes
+            ):
+                # ignore flags that didn't have the right groups passed in
+                return
+
+            flag_conditions.append(
+                FlagCondition(
+                    key=key,
+                    expr=expr or None,
+                    properties_with_math_operators=properties_with_math_operators,
+                    group_type_index=feature_flag.aggregation_group_type_index,
+                )
+            )
+
+        # only fetch all cohorts if not passed in any cached cohorts
+        if not self.cohorts_cache and any(feature_flag.uses_cohorts for feature_flag in self.feature_flags):
+            all_cohorts = {
+                cohort.pk: cohort
+                for cohort in Cohort.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
+                    team_id=team_id, deleted=False
+                )
+            }
+            self.cohorts_cache.update(all_cohorts)
+        # release conditions
+        for feature_flag in self.feature_flags:
+            # super release conditions
+            if feature_flag.super_conditions and len(feature_flag.super_conditions) > 0:
+                condition = feature_flag.super_conditions[0]
+                prop_key = (condition.get("properties") or [{}])[0].get("key")
+                if prop_key:
+                    key = f"flag_{feature_flag.pk}_super_condition"
+                    condition_eval(key, condition, feature_flag)
+
+                    is_set_key = f"flag_{feature_flag.pk}_super_condition_is_set"
+                    is_set_condition = {
+                        "properties": [
+                            {
+                                "key": prop_key,
+                                "operator": "is_set",
                             }
-                            condition_eval(is_set_key, is_set_condition)
-
-                    with start_span(
-                        op="parse_feature_flag_conditions",
-                        description=f"feature_flag={feature_flag.pk} key={feature_flag.key}",
-                    ):
-                        for index, condition in enumerate(feature_flag.conditions):
-                            key = f"flag_{feature_flag.pk}_condition_{index}"
-                            condition_eval(key, condition)
-
-                if len(person_fields) > 0:
-                    person_query = person_query.values(*person_fields)
-                    if len(person_query) > 0:
-                        all_conditions = {**all_conditions, **person_query[0]}
-
-                for (
-                    group_query,
-                    group_fields,
-                ) in group_query_per_group_type_mapping.values():
-                    # Only query the group if there's a field to query
-                    if len(group_fields) > 0:
-                        group_query = group_query.values(*group_fields)
-                        if len(group_query) > 0:
-                            assert len(group_query) == 1, f"Expected 1 group query result, got {len(group_query)}"
-                            all_conditions = {**all_conditions, **group_query[0]}
-                return all_conditions
-        except DatabaseError:
-            self.failed_to_fetch_conditions = True
-            raise
-        except Exception:
-            # Usually when a user somehow manages to create an invalid filter, usually via API.
-            # In this case, don't put db down, just skip the flag.
-            # Covers all cases like invalid JSON, invalid operator, invalid property name, invalid group input format, etc.
-            raise
+                        ]
+                    }
+                    condition_eval(is_set_key, is_set_condition, feature_flag)
+
+            with start_span(
+                op="parse_feature_flag_conditions",
+                description=f"feature_flag={feature_flag.pk} key={feature_flag.key}",
+            ):
+                for index, condition in enumerate(feature_flag.conditions):
+                    key = f"flag_{feature_flag.pk}_condition_{index}"
+                    condition_eval(key, condition, feature_flag)
+
+        return flag_conditions
+
+    def _fetch_conditions_with_sql(
+        self,
+        person_query: QuerySet,
+        group_queries: dict[GroupTypeIndex, QuerySet],
+        flag_conditions: list["FlagCondition"],
+    ) -> dict[str, bool]:
+        all_conditions: dict = {}
+        person_fields: list[str] = []
+        group_fields: dict[GroupTypeIndex, list[str]] = {}
+
+        for flag_condition in flag_conditions:
+            # :TRICKY: Flag matching depends on type of property when doing >, <, >=, <= comparisons.
+            # This requires a generated field to query in Q objects, which sadly don't allow inlining fields,
+            # hence we need to annotate the query here, even though these annotations are used much deeper,
+            # in properties_to_q, in empty_or_null_with_value_q
+            # These need to come in before the expr so they're available to use inside the expr.
+            # Same holds for the group queries below.
+            type_property_annotations = _get_property_type_annotations(flag_condition.properties_with_math_operators)
+            annotations = {
+                **type_property_annotations,
+                flag_condition.key: ExpressionWrapper(
+                    flag_condition.expr if flag_condition.expr else RawSQL("true", []),
+                    output_field=BooleanField(),
+                ),
+            }
+            if flag_condition.group_type_index is None:
+                person_query = person_query.annotate(**annotations)
+                person_fields.append(flag_condition.key)
+            else:
+                group_queries[flag_condition.group_type_index] = group_queries[
+                    flag_condition.group_type_index
+                ].annotate(**annotations)
+                group_fields.setdefault(flag_condition.group_type_index, []).append(flag_condition.key)
+
+        if len(person_fields) > 0:
+            person_query = person_query.values(*person_fields)
+            if len(person_query) > 0:
+                all_conditions = {**all_conditions, **person_query[0]}
+
+        for group_type_index, group_query in group_queries.items():
+            # Only query the group if there's a field to query
+            if group_type_index not in group_fields:
+                continue
+            group_query = group_query.values(*group_fields[group_type_index])
+            if len(group_query) > 0:
+                assert len(group_query) == 1, f"Expected 1 group query result, got {len(group_query)}"
+                all_conditions = {**all_conditions, **group_query[0]}
+        return all_conditions
+
+    def _fetch_entities(
+        self, entity_keys: set[Literal["person"] | GroupTypeIndex]
+    ) -> dict[Literal["person"] | GroupTypeIndex, tuple[str, Any, Optional[set[int]]]]:
+        """
+        Fetches the properties of the person and the groups the conditions are on, as
+        `entity key -> (properties column, properties, static cohort ids)`. Missing entities are left out.
+        """
+        team_id = self.feature_flags[0].team_id
+        entities: dict[Literal["person"] | GroupTypeIndex, tuple[str, Any, Optional[set[int]]]] = {}
+
+        if PERSON_KEY in entity_keys:
+            # Only the static cohorts the conditions can refer to, as a person might be in many of them
+            static_cohort_ids = [pk for pk, cohort in self.cohorts_cache.items() if cohort and cohort.is_static]
+            person_values: dict[str, Any] = {"properties_text": Cast("properties", TextField())}
+            if static_cohort_ids:
+                person_values["static_cohort_ids"] = ArraySubquery(
+                    CohortPeople.objects.db_manager(DATABASE_FOR_FLAG_MATCHING)
+                    .filter(person_id=OuterRef("id"), cohort_id__in=static_cohort_ids)
+                    .values("cohort_id")
+                )
+            person = self._person_query().values(**person_values).first()
+            if person is not None:
+                entities[PERSON_KEY] = (
+                    "properties",
+                    parse_properties_json(person["properties_text"]),
+                    set(person.get("static_cohort_ids") or []),
+                )
+
+        group_filter = Q()
+        for group_type, group_key in self.groups.items():
+            group_type_index = self.cache.group_types_to_indexes.get(group_type)
+            if group_type_index is not None and group_type_index in entity_keys:
+                group_filter |= Q(group_type_index=group_type_index, group_key=group_key)
+
+        if group_filter:
+            groups = (
+                Group.objects.db_manager(DATABASE_FOR_FLAG_MATCHING)
+                .filter(group_filter, team_id=team_id)
+                .annotate(properties_text=Cast("group_properties", TextField()))
+                .values("group_type_index", "properties_text")
+            )
+            for group in groups:
+                group_entity_key = cast(GroupTypeIndex, group["group_type_index"])
+                assert group_entity_key not in entities, "Expected 1 group query result, got more"
+                entities[group_entity_key] = (
+                    "group_properties",
+                    parse_properties_json(group["properties_text"]),
+                    None,
+                )
+
+        return entities
 
     def hashed_identifier(self, feature_flag: FeatureFlag) -> Optional[str]:
         """
@@ -1079,6 +1223,20 @@ def key_and_field_for_property(property: Property) -> tuple[str, str]:
     )
 
 
+def get_condition_properties(condition: dict) -> list[Property]:
+    try:
+        serialized_condition = json.dumps(condition, sort_keys=True)
+    except (TypeError, ValueError):
+        return Filter(data=condition).property_groups.flat
+    return list(_parse_condition_properties(serialized_condition))
+
+
+@lru_cache(maxsize=FLAG_CONDITION_PROPERTIES_CACHE_SIZE)
+def _parse_condition_properties(serialized_condition: str) -> tuple[Property, ...]:
+    # Parsing conditions with `Filter` is a hot path on every decide request, and flags rarely change
+    return tuple(Filter(data=json.loads(serialized_condition)).property_groups.flat)
+
+
 def get_all_properties_with_math_operators(
     properties: list[Property], cohorts_cache: dict[int, CohortOrEmpty], team_id: int
 ) -> list[tuple[str, str]]:
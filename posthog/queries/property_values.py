@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import Any, Optional
 
+from django.conf import settings
 from django.utils import timezone
 
-from posthog.models.event.sql import SELECT_PROP_VALUES_SQL_WITH_FILTER
+from posthog.models.event.sql import SELECT_PROP_VALUES_SQL_WITH_FILTER, SELECT_TOP_PROP_VALUES_SQL
 from posthog.models.person.sql import (
     SELECT_PERSON_PROP_VALUES_SQL,
     SELECT_PERSON_PROP_VALUES_SQL_WITH_FILTER,
@@ -10,6 +11,7 @@ from posthog.models.person.sql import (
 from posthog.models.property.util import get_property_string_expr
 from posthog.models.team import Team
 from posthog.queries.insight import insight_sync_execute
+from posthog.queries.property_values_index import PropertyValuesIndex
 from posthog.utils import relative_date_parse
 
 
@@ -19,6 +21,50 @@ def get_property_values_for_key(
     event_names: Optional[list[str]] = None,
     value: Optional[str] = None,
 ):
+    if settings.USE_PROPERTY_VALUES_INDEX:
+        indexed_values = PropertyValuesIndex.for_events(team.pk, key, event_names).get_values(value, limit=10)
+        if indexed_values is not None:
+            return indexed_values
+
+    property_field, filters, extra_params = _get_event_property_filters(key, team, event_names)
+    value_filter = ""
+    order_by_clause = ""
+
+    if value:
+        value_filter = "AND {} ILIKE %(value)s".format(property_field)
+        extra_params["value"] = "%{}%".format(value)
+
+        order_by_clause = f"order by length({property_field})"
+
+    return insight_sync_execute(
+        SELECT_PROP_VALUES_SQL_WITH_FILTER.format(
+            property_field=property_field,
+            value_filter=value_filter,
+            order_by_clause=order_by_clause,
+            **filters,
+        ),
+        {"team_id": team.pk, "key": key, **extra_params},
+        query_type="get_property_values_with_value",
+        team_id=team.pk,
+    )
+
+
+def get_top_property_values_for_key(key: str, team: Team, event_name: Optional[str], limit: int):
+    """Values of an event property in the last seven days with how often they were seen, most frequent first."""
+    property_field, filters, extra_params = _get_event_property_filters(
+        key, team, [event_name] if event_name is not None else None
+    )
+    return insight_sync_execute(
+        SELECT_TOP_PROP_VALUES_SQL.format(property_field=property_field, **filters),
+        {"team_id": team.pk, "key": key, "limit": limit, **extra_params},
+        query_type="get_top_property_values",
+        team_id=team.pk,
+    )
+
+
+def _get_event_property_filters(
+    key: str, team: Team, event_names: Optional[list[str]]
+) -> tuple[str, dict[str, str], dict[str, Any]]:
     property_field, mat_column_exists = get_property_string_expr("events", key, "%(key)s", "properties")
     parsed_date_from = "AND timestamp >= '{}'".format(
         relative_date_parse("-7d", team.timezone_info).strftime("%Y-%m-%d 00:00:00")
@@ -26,8 +72,6 @@ def get_property_values_for_key(
     parsed_date_to = "AND timestamp <= '{}'".format(timezone.now().strftime("%Y-%m-%d 23:59:59"))
     property_exists_filter = ""
     event_filter = ""
-    value_filter = ""
-    order_by_clause = ""
     extra_params = {}
 
     if mat_column_exists:
@@ -45,29 +89,21 @@ def get_property_values_for_key(
         event_conditions = " OR ".join(event_conditions_list)
         event_filter = "AND ({})".format(event_conditions)
 
-    if value:
-        value_filter = "AND {} ILIKE %(value)s".format(property_field)
-        extra_params["value"] = "%{}%".format(value)
-
-        order_by_clause = f"order by length({property_field})"
-
-    return insight_sync_execute(
-        SELECT_PROP_VALUES_SQL_WITH_FILTER.format(
-            parsed_date_from=parsed_date_from,
-            parsed_date_to=parsed_date_to,
-            property_field=property_field,
-            event_filter=event_filter,
-            value_filter=value_filter,
-            property_exists_filter=property_exists_filter,
-            order_by_clause=order_by_clause,
-        ),
-        {"team_id": team.pk, "key": key, **extra_params},
-        query_type="get_property_values_with_value",
-        team_id=team.pk,
-    )
+    filters = {
+        "parsed_date_from": parsed_date_from,
+        "parsed_date_to": parsed_date_to,
+        "property_exists_filter": property_exists_filter,
+        "event_filter": event_filter,
+    }
+    return property_field, filters, extra_params
 
 
 def get_person_property_values_for_key(key: str, team: Team, value: Optional[str] = None):
+    if settings.USE_PROPERTY_VALUES_INDEX:
+        indexed_values = PropertyValuesIndex.for_persons(team.pk, key).get_values(value, limit=20)
+        if indexed_values is not None:
+            return indexed_values
+
     property_field, _ = get_property_string_expr("person", key, "%(key)s", "properties")
 
     if value:
@@ -79,7 +115,18 @@ def get_person_property_values_for_key(key: str, team: Team, value: Optional[str
         )
     return insight_sync_execute(
         SELECT_PERSON_PROP_VALUES_SQL.format(property_field=property_field),
-        {"team_id": team.pk, "key": key},
+        {"team_id": team.pk, "key": key, "limit": 20},
         query_type="get_person_property_values",
         team_id=team.pk,
     )
+
+
+def get_top_person_property_values_for_key(key: str, team: Team, limit: int):
+    """Values of a person property among the latest persons with how many have them, most frequent first."""
+    property_field, _ = get_property_string_expr("person", key, "%(key)s", "properties")
+    return insight_sync_execute(
+        SELECT_PERSON_PROP_VALUES_SQL.format(property_field=property_field),
+        {"team_id": team.pk, "key": key, "limit": limit},
+        query_type="get_top_person_property_values",
+        team_id=team.pk,
+    )
@@ -0,0 +1,162 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Literal, Optional
+
+import orjson
+import structlog
+from prometheus_client import Counter
+
+from posthog import redis
+
+logger = structlog.get_logger(__name__)
+
+# Number of most frequent values kept per property. Properties with fewer values than this are indexed completely.
+INDEX_SIZE = 1000
+# Indexes are refreshed every hour, and expire if they stop being refreshed
+INDEX_TTL = timedelta(hours=3)
+# Properties that nobody has looked up values for in this long stop being refreshed
+REQUESTED_TTL = timedelta(days=7)
+BUILD_LOCK_TTL = timedelta(minutes=10)
+
+INDEX_KEY = "property_values_index:{team_id}:{digest}"
+BUILD_LOCK_KEY = "property_values_index:building:{team_id}:{digest}"
+REQUESTED_KEY = "property_values_index:requested"
+
+PROPERTY_VALUES_INDEX_REQUESTS_COUNTER = Counter(
+    "posthog_property_values_index_requests_total",
+    "Property value suggestions requested from the index, by whether the index could serve them.",
+    labelnames=["property_type", "result"],
+)
+
+PropertyType = Literal["event", "person"]
+
+
+@dataclass(frozen=True)
+class PropertyValuesIndexEntry:
+    """The top values of one property of a team, for one event or for all of them."""
+
+    team_id: int
+    property_type: PropertyType
+    key: str
+    event: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        # Property keys and event names can be anything, so they're hashed to keep Redis keys short and unambiguous
+        return hashlib.sha256(orjson.dumps([self.property_type, self.key, self.event])).hexdigest()
+
+    @property
+    def index_key(self) -> str:
+        return INDEX_KEY.format(team_id=self.team_id, digest=self.digest)
+
+    @property
+    def build_lock_key(self) -> str:
+        return BUILD_LOCK_KEY.format(team_id=self.team_id, digest=self.digest)
+
+    def serialize(self) -> bytes:
+        return orjson.dumps([self.team_id, self.property_type, self.key, self.event])
+
+    @classmethod
+    def deserialize(cls, value: bytes) -> "PropertyValuesIndexEntry":
+        team_id, property_type, key, event = orjson.loads(value)
+        return cls(team_id=team_id, property_type=property_type, key=key, event=event)
+
+
+class PropertyValuesIndex:
+    """
+    Serves property value suggestions from the most frequent values of properties, which are kept in Redis by the
+    refresh_property_values_indexes task, instead of scanning events or persons for every keystroke in a filter.
+
+    Looking up values marks the properties as requested, which makes the task keep their indexes up to date. When an
+    index hasn't been built yet, a build is started and the caller is expected to fall back to scanning.
+    """
+
+    def __init__(self, entries: list[PropertyValuesIndexEntry]):
+        self.entries = entries
+
+    @classmethod
+    def for_events(cls, team_id: int, key: str, event_names: Optional[list[str]] = None) -> "PropertyValuesIndex":
+        events: list[Optional[str]] = list(event_names) if event_names else [None]
+        return cls(
+            [PropertyValuesIndexEntry(team_id=team_id, property_type="event", key=key, event=event) for event in events]
+        )
+
+    @classmethod
+    def for_persons(cls, team_id: int, key: str) -> "PropertyValuesIndex":
+        return cls([PropertyValuesIndexEntry(team_id=team_id, property_type="person", key=key)])
+
+    def get_values(self, value: Optional[str], limit: int) -> Optional[list[tuple[str, int]]]:
+        """
+        Returns values that start with or contain `value`, with how often they were seen, prefix matches first.
+        Returns None when the values have to be looked up with a scan, because an index isn't ready yet, or because
+        nothing matches among the top values of a property that has more values than fit in its index.
+        """
+        property_type = self.entries[0].property_type
+        try:
+            indexes = self._get_indexes()
+        except Exception as e:
+            logger.warning("property_values_index_unavailable", error=str(e))
+            return None
+
+        if any(index is None for index in indexes):
+            PROPERTY_VALUES_INDEX_REQUESTS_COUNTER.labels(property_type=property_type, result="cold").inc()
+            self._build_missing(indexes)
+            return None
+
+        counts: dict[str, int] = {}
+        complete = True
+        for index in indexes:
+            assert index is not None  # For type checking
+            complete = complete and index["complete"]
+            for indexed_value, count in index["values"]:
+                counts[indexed_value] = counts.get(indexed_value, 0) + count
+        values = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+
+        if value:
+            search = value.casefold()
+            prefix_matches = [item for item in values if item[0].casefold().startswith(search)]
+            other_matches = [
+                item for item in values if search in item[0].casefold() and not item[0].casefold().startswith(search)
+            ]
+            values = prefix_matches + other_matches
+            if not values and not complete:
+                PROPERTY_VALUES_INDEX_REQUESTS_COUNTER.labels(property_type=property_type, result="miss").inc()
+                return None
+
+        PROPERTY_VALUES_INDEX_REQUESTS_COUNTER.labels(property_type=property_type, result="hit").inc()
+        return values[:limit]
+
+    def _get_indexes(self) -> list[Optional[dict]]:
+        client = redis.get_client()
+        pipeline = client.pipeline(transaction=False)
+        pipeline.zadd(REQUESTED_KEY, {entry.serialize(): time.time() for entry in self.entries})
+        pipeline.mget([entry.index_key for entry in self.entries])
+        _, indexes = pipeline.execute()
+        return [orjson.loads(index) if index is not None else None for index in indexes]
+
+    def _build_missing(self, indexes: list[Optional[dict]]) -> None:
+        from posthog.tasks.property_values_index import build_property_values_index
+
+        client = redis.get_client()
+        for entry, index in zip(self.entries, indexes):
+            if index is not None:
+                continue
+            # Every keystroke finds the index missing until it's built, but it only needs to be built once
+            if client.set(entry.build_lock_key, 1, nx=True, ex=BUILD_LOCK_TTL):
+                build_property_values_index.delay(entry.team_id, entry.property_type, entry.key, entry.event)
+
+
+def store_property_values_index(entry: PropertyValuesIndexEntry, values: list[tuple[str, int]]) -> None:
+    index = {"complete": len(values) < INDEX_SIZE, "values": values[:INDEX_SIZE]}
+    pipeline = redis.get_client().pipeline(transaction=False)
+    pipeline.set(entry.index_key, orjson.dumps(index), ex=INDEX_TTL)
+    pipeline.delete(entry.build_lock_key)
+    pipeline.execute()
+
+
+def get_requested_entries() -> list[PropertyValuesIndexEntry]:
+    client = redis.get_client()
+    client.zremrangebyscore(REQUESTED_KEY, "-inf", time.time() - REQUESTED_TTL.total_seconds())
+    return [PropertyValuesIndexEntry.deserialize(member) for member in client.zrange(REQUESTED_KEY, 0, -1)]
@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+from freezegun import freeze_time
+
+from posthog import redis
+from posthog.queries.property_values import get_person_property_values_for_key, get_property_values_for_key
+from posthog.queries.property_values_index import (
+    INDEX_SIZE,
+    REQUESTED_KEY,
+    PropertyValuesIndex,
+    PropertyValuesIndexEntry,
+    get_requested_entries,
+    store_property_values_index,
+)
+from posthog.tasks.property_values_index import build_property_values_index, refresh_property_values_indexes
+from posthog.test.base import BaseTest
+
+
+class TestPropertyValuesIndex(BaseTest):
+    def _entry(self, key: str = "$browser", event: str | None = None) -> PropertyValuesIndexEntry:
+        return PropertyValuesIndexEntry(team_id=self.team.pk, property_type="event", key=key, event=event)
+
+    @patch("posthog.tasks.property_values_index.build_property_values_index.delay")
+    def test_cold_index_starts_a_single_build(self, mock_delay: MagicMock) -> None:
+        index = PropertyValuesIndex.for_events(self.team.pk, "$browser", ["$pageview"])
+
+        assert index.get_values("chr", limit=10) is None
+        assert index.get_values("chro", limit=10) is None
+
+        mock_delay.assert_called_once_with(self.team.pk, "event", "$browser", "$pageview")
+        assert get_requested_entries() == [self._entry(event="$pageview")]
+
+    def test_serves_prefix_matches_before_substring_matches(self) -> None:
+        store_property_values_index(
+            self._entry(event="$pageview"),
+            [("Mobile Chrome", 50), ("Safari", 40), ("Chrome", 10), ("Firefox", 5)],
+        )
+        store_property_values_index(self._entry(event="$pageleave"), [("Chrome", 45), ("Safari", 1)])
+        index = PropertyValuesIndex.for_events(self.team.pk, "$browser", ["$pageview", "$pageleave"])
+
+        assert index.get_values(None, limit=10) == [
+            ("Chrome", 55),
+            ("Mobile Chrome", 50),
+            ("Safari", 41),
+            ("Firefox", 5),
+        ]
+        assert index.get_values("chr", limit=10) == [("Chrome", 55), ("Mobile Chrome", 50)]
+        assert index.get_values("ro", limit=1) == [("Chrome", 55)]
+        assert index.get_values("opera", limit=10) == []
+
+    def test_searches_the_long_tail_of_incomplete_indexes_with_a_scan(self) -> None:
+        store_property_values_index(self._entry(key="email"), [(f"user{i}@posthog.com", 1) for i in range(INDEX_SIZE)])
+        index = PropertyValuesIndex.for_events(self.team.pk, "email")
+
+        assert index.get_values("user1@", limit=10) == [("user1@posthog.com", 1)]
+        assert index.get_values("someone@example.com", limit=10) is None
+
+    def test_stops_refreshing_properties_that_are_not_requested(self) -> None:
+        with freeze_time("2024-01-01"):
+            PropertyValuesIndex.for_persons(self.team.pk, "email")._get_indexes()
+        with freeze_time("2024-01-06"):
+            PropertyValuesIndex.for_events(self.team.pk, "$browser")._get_indexes()
+
+        with freeze_time("2024-01-10"):
+            assert get_requested_entries() == [self._entry()]
+        assert redis.get_client().zcard(REQUESTED_KEY) == 1
+
+    @override_settings(USE_PROPERTY_VALUES_INDEX=True)
+    @patch("posthog.queries.property_values.insight_sync_execute")
+    def test_values_are_served_from_the_index_without_scanning(self, mock_execute: MagicMock) -> None:
+        store_property_values_index(self._entry(), [("Chrome", 10)])
+        store_property_values_index(
+            PropertyValuesIndexEntry(team_id=self.team.pk, property_type="person", key="email"),
+            [("jacob@posthog.com", 2)],
+        )
+
+        assert get_property_values_for_key("$browser", self.team, value="chr") == [("Chrome", 10)]
+        assert get_person_property_values_for_key("email", self.team, value="jacob") == [("jacob@posthog.com", 2)]
+        mock_execute.assert_not_called()
+
+    @patch("posthog.tasks.property_values_index.get_top_property_values_for_key")
+    def test_build_task_stores_top_values(self, mock_get_top_values: MagicMock) -> None:
+        mock_get_top_values.return_value = [("Chrome", 10), ("Safari", 5)]
+
+        build_property_values_index(self.team.pk, "event", "$browser", "$pageview")
+
+        mock_get_top_values.assert_called_once_with("$browser", self.team, "$pageview", INDEX_SIZE)
+        index = PropertyValuesIndex.for_events(self.team.pk, "$browser", ["$pageview"])
+        assert index.get_values(None, limit=10) == [("Chrome", 10), ("Safari", 5)]
+
+    @patch("posthog.tasks.property_values_index.build_property_values_index.delay")
+    def test_refresh_task_builds_requested_indexes(self, mock_delay: MagicMock) -> None:
+        PropertyValuesIndex.for_persons(self.team.pk, "email")._get_indexes()
+
+        refresh_property_values_indexes()
+
+        mock_delay.assert_called_once_with(self.team.pk, "person", "email", None)
@@ -2500,6 +2500,10 @@ class QueryResponseAlternative1(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2527,6 +2531,10 @@ class QueryResponseAlternative2(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2707,6 +2715,10 @@ class QueryResponseAlternative17(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2734,6 +2746,10 @@ class QueryResponseAlternative18(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3518,6 +3534,10 @@ class ActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3804,6 +3824,10 @@ class CachedActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: int
     query_status: Optional[QueryStatus] = Field(
@@ -3903,6 +3927,10 @@ class CachedEventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
@@ -4476,6 +4504,10 @@ class Response(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -4503,6 +4535,10 @@ class Response1(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -4934,6 +4970,10 @@ class EventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page, when the query was paginated with a cursor",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -5976,6 +6016,10 @@ class EventsQuery(BaseModel):
     actionId: Optional[int] = Field(default=None, description="Show events matching a given action")
     after: Optional[str] = Field(default=None, description="Only fetch events that happened after this timestamp")
     before: Optional[str] = Field(default=None, description="Only fetch events that happened before this timestamp")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Continue after the last row of a previous page, from its `nextCursor`, or pass an empty string to start paginating with cursors. Takes precedence over `offset`",
+    )
     event: Optional[str] = Field(default=None, description="Limit to events matching this string")
     filterTestAccounts: Optional[bool] = Field(default=None, description="Filter test accounts")
     fixedProperties: Optional[
@@ -6835,6 +6879,10 @@ class ActorsQuery(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Continue after the last row of a previous page, from its `nextCursor`, or pass an empty string to start paginating with cursors. Takes precedence over `offset`",
+    )
     fixedProperties: Optional[
         list[Union[PersonPropertyFilter, CohortPropertyFilter, HogQLPropertyFilter, EmptyPropertyFilter]]
     ] = Field(
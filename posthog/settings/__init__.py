@@ -112,6 +112,21 @@ IN_EVAL_TESTING: bool = get_from_env("DEEPEVAL", False, type_cast=str_to_bool)
 
 HOGQL_INCREASED_MAX_EXECUTION_TIME: int = get_from_env("HOGQL_INCREASED_MAX_EXECUTION_TIME", 600, type_cast=int)
 
+# Process-local cache of built HogQL databases, see posthog/hogql/database/cache.py
+HOGQL_DATABASE_CACHE_ENABLED: bool = get_from_env("HOGQL_DATABASE_CACHE_ENABLED", not TEST, type_cast=str_to_bool)
+HOGQL_DATABASE_CACHE_MAX_SIZE: int = get_from_env("HOGQL_DATABASE_CACHE_MAX_SIZE", 256, type_cast=int)
+
+# Process-local cache of printed HogQL queries, see posthog/hogql/compiled_query_cache.py
+HOGQL_COMPILED_QUERY_CACHE_ENABLED: bool = get_from_env(
+    "HOGQL_COMPILED_QUERY_CACHE_ENABLED", not TEST, type_cast=str_to_bool
+)
+HOGQL_COMPILED_QUERY_CACHE_MAX_SIZE: int = get_from_env("HOGQL_COMPILED_QUERY_CACHE_MAX_SIZE", 1024, type_cast=int)
+HOGQL_COMPILED_QUERY_CACHE_TTL: int = get_from_env("HOGQL_COMPILED_QUERY_CACHE_TTL", 300, type_cast=int)
+
+# Process-wide pool for the sub-queries of query runners, see posthog/hogql_queries/query_executor.py
+QUERY_EXECUTOR_MAX_WORKERS: int = get_from_env("QUERY_EXECUTOR_MAX_WORKERS", 16, type_cast=int)
+QUERY_EXECUTOR_MAX_CONCURRENT_PER_TEAM: int = get_from_env("QUERY_EXECUTOR_MAX_CONCURRENT_PER_TEAM", 4, type_cast=int)
+
 # Extend and override these settings with EE's ones
 if "ee.apps.EnterpriseConfig" in INSTALLED_APPS:
     from ee.settings import *  # noqa: F401, F403
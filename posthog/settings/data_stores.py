@@ -306,6 +306,14 @@ if not REDIS_URL:
 # can cope with compressed and uncompressed reading at the same time
 USE_REDIS_COMPRESSION = get_from_env("USE_REDIS_COMPRESSION", True, type_cast=str_to_bool)
 
+# Controls whether query results are written to the cache compressed with zstd dictionaries trained per query kind,
+# see the train_query_cache_dictionaries management command. Results written this way can be read either way.
+USE_QUERY_CACHE_ZSTD_DICTIONARIES = get_from_env("USE_QUERY_CACHE_ZSTD_DICTIONARIES", False, type_cast=str_to_bool)
+
+# Controls whether property value suggestions are served from an index of the top values of each property in Redis,
+# kept up to date by the refresh_property_values_indexes task, instead of scanning events or persons on every request.
+USE_PROPERTY_VALUES_INDEX = get_from_env("USE_PROPERTY_VALUES_INDEX", False, type_cast=str_to_bool)
+
 # AWS ElastiCache supports "reader" endpoints.
 # See "Finding a Redis (Cluster Mode Disabled) Cluster's Endpoints (Console)"
 # on https://docs.aws.amazon.com/AmazonElastiCache/latest/red-ug/Endpoints.html#Endpoints.Find.Redis
@@ -338,6 +346,7 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "COMPRESSOR": "posthog.caching.tolerant_zlib_compressor.TolerantZlibCompressor",
+            "SERIALIZER": "posthog.caching.query_results_serializer.QueryResultsSerializer",
         },
         "KEY_PREFIX": "posthog",
     }
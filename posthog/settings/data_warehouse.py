@@ -1,5 +1,5 @@
 import os
-from posthog.settings.utils import get_list
+from posthog.settings.utils import get_from_env, get_list, str_to_bool
 
 AIRBYTE_API_KEY = os.getenv("AIRBYTE_API_KEY", None)
 AIRBYTE_BUCKET_REGION = os.getenv("AIRBYTE_BUCKET_REGION", None)
@@ -12,3 +12,37 @@ AIRBYTE_BUCKET_NAME = os.getenv("AIRBYTE_BUCKET_NAME", None)
 BUCKET = "test-pipeline"
 
 V2_PIPELINE_ENABLED_TEAM_IDS = get_list(os.getenv("V2_PIPELINE_ENABLED_TEAM_IDS", ""))
+
+# Pipelined imports overlap reading from the source with converting and committing to Delta in a worker thread.
+# Memory is bounded by the number of queued source chunks plus the size of one pending commit.
+DATA_WAREHOUSE_PIPELINED_IMPORT_ENABLED: bool = get_from_env(
+    "DATA_WAREHOUSE_PIPELINED_IMPORT_ENABLED", False, type_cast=str_to_bool
+)
+DATA_WAREHOUSE_PIPELINE_MAX_QUEUED_CHUNKS: int = get_from_env(
+    "DATA_WAREHOUSE_PIPELINE_MAX_QUEUED_CHUNKS", 4, type_cast=int
+)
+DATA_WAREHOUSE_PIPELINE_COMMIT_TARGET_BYTES: int = get_from_env(
+    "DATA_WAREHOUSE_PIPELINE_COMMIT_TARGET_BYTES", 128 * 1024 * 1024, type_cast=int
+)
+
+# Incremental chunks are staged and merged into Delta together once this many bytes are staged, 0 merges every chunk
+DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES: int = get_from_env(
+    "DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES", 256 * 1024 * 1024, type_cast=int
+)
+# Compact (and Z-order on the primary keys) Delta tables that have at least this many files after a sync
+DATA_WAREHOUSE_COMPACTION_ENABLED: bool = get_from_env(
+    "DATA_WAREHOUSE_COMPACTION_ENABLED", False, type_cast=str_to_bool
+)
+DATA_WAREHOUSE_COMPACTION_MIN_FILE_COUNT: int = get_from_env(
+    "DATA_WAREHOUSE_COMPACTION_MIN_FILE_COUNT", 50, type_cast=int
+)
+# Z-ordering rewrites the whole table, so bigger tables are left alone to keep syncs from running long
+DATA_WAREHOUSE_COMPACTION_MAX_BYTES: int = get_from_env(
+    "DATA_WAREHOUSE_COMPACTION_MAX_BYTES", 5 * 1024 * 1024 * 1024, type_cast=int
+)
+DATA_WAREHOUSE_COMPACTION_MAX_CONCURRENT_TASKS: int = get_from_env(
+    "DATA_WAREHOUSE_COMPACTION_MAX_CONCURRENT_TASKS", 2, type_cast=int
+)
+DATA_WAREHOUSE_COMPACTION_COMMIT_INTERVAL_SECONDS: int = get_from_env(
+    "DATA_WAREHOUSE_COMPACTION_COMMIT_INTERVAL_SECONDS", 300, type_cast=int
+)
@@ -1,5 +1,5 @@
 from posthog.settings.base_variables import TEST
-from posthog.settings.utils import get_from_env
+from posthog.settings.utils import get_from_env, str_to_bool
 
 USE_PRECALCULATED_CH_COHORT_PEOPLE = not TEST
 
@@ -15,6 +15,11 @@ CALCULATE_COHORTS_NIGHT_SCHEDULE = get_from_env(
     "* 0-5,18-23 * * *",
 )
 CALCULATE_X_PARALLEL_COHORTS_DURING_NIGHT = get_from_env("CALCULATE_X_PARALLEL_COHORTS_DURING_NIGHT", 5, type_cast=int)
+# Maximum number of cohorts of a single team calculated at the same time, out of the parallel cohorts above.
+# Unset, a single team can use all of them.
+CALCULATE_X_PARALLEL_COHORTS_PER_TEAM = get_from_env(
+    "CALCULATE_X_PARALLEL_COHORTS_PER_TEAM", optional=True, type_cast=int
+)
 
 ACTION_EVENT_MAPPING_INTERVAL_SECONDS = get_from_env("ACTION_EVENT_MAPPING_INTERVAL_SECONDS", 300, type_cast=int)
 
@@ -37,6 +42,25 @@ COUNT_TILES_WITH_NO_FILTERS_HASH_INTERVAL_SECONDS = get_from_env(
 
 CACHED_RESULTS_TTL = 7 * 24 * 60 * 60  # how long to keep cached results for
 
+# When several requests miss the cache for the same query at once, only one of them calculates it. The others wait
+# up to QUERY_CALCULATION_WAIT_TIMEOUT seconds for its result. The lock expires on its own if its holder dies.
+QUERY_CALCULATION_LOCK_TTL = get_from_env("QUERY_CALCULATION_LOCK_TTL", 10 * 60, type_cast=int)
+QUERY_CALCULATION_WAIT_TIMEOUT = get_from_env("QUERY_CALCULATION_WAIT_TIMEOUT", 30, type_cast=float)
+
+# Stale trends results are recalculated only for the intervals that ended less than
+# TRENDS_INCREMENTAL_CALCULATION_FROZEN_LAG seconds before the result was cached, as older intervals can't change
+# anymore (short of late-arriving events). Results older than TRENDS_INCREMENTAL_CALCULATION_MAX_AGE seconds are
+# always recalculated in full, which also picks up those late events.
+TRENDS_INCREMENTAL_CALCULATION_ENABLED = get_from_env(
+    "TRENDS_INCREMENTAL_CALCULATION_ENABLED", not TEST, type_cast=str_to_bool
+)
+TRENDS_INCREMENTAL_CALCULATION_FROZEN_LAG = get_from_env(
+    "TRENDS_INCREMENTAL_CALCULATION_FROZEN_LAG", 60 * 60, type_cast=int
+)
+TRENDS_INCREMENTAL_CALCULATION_MAX_AGE = get_from_env(
+    "TRENDS_INCREMENTAL_CALCULATION_MAX_AGE", 24 * 60 * 60, type_cast=int
+)
+
 # Schedule to run asynchronous data deletion on. Follows crontab syntax.
 # Use empty string to prevent this
 CLEAR_CLICKHOUSE_REMOVED_DATA_SCHEDULE_CRON = get_from_env(
@@ -19,6 +19,18 @@ BATCH_EXPORT_S3_UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024 * 50  # 50MB
 BATCH_EXPORT_S3_RECORD_BATCH_QUEUE_MAX_SIZE_BYTES: int = get_from_env(
     "BATCH_EXPORT_S3_RECORD_BATCH_QUEUE_MAX_SIZE_BYTES", 0, type_cast=int
 )
+# How many parts of a multi-part upload are uploaded at a time, while the next part is being written.
+BATCH_EXPORT_S3_UPLOAD_MAX_CONCURRENT_PARTS: int = get_from_env(
+    "BATCH_EXPORT_S3_UPLOAD_MAX_CONCURRENT_PARTS", 2, type_cast=int
+)
+# Backfills of events are split in time shards of roughly this many events, and up to this many shards are
+# queried at the same time. Shards are still exported in order. A single shard means a single query.
+BATCH_EXPORT_BACKFILL_MAX_CONCURRENT_SHARDS: int = get_from_env(
+    "BATCH_EXPORT_BACKFILL_MAX_CONCURRENT_SHARDS", 1, type_cast=int
+)
+BATCH_EXPORT_BACKFILL_SHARD_TARGET_ROWS: int = get_from_env(
+    "BATCH_EXPORT_BACKFILL_SHARD_TARGET_ROWS", 10_000_000, type_cast=int
+)
 BATCH_EXPORT_SNOWFLAKE_UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024 * 100  # 100MB
 BATCH_EXPORT_POSTGRES_UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024 * 50  # 50MB
 BATCH_EXPORT_BIGQUERY_UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024 * 100  # 100MB
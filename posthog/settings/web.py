@@ -35,6 +35,10 @@ DECIDE_SHORT_CIRCUITED_TEAM_IDS = [0]
 # Decide db settings
 
 DECIDE_SKIP_POSTGRES_FLAGS = get_from_env("DECIDE_SKIP_POSTGRES_FLAGS", False, type_cast=str_to_bool)
+# Fetch the person and groups once and evaluate flag conditions in process, instead of one query column per condition
+DECIDE_EVALUATE_FLAGS_IN_PROCESS = get_from_env("DECIDE_EVALUATE_FLAGS_IN_PROCESS", False, type_cast=str_to_bool)
+# Number of teams whose deserialized flags each process keeps around, 0 to always deserialize them from Redis
+DECIDE_FLAG_DEFINITIONS_CACHE_MAX_SIZE = get_from_env("DECIDE_FLAG_DEFINITIONS_CACHE_MAX_SIZE", 1000, type_cast=int)
 
 # Decide billing analytics
 
@@ -57,6 +61,13 @@ DECIDE_SKIP_HASH_KEY_OVERRIDE_WRITES = get_from_env(
 # if `true` we disable session replay if over quota
 DECIDE_SESSION_REPLAY_QUOTA_CHECK = get_from_env("DECIDE_SESSION_REPLAY_QUOTA_CHECK", False, type_cast=str_to_bool)
 
+# Usage reports
+
+# Number of usage report queries run at the same time
+USAGE_REPORT_MAX_CONCURRENT_QUERIES = get_from_env("USAGE_REPORT_MAX_CONCURRENT_QUERIES", 4, type_cast=int)
+# How long the results of usage report queries are kept in Redis for retries of the report to reuse
+USAGE_REPORT_CHECKPOINT_TTL_SECONDS = get_from_env("USAGE_REPORT_CHECKPOINT_TTL_SECONDS", 60 * 60 * 12, type_cast=int)
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -12,6 +12,7 @@ from . import (
     integrations,
     plugin_server,
     process_scheduled_changes,
+    property_values_index,
     remote_config,
     split_person,
     sync_all_organization_available_product_features,
@@ -35,6 +36,7 @@ __all__ = [
     "integrations",
     "plugin_server",
     "process_scheduled_changes",
+    "property_values_index",
     "remote_config",
     "split_person",
     "sync_all_organization_available_product_features",
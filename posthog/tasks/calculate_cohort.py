@@ -1,4 +1,8 @@
+import hashlib
+import json
 import time
+from collections import defaultdict
+from graphlib import CycleError, TopologicalSorter
 from typing import Any, Optional
 
 from django.conf import settings
@@ -7,17 +11,18 @@ from posthog.models.team.team import Team
 import structlog
 from celery import shared_task
 from dateutil.relativedelta import relativedelta
-from django.db.models import F, ExpressionWrapper, DurationField, Q
+from django.db.models import F, ExpressionWrapper, DurationField, Q, QuerySet
 from django.utils import timezone
-from prometheus_client import Gauge
+from prometheus_client import Counter, Gauge
 from sentry_sdk import capture_exception, set_tag
 
 from datetime import timedelta
 
+from posthog import redis
 from posthog.api.monitoring import Feature
 from posthog.models import Cohort
 from posthog.models.cohort import get_and_update_pending_version
-from posthog.models.cohort.util import clear_stale_cohortpeople, get_static_cohort_size
+from posthog.models.cohort.util import clear_stale_cohortpeople, get_cohort_dependency_ids, get_static_cohort_size
 from posthog.models.user import User
 
 COHORT_RECALCULATIONS_BACKLOG_GAUGE = Gauge(
@@ -30,17 +35,38 @@ COHORT_STALENESS_HOURS_GAUGE = Gauge(
     "Cohort's count of hours since last calculation",
 )
 
+COHORT_RECALCULATIONS_SKIPPED_COUNTER = Counter(
+    "cohort_recalculations_skipped",
+    "Number of cohorts not recalculated because none of their inputs changed since their last calculation",
+)
+
 logger = structlog.get_logger(__name__)
 
 MAX_AGE_MINUTES = 15
 
+# Due cohorts looked at per calculation slot, so that cohorts waiting on their dependencies don't hold up others
+CANDIDATES_PER_SLOT = 10
+
+# Sorted set of "{team_id}:{cohort_id}:{pending_version}" of the calculations in flight, scored by when they stop
+# counting as running. The version tells apart calculations of the same cohort, e.g. one started from the API.
+RUNNING_CALCULATIONS_KEY = "cohort_calculations:running"
+# Calculations that never finish, e.g. because their worker died, free their slot after this
+RUNNING_CALCULATION_TTL = timedelta(minutes=30)
+
+INPUTS_FINGERPRINT_KEY = "cohort_calculations:inputs:{cohort_id}"
+INPUTS_FINGERPRINT_TTL = timedelta(days=7)
+
 
 def calculate_cohorts(parallel_count: int) -> None:
     """
     Calculates maximum N cohorts in parallel.
 
+    Cohorts are calculated only once the cohorts they depend on aren't due or being calculated anymore, so that they
+    use their latest people. Cohorts that only consist of other cohorts aren't recalculated until one of those has a
+    new version or their filters change.
+
     Args:
-        parallel_count: Maximum number of cohorts to calculate in parallel.
+        parallel_count: Maximum number of cohorts to calculate in parallel, across all teams.
     """
 
     # This task will be run every minute
@@ -52,7 +78,7 @@ def calculate_cohorts(parallel_count: int) -> None:
         output_field=DurationField(),
     )
 
-    for cohort in (
+    due_cohorts = (
         Cohort.objects.filter(
             deleted=False,
             is_calculating=False,
@@ -65,10 +91,40 @@ def calculate_cohorts(parallel_count: int) -> None:
             | Q(last_error_at__isnull=True)  # backwards compatability cohorts before last_error_at was introduced
         )
         .exclude(is_static=True)
-        .order_by(F("last_calculation").asc(nulls_first=True))[0:parallel_count]
-    ):
-        cohort = Cohort.objects.filter(pk=cohort.pk).get()
-        update_cohort(cohort, initiating_user=None)
+        .select_related("team")
+    )
+
+    running_calculations = get_running_calculations()
+    budget = parallel_count - len(running_calculations)
+    team_parallel_count = settings.CALCULATE_X_PARALLEL_COHORTS_PER_TEAM or parallel_count
+    team_budgets: dict[int, int] = defaultdict(lambda: team_parallel_count)
+    for team_id, _ in running_calculations:
+        team_budgets[team_id] -= 1
+
+    if budget > 0:
+        candidates = list(
+            due_cohorts.order_by(F("last_calculation").asc(nulls_first=True))[0 : parallel_count * CANDIDATES_PER_SLOT]
+        )
+        running_cohort_ids = {cohort_id for _, cohort_id in running_calculations}
+        for cohort in get_ready_cohorts(candidates, due_cohorts, running_cohort_ids):
+            if budget <= 0:
+                break
+            if team_budgets[cohort.team_id] <= 0:
+                continue
+
+            inputs_fingerprint = get_inputs_fingerprint(cohort)
+            if inputs_fingerprint is not None and inputs_fingerprint == get_last_inputs_fingerprint(cohort):
+                # Its people are those of its last successful calculation, whatever happened since
+                Cohort.objects.filter(pk=cohort.pk).update(
+                    last_calculation=timezone.now(), errors_calculating=0, last_error_at=None
+                )
+                COHORT_RECALCULATIONS_SKIPPED_COUNTER.inc()
+                continue
+
+            cohort = Cohort.objects.filter(pk=cohort.pk).get()
+            update_cohort(cohort, initiating_user=None)
+            budget -= 1
+            team_budgets[cohort.team_id] -= 1
 
     # update gauge
     backlog = (
@@ -84,8 +140,91 @@ def calculate_cohorts(parallel_count: int) -> None:
     COHORT_RECALCULATIONS_BACKLOG_GAUGE.set(backlog)
 
 
+def get_ready_cohorts(
+    candidates: list[Cohort], due_cohorts: QuerySet[Cohort], running_cohort_ids: set[int]
+) -> list[Cohort]:
+    """
+    Returns the cohorts out of the candidates that can be calculated now, oldest first. Cohorts that depend on a cohort
+    that is due or being calculated wait for it, as they would be calculated from its outdated people otherwise.
+    """
+    cohorts = {cohort.pk: cohort for cohort in candidates}
+    dependency_ids = {cohort.pk: set(get_cohort_dependency_ids(cohort)) for cohort in candidates}
+
+    # Dependencies that are due but weren't among the candidates are calculated first, instead of being waited on
+    missing_dependency_ids = set().union(*dependency_ids.values()) - cohorts.keys() - running_cohort_ids
+    for cohort in due_cohorts.filter(pk__in=missing_dependency_ids):
+        cohorts[cohort.pk] = cohort
+        dependency_ids[cohort.pk] = set(get_cohort_dependency_ids(cohort))
+
+    pending_ids = cohorts.keys() | running_cohort_ids
+    graphs: dict[int, dict[int, set[int]]] = defaultdict(dict)
+    for cohort in cohorts.values():
+        # Cohorts can only depend on cohorts of the same project
+        graphs[cohort.team.project_id][cohort.pk] = dependency_ids[cohort.pk] & pending_ids
+
+    ready_ids: set[int] = set()
+    for project_id, graph in graphs.items():
+        sorter = TopologicalSorter(graph)
+        try:
+            sorter.prepare()
+        except CycleError as e:
+            # Cycles are rejected when saving cohorts, but older cohorts may still have them. Rather than waiting on
+            # each other forever, the cohorts of the project are calculated oldest first like they used to be.
+            logger.warning("cohort_dependency_cycle", project_id=project_id, cycle=e.args[1])
+            ready_ids.update(graph.keys())
+        else:
+            ready_ids.update(sorter.get_ready())
+
+    return [cohort for cohort in cohorts.values() if cohort.pk in ready_ids and cohort.pk not in running_cohort_ids]
+
+
+def get_inputs_fingerprint(cohort: Cohort) -> Optional[str]:
+    """
+    Fingerprints what the people of a cohort are calculated from, for cohorts that only consist of other cohorts.
+    Returns None for any other cohort, since the persons and events their filters match change all the time.
+    """
+    properties = cohort.properties.flat
+    if not properties or any(prop.type != "cohort" for prop in properties):
+        return None
+
+    dependency_ids = set(get_cohort_dependency_ids(cohort))
+    dependencies = sorted(
+        Cohort.objects.filter(pk__in=dependency_ids).values_list("pk", "version", "deleted", "is_static")
+    )
+    # Static cohorts change without getting a new version
+    if len(dependencies) != len(dependency_ids) or any(is_static for *_, is_static in dependencies):
+        return None
+
+    inputs = {"filters": cohort.filters, "groups": cohort.groups, "dependencies": dependencies}
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_last_inputs_fingerprint(cohort: Cohort) -> Optional[str]:
+    fingerprint = redis.get_client().get(INPUTS_FINGERPRINT_KEY.format(cohort_id=cohort.pk))
+    return fingerprint.decode("utf-8") if fingerprint is not None else None
+
+
+def get_running_calculations() -> list[tuple[int, int]]:
+    """Returns the team and cohort IDs of the cohort calculations in flight."""
+    client = redis.get_client()
+    client.zremrangebyscore(RUNNING_CALCULATIONS_KEY, "-inf", time.time())
+    running_calculations = []
+    for member in client.zrange(RUNNING_CALCULATIONS_KEY, 0, -1):
+        team_id, cohort_id, *_ = member.decode("utf-8").split(":")
+        running_calculations.append((int(team_id), int(cohort_id)))
+    return running_calculations
+
+
+def _running_calculation_member(cohort: Cohort, pending_version: int) -> str:
+    return f"{cohort.team_id}:{cohort.pk}:{pending_version}"
+
+
 def update_cohort(cohort: Cohort, *, initiating_user: Optional[User]) -> None:
     pending_version = get_and_update_pending_version(cohort)
+    redis.get_client().zadd(
+        RUNNING_CALCULATIONS_KEY,
+        {_running_calculation_member(cohort, pending_version): time.time() + RUNNING_CALCULATION_TTL.total_seconds()},
+    )
     calculate_cohort_ch.delay(cohort.id, pending_version, initiating_user.id if initiating_user else None)
 
 
@@ -108,7 +247,17 @@ def calculate_cohort_ch(cohort_id: int, pending_version: int, initiating_user_id
         staleness_hours = (timezone.now() - cohort.last_calculation).total_seconds() / 3600
     COHORT_STALENESS_HOURS_GAUGE.set(staleness_hours)
 
-    cohort.calculate_people_ch(pending_version, initiating_user_id=initiating_user_id)
+    # Taken before calculating, so that dependencies getting a new version in the meantime trigger a recalculation
+    inputs_fingerprint = get_inputs_fingerprint(cohort)
+    try:
+        cohort.calculate_people_ch(pending_version, initiating_user_id=initiating_user_id)
+    finally:
+        redis.get_client().zrem(RUNNING_CALCULATIONS_KEY, _running_calculation_member(cohort, pending_version))
+
+    if inputs_fingerprint is not None:
+        redis.get_client().set(
+            INPUTS_FINGERPRINT_KEY.format(cohort_id=cohort.pk), inputs_fingerprint, ex=INPUTS_FINGERPRINT_TTL
+        )
 
 
 @shared_task(ignore_result=True, max_retries=1)
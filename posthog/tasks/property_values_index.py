@@ -0,0 +1,41 @@
+from typing import Optional
+
+import structlog
+from celery import shared_task
+
+from posthog.models.team import Team
+from posthog.queries.property_values import get_top_person_property_values_for_key, get_top_property_values_for_key
+from posthog.queries.property_values_index import (
+    INDEX_SIZE,
+    PropertyType,
+    PropertyValuesIndexEntry,
+    get_requested_entries,
+    store_property_values_index,
+)
+from posthog.tasks.utils import CeleryQueue
+
+logger = structlog.get_logger(__name__)
+
+
+@shared_task(ignore_result=True, queue=CeleryQueue.LONG_RUNNING.value)
+def build_property_values_index(team_id: int, property_type: PropertyType, key: str, event: Optional[str]) -> None:
+    try:
+        team = Team.objects.get(id=team_id)
+    except Team.DoesNotExist:
+        logger.warning("Team does not exist", team_id=team_id)
+        return
+
+    if property_type == "person":
+        rows = get_top_person_property_values_for_key(key, team, INDEX_SIZE)
+    else:
+        rows = get_top_property_values_for_key(key, team, event, INDEX_SIZE)
+
+    entry = PropertyValuesIndexEntry(team_id=team_id, property_type=property_type, key=key, event=event)
+    store_property_values_index(entry, [(str(value), count) for value, count in rows])
+
+
+@shared_task(ignore_result=True)
+def refresh_property_values_indexes() -> None:
+    # Only the properties someone looked up values for recently are kept up to date
+    for entry in get_requested_entries():
+        build_property_values_index.delay(entry.team_id, entry.property_type, entry.key, entry.event)
@@ -16,6 +16,7 @@ from posthog.tasks.alerts.checks import (
 )
 from posthog.tasks.integrations import refresh_integrations
 from posthog.tasks.periodic_digest import send_all_periodic_digest_reports
+from posthog.tasks.property_values_index import refresh_property_values_indexes
 from posthog.tasks.tasks import (
     calculate_cohort,
     calculate_decide_usage,
@@ -165,6 +166,14 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
     if settings.INGESTION_LAG_METRIC_TEAM_IDS:
         sender.add_periodic_task(60, ingestion_lag.s(), name="ingestion lag")
 
+    if settings.USE_PROPERTY_VALUES_INDEX:
+        add_periodic_task_with_expiry(
+            sender,
+            3600,
+            refresh_property_values_indexes.s(),
+            name="refresh property values indexes",
+        )
+
     add_periodic_task_with_expiry(
         sender,
         120,
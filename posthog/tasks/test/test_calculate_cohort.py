@@ -3,14 +3,28 @@ from django.utils import timezone
 from dateutil.relativedelta import relativedelta
 from unittest.mock import MagicMock, patch
 
+from django.test import override_settings
 from freezegun import freeze_time
 
 from posthog.models.cohort import Cohort
 from posthog.models.person import Person
-from posthog.tasks.calculate_cohort import calculate_cohort_from_list, calculate_cohorts, MAX_AGE_MINUTES
+from posthog.tasks.calculate_cohort import (
+    calculate_cohort_ch,
+    calculate_cohort_from_list,
+    calculate_cohorts,
+    get_inputs_fingerprint,
+    get_last_inputs_fingerprint,
+    get_running_calculations,
+    update_cohort,
+    MAX_AGE_MINUTES,
+)
 from posthog.test.base import APIBaseTest
 
 
+def cohort_filters(*properties: dict) -> dict:
+    return {"properties": {"type": "AND", "values": list(properties)}}
+
+
 def calculate_cohort_test_factory(event_factory: Callable, person_factory: Callable):  # type: ignore
     class TestCalculateCohort(APIBaseTest):
         @patch("posthog.tasks.calculate_cohort.calculate_cohort_from_list.delay")
@@ -91,4 +105,145 @@ def calculate_cohort_test_factory(event_factory: Callable, person_factory: Calla
             calculate_cohorts(5)
             self.assertEqual(patch_update_cohort.call_count, 2)
 
+        def _create_due_cohort(self, *properties: dict, minutes_ago: int = MAX_AGE_MINUTES + 1) -> Cohort:
+            return Cohort.objects.create(
+                team_id=self.team.pk,
+                filters=cohort_filters(*properties),
+                last_calculation=timezone.now() - relativedelta(minutes=minutes_ago),
+            )
+
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_calculates_dependencies_before_dependents(self, patch_update_cohort: MagicMock) -> None:
+            base = self._create_due_cohort({"key": "email", "value": "a@posthog.com", "type": "person"})
+            # the dependent is older, but has to wait for the cohort it consists of
+            dependent = self._create_due_cohort({"key": "id", "value": base.pk, "type": "cohort"}, minutes_ago=60)
+
+            calculate_cohorts(5)
+
+            self.assertEqual([call.args[0].pk for call in patch_update_cohort.call_args_list], [base.pk])
+
+            Cohort.objects.filter(pk=base.pk).update(last_calculation=timezone.now())
+            patch_update_cohort.reset_mock()
+            calculate_cohorts(5)
+
+            self.assertEqual([call.args[0].pk for call in patch_update_cohort.call_args_list], [dependent.pk])
+
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_pulls_in_due_dependencies_of_candidates(self, patch_update_cohort: MagicMock) -> None:
+            base = self._create_due_cohort({"key": "email", "value": "a@posthog.com", "type": "person"})
+            self._create_due_cohort({"key": "id", "value": base.pk, "type": "cohort"}, minutes_ago=60)
+
+            with patch("posthog.tasks.calculate_cohort.CANDIDATES_PER_SLOT", 1):
+                # only the dependent is among the oldest cohorts, but its dependency gets calculated first
+                calculate_cohorts(1)
+
+            self.assertEqual([call.args[0].pk for call in patch_update_cohort.call_args_list], [base.pk])
+
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_calculates_cohorts_with_dependency_cycles(self, patch_update_cohort: MagicMock) -> None:
+            first = self._create_due_cohort({"key": "email", "value": "a@posthog.com", "type": "person"})
+            second = self._create_due_cohort({"key": "id", "value": first.pk, "type": "cohort"})
+            first.filters = cohort_filters({"key": "id", "value": second.pk, "type": "cohort"})
+            first.save()
+
+            calculate_cohorts(5)
+
+            self.assertEqual({call.args[0].pk for call in patch_update_cohort.call_args_list}, {first.pk, second.pk})
+
+        @override_settings(CALCULATE_X_PARALLEL_COHORTS_PER_TEAM=2)
+        @patch("posthog.tasks.calculate_cohort.calculate_cohort_ch.delay")
+        def test_respects_team_and_global_budgets(self, patch_calculate_cohort_ch: MagicMock) -> None:
+            cohorts = [
+                self._create_due_cohort({"key": "email", "value": f"{i}@posthog.com", "type": "person"})
+                for i in range(4)
+            ]
+
+            calculate_cohorts(5)
+
+            self.assertEqual(patch_calculate_cohort_ch.call_count, 2)
+            self.assertEqual(len(get_running_calculations()), 2)
+
+            # the running calculations use up the team's budget until they finish
+            patch_calculate_cohort_ch.reset_mock()
+            calculate_cohorts(5)
+            self.assertEqual(patch_calculate_cohort_ch.call_count, 0)
+
+            with override_settings(CALCULATE_X_PARALLEL_COHORTS_PER_TEAM=5):
+                calculate_cohorts(3)
+            self.assertEqual(patch_calculate_cohort_ch.call_count, 1)
+            self.assertEqual(
+                {cohort_id for _, cohort_id in get_running_calculations()},
+                {cohort.pk for cohort in cohorts[:3]},
+            )
+
+        @override_settings(CALCULATE_X_PARALLEL_COHORTS_PER_TEAM=None)
+        @patch("posthog.tasks.calculate_cohort.calculate_cohort_ch.delay")
+        def test_teams_can_use_all_parallel_calculations_by_default(self, patch_calculate_cohort_ch: MagicMock) -> None:
+            for i in range(4):
+                self._create_due_cohort({"key": "email", "value": f"{i}@posthog.com", "type": "person"})
+
+            calculate_cohorts(3)
+
+            self.assertEqual(patch_calculate_cohort_ch.call_count, 3)
+
+        @patch("posthog.models.cohort.Cohort.calculate_people_ch")
+        @patch("posthog.tasks.calculate_cohort.calculate_cohort_ch.delay")
+        def test_finishing_calculation_keeps_concurrent_calculations_of_the_cohort_running(
+            self, patch_calculate_cohort_ch: MagicMock, patch_calculate_people_ch: MagicMock
+        ) -> None:
+            cohort = self._create_due_cohort({"key": "email", "value": "a@posthog.com", "type": "person"})
+
+            update_cohort(cohort, initiating_user=None)
+            # e.g. recalculated from the API while the scheduled calculation runs
+            update_cohort(cohort, initiating_user=None)
+            calculate_cohort_ch(cohort.pk, 1)
+
+            self.assertEqual(get_running_calculations(), [(self.team.pk, cohort.pk)])
+
+            calculate_cohort_ch(cohort.pk, 2)
+
+            self.assertEqual(get_running_calculations(), [])
+
+        @patch("posthog.models.cohort.Cohort.calculate_people_ch")
+        @patch("posthog.tasks.calculate_cohort.calculate_cohort_ch.delay")
+        def test_skips_cohorts_whose_inputs_have_not_changed(
+            self, patch_calculate_cohort_ch: MagicMock, patch_calculate_people_ch: MagicMock
+        ) -> None:
+            base = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters=cohort_filters({"key": "email", "value": "a@posthog.com", "type": "person"}),
+                last_calculation=timezone.now(),
+                version=1,
+            )
+            dependent = self._create_due_cohort({"key": "id", "value": base.pk, "type": "cohort"})
+            self.assertIsNone(get_inputs_fingerprint(base))
+
+            update_cohort(dependent, initiating_user=None)
+            calculate_cohort_ch(dependent.pk, 1)
+            self.assertEqual(get_running_calculations(), [])
+            self.assertEqual(get_last_inputs_fingerprint(dependent), get_inputs_fingerprint(dependent))
+
+            # a failed calculation since doesn't matter, its people are still those of the last one
+            Cohort.objects.filter(pk=dependent.pk).update(
+                errors_calculating=1, last_error_at=timezone.now() - relativedelta(hours=2)
+            )
+            patch_calculate_cohort_ch.reset_mock()
+            calculate_cohorts(5)
+
+            patch_calculate_cohort_ch.assert_not_called()
+            dependent.refresh_from_db()
+            assert dependent.last_calculation is not None
+            self.assertGreater(dependent.last_calculation, timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES))
+            self.assertEqual(dependent.errors_calculating, 0)
+            self.assertIsNone(dependent.last_error_at)
+
+            # a new version of the cohort it depends on makes it due again
+            Cohort.objects.filter(pk=base.pk).update(version=2)
+            Cohort.objects.filter(pk=dependent.pk).update(
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1)
+            )
+            calculate_cohorts(5)
+
+            self.assertEqual([call.args[0] for call in patch_calculate_cohort_ch.call_args_list], [dependent.pk])
+
     return TestCalculateCohort
@@ -7,7 +7,7 @@ import pytest
 import structlog
 from dateutil.relativedelta import relativedelta
 from dateutil.tz import tzutc
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from freezegun import freeze_time
 
@@ -34,9 +34,11 @@ from posthog.session_recordings.queries.test.session_replay_sql import (
     produce_replay_summary,
 )
 from posthog.tasks.usage_report import (
+    UsageDataCollector,
     OrgReport,
     _add_team_report_to_org_reports,
     _get_all_org_reports,
+    _get_all_usage_data,
     _get_all_usage_data_as_team_rows,
     _get_full_org_usage_report,
     _get_full_org_usage_report_as_dict,
@@ -45,6 +47,7 @@ from posthog.tasks.usage_report import (
     capture_event,
     capture_report,
     get_instance_metadata,
+    get_teams_with_hog_function_calls_in_period,
     send_all_org_usage_reports,
 )
 from posthog.test.base import (
@@ -984,6 +987,7 @@ class TestFeatureFlagsUsageReport(ClickhouseDestroyTablesMixin, TestCase, Clickh
         self.org_2_team_3 = Team.objects.create(pk=5, organization=self.org_2, name="Team 3 org 2")
 
     @snapshot_clickhouse_queries
+    @override_settings(USAGE_REPORT_MAX_CONCURRENT_QUERIES=1)  # Keeps the order of queries stable
     @patch("posthog.tasks.usage_report.Client")
     @patch("posthog.tasks.usage_report.send_report_to_billing_service")
     def test_usage_report_decide_requests(self, billing_task_mock: MagicMock, posthog_capture_mock: MagicMock) -> None:
@@ -1453,6 +1457,56 @@ class TestHogFunctionUsageReports(ClickhouseDestroyTablesMixin, TestCase, Clickh
         assert org_1_report["teams"]["4"]["hog_function_fetch_calls_in_period"] == 2
 
 
+class TestUsageDataCollection(APIBaseTest):
+    def test_retrying_only_reruns_failed_collectors(self) -> None:
+        ff_counts = MagicMock(return_value={"teams_with_ff_count": [(self.team.id, 2)]})
+        dashboard_counts = MagicMock(
+            side_effect=[
+                Exception("Collector failed"),
+                {"teams_with_dashboard_count": [(self.team.id, 3)]},
+                {"teams_with_dashboard_count": [(self.team.id, 4)]},
+            ]
+        )
+        collectors = (
+            UsageDataCollector("ff_counts", ff_counts),
+            UsageDataCollector("dashboard_counts", dashboard_counts, concurrent=False),
+        )
+        period_start, period_end = get_previous_day()
+
+        with patch("posthog.tasks.usage_report.USAGE_DATA_COLLECTORS", collectors):
+            with pytest.raises(Exception, match="Collector failed"):
+                _get_all_usage_data(period_start, period_end)
+
+            all_data = _get_all_usage_data(period_start, period_end)
+
+            assert ff_counts.call_count == 1
+            assert dashboard_counts.call_count == 2
+            assert all_data == {
+                "teams_with_ff_count": [[self.team.id, 2]],
+                "teams_with_dashboard_count": [(self.team.id, 3)],
+            }
+
+            # Checkpoints are cleared once all the data was collected
+            all_data = _get_all_usage_data(period_start, period_end)
+
+            assert ff_counts.call_count == 2
+            assert all_data["teams_with_dashboard_count"] == [(self.team.id, 4)]
+
+    @patch("posthog.tasks.usage_report.sync_execute")
+    def test_hog_function_calls_keep_a_row_per_metric(self, sync_execute_mock: MagicMock) -> None:
+        sync_execute_mock.return_value = [
+            (self.team.id, "succeeded", 2),
+            (self.team.id, "failed", 3),
+            (self.team.id, "fetch", 1),
+        ]
+        period_start, period_end = get_previous_day()
+
+        assert get_teams_with_hog_function_calls_in_period(period_start, period_end) == {
+            "calls": [(self.team.id, 2), (self.team.id, 3)],
+            "fetch_calls": [(self.team.id, 1)],
+        }
+
+
 class SendUsageTest(LicensedTestMixin, ClickhouseDestroyTablesMixin, APIBaseTest):
     def setUp(self) -> None:
         super().setUp()
@@ -1,7 +1,9 @@
 import dataclasses
+import json
 import os
 from collections import Counter
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Any, Literal, Optional, TypedDict, Union, cast
 
@@ -31,6 +33,7 @@ from posthog.models.plugin import PluginConfig
 from posthog.models.property.util import get_property_string_expr
 from posthog.models.team.team import Team
 from posthog.models.utils import namedtuplefetchall
+from posthog.redis import get_client
 from posthog.settings import CLICKHOUSE_CLUSTER, INSTANCE_TAG
 from posthog.tasks.utils import CeleryQueue
 from posthog.utils import (
@@ -437,50 +440,46 @@ def get_teams_with_billable_event_count_in_period(
 
 @timed_log()
 @retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_billable_enhanced_persons_event_count_in_period(
-    begin: datetime, end: datetime, count_distinct: bool = False
-) -> list[tuple[int, int]]:
-    # count only unique events
-    # Duplicate events will be eventually removed by ClickHouse and likely came from our library or pipeline.
-    # We shouldn't bill for these. However counting unique events is more expensive, and likely to fail on longer time ranges.
-    # So, we count uniques in small time periods only, controlled by the count_distinct parameter.
-    if count_distinct:
-        # Uses the same expression as the one used to de-duplicate events on the merge tree:
-        # https://github.com/PostHog/posthog/blob/master/posthog/models/event/sql.py#L92
-        distinct_expression = "distinct toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid)"
-    else:
-        distinct_expression = "1"
-
-    result = sync_execute(
-        f"""
-        SELECT team_id, count({distinct_expression}) as count
-        FROM events
-        WHERE timestamp between %(begin)s AND %(end)s AND event != '$feature_flag_called' AND event NOT IN ('survey sent', 'survey shown', 'survey dismissed') AND person_mode IN ('full', 'force_upgrade')
-        GROUP BY team_id
-    """,
-        {"begin": begin, "end": end},
-        workload=Workload.OFFLINE,
-        settings=CH_BILLING_SETTINGS,
-    )
-    return result
-
-
-@timed_log()
-@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_event_count_with_groups_in_period(begin: datetime, end: datetime) -> list[tuple[int, int]]:
-    result = sync_execute(
+def get_teams_with_event_counts_in_period(begin: datetime, end: datetime) -> dict[str, list[tuple[int, int]]]:
+    """
+    Counts all the metrics computed over the events of each team in one pass over the events table:
+    unique billable events, unique billable events with enhanced persons, events with groups, and survey responses.
+    """
+    # Unique events are counted with the same expression as the one used to de-duplicate events on the merge tree:
+    # https://github.com/PostHog/posthog/blob/master/posthog/models/event/sql.py#L92
+    results = sync_execute(
         """
-        SELECT team_id, count(1) as count
+        WITH
+            event != '$feature_flag_called' AND event NOT IN ('survey sent', 'survey shown', 'survey dismissed') AS is_billable,
+            person_mode IN ('full', 'force_upgrade') AS is_enhanced_persons
+        SELECT
+            team_id,
+            uniqExactIf(toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid), is_billable) AS event_count,
+            uniqExactIf(toDate(timestamp), event, cityHash64(distinct_id), cityHash64(uuid), is_billable AND is_enhanced_persons) AS enhanced_persons_event_count,
+            countIf($group_0 != '' OR $group_1 != '' OR $group_2 != '' OR $group_3 != '' OR $group_4 != '') AS event_count_with_groups,
+            countIf(event = 'survey sent') AS survey_responses_count
         FROM events
         WHERE timestamp between %(begin)s AND %(end)s
-        AND ($group_0 != '' OR $group_1 != '' OR $group_2 != '' OR $group_3 != '' OR $group_4 != '')
         GROUP BY team_id
     """,
         {"begin": begin, "end": end},
         workload=Workload.OFFLINE,
         settings=CH_BILLING_SETTINGS,
     )
-    return result
+
+    metrics: dict[str, list[tuple[int, int]]] = {
+        "event_count": [],
+        "enhanced_persons_event_count": [],
+        "event_count_with_groups": [],
+        "survey_responses_count": [],
+    }
+
+    for team_id, *counts in results:
+        for metric, count in zip(metrics.keys(), counts):
+            if count > 0:
+                metrics[metric].append((team_id, count))
+
+    return metrics
 
 
 @timed_log()
@@ -588,62 +587,126 @@ def get_teams_with_recording_count_in_period(
 
 @timed_log()
 @retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_query_metric(
-    begin: datetime,
-    end: datetime,
-    query_types: Optional[list[str]] = None,
-    access_method: str = "",
-    metric: Literal["read_bytes", "read_rows", "query_duration_ms"] = "read_bytes",
-) -> list[tuple[int, int]]:
-    if metric not in ["read_bytes", "read_rows", "query_duration_ms"]:
-        # :TRICKY: Inlined into the query below.
-        raise ValueError(f"Invalid metric {metric}")
+def get_teams_with_recording_counts_in_period(begin: datetime, end: datetime) -> dict[str, list[tuple[int, int]]]:
+    """
+    Counts the web and mobile recordings of each team in one pass, see `get_teams_with_recording_count_in_period`.
+    """
+    previous_begin = begin - (end - begin)
+
+    results = sync_execute(
+        """
+        SELECT team_id, countIf(snapshot_source_or_web = 'web') as web_count, countIf(snapshot_source_or_web = 'mobile') as mobile_count
+        FROM (
+            SELECT any(team_id) as team_id, session_id, ifNull(argMinMerge(snapshot_source), 'web') as snapshot_source_or_web
+            FROM session_replay_events
+            WHERE min_first_timestamp BETWEEN %(begin)s AND %(end)s
+            GROUP BY session_id
+        )
+        WHERE session_id NOT IN (
+            -- we want to exclude sessions that might have events with timestamps
+            -- before the period we are interested in
+            SELECT DISTINCT session_id
+            FROM session_replay_events
+            WHERE min_first_timestamp BETWEEN %(previous_begin)s AND %(begin)s
+            GROUP BY session_id
+        )
+        GROUP BY team_id
+    """,
+        {"previous_begin": previous_begin, "begin": begin, "end": end},
+        workload=Workload.OFFLINE,
+        settings=CH_BILLING_SETTINGS,
+    )
 
-    query_types_clause = "AND query_type IN (%(query_types)s)" if query_types and len(query_types) > 0 else ""
+    metrics: dict[str, list[tuple[int, int]]] = {"web": [], "mobile": []}
 
-    query = f"""
+    for team_id, web_count, mobile_count in results:
+        if web_count > 0:
+            metrics["web"].append((team_id, web_count))
+        if mobile_count > 0:
+            metrics["mobile"].append((team_id, mobile_count))
+
+    return metrics
+
+
+QUERY_METRIC_COLUMNS = {
+    "bytes_read": "read_bytes",
+    "rows_read": "read_rows",
+    "duration_ms": "query_duration_ms",
+}
+QUERY_METRIC_ACCESS_METHODS = {
+    "app": "",
+    "api": "personal_api_key",
+}
+# Query types to sum metrics for, `None` for all query types
+QUERY_METRIC_QUERY_TYPES: dict[str, Optional[str]] = {
+    "query": None,
+    "event_explorer": "EventsQuery",
+}
+
+
+@timed_log()
+@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
+def get_teams_with_query_metrics_in_period(begin: datetime, end: datetime) -> dict[str, list[tuple[int, int]]]:
+    """
+    Sums the read bytes, read rows, and duration of the queries of each team, by access method and query type,
+    in one pass over the query log. Metrics are keyed as `{query type}_{access method}_{metric}`, e.g. `query_app_bytes_read`.
+    """
+    metric_expressions = {}
+    for query_type_name, query_type in QUERY_METRIC_QUERY_TYPES.items():
+        for access_method_name, access_method in QUERY_METRIC_ACCESS_METHODS.items():
+            for metric_name, column in QUERY_METRIC_COLUMNS.items():
+                condition = f"access_method = '{access_method}'"
+                if query_type is not None:
+                    condition += f" AND query_type = '{query_type}'"
+                metric_expressions[f"{query_type_name}_{access_method_name}_{metric_name}"] = (
+                    f"sumIf({column}, {condition})"
+                )
+
+    # :TRICKY: Metrics, access methods and query types are inlined into the query below, and all come from the constants above.
+    results = sync_execute(
+        f"""
         WITH JSONExtractInt(log_comment, 'team_id') as team_id,
             JSONExtractString(log_comment, 'query_type') as query_type,
             JSONExtractString(log_comment, 'access_method') as access_method
-        SELECT team_id, sum({metric}) as count
+        SELECT team_id, {", ".join(f"{expression} as {metric}" for metric, expression in metric_expressions.items())}
         FROM clusterAllReplicas({CLICKHOUSE_CLUSTER}, system.query_log)
         WHERE (type = 'QueryFinish' OR type = 'ExceptionWhileProcessing')
         AND is_initial_query = 1
-        {query_types_clause}
         AND query_start_time between %(begin)s AND %(end)s
-        AND access_method = %(access_method)s
+        AND access_method IN ({", ".join(f"'{access_method}'" for access_method in QUERY_METRIC_ACCESS_METHODS.values())})
         GROUP BY team_id
-    """
-    result = sync_execute(
-        query,
-        {
-            "begin": begin,
-            "end": end,
-            "query_types": query_types,
-            "access_method": access_method,
-        },
+    """,
+        {"begin": begin, "end": end},
         workload=Workload.OFFLINE,
         settings=CH_BILLING_SETTINGS,
     )
-    return result
+
+    metrics: dict[str, list[tuple[int, int]]] = {metric: [] for metric in metric_expressions}
+
+    for team_id, *values in results:
+        for metric, value in zip(metric_expressions.keys(), values):
+            if value > 0:
+                metrics[metric].append((team_id, value))
+
+    return metrics
 
 
 @timed_log()
 @retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_feature_flag_requests_count_in_period(
-    begin: datetime, end: datetime, request_type: FlagRequestType
-) -> list[tuple[int, int]]:
+def get_teams_with_feature_flag_requests_counts_in_period(
+    begin: datetime, end: datetime
+) -> dict[FlagRequestType, list[tuple[int, int]]]:
     # depending on the region, events are stored in different teams
     team_to_query = 1 if get_instance_region() == "EU" else 2
     validity_token = settings.DECIDE_BILLING_ANALYTICS_TOKEN
 
-    target_event = "decide usage" if request_type == FlagRequestType.DECIDE else "local evaluation usage"
-
-    result = sync_execute(
+    results = sync_execute(
         """
-        SELECT distinct_id as team, sum(JSONExtractInt(properties, 'count')) as sum
+        SELECT distinct_id as team,
+            sumIf(JSONExtractInt(properties, 'count'), event = 'decide usage') as decide_requests,
+            sumIf(JSONExtractInt(properties, 'count'), event = 'local evaluation usage') as local_evaluation_requests
         FROM events
-        WHERE team_id = %(team_to_query)s AND event=%(target_event)s AND timestamp between %(begin)s AND %(end)s
+        WHERE team_id = %(team_to_query)s AND event IN ('decide usage', 'local evaluation usage') AND timestamp between %(begin)s AND %(end)s
         AND has([%(validity_token)s], replaceRegexpAll(JSONExtractRaw(properties, 'token'), '^"|"$', ''))
         GROUP BY team
     """,
@@ -652,34 +715,23 @@ def get_teams_with_feature_flag_requests_count_in_period(
             "end": end,
             "team_to_query": team_to_query,
             "validity_token": validity_token,
-            "target_event": target_event,
         },
         workload=Workload.OFFLINE,
         settings=CH_BILLING_SETTINGS,
     )
 
-    return result
+    metrics: dict[FlagRequestType, list[tuple[int, int]]] = {
+        FlagRequestType.DECIDE: [],
+        FlagRequestType.LOCAL_EVALUATION: [],
+    }
 
+    for team, decide_requests, local_evaluation_requests in results:
+        if decide_requests > 0:
+            metrics[FlagRequestType.DECIDE].append((team, decide_requests))
+        if local_evaluation_requests > 0:
+            metrics[FlagRequestType.LOCAL_EVALUATION].append((team, local_evaluation_requests))
 
-@timed_log()
-@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_survey_responses_count_in_period(
-    begin: datetime,
-    end: datetime,
-) -> list[tuple[int, int]]:
-    results = sync_execute(
-        """
-        SELECT team_id, COUNT() as count
-        FROM events
-        WHERE event = 'survey sent' AND timestamp between %(begin)s AND %(end)s
-        GROUP BY team_id
-    """,
-        {"begin": begin, "end": end},
-        workload=Workload.OFFLINE,
-        settings=CH_BILLING_SETTINGS,
-    )
-
-    return results
+    return metrics
 
 
 @timed_log()
@@ -698,12 +750,12 @@ def get_teams_with_rows_synced_in_period(begin: datetime, end: datetime) -> list
 def get_teams_with_hog_function_calls_in_period(
     begin: datetime,
     end: datetime,
-) -> list[tuple[int, int]]:
+) -> dict[str, list[tuple[int, int]]]:
     results = sync_execute(
         """
-        SELECT team_id, SUM(count) as count
+        SELECT team_id, metric_name, SUM(count) as count
         FROM app_metrics2
-        WHERE app_source='hog_function' AND metric_name IN ('succeeded','failed') AND timestamp between %(begin)s AND %(end)s
+        WHERE app_source='hog_function' AND metric_name IN ('succeeded','failed','fetch') AND timestamp between %(begin)s AND %(end)s
         GROUP BY team_id, metric_name
     """,
         {"begin": begin, "end": end},
@@ -711,28 +763,13 @@ def get_teams_with_hog_function_calls_in_period(
         settings=CH_BILLING_SETTINGS,
     )
 
-    return results
+    # Calls keep one row per team and metric, as they did when they had a query of their own
+    metrics: dict[str, list[tuple[int, int]]] = {"calls": [], "fetch_calls": []}
 
+    for team_id, metric_name, count in results:
+        metrics["fetch_calls" if metric_name == "fetch" else "calls"].append((team_id, count))
 
-@timed_log()
-@retry(tries=QUERY_RETRIES, delay=QUERY_RETRY_DELAY, backoff=QUERY_RETRY_BACKOFF)
-def get_teams_with_hog_function_fetch_calls_in_period(
-    begin: datetime,
-    end: datetime,
-) -> list[tuple[int, int]]:
-    results = sync_execute(
-        """
-        SELECT team_id, SUM(count) as count
-        FROM app_metrics2
-        WHERE app_source='hog_function' AND metric_name IN ('fetch') AND timestamp between %(begin)s AND %(end)s
-        GROUP BY team_id, metric_name
-    """,
-        {"begin": begin, "end": end},
-        workload=Workload.OFFLINE,
-        settings=CH_BILLING_SETTINGS,
-    )
-
-    return results
+    return metrics
 
 
 @shared_task(**USAGE_REPORT_TASK_KWARGS, max_retries=0)
@@ -800,24 +837,29 @@ def convert_team_usage_rows_to_dict(rows: list[Union[dict, tuple[int, int]]]) ->
     return team_id_map
 
 
-def _get_all_usage_data(period_start: datetime, period_end: datetime) -> dict[str, Any]:
-    """
-    Gets all usage data for the specified period. Clickhouse is good at counting things so
-    we count across all teams rather than doing it one by one
-    """
+@dataclasses.dataclass(frozen=True)
+class UsageDataCollector:
+    """Collects some of the usage data of all teams, keyed like the results of `_get_all_usage_data`."""
 
-    all_metrics = get_all_event_metrics_in_period(period_start, period_end)
+    name: str
+    collect: Callable[[datetime, datetime], dict[str, list[Any]]]
+    # Postgres collectors run in the calling thread, to use the same database connection as the rest of the report
+    concurrent: bool = True
 
+
+def _collect_event_counts(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    event_counts = get_teams_with_event_counts_in_period(period_start, period_end)
+    return {
+        "teams_with_event_count_in_period": event_counts["event_count"],
+        "teams_with_enhanced_persons_event_count_in_period": event_counts["enhanced_persons_event_count"],
+        "teams_with_event_count_with_groups_in_period": event_counts["event_count_with_groups"],
+        "teams_with_survey_responses_count_in_period": event_counts["survey_responses_count"],
+    }
+
+
+def _collect_event_metrics(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    all_metrics = get_all_event_metrics_in_period(period_start, period_end)
     return {
-        "teams_with_event_count_in_period": get_teams_with_billable_event_count_in_period(
-            period_start, period_end, count_distinct=True
-        ),
-        "teams_with_enhanced_persons_event_count_in_period": get_teams_with_billable_enhanced_persons_event_count_in_period(
-            period_start, period_end, count_distinct=True
-        ),
-        "teams_with_event_count_with_groups_in_period": get_teams_with_event_count_with_groups_in_period(
-            period_start, period_end
-        ),
         "teams_with_event_count_from_helicone_in_period": all_metrics["helicone_events"],
         "teams_with_event_count_from_langfuse_in_period": all_metrics["langfuse_events"],
         "teams_with_event_count_from_keywords_ai_in_period": all_metrics["keywords_ai_events"],
@@ -834,18 +876,40 @@ def _get_all_usage_data(period_start: datetime, period_end: datetime) -> dict[st
         "teams_with_ruby_events_count_in_period": all_metrics["ruby_events"],
         "teams_with_python_events_count_in_period": all_metrics["python_events"],
         "teams_with_php_events_count_in_period": all_metrics["php_events"],
-        "teams_with_recording_count_in_period": get_teams_with_recording_count_in_period(
-            period_start, period_end, snapshot_source="web"
-        ),
-        "teams_with_mobile_recording_count_in_period": get_teams_with_recording_count_in_period(
-            period_start, period_end, snapshot_source="mobile"
-        ),
-        "teams_with_decide_requests_count_in_period": get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.DECIDE
-        ),
-        "teams_with_local_evaluation_requests_count_in_period": get_teams_with_feature_flag_requests_count_in_period(
-            period_start, period_end, FlagRequestType.LOCAL_EVALUATION
-        ),
+    }
+
+
+def _collect_recording_counts(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    recording_counts = get_teams_with_recording_counts_in_period(period_start, period_end)
+    return {
+        "teams_with_recording_count_in_period": recording_counts["web"],
+        "teams_with_mobile_recording_count_in_period": recording_counts["mobile"],
+    }
+
+
+def _collect_feature_flag_requests_counts(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    requests_counts = get_teams_with_feature_flag_requests_counts_in_period(period_start, period_end)
+    return {
+        "teams_with_decide_requests_count_in_period": requests_counts[FlagRequestType.DECIDE],
+        "teams_with_local_evaluation_requests_count_in_period": requests_counts[FlagRequestType.LOCAL_EVALUATION],
+    }
+
+
+def _collect_query_metrics(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    query_metrics = get_teams_with_query_metrics_in_period(period_start, period_end)
+    return {f"teams_with_{metric}": rows for metric, rows in query_metrics.items()}
+
+
+def _collect_hog_function_calls(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    hog_function_calls = get_teams_with_hog_function_calls_in_period(period_start, period_end)
+    return {
+        "teams_with_hog_function_calls_in_period": hog_function_calls["calls"],
+        "teams_with_hog_function_fetch_calls_in_period": hog_function_calls["fetch_calls"],
+    }
+
+
+def _collect_postgres_counts(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    return {
         "teams_with_group_types_total": list(
             GroupTypeMapping.objects.values("team_id").annotate(total=Count("id")).order_by("team_id")
         ),
@@ -876,97 +940,108 @@ def _get_all_usage_data(period_start: datetime, period_end: datetime) -> dict[st
         "teams_with_ff_active_count": list(
             FeatureFlag.objects.filter(active=True).values("team_id").annotate(total=Count("id")).order_by("team_id")
         ),
-        "teams_with_query_app_bytes_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            access_method="",
-        ),
-        "teams_with_query_app_rows_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            access_method="",
-        ),
-        "teams_with_query_app_duration_ms": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            access_method="",
-        ),
-        "teams_with_query_api_bytes_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            access_method="personal_api_key",
-        ),
-        "teams_with_query_api_rows_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            access_method="personal_api_key",
-        ),
-        "teams_with_query_api_duration_ms": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            access_method="personal_api_key",
-        ),
-        "teams_with_event_explorer_app_bytes_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            query_types=["EventsQuery"],
-            access_method="",
-        ),
-        "teams_with_event_explorer_app_rows_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["EventsQuery"],
-            access_method="",
-        ),
-        "teams_with_event_explorer_app_duration_ms": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            query_types=["EventsQuery"],
-            access_method="",
-        ),
-        "teams_with_event_explorer_api_bytes_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_bytes",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
-        ),
-        "teams_with_event_explorer_api_rows_read": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="read_rows",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
-        ),
-        "teams_with_event_explorer_api_duration_ms": get_teams_with_query_metric(
-            period_start,
-            period_end,
-            metric="query_duration_ms",
-            query_types=["EventsQuery"],
-            access_method="personal_api_key",
-        ),
-        "teams_with_survey_responses_count_in_period": get_teams_with_survey_responses_count_in_period(
-            period_start, period_end
-        ),
-        "teams_with_rows_synced_in_period": get_teams_with_rows_synced_in_period(period_start, period_end),
-        "teams_with_hog_function_calls_in_period": get_teams_with_hog_function_calls_in_period(
-            period_start, period_end
-        ),
-        "teams_with_hog_function_fetch_calls_in_period": get_teams_with_hog_function_fetch_calls_in_period(
-            period_start, period_end
-        ),
     }
 
 
+def _collect_rows_synced(period_start: datetime, period_end: datetime) -> dict[str, list[Any]]:
+    return {"teams_with_rows_synced_in_period": get_teams_with_rows_synced_in_period(period_start, period_end)}
+
+
+USAGE_DATA_COLLECTORS = (
+    UsageDataCollector("event_counts", _collect_event_counts),
+    UsageDataCollector("event_metrics", _collect_event_metrics),
+    UsageDataCollector("recording_counts", _collect_recording_counts),
+    UsageDataCollector("feature_flag_requests_counts", _collect_feature_flag_requests_counts),
+    UsageDataCollector("query_metrics", _collect_query_metrics),
+    UsageDataCollector("hog_function_calls", _collect_hog_function_calls),
+    UsageDataCollector("postgres_counts", _collect_postgres_counts, concurrent=False),
+    UsageDataCollector("rows_synced", _collect_rows_synced, concurrent=False),
+)
+
+
+def _get_usage_data_checkpoint_key(collector: UsageDataCollector, period_start: datetime, period_end: datetime) -> str:
+    return f"usage_report:{collector.name}:{period_start.isoformat()}:{period_end.isoformat()}"
+
+
+def _collect_usage_data(
+    collector: UsageDataCollector, period_start: datetime, period_end: datetime
+) -> dict[str, list[Any]]:
+    """
+    Runs a collector, unless its results for the period were checkpointed to Redis by a previous attempt at the report.
+    Checkpointing is best effort: if Redis is unavailable, the collector simply runs.
+    """
+    key = _get_usage_data_checkpoint_key(collector, period_start, period_end)
+
+    try:
+        checkpoint = get_client().get(key)
+    except Exception as err:
+        capture_exception(err)
+        checkpoint = None
+
+    if checkpoint is not None:
+        logger.info("Using checkpointed usage data", collector=collector.name)
+        return json.loads(checkpoint)
+
+    data = collector.collect(period_start, period_end)
+
+    try:
+        get_client().set(key, json.dumps(data), ex=settings.USAGE_REPORT_CHECKPOINT_TTL_SECONDS)
+    except Exception as err:
+        capture_exception(err)
+
+    return data
+
+
+def _get_all_usage_data(period_start: datetime, period_end: datetime) -> dict[str, Any]:
+    """
+    Gets all usage data for the specified period. Clickhouse is good at counting things so
+    we count across all teams rather than doing it one by one.
+
+    ClickHouse collectors run concurrently. The results of each collector are checkpointed, so if any of
+    them fails, retrying the report only runs the collectors that haven't succeeded yet.
+    """
+    all_data: dict[str, Any] = {}
+    errors: list[Exception] = []
+
+    with ThreadPoolExecutor(max_workers=settings.USAGE_REPORT_MAX_CONCURRENT_QUERIES) as executor:
+        futures = [
+            executor.submit(_collect_usage_data, collector, period_start, period_end)
+            for collector in USAGE_DATA_COLLECTORS
+            if collector.concurrent
+        ]
+
+        for collector in USAGE_DATA_COLLECTORS:
+            if collector.concurrent:
+                continue
+
+            try:
+                all_data.update(_collect_usage_data(collector, period_start, period_end))
+            except Exception as err:
+                errors.append(err)
+
+        for future in as_completed(futures):
+            try:
+                all_data.update(future.result())
+            except Exception as err:
+                errors.append(err)
+
+    if errors:
+        raise errors[0]
+
+    # The report is complete, so the next one for the period should collect fresh data
+    try:
+        get_client().delete(
+            *(
+                _get_usage_data_checkpoint_key(collector, period_start, period_end)
+                for collector in USAGE_DATA_COLLECTORS
+            )
+        )
+    except Exception as err:
+        capture_exception(err)
+
+    return all_data
+
+
 def _get_all_usage_data_as_team_rows(period_start: datetime, period_end: datetime) -> dict[str, Any]:
     """
     Gets all usage data for the specified period as a map of team_id -> value. This makes it faster
@@ -333,8 +333,12 @@ class S3MultiPartUpload:
         initial_retry_delay: float | int = 2,
         max_retry_delay: float | int = 32,
         exponential_backoff_coefficient: int = 2,
-    ):
-        """Upload a part of this multi-part upload."""
+    ) -> Part:
+        """Upload a part of this multi-part upload.
+
+        The part number is assigned before the first `await`, so concurrent uploads are
+        numbered in the order they are started.
+        """
         next_part_number = self.part_number + 1
         part = {"PartNumber": next_part_number, "ETag": ""}
         self.pending_parts.append(part)
@@ -366,6 +370,8 @@ class S3MultiPartUpload:
         part["ETag"] = etag
         self.parts.append(part)
 
+        return part
+
     async def upload_part_retryable(
         self,
         reader: io.BufferedReader,
@@ -470,7 +476,28 @@ class S3HeartbeatDetails(BatchExportRangeHeartbeatDetails):
                 self.upload_state.parts.append(part)
 
 
+@dataclasses.dataclass
+class S3PartUpload:
+    """A part being uploaded by a `S3Consumer`, along with what to track once it's done."""
+
+    task: asyncio.Task[Part]
+    records: int
+    bytes: int
+    date_range: DateRange
+
+
 class S3Consumer(Consumer):
+    """A `Consumer` that uploads each flushed file as a part of a `S3MultiPartUpload`.
+
+    Parts are uploaded concurrently with writing: On flush, the data written so far is swapped into
+    a spare temporary file, which is uploaded in the background while the writer continues with an
+    empty one. At most `max_concurrent_uploads` parts are uploaded at a time.
+
+    Parts can finish uploading in any order, but they are tracked in heartbeat details in the order
+    they were flushed. This way, a resumed upload never continues from a part number that precedes a
+    part (and date range) we have already recorded as done.
+    """
+
     def __init__(
         self,
         heartbeater: Heartbeater,
@@ -479,6 +506,7 @@ class S3Consumer(Consumer):
         data_interval_end: dt.datetime | str,
         writer_format: WriterFormat,
         s3_upload: S3MultiPartUpload,
+        max_concurrent_uploads: int = 1,
     ):
         super().__init__(
             heartbeater=heartbeater,
@@ -489,6 +517,48 @@ class S3Consumer(Consumer):
         )
         self.heartbeat_details: S3HeartbeatDetails = heartbeat_details
         self.s3_upload = s3_upload
+        self.max_concurrent_uploads = max(max_concurrent_uploads, 1)
+        self.uploads: collections.deque[S3PartUpload] = collections.deque()
+        self.spare_files: list[BatchExportTemporaryFile] = []
+        self.created_files: list[BatchExportTemporaryFile] = []
+
+    async def start(
+        self,
+        queue: RecordBatchQueue,
+        producer_task: asyncio.Task,
+        max_bytes: int,
+        schema: pa.Schema,
+        json_columns: collections.abc.Sequence[str],
+        multiple_files: bool = False,
+        include_inserted_at: bool = False,
+        **kwargs,
+    ) -> int:
+        """Start consuming record batches, and wait for all parts to be uploaded before returning."""
+        try:
+            records_count = await super().start(
+                queue=queue,
+                producer_task=producer_task,
+                max_bytes=max_bytes,
+                schema=schema,
+                json_columns=json_columns,
+                multiple_files=multiple_files,
+                include_inserted_at=include_inserted_at,
+                **kwargs,
+            )
+            await self.wait_for_uploads()
+
+        except BaseException:
+            for upload in self.uploads:
+                upload.task.cancel()
+            await asyncio.gather(*(upload.task for upload in self.uploads), return_exceptions=True)
+            raise
+
+        finally:
+            for batch_export_file in self.created_files:
+                batch_export_file.close()
+
+        self.heartbeater.set_from_heartbeat_details(self.heartbeat_details)
+        return records_count
 
     async def flush(
         self,
@@ -506,8 +576,13 @@ class S3Consumer(Consumer):
                 "An error was detected while writing part %d. Partial part will not be uploaded in case it can be retried.",
                 self.s3_upload.part_number + 1,
             )
+            # Parts already flushed are fine, so we still want them in heartbeat details to resume from.
+            await self.wait_for_uploads()
             return
 
+        part_file = await self.get_spare_file()
+        batch_export_file.swap_file(part_file)
+
         await self.logger.adebug(
             "Uploading part %s containing %s records with size %s bytes",
             self.s3_upload.part_number + 1,
@@ -515,13 +590,68 @@ class S3Consumer(Consumer):
             bytes_since_last_flush,
         )
 
-        await self.s3_upload.upload_part(batch_export_file)
+        self.uploads.append(
+            S3PartUpload(
+                task=asyncio.create_task(self.upload_part(part_file)),
+                records=records_since_last_flush,
+                bytes=bytes_since_last_flush,
+                date_range=last_date_range,
+            )
+        )
 
-        self.rows_exported_counter.add(records_since_last_flush)
-        self.bytes_exported_counter.add(bytes_since_last_flush)
+        if is_last:
+            await self.wait_for_uploads()
 
-        self.heartbeat_details.track_done_range(last_date_range, self.data_interval_start)
-        self.heartbeat_details.append_upload_state(self.s3_upload.to_state())
+    async def upload_part(self, part_file: BatchExportTemporaryFile) -> Part:
+        """Upload `part_file` as the next part, and put it back with the spare files after."""
+        try:
+            return await self.s3_upload.upload_part(part_file)
+        finally:
+            part_file.reset()
+            self.spare_files.append(part_file)
+
+    async def get_spare_file(self) -> BatchExportTemporaryFile:
+        """Get an empty temporary file to swap data into, waiting if we have too many parts in flight."""
+        while True:
+            self.track_finished_uploads()
+
+            in_flight = [upload.task for upload in self.uploads if not upload.task.done()]
+            if len(in_flight) < self.max_concurrent_uploads:
+                break
+
+            await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+        if self.spare_files:
+            return self.spare_files.pop()
+
+        batch_export_file = await asyncio.to_thread(BatchExportTemporaryFile)
+        self.created_files.append(batch_export_file)
+        return batch_export_file
+
+    async def wait_for_uploads(self) -> None:
+        """Wait for all parts in flight to be uploaded and track them."""
+        if self.uploads:
+            await asyncio.wait([upload.task for upload in self.uploads])
+        self.track_finished_uploads()
+
+    def track_finished_uploads(self) -> None:
+        """Track parts that finished uploading in flush order, raising the first upload error found."""
+        for upload in self.uploads:
+            exception = upload.task.exception() if upload.task.done() else None
+            if exception is not None:
+                raise exception
+
+        while self.uploads and self.uploads[0].task.done():
+            upload = self.uploads.popleft()
+            part = upload.task.result()
+
+            self.rows_exported_counter.add(upload.records)
+            self.bytes_exported_counter.add(upload.bytes)
+
+            self.heartbeat_details.track_done_range(upload.date_range, self.data_interval_start)
+            self.heartbeat_details.append_upload_state(
+                S3MultiPartUploadState(self.s3_upload.to_state().upload_id, [part])
+            )
 
 
 @dataclasses.dataclass
@@ -724,6 +854,7 @@ async def insert_into_s3_activity(inputs: S3InsertInputs) -> RecordsCompleted:
                 data_interval_start=data_interval_start,
                 writer_format=WriterFormat.from_str(inputs.file_format, "S3"),
                 s3_upload=s3_upload,
+                max_concurrent_uploads=settings.BATCH_EXPORT_S3_UPLOAD_MAX_CONCURRENT_PARTS,
             )
             records_completed = await run_consumer(
                 consumer=consumer,
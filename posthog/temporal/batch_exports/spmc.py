@@ -17,6 +17,7 @@ from posthog.temporal.batch_exports.metrics import (
     get_rows_exported_metric,
 )
 from posthog.temporal.batch_exports.sql import (
+    COUNT_EVENTS_BY_HOUR_FOR_BACKFILL,
     SELECT_FROM_EVENTS_VIEW,
     SELECT_FROM_EVENTS_VIEW_BACKFILL,
     SELECT_FROM_EVENTS_VIEW_RECENT,
@@ -511,6 +512,8 @@ class Producer:
         use_latest_schema: bool = False,
         **parameters,
     ) -> asyncio.Task:
+        shard_by_time = False
+
         if fields is None:
             if destination_default_fields is None:
                 fields = default_fields()
@@ -552,6 +555,8 @@ class Producer:
                 query_template = SELECT_FROM_EVENTS_VIEW_UNBOUNDED
             elif is_backfill:
                 query_template = SELECT_FROM_EVENTS_VIEW_BACKFILL
+                # The backfill view uses `timestamp` as `_inserted_at`, which we can split on.
+                shard_by_time = full_range[0] is not None
             else:
                 query_template = SELECT_FROM_EVENTS_VIEW
                 lookback_days = settings.OVERRIDE_TIMESTAMP_TEAM_IDS.get(
@@ -573,12 +578,22 @@ class Producer:
         extra_query_parameters = parameters.pop("extra_query_parameters", {}) or {}
         parameters = {**parameters, **extra_query_parameters}
 
-        self._task = asyncio.create_task(
-            self.produce_batch_export_record_batches_from_range(
+        if shard_by_time and settings.BATCH_EXPORT_BACKFILL_MAX_CONCURRENT_SHARDS > 1:
+            produce = self.produce_batch_export_record_batches_from_shards(
+                query=query,
+                full_range=full_range,
+                done_ranges=done_ranges,
+                queue=queue,
+                query_parameters=parameters,
+                max_concurrent_shards=settings.BATCH_EXPORT_BACKFILL_MAX_CONCURRENT_SHARDS,
+                shard_target_rows=settings.BATCH_EXPORT_BACKFILL_SHARD_TARGET_ROWS,
+            )
+        else:
+            produce = self.produce_batch_export_record_batches_from_range(
                 query=query, full_range=full_range, done_ranges=done_ranges, queue=queue, query_parameters=parameters
-            ),
-            name="record_batch_producer",
-        )
+            )
+
+        self._task = asyncio.create_task(produce, name="record_batch_producer")
 
         return self.task
 
@@ -600,6 +615,143 @@ class Producer:
                 query, queue=queue, query_parameters=query_parameters, query_id=str(query_id)
             )
 
+    async def produce_batch_export_record_batches_from_shards(
+        self,
+        query: str,
+        full_range: tuple[dt.datetime | None, dt.datetime],
+        done_ranges: collections.abc.Sequence[tuple[dt.datetime, dt.datetime]],
+        queue: RecordBatchQueue,
+        query_parameters: dict[str, typing.Any],
+        max_concurrent_shards: int,
+        shard_target_rows: int,
+    ):
+        """Produce record batches by querying time shards of the remaining ranges concurrently.
+
+        Each shard is produced into its own queue, and shards are forwarded to `queue` one after
+        the other. Consumers rely on record batches arriving in `_inserted_at` order to track done
+        ranges, so interleaving shards would mark ranges we haven't exported as done.
+
+        A shard holds its slot until it has been fully forwarded, so at most `max_concurrent_shards`
+        shards are buffered, each up to a fraction of `queue.maxsize`.
+        """
+        shards: list[tuple[dt.datetime, dt.datetime]] = []
+        for interval_start, interval_end in generate_query_ranges(full_range, done_ranges):
+            if interval_start is None:
+                raise ValueError("Cannot split a range without a start in shards")
+
+            shards.extend(
+                await self.split_range_in_shards(
+                    (interval_start, interval_end), team_id=query_parameters["team_id"], target_rows=shard_target_rows
+                )
+            )
+
+        await logger.adebug("Producing %s shards, up to %s at a time", len(shards), max_concurrent_shards)
+
+        shard_slots = asyncio.Semaphore(max_concurrent_shards)
+        shard_max_size_bytes = max(queue.maxsize // max_concurrent_shards, 1) if queue.maxsize > 0 else 0
+
+        async def produce_shard(shard: tuple[dt.datetime, dt.datetime], shard_queue: RecordBatchQueue) -> None:
+            # Tasks are started in shard order, and waiting on a semaphore is first come, first served.
+            await shard_slots.acquire()
+
+            interval_start, interval_end = shard
+            shard_query_parameters = {
+                **query_parameters,
+                "interval_start": interval_start.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "interval_end": interval_end.strftime("%Y-%m-%d %H:%M:%S.%f"),
+            }
+            await self.clickhouse_client.aproduce_query_as_arrow_record_batches(
+                query, queue=shard_queue, query_parameters=shard_query_parameters, query_id=str(uuid.uuid4())
+            )
+
+        shard_queues = [RecordBatchQueue(max_size_bytes=shard_max_size_bytes) for _ in shards]
+        shard_tasks = [
+            asyncio.create_task(produce_shard(shard, shard_queue), name=f"record_batch_producer_shard_{index}")
+            for index, (shard, shard_queue) in enumerate(zip(shards, shard_queues))
+        ]
+
+        try:
+            for shard_queue, shard_task in zip(shard_queues, shard_tasks):
+                await forward_record_batches(shard_queue, shard_task, queue)
+                shard_slots.release()
+
+        finally:
+            for shard_task in shard_tasks:
+                shard_task.cancel()
+            await asyncio.gather(*shard_tasks, return_exceptions=True)
+
+    async def split_range_in_shards(
+        self, query_range: tuple[dt.datetime, dt.datetime], team_id: int, target_rows: int
+    ) -> list[tuple[dt.datetime, dt.datetime]]:
+        """Split `query_range` in shards of about `target_rows` events, using hourly event counts."""
+        interval_start, interval_end = query_range
+        response = await self.clickhouse_client.read_query(
+            COUNT_EVENTS_BY_HOUR_FOR_BACKFILL,
+            query_parameters={
+                "team_id": team_id,
+                "interval_start": interval_start.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "interval_end": interval_end.strftime("%Y-%m-%d %H:%M:%S.%f"),
+            },
+        )
+
+        hourly_counts = []
+        for line in response.decode("utf-8").splitlines():
+            hour, count = line.strip().split("\t")
+            hourly_counts.append((dt.datetime.fromisoformat(hour).replace(tzinfo=dt.UTC), int(count)))
+
+        return split_range_by_counts(query_range, hourly_counts, target_rows)
+
+
+async def forward_record_batches(
+    source: RecordBatchQueue, source_task: asyncio.Task, destination: RecordBatchQueue
+) -> None:
+    """Forward record batches from `source` to `destination` until `source_task` is done producing them.
+
+    Raises:
+        Any exception raised by `source_task`.
+    """
+    while True:
+        get_task = asyncio.create_task(source.get())
+        await asyncio.wait([get_task, source_task], return_when=asyncio.FIRST_COMPLETED)
+
+        if not get_task.done():
+            get_task.cancel()
+            break
+
+        await destination.put(get_task.result())
+
+    while not source.empty():
+        await destination.put(source.get_nowait())
+
+    source_task.result()
+
+
+def split_range_by_counts(
+    query_range: tuple[dt.datetime, dt.datetime],
+    counts: collections.abc.Iterable[tuple[dt.datetime, int]],
+    target_rows: int,
+) -> list[tuple[dt.datetime, dt.datetime]]:
+    """Split `query_range` in contiguous shards of at least `target_rows` rows (except for the last one).
+
+    Arguments:
+        query_range: The range to split.
+        counts: Row counts by start of time bucket, in order. Shards are split at bucket starts.
+        target_rows: How many rows to put in each shard.
+    """
+    interval_start, interval_end = query_range
+    boundaries = [interval_start]
+    rows = 0
+
+    for bucket_start, count in counts:
+        if rows >= target_rows and boundaries[-1] < bucket_start < interval_end:
+            boundaries.append(bucket_start)
+            rows = 0
+
+        rows += count
+
+    boundaries.append(interval_end)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
 
 def generate_query_ranges(
     remaining_range: tuple[dt.datetime | None, dt.datetime],
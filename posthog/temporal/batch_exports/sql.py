@@ -171,3 +171,20 @@ SETTINGS
     max_bytes_before_external_sort=50000000000
 """
 )
+
+# A cheap estimate of how many events a backfill will export, used to split it in shards.
+# It reads the events table directly: Filtering out events is left to the export query.
+COUNT_EVENTS_BY_HOUR_FOR_BACKFILL = """
+SELECT
+    toStartOfHour(timestamp) AS hour,
+    count() AS total
+FROM
+    events
+WHERE
+    team_id = {team_id}
+    AND timestamp >= toDateTime64({interval_start}, 6, 'UTC')
+    AND timestamp < toDateTime64({interval_end}, 6, 'UTC')
+GROUP BY hour
+ORDER BY hour
+FORMAT TabSeparated
+"""
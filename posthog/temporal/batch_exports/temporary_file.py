@@ -16,6 +16,7 @@ import brotli
 import orjson
 import psycopg
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 import structlog
 from psycopg import sql
@@ -47,6 +48,106 @@ def json_dumps_bytes(d) -> bytes:
         return orjson.dumps(cleaned_d, default=str)
 
 
+_JSON_STRING_ESCAPES = (
+    # Backslashes go first, so we don't escape the escapes we add.
+    ("\\", "\\\\"),
+    ('"', '\\"'),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\t", "\\t"),
+    ("\b", "\\b"),
+    ("\f", "\\f"),
+)
+_JSON_UNESCAPED_CONTROL_CHARACTERS = r"[\x00-\x1f]"
+_JSON_NULL = pa.scalar(b"null", type=pa.large_binary())
+_JSON_QUOTE = pa.scalar(b'"', type=pa.large_binary())
+_NO_SEPARATOR = pa.scalar(b"", type=pa.large_binary())
+
+
+def _encode_json_values(values: list[typing.Any]) -> pa.LargeBinaryArray:
+    """Encode each value with orjson, as it would be encoded inside a row dictionary.
+
+    Values are wrapped in a list so orjson's recursion limit is hit at the same depth as when
+    dumping the whole row. Values that can't be encoded are left as nulls.
+    """
+    encoded: list[bytes | None] = []
+    for value in values:
+        try:
+            encoded.append(orjson.dumps([value], default=str)[1:-1])
+        except orjson.JSONEncodeError:
+            encoded.append(None)
+    return pa.array(encoded, type=pa.large_binary())
+
+
+def _encode_json_column(array: pa.Array) -> pa.LargeBinaryArray:
+    """Encode every value of `array` as JSON, the same way orjson encodes what `to_pylist` returns.
+
+    Primitive types are encoded with Arrow compute kernels. Anything else is passed through
+    `_encode_json_values`, which is still cheaper than building a dictionary per row.
+    """
+    array_type = array.type
+
+    if pa.types.is_boolean(array_type):
+        encoded = pc.if_else(array, pa.scalar(b"true", pa.large_binary()), pa.scalar(b"false", pa.large_binary()))
+
+    elif pa.types.is_integer(array_type) or pa.types.is_date32(array_type):
+        encoded = pc.cast(pc.cast(array, pa.large_string()), pa.large_binary())
+        if pa.types.is_date32(array_type):
+            encoded = pc.binary_join_element_wise(_JSON_QUOTE, encoded, _JSON_QUOTE, _NO_SEPARATOR)
+
+    elif pa.types.is_timestamp(array_type) and array_type.unit != "ns" and array_type.tz in (None, "UTC"):
+        formatted = pc.strftime(pc.cast(array, pa.timestamp("us", tz=array_type.tz)), format="%Y-%m-%dT%H:%M:%S")
+        # orjson only includes microseconds when there are any.
+        formatted = pc.replace_substring_regex(formatted, pattern=r"\.000000$", replacement="")
+        suffix = b'+00:00"' if array_type.tz is not None else b'"'
+        encoded = pc.binary_join_element_wise(
+            _JSON_QUOTE, pc.cast(formatted, pa.large_binary()), pa.scalar(suffix, pa.large_binary()), _NO_SEPARATOR
+        )
+
+    elif pa.types.is_string(array_type) or pa.types.is_large_string(array_type):
+        try:
+            # Make sure the data decodes, otherwise `to_pylist` would have failed on it.
+            array.validate(full=True)
+        except pa.ArrowInvalid:
+            return _encode_json_values(array.to_pylist())
+
+        escaped = array
+        for character, escape in _JSON_STRING_ESCAPES:
+            escaped = pc.replace_substring(escaped, pattern=character, replacement=escape)
+
+        if pc.any(pc.match_substring_regex(escaped, pattern=_JSON_UNESCAPED_CONTROL_CHARACTERS)).as_py():
+            # orjson writes the remaining control characters as unicode escapes, not worth doing here.
+            return _encode_json_values(array.to_pylist())
+
+        encoded = pc.binary_join_element_wise(
+            _JSON_QUOTE, pc.cast(escaped, pa.large_binary()), _JSON_QUOTE, _NO_SEPARATOR
+        )
+
+    else:
+        return _encode_json_values(array.to_pylist())
+
+    return pc.fill_null(encoded, _JSON_NULL)
+
+
+def encode_record_batch_as_jsonl(record_batch: pa.RecordBatch) -> pa.LargeBinaryArray:
+    """Encode each row of `record_batch` as a line of JSON, joining the encoded columns row-wise.
+
+    The lines are byte-identical to `orjson.dumps(row, default=str) + b"\\n"` for each row in
+    `record_batch.to_pylist()`. A line is null if one of its values could not be encoded, in which
+    case the caller must fall back to encoding that row as a dictionary.
+    """
+    parts: list[pa.Array | pa.Scalar] = []
+
+    for index, (name, column) in enumerate(zip(record_batch.column_names, record_batch.columns)):
+        key = (b"{" if index == 0 else b",") + orjson.dumps(name) + b":"
+        parts.append(pa.scalar(key, type=pa.large_binary()))
+        parts.append(_encode_json_column(column))
+
+    parts.append(pa.scalar(b"}\n", type=pa.large_binary()))
+
+    return pc.binary_join_element_wise(*parts, _NO_SEPARATOR)
+
+
 class BatchExportTemporaryFile:
     """A TemporaryFile used to as an intermediate step while exporting data.
 
@@ -240,6 +341,14 @@ class BatchExportTemporaryFile:
         """Rewind the file before reading it."""
         self._file.seek(0)
 
+    def swap_file(self, other: "BatchExportTemporaryFile") -> None:
+        """Swap the underlying temporary files of this and `other`.
+
+        Byte tracking and the brotli compressor are not swapped. This lets callers hand off the
+        data written so far in `other`, while writing (and compressing) continues in this file.
+        """
+        self._file, other._file = other._file, self._file
+
     def reset(self):
         """Reset underlying file by truncating it.
 
@@ -598,12 +707,39 @@ class JSONLBatchExportWriter(BatchExportWriter):
         return n
 
     def _write_record_batch(self, record_batch: pa.RecordBatch) -> None:
-        """Write records to a temporary file as JSONL."""
-        for record_dict in record_batch.to_pylist():
-            if not record_dict:
-                continue
+        """Write records to a temporary file as JSONL.
+
+        Rows are encoded column by column with `encode_record_batch_as_jsonl`. Only the rows
+        that encoder gives up on go through `write_dict` and its fallbacks.
+        """
+        if record_batch.num_columns == 0:
+            return
+
+        if len(set(record_batch.column_names)) != record_batch.num_columns:
+            # Duplicate column names are collapsed into a single key when building dictionaries.
+            for record_dict in record_batch.to_pylist():
+                self.write_dict(record_dict)
+            return
+
+        lines = encode_record_batch_as_jsonl(record_batch)
+        start = 0
+
+        for index in pc.indices_nonzero(lines.is_null()).to_pylist():
+            self._write_jsonl_lines(lines.slice(start, index - start))
+            self.write_dict(record_batch.slice(index, 1).to_pylist()[0])
+            start = index + 1
+
+        self._write_jsonl_lines(lines.slice(start))
+
+    def _write_jsonl_lines(self, lines: pa.LargeBinaryArray) -> None:
+        """Write a run of encoded lines in one call, straight from the array's data buffer."""
+        if len(lines) == 0:
+            return
 
-            self.write_dict(record_dict)
+        _, offsets_buffer, data_buffer = lines.buffers()
+        offsets = memoryview(offsets_buffer).cast("q")
+        start, end = offsets[lines.offset], offsets[lines.offset + len(lines)]
+        self.batch_export_file.write(data_buffer[start:end].to_pybytes())
 
 
 class CSVBatchExportWriter(BatchExportWriter):
@@ -0,0 +1,26 @@
+from temporalio import activity
+from temporalio.common import MetricCounter, MetricMeter
+
+
+def _get_metric_meter() -> MetricMeter:
+    return activity.metric_meter() if activity.in_activity() else MetricMeter.noop
+
+
+def get_pipeline_stage_rows_metric() -> MetricCounter:
+    return _get_metric_meter().create_counter(
+        "data_imports_pipeline_stage_rows", "Number of rows processed by a stage of the import pipeline."
+    )
+
+
+def get_pipeline_stage_bytes_metric() -> MetricCounter:
+    return _get_metric_meter().create_counter(
+        "data_imports_pipeline_stage_bytes", "Number of Arrow bytes processed by a stage of the import pipeline."
+    )
+
+
+def get_pipeline_stage_duration_metric() -> MetricCounter:
+    return _get_metric_meter().create_counter(
+        "data_imports_pipeline_stage_duration_ms",
+        "Time spent working in a stage of the import pipeline, excluding time spent waiting on other stages.",
+        "ms",
+    )
@@ -1,8 +1,10 @@
 from collections.abc import Sequence
 from conditional_cache import lru_cache
+import datetime as dt
 from typing import Any
 import deltalake.exceptions
 import pyarrow as pa
+import pyarrow.compute as pc
 from dlt.common.libs.deltalake import ensure_delta_compatible_arrow_schema
 from dlt.common.normalizers.naming.snake_case import NamingConvention
 import deltalake as deltalake
@@ -10,6 +12,7 @@ from django.conf import settings
 from sentry_sdk import capture_exception
 from posthog.settings.base_variables import TEST
 from posthog.temporal.common.logger import FilteringBoundLogger
+from posthog.temporal.data_imports.pipelines.pipeline.utils import _deduplicate_on_primary_keys, _unify_schemas
 from posthog.warehouse.models import ExternalDataJob
 from posthog.warehouse.s3 import get_s3_client
 
@@ -18,11 +21,17 @@ class DeltaTableHelper:
     _resource_name: str
     _job: ExternalDataJob
     _logger: FilteringBoundLogger
+    _staged_merge_tables: list[pa.Table]
+    _staged_merge_schema: pa.Schema | None
+    _staged_merge_bytes: int
 
     def __init__(self, resource_name: str, job: ExternalDataJob, logger: FilteringBoundLogger) -> None:
         self._resource_name = resource_name
         self._job = job
         self._logger = logger
+        self._staged_merge_tables = []
+        self._staged_merge_schema = None
+        self._staged_merge_bytes = 0
 
     def _get_credentials(self):
         if TEST:
@@ -96,12 +105,10 @@ class DeltaTableHelper:
             if not primary_keys or len(primary_keys) == 0:
                 raise Exception("Primary key required for incremental syncs")
 
-            delta_table.merge(
-                source=data,
-                source_alias="source",
-                target_alias="target",
-                predicate=" AND ".join([f"source.{c} = target.{c}" for c in primary_keys]),
-            ).when_matched_update_all().when_not_matched_insert_all().execute()
+            if settings.DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES > 0:
+                self._stage_merge(data, primary_keys)
+            else:
+                self._merge(delta_table, data, primary_keys)
         else:
             mode = "append"
             schema_mode = "merge"
@@ -140,3 +147,112 @@ class DeltaTableHelper:
         assert delta_table is not None
 
         return delta_table
+
+    @property
+    def has_staged_merge(self) -> bool:
+        return len(self._staged_merge_tables) > 0
+
+    def _stage_merge(self, data: pa.Table, primary_keys: Sequence[Any]) -> None:
+        """
+        Hold incremental chunks back so they are merged into the table together.
+
+        Every merge rewrites all the files it touches, so merging each chunk on its own leaves incremental tables
+        with lots of small files. Staged chunks are merged once they reach `DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES`,
+        when a chunk's schema can't be combined with them, or when the sync calls `merge_staged`.
+        """
+        if self._staged_merge_schema is not None:
+            self._staged_merge_schema = _unify_schemas(self._staged_merge_schema, data.schema)
+            if self._staged_merge_schema is None:
+                self.merge_staged(primary_keys)
+
+        if self._staged_merge_schema is None:
+            self._staged_merge_schema = data.schema
+        self._staged_merge_tables.append(data)
+        self._staged_merge_bytes += data.nbytes
+
+        if self._staged_merge_bytes >= settings.DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES:
+            self.merge_staged(primary_keys)
+
+    def merge_staged(self, primary_keys: Sequence[Any] | None) -> None:
+        if not self.has_staged_merge:
+            return
+
+        if not primary_keys or len(primary_keys) == 0:
+            raise Exception("Primary key required for incremental syncs")
+
+        delta_table = self.get_delta_table()
+        assert delta_table is not None
+
+        data = pa.concat_tables(self._staged_merge_tables, promote_options="default")
+        self._staged_merge_tables = []
+        self._staged_merge_schema = None
+        self._staged_merge_bytes = 0
+
+        data = _deduplicate_on_primary_keys(data, primary_keys)
+        self._logger.debug(f"Merging {data.num_rows} staged rows into the delta table")
+        self._merge(delta_table, data, primary_keys)
+
+    def _merge(self, delta_table: deltalake.DeltaTable, data: pa.Table, primary_keys: Sequence[Any]) -> None:
+        delta_table.merge(
+            source=data,
+            source_alias="source",
+            target_alias="target",
+            predicate=" AND ".join([f"source.{c} = target.{c}" for c in primary_keys]),
+        ).when_matched_update_all().when_not_matched_insert_all().execute()
+
+    def compact(self, primary_keys: Sequence[Any] | None) -> None:
+        """
+        Compact the small files of the table, Z-ordering them on the primary keys when there are any.
+
+        Delta can't interrupt an optimize, so the work is bounded up front instead: tables over
+        `DATA_WAREHOUSE_COMPACTION_MAX_BYTES` are skipped, as Z-ordering rewrites the whole table, and the optimize
+        runs at most `DATA_WAREHOUSE_COMPACTION_MAX_CONCURRENT_TASKS` tasks. Progress is committed every
+        `DATA_WAREHOUSE_COMPACTION_COMMIT_INTERVAL_SECONDS`. Compaction is best effort and never fails the sync.
+        """
+        delta_table = self.get_delta_table()
+        if delta_table is None:
+            return
+
+        file_stats = self.get_file_stats()
+        assert file_stats is not None
+        file_count, size_in_bytes = file_stats
+        if file_count < settings.DATA_WAREHOUSE_COMPACTION_MIN_FILE_COUNT:
+            self._logger.debug(f"Skipping compaction of {file_count} files")
+            return
+
+        if size_in_bytes > settings.DATA_WAREHOUSE_COMPACTION_MAX_BYTES:
+            self._logger.debug(f"Skipping compaction of {file_count} files totalling {size_in_bytes} bytes")
+            return
+
+        min_commit_interval = dt.timedelta(seconds=settings.DATA_WAREHOUSE_COMPACTION_COMMIT_INTERVAL_SECONDS)
+        max_concurrent_tasks = settings.DATA_WAREHOUSE_COMPACTION_MAX_CONCURRENT_TASKS
+
+        try:
+            if primary_keys:
+                metrics = delta_table.optimize.z_order(
+                    list(primary_keys),
+                    max_concurrent_tasks=max_concurrent_tasks,
+                    min_commit_interval=min_commit_interval,
+                )
+            else:
+                metrics = delta_table.optimize.compact(
+                    max_concurrent_tasks=max_concurrent_tasks, min_commit_interval=min_commit_interval
+                )
+
+            self._logger.debug(
+                f"Compacted delta table: {metrics.get('numFilesRemoved')} files removed, "
+                f"{metrics.get('numFilesAdded')} files added"
+            )
+        except Exception as e:
+            capture_exception(e)
+            self._logger.warning("Compaction of the delta table failed", exc_info=e)
+            delta_table.update_incremental()
+
+    def get_file_stats(self) -> tuple[int, int] | None:
+        """Returns the number of files and their total size in bytes in the current version of the table."""
+        delta_table = self.get_delta_table()
+        if delta_table is None:
+            return None
+
+        add_actions = delta_table.get_add_actions(flatten=True)
+        return add_actions.num_rows, pc.sum(add_actions.column("size_bytes")).as_py() or 0
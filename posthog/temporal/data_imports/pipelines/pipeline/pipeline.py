@@ -1,16 +1,28 @@
+import dataclasses
 import gc
+import queue
+import threading
 import time
+from collections.abc import Iterator
 from typing import Any
 import pyarrow as pa
+from django import db
+from django.conf import settings
 from dlt.sources import DltSource, DltResource
 import deltalake as deltalake
 from posthog.temporal.common.logger import FilteringBoundLogger
+from posthog.temporal.data_imports.metrics import (
+    get_pipeline_stage_bytes_metric,
+    get_pipeline_stage_duration_metric,
+    get_pipeline_stage_rows_metric,
+)
 from posthog.temporal.data_imports.pipelines.pipeline.utils import (
     _update_incremental_state,
     _get_primary_keys,
     _evolve_pyarrow_schema,
     _append_debug_column_to_pyarrows_table,
     _update_job_row_count,
+    _unify_schemas,
     table_from_py_list,
 )
 from posthog.temporal.data_imports.pipelines.pipeline.delta_table_helper import DeltaTableHelper
@@ -19,6 +31,20 @@ from posthog.temporal.data_imports.pipelines.pipeline_sync import validate_schem
 from posthog.temporal.data_imports.util import prepare_s3_files_for_querying
 from posthog.warehouse.models import DataWarehouseTable, ExternalDataJob, ExternalDataSchema
 
+_END_OF_SOURCE = object()
+
+
+@dataclasses.dataclass
+class PipelineStageStats:
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def add(self, rows: int, bytes: int, seconds: float) -> None:
+        self.rows += rows
+        self.bytes += bytes
+        self.seconds += seconds
+
 
 class PipelineNonDLT:
     _resource: DltResource
@@ -30,6 +56,7 @@ class PipelineNonDLT:
     _delta_table_helper: DeltaTableHelper
     _internal_schema = HogQLSchema()
     _load_id: int
+    _unmerged_tables: list[pa.Table]
 
     def __init__(self, source: DltSource, logger: FilteringBoundLogger, job_id: str, is_incremental: bool) -> None:
         resources = list(source.resources.items())
@@ -49,54 +76,16 @@ class PipelineNonDLT:
 
         self._delta_table_helper = DeltaTableHelper(resource_name, self._job, self._logger)
         self._internal_schema = HogQLSchema()
+        self._unmerged_tables = []
 
     def run(self):
         try:
-            buffer: list[Any] = []
-            py_table = None
-            chunk_size = 5000
-            row_count = 0
-            chunk_index = 0
-
-            for item in self._resource:
-                py_table = None
-
-                if isinstance(item, list):
-                    if len(buffer) > 0:
-                        buffer.extend(item)
-                        if len(buffer) >= chunk_size:
-                            py_table = table_from_py_list(buffer)
-                            buffer = []
-                    else:
-                        if len(item) >= chunk_size:
-                            py_table = table_from_py_list(item)
-                        else:
-                            buffer.extend(item)
-                            continue
-                elif isinstance(item, dict):
-                    buffer.append(item)
-                    if len(buffer) < chunk_size:
-                        continue
-
-                    py_table = table_from_py_list(buffer)
-                    buffer = []
-                elif isinstance(item, pa.Table):
-                    py_table = item
-                else:
-                    raise Exception(f"Unhandled item type: {item.__class__.__name__}")
-
-                assert py_table is not None
-
-                self._process_pa_table(pa_table=py_table, index=chunk_index)
-
-                row_count += py_table.num_rows
-                chunk_index += 1
-
-            if len(buffer) > 0:
-                py_table = table_from_py_list(buffer)
-                self._process_pa_table(pa_table=py_table, index=chunk_index)
-                row_count += py_table.num_rows
+            if settings.DATA_WAREHOUSE_PIPELINED_IMPORT_ENABLED:
+                row_count = self._run_pipelined()
+            else:
+                row_count = self._run_sequential()
 
+            self._merge_staged()
             self._post_run_operations(row_count=row_count)
         finally:
             # Help reduce the memory footprint of each job
@@ -108,12 +97,186 @@ class PipelineNonDLT:
             del self._resource
             del self._delta_table_helper
 
-            if "buffer" in locals() and buffer is not None:
-                del buffer
-            if "py_table" in locals() and py_table is not None:
-                del py_table
             gc.collect()
 
+    def _iter_source_chunks(self) -> Iterator[list[Any] | pa.Table]:
+        """Group the items of the resource into chunks of at least `chunk_size` rows, leaving Arrow tables as they are."""
+        buffer: list[Any] = []
+        chunk_size = 5000
+
+        for item in self._resource:
+            if isinstance(item, list):
+                if len(buffer) > 0:
+                    buffer.extend(item)
+                    if len(buffer) >= chunk_size:
+                        yield buffer
+                        buffer = []
+                elif len(item) >= chunk_size:
+                    yield item
+                else:
+                    buffer.extend(item)
+            elif isinstance(item, dict):
+                buffer.append(item)
+                if len(buffer) >= chunk_size:
+                    yield buffer
+                    buffer = []
+            elif isinstance(item, pa.Table):
+                yield item
+            else:
+                raise Exception(f"Unhandled item type: {item.__class__.__name__}")
+
+        if len(buffer) > 0:
+            yield buffer
+
+    def _run_sequential(self) -> int:
+        row_count = 0
+
+        for chunk_index, chunk in enumerate(self._iter_source_chunks()):
+            py_table = chunk if isinstance(chunk, pa.Table) else table_from_py_list(chunk)
+            del chunk
+
+            self._process_pa_table(pa_table=py_table, index=chunk_index)
+            row_count += py_table.num_rows
+            del py_table
+
+        return row_count
+
+    def _run_pipelined(self) -> int:
+        """
+        Read from the source in this thread while a worker thread converts chunks to Arrow and commits them to Delta.
+
+        The two stages are decoupled by a bounded queue, so at most `DATA_WAREHOUSE_PIPELINE_MAX_QUEUED_CHUNKS` source
+        chunks plus one pending commit of about `DATA_WAREHOUSE_PIPELINE_COMMIT_TARGET_BYTES` are held in memory.
+        Commits are grouped by Arrow size instead of by row count, as rows vary wildly in size between sources.
+        """
+        chunks: queue.Queue[list[Any] | pa.Table | object] = queue.Queue(
+            maxsize=max(1, settings.DATA_WAREHOUSE_PIPELINE_MAX_QUEUED_CHUNKS)
+        )
+        stages = {stage: PipelineStageStats() for stage in ("source", "convert", "write")}
+        cancelled = threading.Event()
+        worker_errors: list[BaseException] = []
+
+        worker = threading.Thread(
+            target=self._convert_and_write_chunks,
+            args=(chunks, stages, cancelled, worker_errors),
+            name=f"pipeline-writer-{self._resource_name}",
+            daemon=True,
+        )
+        worker.start()
+
+        try:
+            source_chunks = self._iter_source_chunks()
+            while True:
+                start = time.monotonic()
+                chunk = next(source_chunks, _END_OF_SOURCE)
+                stages["source"].seconds += time.monotonic() - start
+
+                if isinstance(chunk, pa.Table):
+                    stages["source"].rows += chunk.num_rows
+                elif isinstance(chunk, list):
+                    stages["source"].rows += len(chunk)
+
+                while not worker_errors:
+                    try:
+                        chunks.put(chunk, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+
+                if worker_errors or chunk is _END_OF_SOURCE:
+                    break
+
+                del chunk
+        except BaseException:
+            cancelled.set()
+            raise
+        finally:
+            worker.join()
+            self._report_stage_stats(stages)
+
+        if worker_errors:
+            raise worker_errors[0]
+
+        return stages["write"].rows
+
+    def _convert_and_write_chunks(
+        self,
+        chunks: queue.Queue,
+        stages: dict[str, "PipelineStageStats"],
+        cancelled: threading.Event,
+        errors: list[BaseException],
+    ) -> None:
+        pending: list[pa.Table] = []
+        pending_schema: pa.Schema | None = None
+        pending_bytes = 0
+        commit_index = 0
+
+        def commit_pending():
+            nonlocal pending, pending_schema, pending_bytes, commit_index
+
+            start = time.monotonic()
+            pa_table = pa.concat_tables(pending, promote_options="default") if len(pending) > 1 else pending[0]
+            pending, pending_schema, pending_bytes = [], None, 0
+
+            self._process_pa_table(pa_table=pa_table, index=commit_index)
+            commit_index += 1
+
+            stages["write"].add(rows=pa_table.num_rows, bytes=pa_table.nbytes, seconds=time.monotonic() - start)
+
+        try:
+            while not cancelled.is_set():
+                try:
+                    chunk = chunks.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+                if chunk is _END_OF_SOURCE:
+                    if pending:
+                        commit_pending()
+                    return
+
+                start = time.monotonic()
+                pa_table = chunk if isinstance(chunk, pa.Table) else table_from_py_list(chunk)
+                del chunk
+                stages["convert"].add(rows=pa_table.num_rows, bytes=pa_table.nbytes, seconds=time.monotonic() - start)
+
+                # Chunks whose schemas can't be combined are committed separately, and evolved one after the other
+                if pending_schema is not None:
+                    pending_schema = _unify_schemas(pending_schema, pa_table.schema)
+                    if pending_schema is None:
+                        commit_pending()
+
+                if pending_schema is None:
+                    pending_schema = pa_table.schema
+                pending.append(pa_table)
+                pending_bytes += pa_table.nbytes
+                del pa_table
+
+                if pending_bytes >= settings.DATA_WAREHOUSE_PIPELINE_COMMIT_TARGET_BYTES:
+                    commit_pending()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            # This thread opened its own database connection when updating the job and schema
+            db.connection.close()
+
+    def _report_stage_stats(self, stages: dict[str, "PipelineStageStats"]) -> None:
+        rows_metric = get_pipeline_stage_rows_metric()
+        bytes_metric = get_pipeline_stage_bytes_metric()
+        duration_metric = get_pipeline_stage_duration_metric()
+
+        for stage, stats in stages.items():
+            attributes = {"stage": stage}
+            rows_metric.add(stats.rows, attributes)
+            bytes_metric.add(stats.bytes, attributes)
+            duration_metric.add(int(stats.seconds * 1000), attributes)
+
+            rows_per_second = stats.rows / stats.seconds if stats.seconds > 0 else 0
+            self._logger.debug(
+                f"Pipeline stage {stage}: {stats.rows} rows, {stats.bytes} bytes in {stats.seconds:.2f}s "
+                f"({rows_per_second:.0f} rows/s)"
+            )
+
     def _process_pa_table(self, pa_table: pa.Table, index: int):
         delta_table = self._delta_table_helper.get_delta_table()
 
@@ -127,8 +290,24 @@ class PipelineNonDLT:
 
         self._internal_schema.add_pyarrow_table(pa_table)
 
-        _update_incremental_state(self._schema, pa_table, self._logger)
-        _update_job_row_count(self._job.id, pa_table.num_rows, self._logger)
+        # Staged rows aren't in the delta table yet, so the sync can't move past them until they are merged
+        self._unmerged_tables.append(pa_table)
+        if not self._delta_table_helper.has_staged_merge:
+            self._update_synced_state()
+
+    def _merge_staged(self):
+        self._delta_table_helper.merge_staged(_get_primary_keys(self._resource))
+        self._update_synced_state()
+
+    def _update_synced_state(self):
+        if not self._unmerged_tables:
+            return
+
+        for pa_table in self._unmerged_tables:
+            _update_incremental_state(self._schema, pa_table, self._logger)
+        _update_job_row_count(self._job.id, sum(pa_table.num_rows for pa_table in self._unmerged_tables), self._logger)
+
+        self._unmerged_tables = []
 
     def _post_run_operations(self, row_count: int):
         delta_table = self._delta_table_helper.get_delta_table()
@@ -137,10 +316,18 @@ class PipelineNonDLT:
             self._logger.debug("No deltalake table, not continuing with post-run ops")
             return
 
-        self._logger.debug("Skipping compact and vacuuming")
-        # self._logger.info("Compacting delta table")
-        # delta_table.optimize.compact()
-        # delta_table.vacuum(retention_hours=24, enforce_retention_duration=False, dry_run=False)
+        if settings.DATA_WAREHOUSE_COMPACTION_ENABLED:
+            self._logger.debug("Compacting delta table")
+            self._delta_table_helper.compact(_get_primary_keys(self._resource))
+        else:
+            self._logger.debug("Skipping compaction")
+
+        file_stats = self._delta_table_helper.get_file_stats()
+        if file_stats is not None:
+            delta_file_count, delta_size_in_bytes = file_stats
+            ExternalDataSchema.objects.filter(id=self._schema.id).update(
+                delta_file_count=delta_file_count, delta_size_in_bytes=delta_size_in_bytes
+            )
 
         file_uris = delta_table.file_uris()
         self._logger.info(f"Preparing S3 files - total parquet files: {len(file_uris)}")
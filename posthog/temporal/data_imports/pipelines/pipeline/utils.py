@@ -2,7 +2,9 @@ import json
 from collections.abc import Sequence
 from typing import Any
 import uuid
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 from dlt.common.libs.deltalake import ensure_delta_compatible_arrow_schema
 from dlt.sources import DltResource
 import deltalake as deltalake
@@ -71,6 +73,35 @@ def _evolve_pyarrow_schema(table: pa.Table, delta_schema: deltalake.Schema | Non
     return table.cast(ensure_delta_compatible_arrow_schema(table.schema))
 
 
+def _unify_schemas(left: pa.Schema, right: pa.Schema) -> pa.Schema | None:
+    """Returns the schema that tables of both schemas can be concatenated into, or `None` if their types conflict."""
+    if left.equals(right):
+        return left
+
+    try:
+        return pa.unify_schemas([left, right], promote_options="default")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def _deduplicate_on_primary_keys(table: pa.Table, primary_keys: Sequence[str]) -> pa.Table:
+    """Keeps the last row of each primary key, as a Delta merge fails when many source rows match one target row."""
+    if table.num_rows == 0:
+        return table
+
+    row_indexes = (
+        table.select(list(primary_keys))
+        .append_column("_ph_row_index", pa.array(np.arange(table.num_rows, dtype=np.int64)))
+        .group_by(list(primary_keys), use_threads=False)
+        .aggregate([("_ph_row_index", "max")])
+        .column("_ph_row_index_max")
+    )
+    if len(row_indexes) == table.num_rows:
+        return table
+
+    return table.take(pc.take(row_indexes, pc.sort_indices(row_indexes)))
+
+
 def _append_debug_column_to_pyarrows_table(table: pa.Table, load_id: int) -> pa.Table:
     debug_info = f'{{"load_id": {load_id}}}'
 
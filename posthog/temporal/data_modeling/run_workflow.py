@@ -14,6 +14,9 @@ import dlt
 import dlt.common.data_types as dlt_data_types
 import dlt.common.schema.typing as dlt_typing
 import dlt.extract
+import deltalake
+import pyarrow as pa
+import pyarrow.compute as pc
 import structlog
 import temporalio.activity
 import temporalio.common
@@ -22,13 +25,21 @@ import temporalio.workflow
 from deltalake import DeltaTable
 from django.conf import settings
 from dlt.common.libs.deltalake import get_delta_tables
+from dlt.common.normalizers.naming.snake_case import NamingConvention
 
-from posthog.hogql.constants import HogQLGlobalSettings, LimitContext
+from posthog.clickhouse.client.escape import substitute_params
+from posthog.hogql import ast
+from posthog.hogql.constants import HogQLGlobalSettings
+from posthog.hogql.context import HogQLContext
 from posthog.hogql.database.database import create_hogql_database
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.escape_sql import escape_clickhouse_identifier
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.hogql.parser import parse_select
+from posthog.hogql.printer import print_ast
 from posthog.models import Team
 from posthog.settings.base_variables import TEST
 from posthog.temporal.batch_exports.base import PostHogWorkflow
+from posthog.temporal.common.clickhouse import get_client
 from posthog.temporal.common.heartbeat import Heartbeater
 from posthog.warehouse.models import DataWarehouseModelPath, DataWarehouseSavedQuery
 from posthog.warehouse.util import database_sync_to_async
@@ -65,6 +76,16 @@ CLICKHOUSE_DLT_MAPPING: dict[str, dlt_data_types.TDataType] = {
     "Decimal": "decimal",
 }
 
+DLT_ARROW_MAPPING: dict[str, pa.DataType] = {
+    "text": pa.string(),
+    "timestamp": pa.timestamp("us", tz="UTC"),
+    "date": pa.date32(),
+    "bigint": pa.int64(),
+    "double": pa.float64(),
+    "complex": pa.string(),
+    "bool": pa.bool_(),
+}
+
 
 class EmptyHogQLResponseColumnsError(Exception):
     def __init__(self):
@@ -127,6 +148,39 @@ class QueueMessage:
     label: str
 
 
+@dataclasses.dataclass
+class RecomputedRows:
+    """The rows recomputed by each model materialized in a DAG run.
+
+    Models are mapped to the watermark they recomputed rows from, or to `None` if they recomputed
+    all of their rows. Models that were not materialized in the run are not present.
+    """
+
+    since: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+    def get_since(self, parents: collections.abc.Iterable[str], since: typing.Any) -> typing.Any:
+        """Widen a model's `since` to also cover the rows its parents recomputed.
+
+        Watermarks are assumed to be propagated by children, so an incremental child reaches back as
+        far as any of its parents. Returns `None` if the model must recompute all of its rows, as one
+        of its parents did, or as the watermarks can't be compared.
+        """
+        for parent in parents:
+            if parent not in self.since:
+                continue
+
+            parent_since = self.since[parent]
+            if parent_since is None:
+                return None
+
+            try:
+                since = min(since, parent_since)
+            except TypeError:
+                return None
+
+        return since
+
+
 Results = collections.namedtuple("Results", ("completed", "failed", "ancestor_failed"))
 
 NullablePattern = re.compile(r"Nullable\((.*)\)")
@@ -140,7 +194,10 @@ async def run_dag_activity(inputs: RunDagActivityInputs) -> Results:
     * "Running a model" means:
       1. Executing the model's query (which is always a `SELECT` query).
       2. Save query results as a delta lake table in S3 ("materialize the results").
-      Both steps are achieved with a dlt pipeline.
+      Both steps are achieved with a dlt pipeline. Incremental models that were materialized
+      before only execute their query for rows past their watermark, and replace those rows
+      in their delta lake table. Any incremental children of a model recompute at least the
+      same rows, as tracked in `RecomputedRows`.
     * A model is considered "ready to run" if all of its ancestors have successfully ran
       already or if it has no ancestors.
     * PostHog tables (e.g. events, persons, sessions) are assumed to be always available
@@ -167,6 +224,7 @@ async def run_dag_activity(inputs: RunDagActivityInputs) -> Results:
     completed = set()
     ancestor_failed = set()
     failed = set()
+    recomputed_rows = RecomputedRows()
     queue: asyncio.Queue[QueueMessage] = asyncio.Queue()
 
     for node in inputs.dag.values():
@@ -185,7 +243,7 @@ async def run_dag_activity(inputs: RunDagActivityInputs) -> Results:
             match message:
                 case QueueMessage(status=ModelStatus.READY, label=label):
                     model = inputs.dag[label]
-                    task = asyncio.create_task(handle_model_ready(model, inputs.team_id, queue))
+                    task = asyncio.create_task(handle_model_ready(model, inputs.team_id, queue, recomputed_rows))
                     running_tasks.add(task)
                     task.add_done_callback(running_tasks.discard)
 
@@ -247,7 +305,12 @@ async def put_models_in_queue(models: collections.abc.Iterable[ModelNode], queue
             tg.create_task(queue.put(QueueMessage(status=ModelStatus.READY, label=model.label)))
 
 
-async def handle_model_ready(model: ModelNode, team_id: int, queue: asyncio.Queue[QueueMessage]) -> None:
+async def handle_model_ready(
+    model: ModelNode,
+    team_id: int,
+    queue: asyncio.Queue[QueueMessage],
+    recomputed_rows: RecomputedRows | None = None,
+) -> None:
     """Handle a model that is ready to run by materializing.
 
     After materializing is done, we can report back to the execution queue the result. If
@@ -258,11 +321,12 @@ async def handle_model_ready(model: ModelNode, team_id: int, queue: asyncio.Queu
         model: The model we are trying to run.
         team_id: The ID of the team who owns this model.
         queue: The execution queue where we will report back results.
+        recomputed_rows: The rows recomputed by models in the DAG run so far.
     """
     try:
         if model.selected is True:
             team = await database_sync_to_async(Team.objects.get)(id=team_id)
-            await materialize_model(model.label, team)
+            await materialize_model(model.label, team, recomputed_rows=recomputed_rows, parents=model.parents)
     except Exception as err:
         await logger.aexception("Failed to materialize model %s due to error: %s", model.label, str(err))
         await queue.put(QueueMessage(status=ModelStatus.FAILED, label=model.label))
@@ -273,14 +337,25 @@ async def handle_model_ready(model: ModelNode, team_id: int, queue: asyncio.Queu
         queue.task_done()
 
 
-async def materialize_model(model_label: str, team: Team) -> tuple[str, DeltaTable]:
+async def materialize_model(
+    model_label: str,
+    team: Team,
+    recomputed_rows: RecomputedRows | None = None,
+    parents: collections.abc.Iterable[str] = (),
+) -> tuple[str, DeltaTable]:
     """Materialize a given model by running its query in a dlt pipeline.
 
+    Incremental models with an existing delta table only run their query for rows at or past their
+    last watermark, minus their lookback, and replace those rows in the table instead.
+
     Arguments:
         model_label: A label representing the ID or the name of the model to materialize.
             If it's a valid UUID, then we will assume it's the ID, otherwise we'll assume
             it is the model's name.
         team: The team the model belongs to.
+        recomputed_rows: The rows recomputed by models in the same DAG run, which is updated
+            with the rows recomputed by this model.
+        parents: The labels of this model's parents in the DAG.
     """
     filter_params: dict[str, str | uuid.UUID] = {}
     try:
@@ -300,14 +375,7 @@ async def materialize_model(model_label: str, team: Team) -> tuple[str, DeltaTab
 
     table_columns: dlt_typing.TTableSchemaColumns = {}
     for column_name, column_info in query_columns.items():
-        clickhouse_type = column_info["clickhouse"]
-        nullable = False
-
-        if nullable_match := re.match(NullablePattern, clickhouse_type):
-            clickhouse_type = nullable_match.group(1)
-            nullable = True
-
-        clickhouse_type = re.sub(r"\(.+\)+", "", clickhouse_type)
+        clickhouse_type, nullable = parse_clickhouse_type(column_info["clickhouse"])
 
         data_type: dlt_data_types.TDataType = CLICKHOUSE_DLT_MAPPING[clickhouse_type]
         column_schema: dlt_typing.TColumnSchema = {
@@ -316,51 +384,289 @@ async def materialize_model(model_label: str, team: Team) -> tuple[str, DeltaTab
         }
         table_columns[column_name] = column_schema
 
-    hogql_query = saved_query.query["query"]
+    watermark_column = saved_query.watermark_column if saved_query.is_incremental else None
+    table_uri = get_model_table_uri(model_label, team, saved_query.name)
+    storage_options = get_delta_storage_options()
+
+    since: typing.Any = None
+    incremental_table = None
+    watermark_last_value = saved_query.get_watermark_last_value()
+    if watermark_column is not None and watermark_last_value is not None:
+        incremental_table = await asyncio.to_thread(
+            get_incremental_delta_table, table_uri, storage_options, list(query_columns.keys())
+        )
 
-    destination = get_dlt_destination()
-    pipeline = dlt.pipeline(
-        pipeline_name=f"materialize_model_{model_label}",
-        destination=destination,
-        dataset_name=f"team_{team.pk}_model_{model_label}",
+    if incremental_table is not None:
+        since = get_watermark_since(watermark_last_value, saved_query.watermark_lookback)
+        if recomputed_rows is not None:
+            since = recomputed_rows.get_since(parents, since)
+
+    hogql_query = saved_query.query["query"]
+    clickhouse_query = await database_sync_to_async(prepare_saved_query_for_arrow)(
+        hogql_query, team, query_columns, watermark_filter=(watermark_column, since) if since is not None else None
     )
-    _ = await asyncio.to_thread(pipeline.run, hogql_table(hogql_query, team, saved_query.name, table_columns))
+    materialized = MaterializedStats(watermark_column=watermark_column)
+
+    if incremental_table is not None and since is not None and watermark_column is not None:
+        await logger.ainfo("Materializing rows of model %s since %s", model_label, since)
+
+        key = NamingConvention().normalize_table_identifier(saved_query.name)
+        delta_table = await write_record_batches_to_delta_table(
+            stream_record_batches(clickhouse_query, team, table_columns, materialized),
+            incremental_table,
+            predicate=get_watermark_predicate(watermark_column, since),
+        )
+    else:
+        destination = get_dlt_destination()
+        pipeline = dlt.pipeline(
+            pipeline_name=f"materialize_model_{model_label}",
+            destination=destination,
+            dataset_name=f"team_{team.pk}_model_{model_label}",
+        )
+        _ = await asyncio.to_thread(
+            pipeline.run, hogql_table(clickhouse_query, team, saved_query.name, table_columns, materialized)
+        )
+
+        tables = get_delta_tables(pipeline)
+        key, delta_table = tables.popitem()
+
+    delta_table.optimize.compact()
+    delta_table.vacuum(retention_hours=24, enforce_retention_duration=False, dry_run=False)
+
+    file_uris = delta_table.file_uris()
 
-    tables = get_delta_tables(pipeline)
+    prepare_s3_files_for_querying(saved_query.folder_path, saved_query.name, file_uris)
 
-    for table in tables.values():
-        table.optimize.compact()
-        table.vacuum(retention_hours=24, enforce_retention_duration=False, dry_run=False)
+    materialized.bytes += pc.sum(delta_table.get_add_actions(flatten=True).column("size_bytes")).as_py() or 0
 
-        file_uris = table.file_uris()
+    if watermark_column is not None:
+        if since is not None:
+            # Rows before `since` were kept as they were, so they still count towards the watermark
+            saved_query.update_watermark_last_value(max_watermark(watermark_last_value, materialized.watermark))
+        elif materialized.watermark is not None:
+            saved_query.update_watermark_last_value(materialized.watermark)
+        else:
+            saved_query.materialization_config.pop("watermark_last_value", None)
 
-        prepare_s3_files_for_querying(saved_query.folder_path, saved_query.name, file_uris)
+    await database_sync_to_async(DataWarehouseSavedQuery.objects.filter(id=saved_query.id).update)(
+        rows_materialized=materialized.rows,
+        bytes_materialized=materialized.bytes,
+        materialization_config=saved_query.materialization_config,
+    )
+
+    if recomputed_rows is not None:
+        recomputed_rows.since[model_label] = since
 
-    key, delta_table = tables.popitem()
     return (key, delta_table)
 
 
-@dlt.source(max_table_nesting=0)
-def hogql_table(query: str, team: Team, table_name: str, table_columns: dlt_typing.TTableSchemaColumns):
-    """A dlt source representing a HogQL table given by a HogQL query."""
+def get_model_table_uri(model_label: str, team: Team, table_name: str) -> str:
+    """Return the URI of the delta table a model is materialized in.
+
+    This follows the layout of the destination returned by `get_dlt_destination`, with dataset and
+    table names normalized like dlt does.
+    """
+    naming = NamingConvention()
+    dataset_name = naming.normalize_table_identifier(f"team_{team.pk}_model_{model_label}")
+    return f"{settings.BUCKET_URL}/{dataset_name}/modeling/{naming.normalize_table_identifier(table_name)}"
+
+
+def get_incremental_delta_table(
+    table_uri: str, storage_options: dict[str, str], column_names: list[str]
+) -> deltalake.DeltaTable | None:
+    """Return a model's delta table if its rows can be replaced incrementally.
+
+    That is, if the table exists and it has the columns the model's query currently returns.
+    """
+    if not deltalake.DeltaTable.is_deltatable(table_uri=table_uri, storage_options=storage_options):
+        return None
+
+    delta_table = deltalake.DeltaTable(table_uri=table_uri, storage_options=storage_options)
+
+    naming = NamingConvention()
+    table_column_names = {field.name for field in delta_table.schema().fields}
+    if table_column_names != {naming.normalize_identifier(column_name) for column_name in column_names}:
+        return None
+
+    return delta_table
+
+
+def get_watermark_since(watermark_last_value: typing.Any, watermark_lookback: int | float) -> typing.Any:
+    """Return the watermark an incremental model recomputes rows from.
+
+    The lookback is in seconds for date and time watermarks, in units of the watermark otherwise.
+    """
+    if isinstance(watermark_last_value, dt.datetime | dt.date):
+        return watermark_last_value - dt.timedelta(seconds=watermark_lookback)
+
+    if isinstance(watermark_last_value, int | float):
+        return watermark_last_value - watermark_lookback
+
+    return watermark_last_value
+
+
+def get_watermark_predicate(watermark_column: str, since: typing.Any) -> str:
+    """Return a delta lake predicate matching rows at or past `since`."""
+    column = NamingConvention().normalize_identifier(watermark_column)
+
+    if isinstance(since, dt.datetime | dt.date):
+        value = f"'{since.isoformat()}'"
+    elif isinstance(since, int | float):
+        value = str(since)
+    else:
+        value = "'{}'".format(str(since).replace("'", "''"))
+
+    return f'"{column}" >= {value}'
+
+
+def max_watermark(*watermarks: typing.Any) -> typing.Any:
+    """Return the highest of `watermarks`, ignoring `None`."""
+    present = [watermark for watermark in watermarks if watermark is not None]
+    if not present:
+        return None
+
+    try:
+        return max(present)
+    except TypeError:
+        # Watermarks from before a change of type of the watermark column
+        return present[-1]
+
+
+def parse_clickhouse_type(clickhouse_type: str) -> tuple[str, bool]:
+    """Return the base name of a ClickHouse type, without parameters, and whether it's nullable."""
+    nullable = False
+
+    if nullable_match := re.match(NullablePattern, clickhouse_type):
+        clickhouse_type = nullable_match.group(1)
+        nullable = True
 
-    async def get_hogql_rows():
-        settings = HogQLGlobalSettings(max_execution_time=60 * 10)  # 10 mins, same as the /query endpoint async workers
+    return re.sub(r"\(.+\)+", "", clickhouse_type), nullable
 
-        response = await asyncio.to_thread(
-            execute_hogql_query, query, team, settings=settings, limit_context=LimitContext.SAVED_QUERY
+
+def prepare_saved_query_for_arrow(
+    query: str,
+    team: Team,
+    query_columns: dict[str, typing.Any],
+    watermark_filter: tuple[str, typing.Any] | None = None,
+) -> str:
+    """Print a saved query's HogQL as a ClickHouse query that outputs Arrow record batches.
+
+    Values are substituted in the query, as our `ClickHouseClient` formats parameters differently
+    from the HogQL printer. Columns that don't have an Arrow type we can write as is are converted
+    in ClickHouse: UUIDs to strings, complex types to JSON, and `DateTime` and `Date` columns, which
+    ClickHouse writes to Arrow as unsigned integers, to `DateTime64` and `Date32`. A `watermark_filter`
+    of a column and a value limits results to rows where the column is at or past the value.
+    """
+    settings = HogQLGlobalSettings(max_execution_time=60 * 10)  # 10 mins, same as the /query endpoint async workers
+    context = HogQLContext(
+        team_id=team.pk,
+        team=team,
+        enable_select_queries=True,
+        # Models are materialized whole, so they can't be capped like results returned to users
+        limit_top_select=False,
+        modifiers=create_default_modifiers_for_team(team),
+    )
+    select_query = parse_select(query)
+    if watermark_filter is not None:
+        watermark_column, since = watermark_filter
+        select_query = ast.SelectQuery(
+            select=[ast.Field(chain=["*"])],
+            select_from=ast.JoinExpr(table=select_query),
+            where=ast.CompareOperation(
+                op=ast.CompareOperationOp.GtEq,
+                left=ast.Field(chain=[watermark_column]),
+                right=ast.Constant(value=since),
+            ),
         )
 
-        if not response.columns:
-            raise EmptyHogQLResponseColumnsError()
+    clickhouse_query = print_ast(select_query, context=context, dialect="clickhouse", settings=settings)
+    clickhouse_query = substitute_params(clickhouse_query, context.values)
+
+    replacements = []
+    for column_name, column_info in query_columns.items():
+        clickhouse_type, _ = parse_clickhouse_type(column_info["clickhouse"])
+
+        identifier = escape_clickhouse_identifier(column_name)
+        if clickhouse_type == "UUID":
+            replacements.append(f"toString({identifier}) AS {identifier}")
+        elif clickhouse_type in ("DateTime", "DateTime32"):
+            replacements.append(f"toDateTime64({identifier}, 6, 'UTC') AS {identifier}")
+        elif clickhouse_type == "Date":
+            replacements.append(f"toDate32({identifier}) AS {identifier}")
+        elif typing.cast(str, CLICKHOUSE_DLT_MAPPING[clickhouse_type]) == "complex":
+            replacements.append(f"toJSONString({identifier}) AS {identifier}")
+
+    if replacements:
+        clickhouse_query = f"SELECT * REPLACE ({', '.join(replacements)}) FROM ({clickhouse_query})"
+
+    return f"{clickhouse_query} FORMAT ArrowStream"
+
+
+@dataclasses.dataclass
+class MaterializedStats:
+    """Rows and bytes written when materializing a model, and the highest watermark of its rows."""
+
+    rows: int = 0
+    bytes: int = 0
+    watermark_column: str | None = None
+    watermark: typing.Any = None
+
+    def add(self, record_batch: pa.RecordBatch) -> None:
+        self.rows += record_batch.num_rows
 
-        columns: list[str] = response.columns
+        if self.watermark_column is None or record_batch.num_rows == 0:
+            return
 
-        for row in response.results:
-            yield dict(zip(columns, row))
+        batch_watermark = pc.max(record_batch.column(self.watermark_column)).as_py()
+        self.watermark = max_watermark(self.watermark, batch_watermark)
+
+
+def cast_record_batch_to_dlt_columns(
+    record_batch: pa.RecordBatch, table_columns: dlt_typing.TTableSchemaColumns
+) -> pa.RecordBatch:
+    """Cast a record batch's columns to the Arrow types and nullability matching their dlt columns.
+
+    Decimals keep the precision and scale they have in ClickHouse.
+    """
+    fields = []
+    for field in record_batch.schema:
+        column = table_columns.get(field.name, {})
+        data_type = column.get("data_type")
+        arrow_type = DLT_ARROW_MAPPING.get(data_type) if data_type is not None else None
+
+        if arrow_type is not None:
+            field = field.with_type(arrow_type)
+        if "nullable" in column:
+            field = field.with_nullable(column["nullable"])
+        fields.append(field)
+
+    schema = pa.schema(fields)
+    if schema.equals(record_batch.schema):
+        return record_batch
+
+    return record_batch.cast(schema)
+
+
+@dlt.source(max_table_nesting=0)
+def hogql_table(
+    query: str,
+    team: Team,
+    table_name: str,
+    table_columns: dlt_typing.TTableSchemaColumns,
+    materialized: MaterializedStats,
+):
+    """A dlt source representing a HogQL table given by a ClickHouse query printed from HogQL.
+
+    Results are streamed from ClickHouse as Arrow record batches, so only a few batches are held in
+    memory at any time regardless of the size of the model.
+    """
+
+    async def get_hogql_record_batches():
+        async for record_batch in stream_record_batches(query, team, table_columns, materialized):
+            yield pa.Table.from_batches([record_batch])
 
     yield dlt.resource(
-        get_hogql_rows,
+        get_hogql_record_batches,
         name="hogql_table",
         table_name=table_name,
         table_format="delta",
@@ -369,6 +675,101 @@ def hogql_table(query: str, team: Team, table_name: str, table_columns: dlt_typi
     )
 
 
+async def stream_record_batches(
+    query: str,
+    team: Team,
+    table_columns: dlt_typing.TTableSchemaColumns,
+    materialized: MaterializedStats,
+) -> collections.abc.AsyncGenerator[pa.RecordBatch, None]:
+    """Stream the results of a ClickHouse query printed from HogQL as Arrow record batches.
+
+    Record batches are cast to the types of their dlt columns and counted in `materialized`.
+    """
+    async with get_client(team_id=team.pk) as client:
+        async for record_batch in client.astream_query_as_arrow(query):
+            if record_batch.num_columns == 0:
+                raise EmptyHogQLResponseColumnsError()
+
+            record_batch = cast_record_batch_to_dlt_columns(record_batch, table_columns)
+            materialized.add(record_batch)
+
+            yield record_batch
+
+
+async def write_record_batches_to_delta_table(
+    record_batches: collections.abc.AsyncGenerator[pa.RecordBatch, None],
+    delta_table: deltalake.DeltaTable,
+    predicate: str,
+) -> deltalake.DeltaTable:
+    """Replace the rows of a delta table matching `predicate` with `record_batches`.
+
+    Record batches are pulled from the event loop by the thread writing to the delta table, so
+    they are written as they are streamed. Column names are normalized like dlt does, so they match
+    the columns of tables written by dlt.
+    """
+    loop = asyncio.get_running_loop()
+    naming = NamingConvention()
+    schema = delta_table.schema().to_pyarrow()
+
+    def iter_record_batches() -> collections.abc.Iterator[pa.RecordBatch]:
+        while True:
+            try:
+                record_batch = asyncio.run_coroutine_threadsafe(anext(record_batches), loop).result()
+            except StopAsyncIteration:
+                return
+
+            record_batch = record_batch.rename_columns(
+                [naming.normalize_identifier(column_name) for column_name in record_batch.schema.names]
+            )
+            yield record_batch.select(schema.names).cast(schema)
+
+    def write() -> deltalake.DeltaTable:
+        batches = iter_record_batches()
+        first_batch = next(batches, None)
+
+        if first_batch is None:
+            # Writing requires at least one batch, but rows past the watermark may be gone
+            delta_table.delete(predicate)
+        else:
+            deltalake.write_deltalake(
+                delta_table,
+                pa.RecordBatchReader.from_batches(schema, itertools.chain([first_batch], batches)),
+                mode="overwrite",
+                predicate=predicate,
+                engine="rust",
+            )
+
+        delta_table.update_incremental()
+        return delta_table
+
+    try:
+        return await asyncio.to_thread(write)
+    finally:
+        await record_batches.aclose()
+
+
+def get_delta_storage_options():
+    """Return the options to access the delta tables models are materialized in."""
+    if TEST:
+        return {
+            "aws_access_key_id": settings.AIRBYTE_BUCKET_KEY,
+            "aws_secret_access_key": settings.AIRBYTE_BUCKET_SECRET,
+            "endpoint_url": settings.OBJECT_STORAGE_ENDPOINT,
+            "region_name": settings.AIRBYTE_BUCKET_REGION,
+            "AWS_DEFAULT_REGION": settings.AIRBYTE_BUCKET_REGION,
+            "AWS_ALLOW_HTTP": "true",
+            "AWS_S3_ALLOW_UNSAFE_RENAME": "true",
+        }
+
+    return {
+        "aws_access_key_id": settings.AIRBYTE_BUCKET_KEY,
+        "aws_secret_access_key": settings.AIRBYTE_BUCKET_SECRET,
+        "region_name": settings.AIRBYTE_BUCKET_REGION,
+        "AWS_DEFAULT_REGION": settings.AIRBYTE_BUCKET_REGION,
+        "AWS_S3_ALLOW_UNSAFE_RENAME": "true",
+    }
+
+
 def get_dlt_destination():
     if TEST:
         credentials = {
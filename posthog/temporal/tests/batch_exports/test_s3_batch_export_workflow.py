@@ -10,6 +10,7 @@ from unittest import mock
 
 import aioboto3
 import botocore.exceptions
+import pyarrow as pa
 import pytest
 import pytest_asyncio
 from django.conf import settings
@@ -32,6 +33,7 @@ from posthog.temporal.batch_exports.s3_batch_export import (
     InvalidS3EndpointError,
     S3BatchExportInputs,
     S3BatchExportWorkflow,
+    S3Consumer,
     S3HeartbeatDetails,
     S3InsertInputs,
     S3MultiPartUpload,
@@ -39,8 +41,10 @@ from posthog.temporal.batch_exports.s3_batch_export import (
     insert_into_s3_activity,
     s3_default_fields,
 )
-from posthog.temporal.batch_exports.temporary_file import UnsupportedFileFormatError
+from posthog.temporal.batch_exports.spmc import RecordBatchQueue
+from posthog.temporal.batch_exports.temporary_file import UnsupportedFileFormatError, WriterFormat
 from posthog.temporal.common.clickhouse import ClickHouseClient
+from posthog.temporal.common.heartbeat import Heartbeater
 from posthog.temporal.tests.batch_exports.utils import mocked_start_batch_export_run
 from posthog.temporal.tests.utils.events import generate_test_events_in_clickhouse
 from posthog.temporal.tests.utils.models import (
@@ -1617,6 +1621,91 @@ async def test_s3_multi_part_upload_raises_retryable_exception(bucket_name, s3_k
         await s3_upload.upload_part(io.BytesIO(b"1010"), rewind=False)  # type: ignore
 
 
+async def test_s3_consumer_uploads_parts_concurrently(bucket_name, minio_client, activity_environment, s3_key_prefix):
+    """Test `S3Consumer` uploads parts concurrently, while tracking them in heartbeat details in order.
+
+    We slow down the upload of the first part, so that the following parts finish uploading before it.
+    """
+    data_interval_end = dt.datetime(2023, 4, 20, 14, 30, tzinfo=dt.UTC)
+    data_interval_start = data_interval_end - dt.timedelta(hours=1)
+    n_parts = 3
+
+    queue = RecordBatchQueue()
+    for i in range(n_parts):
+        await queue.put(
+            pa.RecordBatch.from_pydict(
+                {
+                    "event": [f"test-event-{i}"],
+                    # We need at least 5MB for a multi-part upload.
+                    "properties": ["a" * 5 * 1024**2],
+                    "_inserted_at": [data_interval_start + dt.timedelta(minutes=i)],
+                }
+            )
+        )
+    schema = await queue.get_schema()
+    producer_task = asyncio.create_task(asyncio.sleep(0))
+    await producer_task
+
+    s3_upload = S3MultiPartUpload(
+        bucket_name=bucket_name,
+        key=s3_key_prefix,
+        encryption=None,
+        kms_key_id=None,
+        region_name="us-east-1",
+        aws_access_key_id="object_storage_root_user",
+        aws_secret_access_key="object_storage_root_password",
+        endpoint_url=settings.OBJECT_STORAGE_ENDPOINT,
+    )
+    original_upload_part_retryable = s3_upload.upload_part_retryable
+    finished_part_numbers = []
+
+    async def slow_first_upload_part_retryable(reader, next_part_number, **kwargs):
+        if next_part_number == 1:
+            await asyncio.sleep(1)
+
+        etag = await original_upload_part_retryable(reader, next_part_number, **kwargs)
+        finished_part_numbers.append(next_part_number)
+        return etag
+
+    s3_upload.upload_part_retryable = slow_first_upload_part_retryable  # type: ignore
+    details = S3HeartbeatDetails()
+
+    async def run_consumer():
+        async with s3_upload as upload:
+            consumer = S3Consumer(
+                heartbeater=Heartbeater(),
+                heartbeat_details=details,
+                data_interval_start=data_interval_start,
+                data_interval_end=data_interval_end,
+                writer_format=WriterFormat.JSONL,
+                s3_upload=upload,
+                max_concurrent_uploads=n_parts,
+            )
+            records_completed = await consumer.start(
+                queue=queue, producer_task=producer_task, max_bytes=1, schema=schema, json_columns=()
+            )
+            await upload.complete()
+
+        return records_completed
+
+    records_completed = await activity_environment.run(run_consumer)
+
+    assert records_completed == n_parts
+    assert finished_part_numbers[-1] == 1
+    assert details.upload_state is not None
+    assert [part["PartNumber"] for part in details.upload_state.parts] == [1, 2, 3]
+    assert details.done_ranges == [
+        (data_interval_start + dt.timedelta(minutes=i), data_interval_start + dt.timedelta(minutes=i))
+        for i in range(n_parts)
+    ]
+
+    s3_object = await minio_client.get_object(Bucket=bucket_name, Key=s3_key_prefix)
+    data = await s3_object["Body"].read()
+    records = read_s3_data_as_json(data, None)
+
+    assert [record["event"] for record in records] == [f"test-event-{i}" for i in range(n_parts)]
+
+
 async def test_s3_multi_part_upload_raises_exception_if_invalid_endpoint(bucket_name, s3_key_prefix):
     """Test a InvalidS3EndpointError is raised if the endpoint is invalid."""
     s3_upload = S3MultiPartUpload(
@@ -4,8 +4,9 @@ import random
 
 import pyarrow as pa
 import pytest
+from django.test import override_settings
 
-from posthog.temporal.batch_exports.spmc import Producer, RecordBatchQueue
+from posthog.temporal.batch_exports.spmc import Producer, RecordBatchQueue, split_range_by_counts
 from posthog.temporal.tests.utils.events import generate_test_events_in_clickhouse
 
 pytestmark = [pytest.mark.asyncio, pytest.mark.django_db]
@@ -129,3 +130,60 @@ async def test_record_batch_producer_uses_extra_query_parameters(clickhouse_clie
             raise ValueError("Empty properties")
 
         assert record["custom_prop"] == expected["properties"]["custom"]
+
+
+@pytest.mark.parametrize(
+    "counts,target_rows,expected_boundaries",
+    [
+        ([], 10, [0, 24]),
+        ([(0, 5), (1, 5), (2, 5)], 100, [0, 24]),
+        ([(0, 5), (1, 5), (2, 5)], 5, [0, 1, 2, 24]),
+        ([(0, 10), (1, 0), (5, 3), (6, 7), (7, 1)], 10, [0, 1, 7, 24]),
+    ],
+)
+def test_split_range_by_counts(counts, target_rows, expected_boundaries):
+    """Test ranges are split in contiguous shards at the start of hours with enough rows."""
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.UTC)
+    hourly_counts = [(start + dt.timedelta(hours=hour), count) for hour, count in counts]
+
+    shards = split_range_by_counts((start, start + dt.timedelta(hours=24)), hourly_counts, target_rows)
+
+    boundaries = [start + dt.timedelta(hours=hour) for hour in expected_boundaries]
+    assert shards == list(zip(boundaries[:-1], boundaries[1:]))
+
+
+async def test_record_batch_producer_produces_sharded_backfill_in_order(clickhouse_client):
+    """Test a backfill split in shards produces all events in `_inserted_at` order."""
+    team_id = random.randint(1, 1000000)
+    data_interval_start = dt.datetime.fromisoformat("2023-04-25T00:00:00.000000+00:00")
+    data_interval_end = dt.datetime.fromisoformat("2023-04-26T00:00:00.000000+00:00")
+
+    (events, _, _) = await generate_test_events_in_clickhouse(
+        client=clickhouse_client,
+        team_id=team_id,
+        start_time=data_interval_start,
+        end_time=data_interval_end,
+        count=100,
+        count_outside_range=10,
+        count_other_team=10,
+        duplicate=False,
+    )
+
+    queue = RecordBatchQueue()
+    producer = Producer(clickhouse_client=clickhouse_client)
+
+    with override_settings(BATCH_EXPORT_BACKFILL_MAX_CONCURRENT_SHARDS=3, BATCH_EXPORT_BACKFILL_SHARD_TARGET_ROWS=10):
+        producer_task = producer.start(
+            queue=queue,
+            team_id=team_id,
+            is_backfill=True,
+            model_name="events",
+            full_range=(data_interval_start, data_interval_end),
+            done_ranges=[],
+        )
+
+    records = await get_all_record_batches_from_queue(queue, producer_task)
+
+    assert sorted(record["uuid"] for record in records) == sorted(event["uuid"] for event in events)
+    inserted_ats = [record["_inserted_at"] for record in records]
+    assert inserted_ats == sorted(inserted_ats)
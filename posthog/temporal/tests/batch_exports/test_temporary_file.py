@@ -3,6 +3,7 @@ import datetime as dt
 import io
 import json
 
+import orjson
 import pyarrow as pa
 import pyarrow.parquet as pq
 import pytest
@@ -14,7 +15,9 @@ from posthog.temporal.batch_exports.temporary_file import (
     DateRange,
     ParquetBatchExportWriter,
     json_dumps_bytes,
+    replace_broken_unicode,
 )
+from posthog.temporal.batch_exports.utils import cast_record_batch_json_columns
 
 
 @pytest.mark.parametrize(
@@ -536,3 +539,59 @@ async def test_jsonl_writer_deals_with_nested_user_events():
     assert date_ranges_seen == [
         (record_batch.column("_inserted_at")[0].as_py(), record_batch.column("_inserted_at")[-1].as_py())
     ]
+
+
+@pytest.mark.asyncio
+async def test_jsonl_writer_output_matches_encoding_each_row():
+    """Test the JSONL writer produces the same bytes as encoding each row on its own."""
+    in_memory_file_obj = io.BytesIO()
+
+    record_batch = cast_record_batch_json_columns(
+        pa.RecordBatch.from_pydict(
+            {
+                "event": pa.array(['"quoted"\tevent', "back\\slash", None, "control\x01character"]),
+                "uuid": pa.array(["uuid-0", "uuid-1", "uuid-2", "uuid-3"]),
+                "count": pa.array([1, -2, None, 2**62], type=pa.int64()),
+                "ratio": pa.array([0.1, 1.0, None, float("nan")]),
+                "is_identified": pa.array([True, False, None, True]),
+                "timestamp": pa.array(
+                    [
+                        dt.datetime(2024, 1, 1, tzinfo=dt.UTC),
+                        dt.datetime(2024, 1, 1, 0, 0, 0, 1, tzinfo=dt.UTC),
+                        None,
+                        dt.datetime(1, 1, 1, tzinfo=dt.UTC),
+                    ],
+                    type=pa.timestamp("us", tz="UTC"),
+                ),
+                "properties": pa.array(['{"prop_0": 1, "prop_1": [2.5]}', "{}", None, '{"broken": "\\ud83d"}']),
+                "elements": pa.array([[{"tag_name": "a"}], [], None, [{"tag_name": "div"}]]),
+                "_inserted_at": pa.array([dt.datetime.fromtimestamp(index) for index in range(4)]),
+            }
+        ),
+        json_columns=("properties",),
+    )
+
+    async def store_in_memory_on_flush(
+        batch_export_file,
+        records_since_last_flush,
+        bytes_since_last_flush,
+        flush_counter,
+        last_date_range,
+        is_last,
+        error,
+    ):
+        in_memory_file_obj.write(batch_export_file.read())
+
+    writer = JSONLBatchExportWriter(max_bytes=1, flush_callable=store_in_memory_on_flush)
+
+    async with writer.open_temporary_file():
+        await writer.write_record_batch(record_batch)
+
+    expected_lines = []
+    for record in record_batch.drop_columns(["_inserted_at"]).to_pylist():
+        try:
+            expected_lines.append(orjson.dumps(record, default=str) + b"\n")
+        except orjson.JSONEncodeError:
+            expected_lines.append(orjson.dumps(replace_broken_unicode(record), default=str) + b"\n")
+
+    assert in_memory_file_obj.getvalue() == b"".join(expected_lines)
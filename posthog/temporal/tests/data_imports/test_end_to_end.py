@@ -590,6 +590,28 @@ async def test_delta_wrapper_files(team, stripe_balance_transaction, minio_clien
     assert len(s3_objects["Contents"]) != 0
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_pipelined_import(team, stripe_balance_transaction):
+    with override_settings(
+        DATA_WAREHOUSE_PIPELINED_IMPORT_ENABLED=True,
+        DATA_WAREHOUSE_PIPELINE_MAX_QUEUED_CHUNKS=1,
+        DATA_WAREHOUSE_PIPELINE_COMMIT_TARGET_BYTES=1,
+    ):
+        workflow_id, inputs = await _run(
+            team=team,
+            schema_name="BalanceTransaction",
+            table_name="stripe_balancetransaction",
+            source_type="Stripe",
+            job_inputs={"stripe_secret_key": "test-key", "stripe_account_id": "acct_id"},
+            mock_data_response=stripe_balance_transaction["data"],
+        )
+
+    run: ExternalDataJob = await get_latest_run_if_exists(team_id=team.pk, pipeline_id=inputs.external_data_source_id)
+
+    assert run.rows_synced == len(stripe_balance_transaction["data"])
+
+
 @pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_funnels_lazy_joins_ordering(team, stripe_customer):
@@ -692,6 +714,62 @@ async def test_postgres_schema_evolution(team, postgres_config, postgres_connect
         assert any(x == "new_col" for x in columns)
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_postgres_incremental_staged_merge_and_compaction(team, postgres_config, postgres_connection):
+    await postgres_connection.execute(
+        "CREATE TABLE IF NOT EXISTS {schema}.compacted_table (id integer PRIMARY KEY, value text)".format(
+            schema=postgres_config["schema"]
+        )
+    )
+    await postgres_connection.execute(
+        "INSERT INTO {schema}.compacted_table (id, value) VALUES (1, 'a'), (2, 'b')".format(
+            schema=postgres_config["schema"]
+        )
+    )
+    await postgres_connection.commit()
+
+    with override_settings(
+        DATA_WAREHOUSE_INCREMENTAL_MERGE_BATCH_BYTES=1024 * 1024,
+        DATA_WAREHOUSE_COMPACTION_ENABLED=True,
+        DATA_WAREHOUSE_COMPACTION_MIN_FILE_COUNT=1,
+    ):
+        _workflow_id, inputs = await _run(
+            team=team,
+            schema_name="compacted_table",
+            table_name="postgres_compacted_table",
+            source_type="Postgres",
+            job_inputs={
+                "host": postgres_config["host"],
+                "port": postgres_config["port"],
+                "database": postgres_config["database"],
+                "user": postgres_config["user"],
+                "password": postgres_config["password"],
+                "schema": postgres_config["schema"],
+                "ssh_tunnel_enabled": "False",
+            },
+            mock_data_response=[],
+            sync_type=ExternalDataSchema.SyncType.INCREMENTAL,
+            sync_type_config={"incremental_field": "id", "incremental_field_type": "integer"},
+        )
+
+        await postgres_connection.execute(
+            "INSERT INTO {schema}.compacted_table (id, value) VALUES (3, 'c'), (4, 'd')".format(
+                schema=postgres_config["schema"]
+            )
+        )
+        await postgres_connection.commit()
+
+        await _execute_run(str(uuid.uuid4()), inputs, [])
+
+    schema = await sync_to_async(ExternalDataSchema.objects.get)(id=inputs.external_data_schema_id)
+
+    if settings.TEMPORAL_TASK_QUEUE == DATA_WAREHOUSE_TASK_QUEUE_V2:
+        assert schema.sync_type_config["incremental_field_last_value_v2"] == 4
+        assert schema.delta_file_count == 1
+        assert schema.delta_size_in_bytes is not None and schema.delta_size_in_bytes > 0
+
+
 @pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_sql_database_missing_incremental_values(team, postgres_config, postgres_connection):
@@ -6,6 +6,7 @@ import uuid
 
 import aioboto3
 import dlt
+import pyarrow as pa
 import pytest
 import pytest_asyncio
 import temporalio.common
@@ -24,6 +25,7 @@ from posthog.temporal.data_modeling.run_workflow import (
     BuildDagActivityInputs,
     ModelNode,
     CreateTableActivityInputs,
+    RecomputedRows,
     RunDagActivityInputs,
     RunWorkflow,
     RunWorkflowInputs,
@@ -345,6 +347,123 @@ async def test_materialize_model(ateam, bucket_name, minio_client, pageview_even
     assert key == saved_query.name
     assert sorted(table.to_pylist(), key=lambda d: (d["distinct_id"], d["timestamp"])) == expected_events
 
+    await database_sync_to_async(saved_query.refresh_from_db)()
+    assert saved_query.rows_materialized == len(expected_events)
+    assert saved_query.bytes_materialized is not None and saved_query.bytes_materialized > 0
+
+
+async def test_materialize_model_with_date_columns(ateam, bucket_name, minio_client, pageview_events):
+    query = """\
+    select
+      distinct_id as distinct_id,
+      toDateTime(timestamp, 'UTC') as datetime,
+      toDate(timestamp) as date
+    from events
+    where event = '$pageview'
+    """
+    saved_query = await DataWarehouseSavedQuery.objects.acreate(
+        team=ateam,
+        name="my_model",
+        query={"query": query, "kind": "HogQLQuery"},
+    )
+
+    with (
+        override_settings(
+            BUCKET_URL=f"s3://{bucket_name}",
+            AIRBYTE_BUCKET_KEY=settings.OBJECT_STORAGE_ACCESS_KEY_ID,
+            AIRBYTE_BUCKET_SECRET=settings.OBJECT_STORAGE_SECRET_ACCESS_KEY,
+            AIRBYTE_BUCKET_REGION="us-east-1",
+            AIRBYTE_BUCKET_DOMAIN="objectstorage:19000",
+        ),
+        unittest.mock.patch.object(AwsCredentials, "to_session_credentials", mock_to_session_credentials),
+        unittest.mock.patch.object(
+            AwsCredentials, "to_object_store_rs_credentials", mock_to_object_store_rs_credentials
+        ),
+    ):
+        _, delta_table = await materialize_model(saved_query.id.hex, ateam)
+
+    table = delta_table.to_pyarrow_table(columns=["distinct_id", "datetime", "date"])
+    events, _ = pageview_events
+    timestamps = [dt.datetime.fromisoformat(event["timestamp"]).replace(tzinfo=dt.UTC) for event in events]
+
+    assert table.schema.field("datetime").type == pa.timestamp("us", tz="UTC")
+    assert table.schema.field("date").type == pa.date32()
+    assert sorted(row["datetime"] for row in table.to_pylist()) == sorted(
+        timestamp.replace(microsecond=0) for timestamp in timestamps
+    )
+    assert sorted(row["date"] for row in table.to_pylist()) == sorted(timestamp.date() for timestamp in timestamps)
+
+
+async def test_materialize_model_incrementally(ateam, bucket_name, minio_client, pageview_events):
+    query = """\
+    select
+      event as event,
+      distinct_id as distinct_id,
+      timestamp as timestamp
+    from events
+    where event = '$pageview'
+    """
+    saved_query = await DataWarehouseSavedQuery.objects.acreate(
+        team=ateam,
+        name="my_model",
+        query={"query": query, "kind": "HogQLQuery"},
+        materialization_type=DataWarehouseSavedQuery.MaterializationType.INCREMENTAL,
+        materialization_config={"watermark_column": "timestamp", "watermark_lookback": 0},
+    )
+    events, _ = pageview_events
+    max_timestamp = max(dt.datetime.fromisoformat(event["timestamp"]).replace(tzinfo=dt.UTC) for event in events)
+    rows_at_max_timestamp = sum(
+        1 for event in events if dt.datetime.fromisoformat(event["timestamp"]).replace(tzinfo=dt.UTC) == max_timestamp
+    )
+
+    with (
+        override_settings(
+            BUCKET_URL=f"s3://{bucket_name}",
+            AIRBYTE_BUCKET_KEY=settings.OBJECT_STORAGE_ACCESS_KEY_ID,
+            AIRBYTE_BUCKET_SECRET=settings.OBJECT_STORAGE_SECRET_ACCESS_KEY,
+            AIRBYTE_BUCKET_REGION="us-east-1",
+            AIRBYTE_BUCKET_DOMAIN="objectstorage:19000",
+        ),
+        unittest.mock.patch.object(AwsCredentials, "to_session_credentials", mock_to_session_credentials),
+        unittest.mock.patch.object(
+            AwsCredentials, "to_object_store_rs_credentials", mock_to_object_store_rs_credentials
+        ),
+    ):
+        _, delta_table = await materialize_model(saved_query.id.hex, ateam)
+
+        await database_sync_to_async(saved_query.refresh_from_db)()
+        assert saved_query.rows_materialized == len(events)
+        assert saved_query.get_watermark_last_value() == max_timestamp
+
+        recomputed_rows = RecomputedRows()
+        key, delta_table = await materialize_model(saved_query.id.hex, ateam, recomputed_rows=recomputed_rows)
+
+    await database_sync_to_async(saved_query.refresh_from_db)()
+    table = delta_table.to_pyarrow_table(columns=["event", "distinct_id", "timestamp"])
+
+    assert key == saved_query.name
+    assert table.num_rows == len(events)
+    assert saved_query.rows_materialized == rows_at_max_timestamp
+    assert saved_query.get_watermark_last_value() == max_timestamp
+    assert recomputed_rows.since == {saved_query.id.hex: max_timestamp}
+
+
+@pytest.mark.parametrize(
+    "recomputed,parents,since,expected",
+    [
+        ({}, {"a"}, 10, 10),
+        ({"a": 5}, {"a"}, 10, 5),
+        ({"a": 15}, {"a"}, 10, 10),
+        ({"a": 5, "b": None}, {"a", "b"}, 10, None),
+        ({"a": 5, "c": 1}, {"a"}, 10, 5),
+        ({"a": dt.datetime(2024, 1, 1, tzinfo=dt.UTC)}, {"a"}, 10, None),
+    ],
+)
+def test_recomputed_rows_get_since(recomputed, parents, since, expected):
+    recomputed_rows = RecomputedRows(since=recomputed)
+
+    assert recomputed_rows.get_since(parents, since) == expected
+
 
 @pytest_asyncio.fixture
 async def saved_queries(ateam):
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from threading import Barrier, Thread
 from time import sleep
 from typing import Optional
 from unittest.mock import Mock
@@ -28,6 +29,22 @@ def fn_background(number: float) -> int:
     return value
 
 
+@cache_for(timedelta(minutes=1), maxsize=2)
+def fn_bounded(number: int) -> int:
+    return mocked_dependency(number)
+
+
+@cache_for(timedelta(milliseconds=100), evict_expired=True)
+def fn_evict_expired(number: int) -> int:
+    return mocked_dependency(number)
+
+
+@cache_for(timedelta(minutes=1))
+def fn_slow(number: float) -> int:
+    sleep(number)
+    return mocked_dependency(number)
+
+
 class TestCacheUtils(APIBaseTest):
     def setUp(self):
         mocked_dependency.reset_mock()
@@ -93,3 +110,43 @@ class TestCacheUtils(APIBaseTest):
             "Background task finished",
             "Post refresh call 1",
         ]
+
+    def test_least_recently_used_values_are_evicted_when_full(self) -> None:
+        fn_bounded(1, use_cache=True)
+        fn_bounded(2, use_cache=True)
+        fn_bounded(1, use_cache=True)
+        fn_bounded(3, use_cache=True)  # evicts 2, as 1 was used more recently
+        assert mocked_dependency.call_count == 3
+
+        fn_bounded(1, use_cache=True)
+        fn_bounded(3, use_cache=True)
+        assert mocked_dependency.call_count == 3
+
+        fn_bounded(2, use_cache=True)
+        assert mocked_dependency.call_count == 4
+        assert len(fn_bounded._cache) == 2
+
+    def test_expired_values_are_evicted(self) -> None:
+        fn_evict_expired(1, use_cache=True)
+        fn_evict_expired(2, use_cache=True)
+        sleep(0.2)
+        fn_evict_expired(3, use_cache=True)
+
+        assert list(fn_evict_expired._cache) == [((3,), frozenset())]
+
+    def test_concurrent_calls_share_a_single_call(self) -> None:
+        barrier = Barrier(5)
+        results: list[int] = []
+
+        def call() -> None:
+            barrier.wait()
+            results.append(fn_slow(0.2, use_cache=True))
+
+        threads = [Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [1] * 5
+        assert mocked_dependency.call_count == 1
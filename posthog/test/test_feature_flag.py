@@ -1,11 +1,14 @@
 import concurrent.futures
+import json
+from contextlib import nullcontext
 from datetime import datetime
 from typing import cast
 from unittest.mock import patch
 
 from django.core.cache import cache
 from django.db import IntegrityError, connection
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 import pytest
@@ -13,6 +16,7 @@ import pytest
 from posthog.api.test.test_feature_flag import QueryTimeoutWrapper
 from posthog.models import Cohort, FeatureFlag, GroupTypeMapping, Person
 from posthog.models.feature_flag import get_feature_flags_for_team_in_cache
+from posthog.models.cohort import CohortPeople
 from posthog.models.feature_flag.flag_matching import (
     FeatureFlagHashKeyOverride,
     FeatureFlagMatch,
@@ -745,6 +749,41 @@ class TestModelCache(BaseTest):
         assert cached_flags is not None
         self.assertEqual(0, len(cached_flags))
 
+    def test_deserialized_flags_are_kept_per_version(self):
+        flag = FeatureFlag.objects.create(team=self.team, key="test-flag", created_by=self.user)
+
+        with patch("posthog.models.feature_flag.feature_flag.json.loads", wraps=json.loads) as loads:
+            first_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+            second_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+
+        assert first_flags is not None and second_flags is not None
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(second_flags[0].key, "test-flag")
+
+        # every request gets flags of its own to change
+        self.assertIsNot(first_flags[0], second_flags[0])
+        second_flags[0].key = "changed-key"
+        cached_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+        assert cached_flags is not None
+        self.assertEqual(cached_flags[0].key, "test-flag")
+
+        flag.key = "new-key"
+        flag.save()
+
+        cached_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+        assert cached_flags is not None
+        self.assertEqual(cached_flags[0].key, "new-key")
+
+    def test_deserialized_flags_are_not_kept_without_a_version(self):
+        FeatureFlag.objects.create(team=self.team, key="test-flag", created_by=self.user)
+        cache.delete(f"team_feature_flags_version_{self.team.pk}")
+
+        first_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+        second_flags = get_feature_flags_for_team_in_cache(self.team.pk)
+
+        assert first_flags is not None and second_flags is not None
+        self.assertIsNot(first_flags[0], second_flags[0])
+
 
 class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
     maxDiff = None
@@ -5859,6 +5898,107 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
 
+# In process evaluation, without comparing against SQL
+evaluate_in_process_only = FeatureFlagMatcher._query_conditions_in_process
+
+
+@override_settings(DECIDE_EVALUATE_FLAGS_IN_PROCESS=True)
+class TestFeatureFlagMatcherInProcess(TestFeatureFlagMatcher):
+    """
+    Runs all the matcher tests with flags evaluated in process, checking every evaluation against the SQL one.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        def evaluate_and_compare(matcher: FeatureFlagMatcher) -> dict[str, bool]:
+            conditions = evaluate_in_process_only(matcher)
+            self.assertEqual(conditions, matcher._query_conditions_with_sql())
+            return conditions
+
+        patcher = patch.object(FeatureFlagMatcher, "_query_conditions_in_process", evaluate_and_compare)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    # Evaluating with SQL as well makes extra queries, and in process evaluation makes different ones to begin with
+    def assertNumQueries(self, num, func=None, *args, **kwargs):
+        if func is None:
+            return nullcontext()
+        func(*args, **kwargs)
+
+    def assertQueryMatchesSnapshot(self, query, params=None, replace_all_numbers=False):
+        pass
+
+    def count_selects(self, context: CaptureQueriesContext) -> int:
+        # Leaves out the statement timeout and savepoints around the evaluation
+        return len([query for query in context.captured_queries if query["sql"].startswith("SELECT")])
+
+    def test_in_process_evaluation_fetches_person_once(self):
+        Person.objects.create(
+            team=self.team,
+            distinct_ids=["example_id"],
+            properties={"email": "tim@posthog.com", "age": 30, "plan": None},
+        )
+        feature_flags = [
+            self.create_feature_flag(
+                key=f"flag-{index}",
+                filters={"groups": [{"properties": [properties], "rollout_percentage": 100}]},
+            )
+            for index, properties in enumerate(
+                [
+                    {"key": "email", "value": "posthog.com", "operator": "icontains", "type": "person"},
+                    {"key": "email", "value": "^tim@", "operator": "regex", "type": "person"},
+                    {"key": "age", "value": "25", "operator": "gt", "type": "person"},
+                    {"key": "age", "value": ["30", "31"], "operator": "exact", "type": "person"},
+                    {"key": "plan", "value": "free", "operator": "is_not", "type": "person"},
+                    {"key": "country", "operator": "is_not_set", "type": "person"},
+                ]
+            )
+        ]
+
+        matcher = FeatureFlagMatcher(feature_flags, "example_id")
+        with patch.object(FeatureFlagMatcher, "_query_conditions_in_process", evaluate_in_process_only):
+            with CaptureQueriesContext(connection) as context:
+                matches = [matcher.get_match(feature_flag).match for feature_flag in feature_flags]
+
+        self.assertEqual(matches, [True] * len(feature_flags))
+        self.assertEqual(self.count_selects(context), 1)
+
+    def test_in_process_evaluation_falls_back_to_sql_for_unsupported_conditions(self):
+        Person.objects.create(team=self.team, distinct_ids=["example_id"], properties={"name": "b", "age": 30})
+        feature_flags = [
+            self.create_feature_flag(
+                key="string-comparison",
+                filters={"groups": [{"properties": [{"key": "name", "value": "a", "operator": "gt"}]}]},
+            ),
+            self.create_feature_flag(
+                key="number-comparison",
+                filters={"groups": [{"properties": [{"key": "age", "value": 40, "operator": "gt"}]}]},
+            ),
+        ]
+
+        matcher = FeatureFlagMatcher(feature_flags, "example_id")
+        with patch.object(FeatureFlagMatcher, "_query_conditions_in_process", evaluate_in_process_only):
+            with CaptureQueriesContext(connection) as context:
+                matches = [matcher.get_match(feature_flag).match for feature_flag in feature_flags]
+
+        self.assertEqual(matches, [True, False])
+        # One fetch of the person, and one query for the string comparison, which depends on the database collation
+        self.assertEqual(self.count_selects(context), 2)
+
+    def test_in_process_evaluation_of_static_cohorts(self):
+        person = Person.objects.create(team=self.team, distinct_ids=["example_id_1"])
+        Person.objects.create(team=self.team, distinct_ids=["example_id_2"])
+        cohort = Cohort.objects.create(team=self.team, groups=[], is_static=True, last_calculation=timezone.now())
+        CohortPeople.objects.create(cohort=cohort, person=person)
+        feature_flag = self.create_feature_flag(
+            filters={"groups": [{"properties": [{"key": "id", "value": cohort.pk, "type": "cohort"}]}]}
+        )
+
+        self.assertEqual(FeatureFlagMatcher([feature_flag], "example_id_1").get_match(feature_flag).match, True)
+        self.assertEqual(FeatureFlagMatcher([feature_flag], "example_id_2").get_match(feature_flag).match, False)
+
+
 class TestFeatureFlagHashKeyOverrides(BaseTest, QueryMatchingTest):
     person: Person
 
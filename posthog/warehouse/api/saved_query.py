@@ -48,6 +48,8 @@ class DataWarehouseSavedQuerySerializer(serializers.ModelSerializer):
             "columns",
             "status",
             "last_run_at",
+            "materialization_type",
+            "materialization_config",
         ]
         read_only_fields = ["id", "created_by", "created_at", "columns", "status", "last_run_at"]
 
@@ -98,6 +100,8 @@ class DataWarehouseSavedQuerySerializer(serializers.ModelSerializer):
         except Exception as err:
             raise serializers.ValidationError(str(err))
 
+        self._validate_watermark_column(view)
+
         with transaction.atomic():
             view.save()
 
@@ -112,6 +116,10 @@ class DataWarehouseSavedQuerySerializer(serializers.ModelSerializer):
         return view
 
     def update(self, instance: Any, validated_data: Any) -> Any:
+        previous_query = instance.query
+        previous_watermark_column = instance.watermark_column
+        previous_watermark_last_value = instance.materialization_config.get("watermark_last_value")
+
         with transaction.atomic():
             view: DataWarehouseSavedQuery = super().update(instance, validated_data)
 
@@ -125,6 +133,14 @@ class DataWarehouseSavedQuerySerializer(serializers.ModelSerializer):
             except Exception as err:
                 raise serializers.ValidationError(str(err))
 
+            self._validate_watermark_column(view)
+
+            # Rows materialized past the watermark are only still valid if they were computed the same way
+            if view.query == previous_query and view.watermark_column == previous_watermark_column:
+                view.update_watermark_last_value(previous_watermark_last_value)
+            else:
+                view.materialization_config.pop("watermark_last_value", None)
+
             view.save()
 
             try:
@@ -161,6 +177,49 @@ class DataWarehouseSavedQuerySerializer(serializers.ModelSerializer):
 
         return query
 
+    def validate_materialization_config(self, materialization_config):
+        if not isinstance(materialization_config, dict):
+            raise exceptions.ValidationError(detail="Materialization config must be an object")
+
+        watermark_column = materialization_config.get("watermark_column")
+        if watermark_column is not None and not isinstance(watermark_column, str):
+            raise exceptions.ValidationError(detail="Watermark column must be a string")
+
+        watermark_lookback = materialization_config.get("watermark_lookback", 0)
+        if (
+            not isinstance(watermark_lookback, int | float)
+            or isinstance(watermark_lookback, bool)
+            or watermark_lookback < 0
+        ):
+            raise exceptions.ValidationError(detail="Watermark lookback must be a non-negative number")
+
+        # The last watermark is only ever set by materializing the model
+        return {"watermark_column": watermark_column, "watermark_lookback": watermark_lookback}
+
+    def validate(self, attrs):
+        materialization_type = attrs.get(
+            "materialization_type",
+            getattr(self.instance, "materialization_type", DataWarehouseSavedQuery.MaterializationType.FULL_REFRESH),
+        )
+        materialization_config = attrs.get(
+            "materialization_config", getattr(self.instance, "materialization_config", {})
+        )
+
+        if materialization_type == DataWarehouseSavedQuery.MaterializationType.INCREMENTAL and not (
+            materialization_config.get("watermark_column")
+        ):
+            raise exceptions.ValidationError(
+                detail={"materialization_config": "Incremental materialization requires a watermark column"}
+            )
+
+        return attrs
+
+    def _validate_watermark_column(self, view: DataWarehouseSavedQuery) -> None:
+        if view.is_incremental and view.watermark_column not in (view.columns or {}):
+            raise serializers.ValidationError(
+                {"materialization_config": f"Watermark column {view.watermark_column} is not a column of the view"}
+            )
+
 
 class DataWarehouseSavedQueryViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
     """
@@ -132,6 +132,88 @@ class TestSavedQuery(APIBaseTest):
             ],
         )
 
+    def test_create_incremental(self):
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/warehouse_saved_queries/",
+            {
+                "name": "event_view",
+                "query": {
+                    "kind": "HogQLQuery",
+                    "query": "select event as event, timestamp as timestamp from events",
+                },
+                "types": [["event", "String"], ["timestamp", "DateTime64(6, 'UTC')"]],
+                "materialization_type": "incremental",
+                "materialization_config": {
+                    "watermark_column": "timestamp",
+                    "watermark_lookback": 3600,
+                    "watermark_last_value": "2024-01-01T00:00:00+00:00",
+                },
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        saved_query = response.json()
+        self.assertEqual(saved_query["materialization_type"], "incremental")
+        self.assertEqual(
+            saved_query["materialization_config"], {"watermark_column": "timestamp", "watermark_lookback": 3600}
+        )
+
+    def test_create_incremental_requires_valid_watermark_column(self):
+        for materialization_config in ({}, {"watermark_column": "distinct_id"}):
+            response = self.client.post(
+                f"/api/projects/{self.team.id}/warehouse_saved_queries/",
+                {
+                    "name": "event_view",
+                    "query": {
+                        "kind": "HogQLQuery",
+                        "query": "select event as event, timestamp as timestamp from events",
+                    },
+                    "types": [["event", "String"], ["timestamp", "DateTime64(6, 'UTC')"]],
+                    "materialization_type": "incremental",
+                    "materialization_config": materialization_config,
+                },
+            )
+            self.assertEqual(response.status_code, 400, response.content)
+
+    def test_update_resets_watermark_when_query_changes(self):
+        columns = {
+            "event": {"hogql": "StringDatabaseField", "clickhouse": "String", "valid": True},
+            "timestamp": {"hogql": "DateTimeDatabaseField", "clickhouse": "DateTime64(6, 'UTC')", "valid": True},
+        }
+        saved_query = DataWarehouseSavedQuery.objects.create(
+            team=self.team,
+            name="event_view",
+            query={"kind": "HogQLQuery", "query": "select event as event, timestamp as timestamp from events"},
+            columns=columns,
+            materialization_type=DataWarehouseSavedQuery.MaterializationType.INCREMENTAL,
+            materialization_config={
+                "watermark_column": "timestamp",
+                "watermark_lookback": 0,
+                "watermark_last_value": "2024-01-01T00:00:00+00:00",
+            },
+        )
+
+        with patch.object(DataWarehouseSavedQuery, "get_columns", return_value=columns):
+            response = self.client.patch(
+                f"/api/projects/{self.team.id}/warehouse_saved_queries/{saved_query.id}",
+                {"materialization_config": {"watermark_column": "timestamp", "watermark_lookback": 60}},
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            saved_query.refresh_from_db()
+            self.assertEqual(saved_query.materialization_config["watermark_last_value"], "2024-01-01T00:00:00+00:00")
+
+            response = self.client.patch(
+                f"/api/projects/{self.team.id}/warehouse_saved_queries/{saved_query.id}",
+                {
+                    "query": {
+                        "kind": "HogQLQuery",
+                        "query": "select event as event, timestamp as timestamp from events where event = 'a'",
+                    },
+                },
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            saved_query.refresh_from_db()
+            self.assertNotIn("watermark_last_value", saved_query.materialization_config)
+
     def test_nested_view(self):
         saved_query_1_response = self.client.post(
             f"/api/projects/{self.team.id}/warehouse_saved_queries/",
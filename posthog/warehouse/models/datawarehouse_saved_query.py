@@ -1,3 +1,4 @@
+import datetime as dt
 import re
 from typing import Any, Optional, Union
 
@@ -51,6 +52,10 @@ class DataWarehouseSavedQuery(CreatedMetaFields, UUIDModel, DeletedMetaFields):
         FAILED = "Failed"
         RUNNING = "Running"
 
+    class MaterializationType(models.TextChoices):
+        FULL_REFRESH = "full_refresh", "full_refresh"
+        INCREMENTAL = "incremental", "incremental"
+
     name = models.CharField(max_length=128, validators=[validate_saved_query_name])
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
     columns = models.JSONField(
@@ -69,6 +74,23 @@ class DataWarehouseSavedQuery(CreatedMetaFields, UUIDModel, DeletedMetaFields):
         help_text="The timestamp of this SavedQuery's last run (if any).",
     )
     table = models.ForeignKey("posthog.DataWarehouseTable", on_delete=models.SET_NULL, null=True, blank=True)
+    rows_materialized = models.BigIntegerField(
+        null=True, blank=True, help_text="The number of rows written by this SavedQuery's last materialization."
+    )
+    bytes_materialized = models.BigIntegerField(
+        null=True, blank=True, help_text="The size in bytes of this SavedQuery's last materialization."
+    )
+    materialization_type = models.CharField(
+        max_length=128,
+        choices=MaterializationType.choices,
+        default=MaterializationType.FULL_REFRESH,
+        help_text="Whether materializing this SavedQuery recomputes all rows or only rows past its watermark.",
+    )
+    # { "watermark_column": string, "watermark_lookback": number, "watermark_last_value": any }
+    materialization_config = models.JSONField(
+        default=dict,
+        blank=True,
+    )
 
     class Meta:
         constraints = [
@@ -78,6 +100,52 @@ class DataWarehouseSavedQuery(CreatedMetaFields, UUIDModel, DeletedMetaFields):
             )
         ]
 
+    @property
+    def is_incremental(self) -> bool:
+        return self.materialization_type == self.MaterializationType.INCREMENTAL
+
+    @property
+    def watermark_column(self) -> str | None:
+        return self.materialization_config.get("watermark_column")
+
+    @property
+    def watermark_lookback(self) -> int | float:
+        """How far before the last watermark to recompute rows from.
+
+        In seconds for date and time watermark columns, in units of the column otherwise.
+        """
+        return self.materialization_config.get("watermark_lookback") or 0
+
+    def get_watermark_last_value(self) -> Any:
+        """Return the highest watermark materialized so far, parsed back from its JSON representation."""
+        last_value = self.materialization_config.get("watermark_last_value")
+
+        if not isinstance(last_value, str):
+            return last_value
+
+        try:
+            last_value_dt = dt.datetime.fromisoformat(last_value)
+        except ValueError:
+            return last_value
+
+        if last_value_dt.tzinfo is None:
+            last_value_dt = last_value_dt.replace(tzinfo=dt.UTC)
+        return last_value_dt
+
+    def update_watermark_last_value(self, last_value: Any) -> None:
+        if last_value is None:
+            return
+
+        last_value_json: Any
+        if isinstance(last_value, dt.datetime | dt.date):
+            last_value_json = last_value.isoformat()
+        elif isinstance(last_value, int | float):
+            last_value_json = last_value
+        else:
+            last_value_json = str(last_value)
+
+        self.materialization_config["watermark_last_value"] = last_value_json
+
     def get_columns(self) -> dict[str, dict[str, Any]]:
         from posthog.api.services.query import process_query_dict
         from posthog.hogql_queries.query_runner import ExecutionMode
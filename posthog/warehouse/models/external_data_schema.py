@@ -63,6 +63,12 @@ class ExternalDataSchema(CreatedMetaFields, UpdatedMetaFields, UUIDModel, Delete
         models.CharField(max_length=128, choices=SyncFrequency.choices, default=SyncFrequency.DAILY, blank=True)
     )
     sync_frequency_interval = models.DurationField(default=timedelta(hours=6), null=True, blank=True)
+    delta_file_count = models.IntegerField(
+        null=True, blank=True, help_text="The number of files of the synced delta table after the last sync."
+    )
+    delta_size_in_bytes = models.BigIntegerField(
+        null=True, blank=True, help_text="The total size of the files of the synced delta table after the last sync."
+    )
 
     __repr__ = sane_repr("name")
 